@@ -1,12 +1,33 @@
 """
 KR-AI-Engine API Module
 FastAPI endpoints for document processing and search
+
+The legacy API classes are resolved lazily (PEP 562) so that importing a router
+such as ``api.routes.documents`` does not load the PDF/vision processing stack.
 """
 
-from .document_api import DocumentAPI
-from .search_api import SearchAPI
-from .defect_detection_api import DefectDetectionAPI
-from .features_api import FeaturesAPI
+from importlib import import_module
+
+_EXPORTS = {
+    'DocumentAPI': '.document_api',
+    'SearchAPI': '.search_api',
+    'DefectDetectionAPI': '.defect_detection_api',
+    'FeaturesAPI': '.features_api',
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
 
 __all__ = [
     'DocumentAPI',
@@ -18,13 +18,11 @@ import asyncpg
 import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel, Field
 
+# langchain/langgraph are imported inside create_tools() and KRAIAgent so that
+# importing this router module stays cheap; they load when the agent is first built.
+
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from api.agent_scope import (  # noqa: E402
     AgentScope,
@@ -37,8 +35,10 @@ from api.agent_scope import (  # noqa: E402
     normalize_scope,
 )
 from api.middleware.auth_middleware import require_permission  # noqa: E402
+from api.startup import LazyService  # noqa: E402
 from processors.env_loader import load_all_env_files  # noqa: E402
 from services.db_pool import get_pool  # noqa: E402
+from backend.services.ollama_scheduler import CURRENT_PRIORITY, Priority, get_ollama_scheduler  # noqa: E402
 
 project_root = Path(__file__).parent.parent.parent
 load_all_env_files(project_root)
@@ -285,6 +285,7 @@ def create_tools(
     reranking_service=None,   # RerankingService | None
 ) -> list:
     """Create agent tools bound to the shared asyncpg pool."""
+    from langchain_core.tools import tool
 
     async def _vector_seed(query: str) -> dict:
         """
@@ -645,7 +646,7 @@ def create_tools(
             # Rerank results using index-based reconstruction (handles duplicate content correctly)
             if rows and reranking_service and reranking_service.enabled:
                 texts = [row["content"] for row in rows]
-                top_texts = reranking_service.rerank(query, texts)
+                top_texts = await reranking_service.arerank(query, texts)
                 used_indices: set = set()
                 reranked_rows = []
                 for text in top_texts:
@@ -688,8 +689,7 @@ def create_tools(
     return [search_error_codes, search_parts, search_videos, semantic_search]
 
 
-_SYSTEM_PROMPT = SystemMessage(
-    content="""Du bist **KRAI** – der KI-Assistent für Drucker- und Kopierer-Servicetechniker.
+_SYSTEM_PROMPT_TEXT = """Du bist **KRAI** – der KI-Assistent für Drucker- und Kopierer-Servicetechniker.
 Du hast Zugriff auf eine Datenbank mit Fehlercodes, Ersatzteilen, Videos und Servicehandbüchern.
 
 ## Deine Tools
@@ -707,7 +707,6 @@ Du hast Zugriff auf eine Datenbank mit Fehlercodes, Ersatzteilen, Videos und Ser
 6. Wenn der Nutzer noch kein Gerät eingegrenzt hat und die Frage mehrdeutig ist, weise kurz darauf hin, dass Hersteller/Modell die Trefferqualität verbessert.
 7. Antworte immer auf **Deutsch** und nutze **Markdown**.
 """
-)
 
 
 class KRAIAgent:
@@ -723,6 +722,10 @@ class KRAIAgent:
         if ollama_base_url is None:
             ollama_base_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
 
+        from langchain_core.messages import SystemMessage
+        from langgraph.checkpoint.memory import MemorySaver
+        from langgraph.prebuilt import create_react_agent
+
         self.ai_service = ai_service
         self.reranking_service = reranking_service
         self.logger = logging.getLogger(__name__)
@@ -766,9 +769,27 @@ class KRAIAgent:
                     temperature=0.0,
                 )
         else:
+            from langchain_ollama import ChatOllama
+
+            class ScheduledChatOllama(ChatOllama):
+                """ChatOllama whose generations wait for an Ollama scheduler slot.
+
+                Only the model call holds the slot; tool calls in between run
+                unthrottled, so other models can be served during a turn.
+                """
+
+                async def _agenerate(self, *args: Any, **kwargs: Any):
+                    async with get_ollama_scheduler().aslot(self.model):
+                        return await super()._agenerate(*args, **kwargs)
+
+                async def _astream(self, *args: Any, **kwargs: Any):
+                    async with get_ollama_scheduler().aslot(self.model):
+                        async for chunk in super()._astream(*args, **kwargs):
+                            yield chunk
+
             ollama_model = os.getenv("OLLAMA_MODEL_CHAT") or os.getenv("OLLAMA_MODEL_TEXT", "llama3.2:latest")
             self.logger.info("Connecting to Ollama at %s, model: %s", ollama_base_url, ollama_model)
-            llm = ChatOllama(
+            llm = ScheduledChatOllama(
                 model=ollama_model,
                 base_url=ollama_base_url,
                 temperature=0.0,
@@ -784,7 +805,7 @@ class KRAIAgent:
                 reranking_service=self.reranking_service,
             ),
             checkpointer=MemorySaver(),
-            prompt=_SYSTEM_PROMPT,
+            prompt=SystemMessage(content=_SYSTEM_PROMPT_TEXT),
         )
         self.logger.info("KRAI Agent initialized successfully")
 
@@ -823,9 +844,13 @@ class KRAIAgent:
     ) -> tuple[str, dict[str, str]]:
         """Process a message and return the response plus the active scope."""
 
+        from langchain_core.messages import HumanMessage, SystemMessage
+
         active_scope = self._resolve_scope(session_id, scope, reset_scope=reset_scope)
         config = {"configurable": {"thread_id": session_id}}
         token = CURRENT_AGENT_SCOPE.set(active_scope or None)
+        # Chat turns (and the Ollama calls their tools make) go ahead of ingestion
+        priority_token = CURRENT_PRIORITY.set(Priority.INTERACTIVE)
 
         messages: list[Any] = [HumanMessage(content=message)]
         scope_message = build_scope_system_message(active_scope)
@@ -842,6 +867,7 @@ class KRAIAgent:
             return f"Es ist ein Fehler aufgetreten: {exc}", active_scope
         finally:
             CURRENT_AGENT_SCOPE.reset(token)
+            CURRENT_PRIORITY.reset(priority_token)
 
     async def chat_stream(
         self,
@@ -853,9 +879,13 @@ class KRAIAgent:
     ) -> AsyncGenerator[str, None]:
         """Process a message and stream the response token by token."""
 
+        from langchain_core.messages import HumanMessage, SystemMessage
+
         active_scope = self._resolve_scope(session_id, scope, reset_scope=reset_scope)
         config = {"configurable": {"thread_id": session_id}}
         token = CURRENT_AGENT_SCOPE.set(active_scope or None)
+        # Chat turns (and the Ollama calls their tools make) go ahead of ingestion
+        priority_token = CURRENT_PRIORITY.set(Priority.INTERACTIVE)
 
         messages: list[Any] = [HumanMessage(content=message)]
         scope_message = build_scope_system_message(active_scope)
@@ -875,14 +905,24 @@ class KRAIAgent:
             yield f"Es ist ein Fehler aufgetreten: {exc}"
         finally:
             CURRENT_AGENT_SCOPE.reset(token)
+            CURRENT_PRIORITY.reset(priority_token)
 
 
-def create_agent_api(pool: asyncpg.Pool, agent: KRAIAgent | None = None) -> APIRouter:
-    """Create and return the FastAPI router for the KRAI agent."""
+def create_agent_api(pool: asyncpg.Pool, agent: KRAIAgent | LazyService | None = None) -> APIRouter:
+    """Create and return the FastAPI router for the KRAI agent.
+
+    The agent (LangGraph graph plus LLM client) is built on the first chat request,
+    not when the router is created; pass a ``LazyService`` to share it with other routers.
+    """
 
     router = APIRouter(prefix="/agent", tags=["AI Agent"])
-    if agent is None:
-        agent = KRAIAgent(pool)
+    if isinstance(agent, LazyService):
+        lazy_agent = agent
+    elif agent is not None:
+        ready_agent = agent
+        lazy_agent = LazyService("krai_agent", lambda: ready_agent)
+    else:
+        lazy_agent = LazyService("krai_agent", lambda: KRAIAgent(pool))
 
     @router.post("/chat", response_model=ChatResponse)
     async def chat(
@@ -890,6 +930,7 @@ def create_agent_api(pool: asyncpg.Pool, agent: KRAIAgent | None = None) -> APIR
         current_user: dict = Depends(require_permission("agent:chat")),
     ) -> ChatResponse:
         try:
+            agent = await lazy_agent.get()
             response, active_scope = await agent.chat(
                 message.message,
                 message.session_id,
@@ -911,6 +952,8 @@ def create_agent_api(pool: asyncpg.Pool, agent: KRAIAgent | None = None) -> APIR
         message: ChatMessage,
         current_user: dict = Depends(require_permission("agent:chat")),
     ) -> StreamingResponse:
+        agent = await lazy_agent.get()
+
         async def generate() -> AsyncGenerator[str, None]:
             async for chunk in agent.chat_stream(
                 message.message,
@@ -32,7 +32,6 @@ from slowapi.errors import RateLimitExceeded
 from api import websocket as websocket_api
 
 # Import API routers
-from api.agent_api import KRAIAgent, create_agent_api
 from api.dependencies.auth import set_auth_service
 from api.dependencies.auth_factory import create_and_initialize_auth_service
 from api.middleware.auth_middleware import AuthMiddleware, require_permission
@@ -46,6 +45,7 @@ from api.middleware.rate_limit_middleware import (
     rate_limit_upload_dynamic,
 )
 from api.middleware.request_validation_middleware import RequestValidationMiddleware
+from api.startup import PROFILE_FLAG, LazyService, collect_import_times, startup_profiler
 from api.routes import documents, products
 from api.routes.api_keys import router as api_keys_router
 from api.routes.batch import router as batch_router
@@ -61,16 +61,15 @@ from core.base_processor import ProcessingContext
 from processors.env_loader import load_all_env_files
 from processors.stage_tracker import StageTracker
 from processors.upload_processor import BatchUploadProcessor, UploadProcessor
-from services.ai_service import AIService
 from services.alert_service import AlertService
 from services.auth_service import AuthenticationError, AuthService
 from services.batch_task_service import BatchTaskService
 from services.database_adapter import DatabaseAdapter
 from services.database_factory import create_database_adapter
-from services.db_pool import get_pool
+from services.db_pool import get_pool, get_pool_stats
 from services.metrics_service import MetricsService
+from backend.services.ollama_scheduler import get_ollama_scheduler
 from services.performance_service import PerformanceCollector
-from services.reranking_service import RerankingService
 from services.transaction_manager import TransactionManager
 
 # Load consolidated environment configuration
@@ -429,6 +428,7 @@ _transaction_manager_lock = asyncio.Lock()
 _metrics_service_lock = asyncio.Lock()
 _alert_service_lock = asyncio.Lock()
 _performance_collector_lock = asyncio.Lock()
+_db_adapter_lock = asyncio.Lock()
 
 
 # === AUTH SERVICE INITIALIZATION ===
@@ -452,15 +452,24 @@ async def get_database_pool():
     return await get_pool()
 
 
+async def get_shared_database_adapter():
+    """Return the app-wide DatabaseAdapter (backed by the shared asyncpg pool)."""
+    db_adapter = getattr(app.state, "db_adapter", None)
+    if db_adapter is None:
+        async with _db_adapter_lock:
+            db_adapter = getattr(app.state, "db_adapter", None)
+            if db_adapter is None:
+                db_adapter = create_database_adapter()
+                await db_adapter.connect()
+                app.state.db_adapter = db_adapter
+    return db_adapter
+
+
 async def get_upload_processor(request: Request):
     """Get Upload Processor instance"""
     global upload_processor
     if upload_processor is None:
-        db_adapter = getattr(request.app.state, "db_adapter", None)
-        if db_adapter is None:
-            db_adapter = create_database_adapter()
-            await db_adapter.connect()
-            request.app.state.db_adapter = db_adapter
+        db_adapter = await get_shared_database_adapter()
         upload_processor = UploadProcessor(database_adapter=db_adapter)
     return upload_processor
 
@@ -471,8 +480,10 @@ async def get_agent_app():
     if agent_app is None:
         async with _agent_app_lock:
             if agent_app is None:
+                from api.agent_api import create_agent_api
+
                 pool = await get_pool()
-                agent_app = create_agent_api(pool)
+                agent_app = create_agent_api(pool, agent=getattr(app.state, "krai_agent", None))
     return agent_app
 
 
@@ -504,10 +515,9 @@ async def get_metrics_service() -> MetricsService:
     if metrics_service is None:
         async with _metrics_service_lock:
             if metrics_service is None:
-                adapter = create_database_adapter()
-                await adapter.connect()
+                adapter = await get_shared_database_adapter()
                 stage_tracker = StageTracker(adapter)
-                pool = getattr(adapter, "pg_pool", None) or await get_pool()
+                pool = await get_pool()
                 metrics_service = MetricsService(pool, stage_tracker)
     return metrics_service
 
@@ -518,8 +528,7 @@ async def get_alert_service() -> AlertService:
     if alert_service is None:
         async with _alert_service_lock:
             if alert_service is None:
-                adapter = create_database_adapter()
-                await adapter.connect()
+                adapter = await get_shared_database_adapter()
                 metrics_svc = await get_metrics_service()
                 alert_service = AlertService(adapter, metrics_svc)
     return alert_service
@@ -662,7 +671,11 @@ async def health_check(request: Request, response: Response):
         pool = await get_pool()
         async with pool.acquire() as conn:
             await conn.fetchval("SELECT 1")
-        services["database"] = {"status": "healthy", "message": "Database connected"}
+        services["database"] = {
+            "status": "healthy",
+            "message": "Database connected",
+            "pool": get_pool_stats(pool),
+        }
     except Exception as e:
         services["database"] = {"status": "unhealthy", "message": f"Database error: {e!s}"}
 
@@ -678,6 +691,7 @@ async def health_check(request: Request, response: Response):
             services["ollama"] = {"status": "unhealthy", "message": "Ollama not responding"}
     except Exception as e:
         services["ollama"] = {"status": "unhealthy", "message": f"Ollama error: {e!s}"}
+    services["ollama"]["scheduler"] = get_ollama_scheduler().stats()
 
     # Check storage (Object Storage)
     try:
@@ -825,21 +839,63 @@ async def upload_document(
             temp_path.unlink()
 
 
+def _build_storage_service():
+    """Object storage client for the thumbnail endpoint.
+
+    Errors propagate so the LazyService holder retries on the next request
+    instead of caching an unavailable storage backend.
+    """
+    from services.storage_factory import create_storage_service
+
+    return create_storage_service()
+
+
+async def _build_pipeline():
+    """KRMasterPipeline for the document_processing router."""
+    from pipeline.master_pipeline import KRMasterPipeline
+
+    return KRMasterPipeline(
+        database_adapter=await get_shared_database_adapter(),
+        force_continue_on_errors=True,
+    )
+
+
+async def _build_krai_agent():
+    """LangGraph agent with AI and (lazily loaded) reranking services."""
+    from api.agent_api import KRAIAgent
+    from services.ai_service import AIService
+    from services.reranking_service import RerankingService
+
+    ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    return KRAIAgent(
+        await get_pool(),
+        ai_service=AIService(ollama_url=ollama_url),
+        reranking_service=RerankingService(),
+    )
+
+
 @app.on_event("startup")
 async def startup_events():
-    """Initialize shared services and verify default admin user."""
-    service = await ensure_auth_service()
-    set_auth_service(service)
+    """Initialize shared services and verify default admin user.
+
+    Only what every request needs (auth, pool, adapter, batch and monitoring services)
+    is built here; the pipeline, object storage and the LangGraph agent are registered
+    as ``LazyService`` holders and constructed on first use.
+    """
+    with startup_profiler.phase("auth_service"):
+        service = await ensure_auth_service()
+        set_auth_service(service)
     admin_password = os.getenv("DEFAULT_ADMIN_PASSWORD")
 
     try:
-        await service.ensure_default_admin(
-            email=DEFAULT_ADMIN_EMAIL,
-            username=DEFAULT_ADMIN_USERNAME,
-            first_name=DEFAULT_ADMIN_FIRST_NAME,
-            last_name=DEFAULT_ADMIN_LAST_NAME,
-            password=admin_password,
-        )
+        with startup_profiler.phase("default_admin"):
+            await service.ensure_default_admin(
+                email=DEFAULT_ADMIN_EMAIL,
+                username=DEFAULT_ADMIN_USERNAME,
+                first_name=DEFAULT_ADMIN_FIRST_NAME,
+                last_name=DEFAULT_ADMIN_LAST_NAME,
+                password=admin_password,
+            )
     except AuthenticationError as exc:
         if "already exists" in str(exc):
             logger.info("Default admin user already exists: %s", exc)
@@ -847,29 +903,20 @@ async def startup_events():
             logger.error("Failed to ensure default admin user: %s", exc)
             raise
 
-    pool = await get_pool()
+    with startup_profiler.phase("db_pool"):
+        pool = await get_pool()
 
     # Initialize db_pool in app.state for API key validation middleware
     app.state.db_pool = pool
 
-    # Initialize shared DatabaseAdapter for status/upload endpoints
-    db_adapter = create_database_adapter()
-    await db_adapter.connect()
-    app.state.db_adapter = db_adapter
+    # Initialize shared DatabaseAdapter for status/upload endpoints (reuses the pool above)
+    with startup_profiler.phase("db_adapter"):
+        await get_shared_database_adapter()
 
-    # Services for document_processing router
-    from pipeline.master_pipeline import KRMasterPipeline
-    from services.storage_factory import create_storage_service
-
-    try:
-        app.state.storage_service = create_storage_service()
-    except Exception as exc:
-        logger.warning("Object storage not available: %s — thumbnail endpoint will fail", exc)
-        app.state.storage_service = None
-    app.state.pipeline = KRMasterPipeline(
-        database_adapter=db_adapter,
-        force_continue_on_errors=True,
-    )
+    # Heavy services for document_processing / agent / openai_compat routers, built on first use
+    app.state.storage_service = LazyService("storage_service", _build_storage_service)
+    app.state.pipeline = LazyService("pipeline", _build_pipeline)
+    app.state.krai_agent = LazyService("krai_agent", _build_krai_agent)
 
     try:
         async with pool.acquire() as conn:
@@ -877,27 +924,25 @@ async def startup_events():
     except Exception as exc:  # pragma: no cover - startup logging
         logger.warning("Database pool connection failed: %s", exc)
 
-    await get_batch_task_service()
-    await get_transaction_manager()
+    with startup_profiler.phase("batch_services"):
+        await get_batch_task_service()
+        await get_transaction_manager()
     logger.info("Batch services initialized with asyncpg pool")
 
-    # Initialize Agent API router with the live pool
-    ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-    ai_svc = AIService(ollama_url=ollama_url)
-    reranking_svc = RerankingService()
-    krai_agent = KRAIAgent(pool, ai_service=ai_svc, reranking_service=reranking_svc)
-    app.state.krai_agent = krai_agent  # shared with openai_compat router
-    agent_router = create_agent_api(pool, agent=krai_agent)
-    app.include_router(agent_router)
+    # Agent API router; the agent itself is shared with openai_compat via app.state
+    with startup_profiler.phase("agent_router"):
+        from api.agent_api import create_agent_api
+
+        agent_router = create_agent_api(pool, agent=app.state.krai_agent)
+        app.include_router(agent_router)
 
     # Initialize monitoring services
-    metrics_svc = await get_metrics_service()
-    alert_svc = await get_alert_service()
-    ws_manager = get_websocket_manager()
+    with startup_profiler.phase("monitoring_services"):
+        metrics_svc = await get_metrics_service()
+        alert_svc = await get_alert_service()
+        get_websocket_manager()
 
     # Start background tasks
-    import asyncio
-
     asyncio.create_task(alert_svc.start_alert_monitoring())
     asyncio.create_task(websocket_api.start_periodic_broadcast(metrics_svc))
 
@@ -908,12 +953,27 @@ async def startup_events():
         security_config.RATE_LIMIT_ENABLED,
         security_config.REQUEST_VALIDATION_ENABLED,
     )
+    if startup_profiler.enabled:
+        logger.info("\n%s", startup_profiler.format_report())
 
 
 @app.on_event("shutdown")
 async def shutdown_events():
     """Clean up resources on shutdown."""
     from services.db_pool import close_pool
+    from services.api_key_service import APIKeyService
+    from backend.services.error_logging_service import close_error_loggers
+
+    try:
+        await close_error_loggers()
+    except Exception as exc:
+        logger.warning("Error flushing pipeline error log on shutdown: %s", exc)
+
+    if getattr(app.state, "db_pool", None) is not None:
+        try:
+            await APIKeyService(app.state.db_pool).flush_last_used()
+        except Exception as exc:
+            logger.warning("Error flushing API key usage on shutdown: %s", exc)
 
     if hasattr(app.state, "db_adapter"):
         try:
@@ -1234,7 +1294,22 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+async def profile_startup() -> str:
+    """Run the startup sequence once and report import and init time per component."""
+    startup_profiler.enabled = True
+    startup_profiler.timings.extend(collect_import_times("api.app"))
+    try:
+        await startup_events()
+    finally:
+        await shutdown_events()
+    return startup_profiler.format_report()
+
+
 if __name__ == "__main__":
+    if PROFILE_FLAG in sys.argv:
+        print(asyncio.run(profile_startup()))
+        sys.exit(0)
+
     import uvicorn
 
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
@@ -67,8 +67,9 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # Check if user is active
-        user = await self.auth_service._get_user_by_id(claims[CLAIM_USER_ID])
+        # Check if user is active; the principal is loaded once (and usually
+        # served from the AuthService cache) for all checks below
+        user = await self.auth_service.get_principal(claims[CLAIM_USER_ID])
         if not user or not user.is_active or user.status != UserStatus.ACTIVE:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -79,7 +80,7 @@ class AuthMiddleware:
         # Check required permissions
         if required_permissions:
             for permission in required_permissions:
-                if not await self.auth_service.has_permission(claims[CLAIM_USER_ID], permission):
+                if not self.auth_service.principal_has_permission(user, permission):
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail=f"Insufficient permissions. Required: {', '.join(required_permissions)}",
@@ -91,7 +92,7 @@ class AuthMiddleware:
             "id": claims[CLAIM_USER_ID],
             "email": claims[CLAIM_EMAIL],
             "role": claims[CLAIM_ROLE],
-            "permissions": await self.auth_service.get_user_permissions(claims[CLAIM_USER_ID])
+            "permissions": self.auth_service.principal_permissions(user)
         }
         
         return claims
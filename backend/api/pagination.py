@@ -0,0 +1,332 @@
+"""Keyset pagination and total-count helpers shared by the list endpoints."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Mapping, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+# ``fetch(query, params)`` returning a list of row mappings (asyncpg records or dicts).
+FetchFn = Callable[[str, Sequence[Any]], Awaitable[Sequence[Mapping[str, Any]]]]
+
+TOTAL_MODE_EXACT = "exact"
+TOTAL_MODE_ESTIMATED = "estimated"
+TOTAL_MODE_NONE = "none"
+
+_IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+_QUALIFIED_TABLE_RE = re.compile(r"^[a-z_][a-z0-9_]*\.[a-z_][a-z0-9_]*$")
+
+
+@dataclass
+class KeysetPage:
+    """One page of rows plus the metadata needed to build a list response."""
+
+    rows: list[dict[str, Any]]
+    total: int | None
+    total_estimated: bool
+    next_cursor: str | None
+
+
+def _enum_value(value: Any) -> str:
+    return str(getattr(value, "value", value)).lower()
+
+
+def _quote_identifier(name: str) -> str:
+    if not _IDENTIFIER_RE.match(name or ""):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort field: {name!r}",
+        )
+    return f'"{name}"'
+
+
+def _encode_value(value: Any) -> list[Any]:
+    """Encode a sort key as ``[type_tag, json_value]`` so it round-trips with its SQL type."""
+    if value is None:
+        return ["null", None]
+    if isinstance(value, datetime):
+        return ["datetime", value.isoformat()]
+    if isinstance(value, date):
+        return ["date", value.isoformat()]
+    if isinstance(value, UUID):
+        return ["uuid", str(value)]
+    if isinstance(value, Decimal):
+        return ["decimal", str(value)]
+    if isinstance(value, bool):
+        return ["bool", value]
+    if isinstance(value, int):
+        return ["int", value]
+    if isinstance(value, float):
+        return ["float", value]
+    return ["str", str(value)]
+
+
+def _decode_value(encoded: Sequence[Any]) -> Any:
+    tag, raw = encoded
+    if tag == "null":
+        return None
+    if tag == "datetime":
+        return datetime.fromisoformat(raw)
+    if tag == "date":
+        return date.fromisoformat(raw)
+    if tag == "uuid":
+        return UUID(raw)
+    if tag == "decimal":
+        return Decimal(raw)
+    if tag == "bool":
+        return bool(raw)
+    if tag == "int":
+        return int(raw)
+    if tag == "float":
+        return float(raw)
+    if tag == "str":
+        return str(raw)
+    raise ValueError(f"unknown cursor value type {tag!r}")
+
+
+def encode_cursor(sort_by: str, sort_value: Any, row_id: Any) -> str:
+    """Build an opaque cursor pointing just past ``(sort_value, row_id)``."""
+    payload = {"s": sort_by, "v": _encode_value(sort_value), "id": _encode_value(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple[Any, Any]:
+    """Decode a cursor produced by :func:`encode_cursor` for the same ``sort_by``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or was issued for another sort field.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_sort = payload["s"]
+        sort_value = _decode_value(payload["v"])
+        row_id = _decode_value(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid pagination cursor: {exc}",
+        ) from exc
+
+    if cursor_sort != sort_by:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor was issued for sort_by={cursor_sort!r}, not {sort_by!r}",
+        )
+    return sort_value, row_id
+
+
+def build_order_clause(sort_by: str, sort_order: Any) -> str:
+    """ORDER BY on the sort key with ``id`` as a unique tie-breaker."""
+    direction = "DESC" if _enum_value(sort_order) == "desc" else "ASC"
+    column = _quote_identifier(sort_by)
+    if sort_by == "id":
+        return f" ORDER BY {column} {direction}"
+    return f" ORDER BY {column} {direction}, id {direction}"
+
+
+def build_keyset_clause(
+    sort_by: str,
+    sort_order: Any,
+    sort_value: Any,
+    row_id: Any,
+    param_start: int,
+) -> tuple[str, list[Any]]:
+    """Return a WHERE fragment selecting rows after the cursor within its NULL phase.
+
+    Postgres sorts NULLs last for ASC and first for DESC. Keeping NULL and non-NULL sort
+    keys in separate phases lets every fragment stay a single ``(sort_by, id)`` btree
+    range; ``build_keyset_tail_clause`` selects the phase that follows once this one
+    is exhausted.
+
+    Args:
+        sort_by: Sort column (validated identifier).
+        sort_order: ``asc``/``desc`` (string or ``SortOrder``).
+        sort_value: Sort-key value of the last row on the previous page.
+        row_id: ``id`` of the last row on the previous page.
+        param_start: Number of positional parameters already bound in the query.
+
+    Returns:
+        Tuple of (SQL fragment, parameters to append).
+    """
+    column = _quote_identifier(sort_by)
+    descending = _enum_value(sort_order) == "desc"
+    cmp = "<" if descending else ">"
+
+    if sort_by == "id":
+        return f"id {cmp} ${param_start + 1}", [row_id]
+
+    if sort_value is None:
+        return f"{column} IS NULL AND id {cmp} ${param_start + 1}", [row_id]
+
+    return f"({column}, id) {cmp} (${param_start + 1}, ${param_start + 2})", [sort_value, row_id]
+
+
+def build_keyset_tail_clause(sort_by: str, sort_order: Any, sort_value: Any) -> str | None:
+    """Return the WHERE fragment for the NULL phase that follows the cursor's phase.
+
+    ASC pages walk non-NULL keys before the trailing NULLs; DESC pages walk the leading
+    NULLs before the non-NULL keys. Returns ``None`` when the cursor is already in the
+    last phase.
+    """
+    if sort_by == "id":
+        return None
+    column = _quote_identifier(sort_by)
+    descending = _enum_value(sort_order) == "desc"
+    if not descending and sort_value is not None:
+        return f"{column} IS NULL"
+    if descending and sort_value is None:
+        return f"{column} IS NOT NULL"
+    return None
+
+
+async def estimate_total(
+    fetch: FetchFn,
+    table: str,
+    where_clause: str,
+    params: Sequence[Any],
+) -> int:
+    """Estimate the row count from planner statistics instead of scanning.
+
+    Unfiltered listings read ``pg_class.reltuples``; filtered listings use the planner's
+    row estimate from ``EXPLAIN``. Both are O(1) regardless of table size.
+    """
+    if not _QUALIFIED_TABLE_RE.match(table):
+        raise ValueError(f"Invalid table name: {table!r}")
+
+    if not where_clause:
+        rows = await fetch(
+            "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass($1)",
+            [table],
+        )
+        estimate = rows[0]["estimate"] if rows else None
+        # reltuples is -1 until the table has been vacuumed/analyzed once
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    rows = await fetch(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table}{where_clause}", list(params))
+    if not rows:
+        return 0
+    plan = next(iter(rows[0].values()))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]["Plan"]["Plan Rows"]), 0)
+
+
+async def fetch_keyset_page(
+    fetch: FetchFn,
+    *,
+    table: str,
+    where_clauses: Sequence[str],
+    params: Sequence[Any],
+    sort_by: str,
+    sort_order: Any,
+    page: int,
+    page_size: int,
+    cursor: str | None = None,
+    total_mode: Any = TOTAL_MODE_EXACT,
+) -> KeysetPage:
+    """Fetch one page of ``table`` using keyset pagination when a cursor is given.
+
+    Without a cursor the classic ``page``/``page_size`` OFFSET path is used so existing
+    clients keep working; every response carries a ``next_cursor`` that switches the
+    caller to constant-cost keyset paging.
+
+    Args:
+        fetch: Query callable returning row mappings.
+        table: Schema-qualified table name.
+        where_clauses: Filter fragments using ``$1..$n`` placeholders.
+        params: Values for ``where_clauses``.
+        sort_by: Validated sort column.
+        sort_order: ``asc``/``desc``.
+        page: 1-based page number (ignored when ``cursor`` is set).
+        page_size: Rows per page.
+        cursor: Opaque cursor from a previous response.
+        total_mode: ``exact``, ``estimated`` or ``none``.
+
+    Returns:
+        KeysetPage with rows, optional total and the next cursor.
+    """
+    if not _QUALIFIED_TABLE_RE.match(table):
+        raise ValueError(f"Invalid table name: {table!r}")
+
+    mode = _enum_value(total_mode)
+    filters = list(where_clauses)
+    filter_params = list(params)
+    filter_clause = f" WHERE {' AND '.join(filters)}" if filters else ""
+
+    page_clauses = list(filters)
+    page_params = list(filter_params)
+    offset = 0
+    tail_clause = None
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_by)
+        tail_clause = build_keyset_tail_clause(sort_by, sort_order, sort_value)
+        keyset_clause, keyset_params = build_keyset_clause(
+            sort_by, sort_order, sort_value, row_id, len(page_params)
+        )
+        page_clauses.append(keyset_clause)
+        page_params.extend(keyset_params)
+    else:
+        offset = (page - 1) * page_size
+
+    page_where = f" WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+    # The window count is only cheap enough to keep for the legacy OFFSET + exact path
+    use_window_count = mode == TOTAL_MODE_EXACT and not cursor
+    select_list = "*, COUNT(*) OVER() AS total_count" if use_window_count else "*"
+    offset_clause = f" OFFSET {offset}" if offset else ""
+
+    query = f"""
+        SELECT {select_list}
+        FROM {table}
+        {page_where}
+        {build_order_clause(sort_by, sort_order)}
+        LIMIT {page_size + 1}{offset_clause}
+    """
+    rows = list(await fetch(query, page_params))
+    if tail_clause and len(rows) <= page_size:
+        # The cursor's NULL phase is exhausted; continue into the next one
+        tail_where = f" WHERE {' AND '.join([*filters, tail_clause])}"
+        tail_query = f"""
+            SELECT {select_list}
+            FROM {table}
+            {tail_where}
+            {build_order_clause(sort_by, sort_order)}
+            LIMIT {page_size + 1 - len(rows)}
+        """
+        rows.extend(await fetch(tail_query, filter_params))
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_by, last[sort_by], last["id"])
+
+    total: int | None = None
+    if mode == TOTAL_MODE_EXACT:
+        if use_window_count and rows:
+            total = int(rows[0]["total_count"])
+        else:
+            count_rows = await fetch(f"SELECT COUNT(*) AS count FROM {table}{filter_clause}", filter_params)
+            total = int(count_rows[0]["count"]) if count_rows else 0
+    elif mode == TOTAL_MODE_ESTIMATED:
+        total = await estimate_total(fetch, table, filter_clause, filter_params)
+
+    rows = [{key: value for key, value in dict(row).items() if key != "total_count"} for row in rows]
+
+    return KeysetPage(
+        rows=rows,
+        total=total,
+        total_estimated=mode == TOTAL_MODE_ESTIMATED,
+        next_cursor=next_cursor,
+    )
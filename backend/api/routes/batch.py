@@ -4,6 +4,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import os
 import re
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
@@ -43,6 +44,7 @@ RESOURCE_TABLE_MAP: Dict[str, str] = {
     "images": "krai_content.images",
 }
 
+# Allowed table identifiers: only values from RESOURCE_TABLE_MAP are safe to interpolate
 _ALLOWED_TABLE_NAMES = frozenset(RESOURCE_TABLE_MAP.values())
 
 RESOURCE_PERMISSIONS: Dict[str, str] = {
@@ -57,12 +59,27 @@ RESOURCE_PERMISSIONS: Dict[str, str] = {
 MAX_SYNC_ITEMS = 100
 ASYNC_THRESHOLD = 50
 
+# Set-based execution replaces the per-id fetch/write/audit round trips with one
+# ANY($1) read, one ANY($1) write and a COPY of the audit rows. Disable to fall
+# back to the per-item closures (e.g. when debugging a single failing record).
+SET_BASED_EXECUTION = os.getenv("BATCH_SET_BASED_EXECUTION", "true").lower() not in {"0", "false", "no"}
+
+AUDIT_LOG_COLUMNS = [
+    "table_name",
+    "record_id",
+    "operation",
+    "changed_by",
+    "old_values",
+    "new_values",
+    "notes",
+    "rollback_point_id",
+    "is_rollback",
+]
+
 
 ProgressCallback = Callable[[BatchOperationResult, int, int, int, int], Awaitable[None]]
 
 COLUMN_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
-# Allowed table identifiers: only values from RESOURCE_TABLE_MAP are safe to interpolate
-_ALLOWED_TABLE_NAMES: frozenset = frozenset()  # populated after RESOURCE_TABLE_MAP is defined
 
 
 def _assert_safe_table_name(table_name: str) -> None:
@@ -160,18 +177,12 @@ async def _delete_record(
         )
 
 
-async def _update_record(
-    connection: Optional[Any],
-    pool: asyncpg.Pool,
-    table_name: str,
-    record_id: str,
-    update_data: Dict[str, Any],
-) -> None:
-    _assert_safe_table_name(table_name)
+def _build_set_clauses(update_data: Dict[str, Any], start_index: int) -> Tuple[List[str], List[Any]]:
+    """Build ``column = $n`` assignments for ``update_data`` starting at ``$start_index``."""
     set_clauses: List[str] = []
-    parameters: List[Any] = [record_id]
-    index = 2
-    
+    parameters: List[Any] = []
+    index = start_index
+
     for column, value in update_data.items():
         if not COLUMN_NAME_PATTERN.match(column):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Invalid update column: {column}")
@@ -184,6 +195,19 @@ async def _update_record(
 
     if not set_clauses:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="update_data must contain at least one field")
+    return set_clauses, parameters
+
+
+async def _update_record(
+    connection: Optional[Any],
+    pool: asyncpg.Pool,
+    table_name: str,
+    record_id: str,
+    update_data: Dict[str, Any],
+) -> None:
+    _assert_safe_table_name(table_name)
+    set_clauses, values = _build_set_clauses(update_data, 2)
+    parameters: List[Any] = [record_id, *values]
 
     query = f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = $1"
     
@@ -232,6 +256,87 @@ async def _insert_audit_log(
             await conn.execute(query, *params)
 
 
+def _normalize_id(value: Any) -> str:
+    return str(value).lower()
+
+
+def _extract_update_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the column changes of an update payload.
+
+    ``BatchUpdateRequest`` nests them under ``update_data``; older callers send the
+    columns next to ``id``.
+    """
+    nested = payload.get("update_data")
+    if isinstance(nested, dict):
+        return dict(nested)
+    return {k: v for k, v in payload.items() if k != "id"}
+
+
+async def _fetch_records_bulk(
+    connection: Any,
+    table_name: str,
+    ids: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch all ``ids`` in one round trip, keyed by normalized id."""
+    _assert_safe_table_name(table_name)
+    rows = await connection.fetch(f"SELECT * FROM {table_name} WHERE id = ANY($1)", ids)
+    return {_normalize_id(row["id"]): dict(row) for row in rows}
+
+
+def _results_until_missing(
+    ids: List[str],
+    found: Dict[str, Any],
+    build_success: Callable[[str], BatchOperationResult],
+) -> Optional[List[BatchOperationResult]]:
+    """Mirror per-item semantics when some ids do not exist.
+
+    The per-item path processes ids in order and aborts the transaction at the first
+    missing record, so return the results up to and including that failure (or None
+    when every id exists).
+    """
+    results: List[BatchOperationResult] = []
+    for record_id in ids:
+        if _normalize_id(record_id) not in found:
+            results.append(_build_result(identifier=record_id, success=False, error="Not found"))
+            return results
+        results.append(build_success(record_id))
+    return None
+
+
+async def _copy_audit_logs(connection: Any, payloads: List[Dict[str, Any]]) -> None:
+    """Bulk insert audit rows with COPY instead of one INSERT per record."""
+    if not payloads:
+        return
+
+    def _to_json(value: Any) -> Optional[str]:
+        return json.dumps(value, default=str) if value else None
+
+    records = [
+        (
+            payload.get("table_name"),
+            payload.get("record_id"),
+            payload.get("operation"),
+            payload.get("changed_by"),
+            _to_json(payload.get("old_values")),
+            _to_json(payload.get("new_values")),
+            payload.get("notes"),
+            payload.get("rollback_point_id"),
+            payload.get("is_rollback", False),
+        )
+        for payload in payloads
+    ]
+    await connection.copy_records_to_table(
+        "audit_log",
+        schema_name="krai_system",
+        columns=AUDIT_LOG_COLUMNS,
+        records=records,
+    )
+
+
+def _use_set_based(transaction_manager: TransactionManager) -> bool:
+    return SET_BASED_EXECUTION and transaction_manager.has_transaction_support()
+
+
 def _prepare_update_value(value: Any) -> Any:
     """Prepare a value for SQL query - handle JSON serialization for complex types."""
     if isinstance(value, (dict, list)):
@@ -254,6 +359,170 @@ def _build_result(
     )
 
 
+async def _execute_set_based_delete(
+    *,
+    transaction_manager: TransactionManager,
+    resource_type: str,
+    ids: List[str],
+    user_id: str,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> BatchOperationResponse:
+    table_name = RESOURCE_TABLE_MAP[resource_type]
+    _assert_safe_table_name(table_name)
+    ids = list(dict.fromkeys(ids))
+
+    async def _delete_all(connection: Any) -> List[BatchOperationResult]:
+        rows = await connection.fetch(f"DELETE FROM {table_name} WHERE id = ANY($1) RETURNING *", ids)
+        deleted = {_normalize_id(row["id"]): dict(row) for row in rows}
+
+        def _success(record_id: str) -> BatchOperationResult:
+            return _build_result(
+                identifier=record_id,
+                success=True,
+                rollback_data={
+                    "operation": "delete",
+                    "table": table_name,
+                    "record_id": record_id,
+                    "old_values": deleted[_normalize_id(record_id)],
+                },
+            )
+
+        partial = _results_until_missing(ids, deleted, _success)
+        if partial is not None:
+            # The trailing "Not found" result makes the transaction manager roll the DELETE back
+            return partial
+
+        await _copy_audit_logs(
+            connection,
+            [
+                {
+                    "table_name": table_name,
+                    "record_id": record_id,
+                    "operation": "DELETE",
+                    "changed_by": user_id,
+                    "old_values": deleted[_normalize_id(record_id)],
+                }
+                for record_id in ids
+            ],
+        )
+        return [_success(record_id) for record_id in ids]
+
+    return await transaction_manager.execute_set_based_batch(
+        _delete_all,
+        total_items=len(ids),
+        rollback_on_error=True,
+        progress_callback=progress_callback,
+    )
+
+
+async def _apply_updates_bulk(
+    connection: Any,
+    table_name: str,
+    prepared: List[Tuple[str, Dict[str, Any]]],
+) -> None:
+    """Apply updates with as few statements as possible.
+
+    Records sharing an identical change set are updated with one ``WHERE id = ANY($1)``
+    statement; the remaining one-off changes are grouped by column set and sent through
+    a single pipelined ``executemany`` per group.
+    """
+    identical: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+    for record_id, update_data in prepared:
+        key = json.dumps(update_data, sort_keys=True, default=str)
+        identical.setdefault(key, (update_data, []))[1].append(record_id)
+
+    singles: Dict[Tuple[str, ...], List[Tuple[str, Dict[str, Any]]]] = {}
+    for update_data, group_ids in identical.values():
+        if len(group_ids) == 1:
+            signature = tuple(update_data.keys())
+            singles.setdefault(signature, []).append((group_ids[0], update_data))
+            continue
+        set_clauses, values = _build_set_clauses(update_data, 2)
+        await connection.execute(
+            f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = ANY($1)",
+            group_ids,
+            *values,
+        )
+
+    for group in singles.values():
+        set_clauses, _ = _build_set_clauses(group[0][1], 2)
+        rows = [(record_id, *_build_set_clauses(update_data, 2)[1]) for record_id, update_data in group]
+        await connection.executemany(
+            f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE id = $1",
+            rows,
+        )
+
+
+async def _execute_set_based_update(
+    *,
+    transaction_manager: TransactionManager,
+    resource_type: str,
+    prepared: List[Tuple[str, Dict[str, Any]]],
+    user_id: str,
+    operation: str = "UPDATE",
+    notes: Optional[str] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> BatchOperationResponse:
+    """Set-based counterpart of the per-item update and status-change closures."""
+    table_name = RESOURCE_TABLE_MAP[resource_type]
+    _assert_safe_table_name(table_name)
+    # Later payloads for the same id win, as they would when applied sequentially
+    merged: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for record_id, update_data in prepared:
+        previous = merged.get(_normalize_id(record_id))
+        combined = {**previous[1], **update_data} if previous else dict(update_data)
+        merged[_normalize_id(record_id)] = (record_id, combined)
+    prepared = list(merged.values())
+    ids = [record_id for record_id, _ in prepared]
+    changes = {_normalize_id(record_id): update_data for record_id, update_data in prepared}
+
+    async def _update_all(connection: Any) -> List[BatchOperationResult]:
+        existing = await _fetch_records_bulk(connection, table_name, ids)
+
+        def _success(record_id: str) -> BatchOperationResult:
+            return _build_result(
+                identifier=record_id,
+                success=True,
+                rollback_data={
+                    "operation": "update",
+                    "table": table_name,
+                    "record_id": record_id,
+                    "new_values": changes[_normalize_id(record_id)],
+                    "old_values": existing[_normalize_id(record_id)],
+                },
+            )
+
+        partial = _results_until_missing(ids, existing, _success)
+        if partial is not None:
+            return partial
+
+        await _apply_updates_bulk(connection, table_name, prepared)
+
+        audit_payloads = []
+        for record_id in ids:
+            audit_payload = {
+                "table_name": table_name,
+                "record_id": record_id,
+                "operation": operation,
+                "changed_by": user_id,
+                "old_values": existing[_normalize_id(record_id)],
+                "new_values": changes[_normalize_id(record_id)],
+            }
+            if notes:
+                audit_payload["notes"] = notes
+            audit_payloads.append(audit_payload)
+        await _copy_audit_logs(connection, audit_payloads)
+
+        return [_success(record_id) for record_id in ids]
+
+    return await transaction_manager.execute_set_based_batch(
+        _update_all,
+        total_items=len(ids),
+        rollback_on_error=True,
+        progress_callback=progress_callback,
+    )
+
+
 async def _execute_sync_delete(
     *,
     pool: asyncpg.Pool,
@@ -263,6 +532,15 @@ async def _execute_sync_delete(
     user_id: str,
     progress_callback: Optional[ProgressCallback] = None,
 ) -> BatchOperationResponse:
+    if _use_set_based(transaction_manager):
+        return await _execute_set_based_delete(
+            transaction_manager=transaction_manager,
+            resource_type=resource_type,
+            ids=ids,
+            user_id=user_id,
+            progress_callback=progress_callback,
+        )
+
     table_name = RESOURCE_TABLE_MAP[resource_type]
     
     operations: List[Callable[[Optional[Any]], Awaitable[BatchOperationResult]]] = []
@@ -324,17 +602,32 @@ async def _execute_sync_update(
 ) -> BatchOperationResponse:
     table_name = RESOURCE_TABLE_MAP[resource_type]
 
-    operations: List[Callable[[Optional[Any]], Awaitable[BatchOperationResult]]] = []
+    prepared: List[Tuple[str, Dict[str, Any]]] = []
     for payload in updates:
         record_id = payload.get("id")
         if not record_id:
             LOGGER.warning("Skipping update without record ID: %s", payload)
             continue
 
-        update_data = {k: v for k, v in payload.items() if k != "id"}
+        update_data = _extract_update_data(payload)
         if not update_data:
             LOGGER.info("Skipping update %s - no data to update", record_id)
             continue
+        prepared.append((record_id, update_data))
+
+    if _use_set_based(transaction_manager):
+        if not prepared:
+            return BatchOperationResponse(success=True, total=len(updates), successful=0, failed=0, results=[])
+        return await _execute_set_based_update(
+            transaction_manager=transaction_manager,
+            resource_type=resource_type,
+            prepared=prepared,
+            user_id=user_id,
+            progress_callback=progress_callback,
+        )
+
+    operations: List[Callable[[Optional[Any]], Awaitable[BatchOperationResult]]] = []
+    for record_id, update_data in prepared:
 
         async def _update_operation(connection: Optional[Any], record_id: str = record_id, update_data: Dict[str, Any] = update_data) -> BatchOperationResult:
             try:
@@ -393,6 +686,17 @@ async def _execute_sync_status_change(
     reason: Optional[str],
     progress_callback: Optional[ProgressCallback] = None,
 ) -> BatchOperationResponse:
+    if _use_set_based(transaction_manager):
+        return await _execute_set_based_update(
+            transaction_manager=transaction_manager,
+            resource_type=resource_type,
+            prepared=[(record_id, {"status": new_status}) for record_id in ids],
+            user_id=user_id,
+            operation="STATUS_CHANGE",
+            notes=reason,
+            progress_callback=progress_callback,
+        )
+
     table_name = RESOURCE_TABLE_MAP[resource_type]
 
     operations: List[Callable[[Optional[Any]], Awaitable[BatchOperationResult]]] = []
@@ -10,6 +10,7 @@ import asyncpg
 
 from api.dependencies.database import get_database_pool
 from api.middleware.auth_middleware import require_permission
+from services.stats_service import StatsService, StatsSnapshot, table_dimensions
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +49,7 @@ async def _fetch_recent_documents(pool: asyncpg.Pool, limit: int = 5) -> List[Di
         )
         recent: List[Dict[str, Any]] = []
         for row in rows or []:
-            updated_at = row.get("updated_at")
-            if isinstance(updated_at, datetime):
-                updated_at = updated_at.astimezone(timezone.utc).isoformat()
+            updated_at = _isoformat(row.get("updated_at"))
             recent.append(
                 {
                     "id": str(row.get("id")),
@@ -63,109 +62,159 @@ async def _fetch_recent_documents(pool: asyncpg.Pool, limit: int = 5) -> List[Di
         return recent
 
 
-@router.get("/overview")
-async def get_dashboard_overview(
-    current_user: dict = Depends(require_permission('monitoring:read')),
-    pool: asyncpg.Pool = Depends(get_database_pool),
-) -> Dict[str, Any]:
-    """Return aggregated dashboard stats for production data.
+DASHBOARD_DIMENSIONS = [
+    *table_dimensions("documents", ("processing_status", "document_type")),
+    "products",
+    "manufacturers",
+    *table_dimensions("processing_queue", ("status",)),
+    "images",
+    "videos",
+]
 
-    This endpoint requires 'monitoring:read' permission to access.
-    Any failure to query optional tables (or other runtime issues) is logged
-    and a safe fallback overview with zero/empty stats is returned instead of a 500 error.
-    """
 
-    try:
-        total_documents = await _fetch_count(
+def _isoformat(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return value
+
+
+def _counts_from_snapshot(snapshot: StatsSnapshot) -> Dict[str, Any]:
+    return {
+        "documents": snapshot.total("documents"),
+        "documents_by_status": snapshot.group("documents", "processing_status"),
+        "documents_by_type": snapshot.group("documents", "document_type"),
+        "products": snapshot.total("products"),
+        "manufacturers": snapshot.total("manufacturers"),
+        "queue_by_status": snapshot.group("processing_queue", "status"),
+        "images": snapshot.total("images"),
+        "videos": snapshot.total("videos"),
+    }
+
+
+async def _fetch_live_counts(pool: asyncpg.Pool) -> Dict[str, Any]:
+    """Full-scan fallback used until migration 031 is applied."""
+    counts: Dict[str, Any] = {
+        "documents": await _fetch_count(
             pool,
             "SELECT COUNT(*) AS count FROM krai_core.documents"
-        )
-        documents_by_status = await _fetch_group_counts(
+        ),
+        "documents_by_status": await _fetch_group_counts(
             pool,
             "SELECT processing_status, COUNT(*) AS count "
             "FROM krai_core.documents GROUP BY processing_status",
             "processing_status",
-        )
-        documents_by_type = await _fetch_group_counts(
+        ),
+        "documents_by_type": await _fetch_group_counts(
             pool,
             "SELECT document_type, COUNT(*) AS count "
             "FROM krai_core.documents GROUP BY document_type",
             "document_type",
-        )
-        processed_last_24h = await _fetch_count(
+        ),
+        "products": await _fetch_count(
             pool,
-            "SELECT COUNT(*) AS count FROM krai_core.documents "
-            "WHERE processing_status = 'completed' "
-            "AND updated_at >= NOW() - INTERVAL '24 hours'",
-        )
+            "SELECT COUNT(*) AS count FROM krai_core.products"
+        ),
+        "manufacturers": await _fetch_count(
+            pool,
+            "SELECT COUNT(*) AS count FROM krai_core.manufacturers"
+        ),
+        "queue_by_status": await _fetch_group_counts(
+            pool,
+            "SELECT status, COUNT(*) AS count FROM krai_system.processing_queue GROUP BY status",
+            "status",
+        ),
+    }
 
-        total_products = await _fetch_count(
+    try:
+        counts["images"] = await _fetch_count(
             pool,
-            "SELECT COUNT(*) AS count FROM krai_core.products"
+            "SELECT COUNT(*) AS count FROM krai_content.images"
         )
-        manufacturers_total = await _fetch_count(
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Dashboard images_total query failed: %s", exc)
+        counts["images"] = 0
+
+    try:
+        counts["videos"] = await _fetch_count(
             pool,
-            "SELECT COUNT(*) AS count FROM krai_core.manufacturers"
+            "SELECT COUNT(*) AS count FROM krai_content.videos"
         )
-        active_products = await _fetch_count(
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Dashboard videos_total query failed: %s", exc)
+        counts["videos"] = 0
+
+    return counts
+
+
+@router.get("/overview")
+async def get_dashboard_overview(
+    current_user: dict = Depends(require_permission('monitoring:read')),
+    pool: asyncpg.Pool = Depends(get_database_pool),
+) -> Dict[str, Any]:
+    """Return aggregated dashboard stats for production data.
+
+    This endpoint requires 'monitoring:read' permission to access.
+    Counts come from the trigger-maintained ``krai_system.stat_counters``
+    (see migration 031); ``freshness`` reports the source and when the counters
+    last changed. Without that table the live COUNT(*) queries are used.
+    Any failure to query optional tables (or other runtime issues) is logged
+    and a safe fallback overview with zero/empty stats is returned instead of a 500 error.
+    """
+
+    try:
+        snapshot = await StatsService.from_pool(pool).read(DASHBOARD_DIMENSIONS)
+        if snapshot is not None:
+            counts = _counts_from_snapshot(snapshot)
+            freshness = {
+                "source": "counters",
+                "updated_at": _isoformat(snapshot.updated_at),
+            }
+        else:
+            counts = await _fetch_live_counts(pool)
+            freshness = {
+                "source": "live",
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+        # Time-dependent figures cannot be kept as counters; both are index range scans
+        processed_last_24h = await _fetch_count(
             pool,
-            "SELECT COUNT(*) AS count FROM krai_core.products "
-            "WHERE end_of_life_date IS NULL OR end_of_life_date > NOW()"
+            "SELECT COUNT(*) AS count FROM krai_core.documents "
+            "WHERE processing_status = 'completed' "
+            "AND updated_at >= NOW() - INTERVAL '24 hours'",
         )
         discontinued_products = await _fetch_count(
             pool,
             "SELECT COUNT(*) AS count FROM krai_core.products "
             "WHERE end_of_life_date IS NOT NULL AND end_of_life_date <= NOW()"
         )
-
-        queue_by_status = await _fetch_group_counts(
-            pool,
-            "SELECT status, COUNT(*) AS count FROM krai_system.processing_queue GROUP BY status",
-            "status",
-        )
-        queue_total = sum(queue_by_status.values())
-
-        try:
-            images_total = await _fetch_count(
-                pool,
-                "SELECT COUNT(*) AS count FROM krai_content.images"
-            )
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("Dashboard images_total query failed: %s", exc)
-            images_total = 0
-
-        try:
-            videos_total = await _fetch_count(
-                pool,
-                "SELECT COUNT(*) AS count FROM krai_content.videos"
-            )
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("Dashboard videos_total query failed: %s", exc)
-            videos_total = 0
+        active_products = max(counts["products"] - discontinued_products, 0)
+        queue_by_status = counts["queue_by_status"]
 
         overview = {
             "documents": {
-                "total": total_documents,
-                "by_status": documents_by_status,
-                "by_type": documents_by_type,
+                "total": counts["documents"],
+                "by_status": counts["documents_by_status"],
+                "by_type": counts["documents_by_type"],
                 "processed_last_24h": processed_last_24h,
                 "recent": await _fetch_recent_documents(pool),
             },
-                "products": {
-                    "total": total_products,
-                    "manufacturers": manufacturers_total,
-                    "active": active_products,
-                    "discontinued": discontinued_products,
-                },
-                "queue": {
-                    "total": queue_total,
-                    "by_status": queue_by_status,
-                },
-                "media": {
-                    "images": images_total,
-                    "videos": videos_total,
-                },
-            }
+            "products": {
+                "total": counts["products"],
+                "manufacturers": counts["manufacturers"],
+                "active": active_products,
+                "discontinued": discontinued_products,
+            },
+            "queue": {
+                "total": sum(queue_by_status.values()),
+                "by_status": queue_by_status,
+            },
+            "media": {
+                "images": counts["images"],
+                "videos": counts["videos"],
+            },
+            "freshness": freshness,
+        }
 
         return {"success": True, "data": overview}
     except Exception as exc:  # pragma: no cover - defensive
@@ -192,5 +241,9 @@ async def get_dashboard_overview(
                 "images": 0,
                 "videos": 0,
             },
+            "freshness": {
+                "source": "fallback",
+                "updated_at": None,
+            },
         }
         return {"success": True, "data": fallback_overview}
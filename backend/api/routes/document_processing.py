@@ -10,11 +10,14 @@ import json
 import logging
 
 import asyncpg
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
 from models.document import CANONICAL_STAGES
 
+from backend.core.stage_profiler import profiling
+
 from api.dependencies.database import get_database_pool
 from api.middleware.auth_middleware import require_permission
+from api.startup import resolve_service
 from api.routes.response_models import (
     DocumentProcessingStatusResponse,
     StageListResponse,
@@ -33,6 +36,11 @@ logger = logging.getLogger("krai.api.document_processing")
 
 router = APIRouter(tags=["document-processing"])
 
+PROFILE_QUERY = Query(
+    None,
+    description='Record sampling profiles: "all" or comma-separated stage names',
+)
+
 
 @router.get("/stages/names")
 async def get_stage_names(
@@ -130,10 +138,14 @@ async def get_document_stages(
     )
 
 
-async def _run_pipeline_stages(document_id: str, stages: list[str], pipeline) -> None:
-    """Background task: run pipeline stages for a document."""
+async def _run_pipeline_stages(document_id: str, stages: list[str], pipeline, profile: str | None = None) -> None:
+    """Background task: run pipeline stages for a document (optionally profiled)."""
     try:
-        await pipeline.run_stages(document_id, stages)
+        if profile:
+            with profiling(profile, documents=document_id):
+                await pipeline.run_stages(document_id, stages)
+        else:
+            await pipeline.run_stages(document_id, stages)
     except Exception as exc:
         logger.error("Background pipeline failed for %s: %s", document_id, exc, exc_info=True)
 
@@ -143,6 +155,7 @@ async def reprocess_document(
     document_id: str,
     request: Request,
     background_tasks: BackgroundTasks,
+    profile: str | None = PROFILE_QUERY,
     pool: asyncpg.Pool = Depends(get_database_pool),
     _: dict = Depends(require_permission("documents:write")),
 ):
@@ -164,8 +177,8 @@ async def reprocess_document(
         except Exception as exc:
             logger.debug("Could not delete completion_markers for %s (table may not exist): %s", document_id, exc)
 
-    pipeline = request.app.state.pipeline
-    background_tasks.add_task(_run_pipeline_stages, document_id, CANONICAL_STAGES, pipeline)
+    pipeline = await resolve_service(request.app.state, "pipeline")
+    background_tasks.add_task(_run_pipeline_stages, document_id, CANONICAL_STAGES, pipeline, profile)
 
     return SuccessResponse(data={"message": "Reprocessing queued", "document_id": document_id, "status": "pending"})
 
@@ -176,6 +189,7 @@ async def process_single_stage(
     stage_name: str,
     request: Request,
     background_tasks: BackgroundTasks,
+    profile: str | None = PROFILE_QUERY,
     pool: asyncpg.Pool = Depends(get_database_pool),
     _: dict = Depends(require_permission("documents:write")),
 ):
@@ -190,8 +204,8 @@ async def process_single_stage(
         if row is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
 
-    pipeline = request.app.state.pipeline
-    background_tasks.add_task(_run_pipeline_stages, document_id, [stage_name], pipeline)
+    pipeline = await resolve_service(request.app.state, "pipeline")
+    background_tasks.add_task(_run_pipeline_stages, document_id, [stage_name], pipeline, profile)
 
     return SuccessResponse(data={"stage": stage_name, "status": "queued", "document_id": document_id})
 
@@ -217,11 +231,15 @@ async def process_multiple_stages(
         if row is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
 
-    pipeline = request.app.state.pipeline
+    pipeline = await resolve_service(request.app.state, "pipeline")
     original_force_continue = getattr(pipeline, "force_continue_on_errors", True)
     pipeline.force_continue_on_errors = not body.stop_on_error
     try:
-        raw_result = await pipeline.run_stages(document_id, body.stages)
+        if body.profile:
+            with profiling(body.profile, documents=document_id):
+                raw_result = await pipeline.run_stages(document_id, body.stages)
+        else:
+            raw_result = await pipeline.run_stages(document_id, body.stages)
     finally:
         pipeline.force_continue_on_errors = original_force_continue
 
@@ -306,7 +324,12 @@ async def process_thumbnail(
         if row is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
 
-    storage_service = request.app.state.storage_service
+    try:
+        storage_service = await resolve_service(request.app.state, "storage_service")
+    except Exception as exc:
+        # Not cached by the lazy holder; the next request retries the connection
+        logger.warning("Object storage not available: %s", exc)
+        storage_service = None
     if storage_service is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
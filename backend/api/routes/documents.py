@@ -32,10 +32,14 @@ from pydantic import BaseModel
 from api.dependencies.database import get_database_pool
 from api.middleware.auth_middleware import require_permission
 from api.middleware.rate_limit_middleware import limiter, rate_limit_search, rate_limit_standard, rate_limit_upload
+from api.pagination import fetch_keyset_page
 from api.routes.response_models import ErrorResponse, SuccessResponse
+from services.stats_service import StatsService, table_dimensions
 
 LOGGER = logging.getLogger("krai.api.documents")
 
+DOCUMENT_STATS_DIMENSIONS = table_dimensions("documents", ("document_type", "processing_status", "manufacturer"))
+
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
@@ -134,45 +138,32 @@ async def list_documents(
             where_clauses.append(f"processing_status = ${param_count}")
             params.append(filters.processing_status)
 
-        where_clause = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-
-        # Apply sorting
-        order_clause = f" ORDER BY {sort.sort_by} {sort.sort_order.value}"
-
-        # Apply pagination
-        offset = (pagination.page - 1) * pagination.page_size
-        limit_clause = f" LIMIT {pagination.page_size} OFFSET {offset}"
-
-        # Execute query
-        query = f"""
-            SELECT *, COUNT(*) OVER() as total_count
-            FROM krai_core.documents
-            {where_clause}
-            {order_clause}
-            {limit_clause}
-        """
-
-        async with pool.acquire() as conn:
-            result = await conn.fetch(query, *params)
-
-        # Get total count from first row or execute separate count query
-        total_count = 0
-        if result:
-            total_count = result[0].get("total_count", len(result))
-        else:
-            # Fallback count query
-            count_query = f"SELECT COUNT(*) as count FROM krai_core.documents{where_clause}"
+        async def _fetch(query: str, query_params: list[Any]) -> list[Any]:
             async with pool.acquire() as conn:
-                count_result = await conn.fetch(count_query, *params)
-            total_count = count_result[0].get("count", 0) if count_result else 0
+                return await conn.fetch(query, *query_params)
+
+        page = await fetch_keyset_page(
+            _fetch,
+            table="krai_core.documents",
+            where_clauses=where_clauses,
+            params=params,
+            sort_by=sort.sort_by,
+            sort_order=sort.sort_order,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            total_mode=pagination.total_mode,
+        )
 
         return SuccessResponse(
             data=DocumentListResponse(
-                documents=result or [],
-                total=total_count,
+                documents=page.rows,
+                total=page.total,
                 page=pagination.page,
                 page_size=pagination.page_size,
-                total_pages=ceil(total_count / pagination.page_size) if pagination.page_size > 0 else 0,
+                total_pages=ceil(page.total / pagination.page_size) if page.total is not None else None,
+                next_cursor=page.next_cursor,
+                total_estimated=page.total_estimated,
             )
         )
     except HTTPException:
@@ -452,41 +443,48 @@ async def get_document_stats(
     current_user: dict[str, Any] = Depends(require_permission("documents:read")),
     pool: asyncpg.Pool = Depends(get_database_pool),
 ) -> SuccessResponse[DocumentStatsResponse]:
-    """Return aggregated document statistics."""
-    try:
-        async with pool.acquire() as conn:
-            total_result = await conn.fetch("SELECT COUNT(*) as count FROM krai_core.documents")
-        total_documents = total_result[0].get("count", 0) if total_result else 0
-
-        async with pool.acquire() as conn:
-            type_result = await conn.fetch(
-                "SELECT document_type, COUNT(*) as count FROM krai_core.documents GROUP BY document_type"
-            )
-        by_type: dict[str, int] = {
-            item.get("document_type"): int(item.get("count", 0))
-            for item in type_result or []
-            if item.get("document_type")
-        }
-
-        async with pool.acquire() as conn:
-            status_result = await conn.fetch(
-                "SELECT processing_status, COUNT(*) as count FROM krai_core.documents GROUP BY processing_status"
-            )
-        by_status: dict[str, int] = {
-            item.get("processing_status"): int(item.get("count", 0))
-            for item in status_result or []
-            if item.get("processing_status")
-        }
+    """Return aggregated document statistics.
 
-        async with pool.acquire() as conn:
-            manufacturer_result = await conn.fetch(
-                "SELECT manufacturer, COUNT(*) as count FROM krai_core.documents GROUP BY manufacturer"
-            )
-        by_manufacturer: dict[str, int] = {
-            item.get("manufacturer"): int(item.get("count", 0))
-            for item in manufacturer_result or []
-            if item.get("manufacturer")
-        }
+    Reads the trigger-maintained counters (migration 031) and falls back to
+    live GROUP BY queries over one connection when they are unavailable.
+    """
+    try:
+        snapshot = await StatsService.from_pool(pool).read(DOCUMENT_STATS_DIMENSIONS)
+        if snapshot is not None:
+            total_documents = snapshot.total("documents")
+            by_type = snapshot.group("documents", "document_type", include_unknown=False)
+            by_status = snapshot.group("documents", "processing_status", include_unknown=False)
+            by_manufacturer = snapshot.group("documents", "manufacturer", include_unknown=False)
+            stats_updated_at = snapshot.updated_at
+        else:
+            async with pool.acquire() as conn:
+                total_result = await conn.fetch("SELECT COUNT(*) as count FROM krai_core.documents")
+                type_result = await conn.fetch(
+                    "SELECT document_type, COUNT(*) as count FROM krai_core.documents GROUP BY document_type"
+                )
+                status_result = await conn.fetch(
+                    "SELECT processing_status, COUNT(*) as count FROM krai_core.documents GROUP BY processing_status"
+                )
+                manufacturer_result = await conn.fetch(
+                    "SELECT manufacturer, COUNT(*) as count FROM krai_core.documents GROUP BY manufacturer"
+                )
+            total_documents = total_result[0].get("count", 0) if total_result else 0
+            by_type = {
+                item.get("document_type"): int(item.get("count", 0))
+                for item in type_result or []
+                if item.get("document_type")
+            }
+            by_status = {
+                item.get("processing_status"): int(item.get("count", 0))
+                for item in status_result or []
+                if item.get("processing_status")
+            }
+            by_manufacturer = {
+                item.get("manufacturer"): int(item.get("count", 0))
+                for item in manufacturer_result or []
+                if item.get("manufacturer")
+            }
+            stats_updated_at = datetime.now(UTC)
 
         LOGGER.info(
             "Document stats computed totals=%s types=%s statuses=%s manufacturers=%s",
@@ -502,6 +500,7 @@ async def get_document_stats(
                 by_type=by_type,
                 by_status=by_status,
                 by_manufacturer=by_manufacturer,
+                stats_updated_at=stats_updated_at,
             )
         )
     except HTTPException:
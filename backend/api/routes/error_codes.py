@@ -19,6 +19,7 @@ from api.middleware.rate_limit_middleware import (
     rate_limit_standard,
     rate_limit_upload,
 )
+from api.pagination import fetch_keyset_page
 from api.routes.response_models import ErrorResponse, SuccessResponse
 from models.document import DocumentResponse, PaginationParams, SortOrder
 from models.error_code import (
@@ -264,36 +265,20 @@ async def list_error_codes(
             params.extend([search_term, search_term, search_term])
             param_count += 3
 
-        where_clause = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-
-        # Apply sorting
-        order_direction = "DESC" if sort.sort_order == SortOrder.DESC else "ASC"
-        order_clause = f" ORDER BY {sort.sort_by} {order_direction}"
-
-        # Apply pagination
-        offset = (pagination.page - 1) * pagination.page_size
-        limit_clause = f" LIMIT {pagination.page_size} OFFSET {offset}"
-
-        # Execute query
-        query = f"""
-            SELECT *, COUNT(*) OVER() as total_count
-            FROM krai_intelligence.error_codes
-            {where_clause}
-            {order_clause}
-            {limit_clause}
-        """
-
-        result = await adapter.execute_query(query, params)
-
-        # Get total count from first row or execute separate count query
-        total = 0
-        if result:
-            total = result[0].get('total_count', len(result))
-        else:
-            # Fallback count query
-            count_query = f"SELECT COUNT(*) as count FROM krai_intelligence.error_codes{where_clause}"
-            count_result = await adapter.execute_query(count_query, params)
-            total = count_result[0].get('count', 0) if count_result else 0
+        page = await fetch_keyset_page(
+            adapter.fetch_all,
+            table="krai_intelligence.error_codes",
+            where_clauses=where_clauses,
+            params=params,
+            sort_by=sort.sort_by,
+            sort_order=sort.sort_order,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            total_mode=pagination.total_mode,
+        )
+        total = page.total
+        result = page.rows
 
         LOGGER.info(
             "Listed error codes page=%s size=%s total=%s",
@@ -307,7 +292,9 @@ async def list_error_codes(
             total=total,
             page=pagination.page,
             page_size=pagination.page_size,
-            total_pages=_calculate_total_pages(total, pagination.page_size),
+            total_pages=_calculate_total_pages(total, pagination.page_size) if total is not None else None,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
         )
         return SuccessResponse(data=payload)
     except HTTPException:
@@ -15,6 +15,7 @@ from api.dependencies.database import get_database_pool, get_database_adapter
 import asyncpg
 import json
 from api.middleware.auth_middleware import require_permission
+from api.pagination import fetch_keyset_page
 from api.routes.response_models import ErrorResponse, SuccessResponse
 from models.document import DocumentResponse, PaginationParams, SortOrder
 from models.image import (
@@ -345,38 +346,24 @@ async def list_images(
             where_clauses.append(f"created_at::date <= ${param_count}::date")
             params.append(filters.date_to)
         
-        where_clause = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        
-        # Apply sorting
-        order_direction = "DESC" if sort.sort_order == SortOrder.DESC else "ASC"
-        order_clause = f" ORDER BY {sort.sort_by} {order_direction}"
-        
-        # Apply pagination
-        offset = (pagination.page - 1) * pagination.page_size
-        limit_clause = f" LIMIT {pagination.page_size} OFFSET {offset}"
-        
-        # Execute query
-        query = f"""
-            SELECT *, COUNT(*) OVER() as total_count
-            FROM krai_content.images
-            {where_clause}
-            {order_clause}
-            {limit_clause}
-        """
-        
-        async with pool.acquire() as conn:
-            result = await conn.fetch(query, *params)
-        
-        # Get total count from first row or execute separate count query
-        total = 0
-        if result:
-            total = result[0].get('total_count', len(result))
-        else:
-            # Fallback count query
-            count_query = f"SELECT COUNT(*) as count FROM krai_content.images{where_clause}"
+        async def _fetch(query: str, query_params: List[Any]) -> List[Any]:
             async with pool.acquire() as conn:
-                count_result = await conn.fetch(count_query, *params)
-            total = count_result[0].get('count', 0) if count_result else 0
+                return await conn.fetch(query, *query_params)
+
+        page = await fetch_keyset_page(
+            _fetch,
+            table="krai_content.images",
+            where_clauses=where_clauses,
+            params=params,
+            sort_by=sort.sort_by,
+            sort_order=sort.sort_order,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            total_mode=pagination.total_mode,
+        )
+        total = page.total
+        result = page.rows
 
         LOGGER.info(
             "Listed images page=%s size=%s total=%s",
@@ -390,7 +377,9 @@ async def list_images(
             total=total,
             page=pagination.page,
             page_size=pagination.page_size,
-            total_pages=_calculate_total_pages(total, pagination.page_size),
+            total_pages=_calculate_total_pages(total, pagination.page_size) if total is not None else None,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
         )
         return SuccessResponse(data=payload)
     except HTTPException:
@@ -49,6 +49,7 @@ from api.agent_scope import (
     normalize_scope,
 )
 from api.middleware.auth_middleware import require_permission
+from api.startup import resolve_service
 
 logger = logging.getLogger(__name__)
 
@@ -916,18 +917,23 @@ async def _fast_path_lookup(
     raw_model = model_match.group(0).strip() if model_match else None
     active_scope = normalize_scope(scope)
 
+    # Exact matches first (btree on upper(error_code)), then substring matches
+    # (trigram index) so "E001" does not also pull in "E0012" when both exist
+    code_matches = [("upper(ec.error_code) = $1", v) for v in variants]
+    code_matches += [("ec.error_code ILIKE $1", f'%{v}%') for v in variants]
+
     try:
         async with pool.acquire() as conn:
             rows = None
-            for v in variants:
+            for code_clause, code_param in code_matches:
                 model_filter_enabled = raw_model and not any(
                     active_scope.get(key) for key in ("product", "product_id", "series")
                 )
                 for apply_model_filter in ([True, False] if model_filter_enabled else [False]):
-                    params: list[object] = [f'%{v}%']
+                    params: list[object] = [code_param]
                     where_clauses = [
                         "ec.is_category IS NOT TRUE",
-                        "ec.error_code ILIKE $1",
+                        code_clause,
                     ]
                     where_clauses.extend(
                         build_scope_filters(
@@ -1462,16 +1468,25 @@ async def _parts_lookup(pool, text: str, scope: dict[str, str] | None = None) ->
     # Extract longest token as search term
     tokens = [t for t in re.findall(r'\b\w[\w\-\.]{2,}\b', text) if not re.match(r'^(was|ist|wie|gibt|es|der|die|das|und|oder|ich|du|wir|sie|ein|für|mit|von|bei|nach|auf|an|im|zur|zum)$', t, re.I)]
     term = max(tokens, key=len) if tokens else text[:40]
+    substring_clause = (
+        "("
+        "pc.part_number ILIKE $1 OR "
+        "COALESCE(pc.part_name, '') ILIKE $1 OR "
+        "COALESCE(pc.description, '') ILIKE $1"
+        ")"
+    )
+    # Part-number-like terms are probed exactly first (btree on
+    # upper(part_number)), then by substring, then by a shorter stem
+    attempts = []
+    if any(ch.isdigit() for ch in term):
+        attempts.append(("upper(pc.part_number) = $1", term.upper()))
+    attempts.append((substring_clause, f'%{term}%'))
+    if len(term) > 6:
+        attempts.append((substring_clause, f'%{term[:6]}%'))
     try:
         async with pool.acquire() as conn:
-            params: list[object] = [f'%{term}%']
-            where_clauses = [
-                "("
-                "pc.part_number ILIKE $1 OR "
-                "COALESCE(pc.part_name, '') ILIKE $1 OR "
-                "COALESCE(pc.description, '') ILIKE $1"
-                ")"
-            ]
+            params: list[object] = [None]
+            where_clauses = [substring_clause]
             where_clauses.extend(
                 build_scope_filters(
                     params,
@@ -1487,18 +1502,9 @@ async def _parts_lookup(pool, text: str, scope: dict[str, str] | None = None) ->
                 )
             )
             params.append(8)
-            rows = await conn.fetch(
-                f"""
-                {_PARTS_BASE_SQL}
-                WHERE {' AND '.join(where_clauses)}
-                ORDER BY pc.part_number
-                LIMIT ${len(params)}
-                """,
-                *params,
-            )
-            if not rows and len(term) > 6:
-                # Retry with shorter stem
-                params[0] = f'%{term[:6]}%'
+            for match_clause, match_param in attempts:
+                where_clauses[0] = match_clause
+                params[0] = match_param
                 rows = await conn.fetch(
                     f"""
                     {_PARTS_BASE_SQL}
@@ -1508,6 +1514,8 @@ async def _parts_lookup(pool, text: str, scope: dict[str, str] | None = None) ->
                     """,
                     *params,
                 )
+                if rows:
+                    break
     except Exception as exc:
         logger.warning("parts_lookup DB error: %s", exc)
         return None
@@ -1740,12 +1748,12 @@ async def _semantic_fast_lookup(pool, text: str, scope: dict[str, str] | None =
         logger.warning("semantic_fast_lookup embed error: %s", exc)
         return None
 
-    # Format embedding as pgvector literal
-    vec_literal = "[" + ",".join(f"{x:.6f}" for x in embedding) + "]"
+    # Bound as a float list; the shared pool's pgvector codec encodes it in binary
+    vec_param = [float(x) for x in embedding]
     active_scope = normalize_scope(scope)
     try:
         async with pool.acquire() as conn:
-            params: list[object] = [vec_literal]
+            params: list[object] = [vec_param]
             where_clauses = [
                 "c.embedding IS NOT NULL",
                 "c.processing_status = 'completed'",
@@ -1847,7 +1855,12 @@ async def chat_completions(
       4. Everything else     → pgvector semantic search    (~1.5 s)
       5. Fallback            → LangGraph agent (needs LLM, with timeout)
     """
-    agent = getattr(request.app.state, "krai_agent", None)
+    try:
+        # Built on the first chat request (LangGraph + LLM client), then reused
+        agent = await resolve_service(request.app.state, "krai_agent")
+    except Exception as exc:
+        logger.warning("KRAI agent unavailable: %s", exc)
+        agent = None
 
     session_id = _session_id(body.messages, body.user)
     content, images = _extract_last_user_content(body.messages)
@@ -18,8 +18,10 @@ from api.middleware.rate_limit_middleware import (
     rate_limit_search,
     rate_limit_upload,
 )
+from api.pagination import fetch_keyset_page
 from api.routes.response_models import ErrorResponse, SuccessResponse
 from models.document import PaginationParams
+from services.stats_service import StatsService, table_dimensions
 from models.manufacturer import ManufacturerResponse
 from models.product import (
     ProductBatchCreateRequest,
@@ -41,6 +43,8 @@ from models.product import (
 
 LOGGER = logging.getLogger("krai.api.products")
 
+PRODUCT_STATS_DIMENSIONS = table_dimensions("products", ("product_type", "manufacturer_id"))
+
 router = APIRouter(prefix="/products", tags=["products"])
 
 
@@ -209,31 +213,20 @@ async def list_products(
             params.extend([search_term, search_term, search_term])
             param_count += 3
 
-        where_clause = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-
-        order_direction = "DESC" if sort.sort_order == SortOrder.DESC else "ASC"
-        order_clause = f" ORDER BY {sort.sort_by} {order_direction}"
-
-        offset = (pagination.page - 1) * pagination.page_size
-        limit_clause = f" LIMIT {pagination.page_size} OFFSET {offset}"
-
-        query = f"""
-            SELECT *, COUNT(*) OVER() as total_count
-            FROM krai_core.products
-            {where_clause}
-            {order_clause}
-            {limit_clause}
-        """
-
-        result = await adapter.execute_query(query, params)
-
-        total = 0
-        if result:
-            total = result[0].get('total_count', len(result))
-        else:
-            count_query = f"SELECT COUNT(*) as count FROM krai_core.products{where_clause}"
-            count_result = await adapter.execute_query(count_query, params)
-            total = count_result[0].get('count', 0) if count_result else 0
+        page = await fetch_keyset_page(
+            adapter.fetch_all,
+            table="krai_core.products",
+            where_clauses=where_clauses,
+            params=params,
+            sort_by=sort.sort_by,
+            sort_order=sort.sort_order,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            total_mode=pagination.total_mode,
+        )
+        total = page.total
+        result = page.rows
 
         LOGGER.info(
             "Listed products page=%s size=%s total=%s",
@@ -247,7 +240,9 @@ async def list_products(
             total=total,
             page=pagination.page,
             page_size=pagination.page_size,
-            total_pages=_calculate_total_pages(total, pagination.page_size),
+            total_pages=_calculate_total_pages(total, pagination.page_size) if total is not None else None,
+            next_cursor=page.next_cursor,
+            total_estimated=page.total_estimated,
         )
         return SuccessResponse(data=payload)
     except HTTPException:
@@ -589,29 +584,42 @@ async def get_product_stats(
     current_user: Dict[str, Any] = Depends(require_permission("products:read")),
     adapter: DatabaseAdapter = Depends(get_database_adapter),
 ) -> SuccessResponse[ProductStatsResponse]:
+    """Return aggregated product statistics.
+
+    Totals and per-type/manufacturer counts come from the trigger-maintained
+    counters (migration 031) when available, otherwise from live queries.
+    """
     try:
-        total_result = await adapter.execute_query(
-            "SELECT COUNT(*) as count FROM krai_core.products"
-        )
-        total_products = total_result[0].get('count', 0) if total_result else 0
+        snapshot = await StatsService.from_adapter(adapter).read(PRODUCT_STATS_DIMENSIONS)
+        if snapshot is not None:
+            total_products = snapshot.total("products")
+            by_type = snapshot.group("products", "product_type", include_unknown=False)
+            manufacturer_counts = snapshot.group("products", "manufacturer_id", include_unknown=False)
+            stats_updated_at = snapshot.updated_at
+        else:
+            total_result = await adapter.execute_query(
+                "SELECT COUNT(*) as count FROM krai_core.products"
+            )
+            total_products = total_result[0].get('count', 0) if total_result else 0
 
-        type_result = await adapter.execute_query(
-            "SELECT product_type, COUNT(*) as count FROM krai_core.products GROUP BY product_type"
-        )
-        by_type = {
-            item.get("product_type"): item.get("count", 0)
-            for item in type_result or []
-            if item.get("product_type")
-        }
+            type_result = await adapter.execute_query(
+                "SELECT product_type, COUNT(*) as count FROM krai_core.products GROUP BY product_type"
+            )
+            by_type = {
+                item.get("product_type"): item.get("count", 0)
+                for item in type_result or []
+                if item.get("product_type")
+            }
 
-        manufacturer_result = await adapter.execute_query(
-            "SELECT manufacturer_id, COUNT(*) as count FROM krai_core.products GROUP BY manufacturer_id"
-        )
-        manufacturer_counts = {
-            item.get("manufacturer_id"): item.get("count", 0)
-            for item in manufacturer_result or []
-            if item.get("manufacturer_id")
-        }
+            manufacturer_result = await adapter.execute_query(
+                "SELECT manufacturer_id, COUNT(*) as count FROM krai_core.products GROUP BY manufacturer_id"
+            )
+            manufacturer_counts = {
+                str(item.get("manufacturer_id")): item.get("count", 0)
+                for item in manufacturer_result or []
+                if item.get("manufacturer_id")
+            }
+            stats_updated_at = datetime.now(timezone.utc)
 
         manufacturer_names: Dict[str, str] = {}
         if manufacturer_counts:
@@ -622,7 +630,7 @@ async def get_product_stats(
                 ids
             )
             manufacturer_names = {
-                item["id"]: item["name"] 
+                str(item["id"]): item["name"]
                 for item in manufacturer_data_result or [] 
                 if item.get("id")
             }
@@ -632,18 +640,14 @@ async def get_product_stats(
             for manufacturer_id, count in manufacturer_counts.items()
         }
 
+        # Depends on today's date, so it stays a query (index range scan)
         today = date.today().isoformat()
-        active_result = await adapter.execute_query(
-            "SELECT COUNT(*) as count FROM krai_core.products WHERE end_of_life_date IS NULL OR end_of_life_date > $1",
-            [today]
-        )
-        active_products = active_result[0].get('count', 0) if active_result else 0
-
         discontinued_result = await adapter.execute_query(
             "SELECT COUNT(*) as count FROM krai_core.products WHERE end_of_life_date < $1",
             [today]
         )
         discontinued_products = discontinued_result[0].get('count', 0) if discontinued_result else 0
+        active_products = max(total_products - discontinued_products, 0)
 
         LOGGER.info(
             "Product stats computed totals=%s types=%s manufacturers=%s",
@@ -658,6 +662,7 @@ async def get_product_stats(
             by_manufacturer=by_manufacturer,
             active_products=active_products,
             discontinued_products=discontinued_products,
+            stats_updated_at=stats_updated_at,
         )
         return SuccessResponse(data=stats)
     except HTTPException:
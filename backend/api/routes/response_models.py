@@ -86,6 +86,10 @@ class StageProcessingRequest(BaseModel):
     """Request model for processing multiple stages"""
     stages: List[str] = Field(..., description="List of stage names to process")
     stop_on_error: bool = Field(default=True, description="Stop processing on first error")
+    profile: Optional[str] = Field(
+        default=None,
+        description='Record sampling profiles: "all" or comma-separated stage names',
+    )
 
 class StageResult(BaseModel):
     """Result of a single stage processing"""
@@ -18,7 +18,8 @@ from pydantic import BaseModel
 from core.data_models import (
     SearchRequest, SearchResponse,
     MultimodalSearchRequest, MultimodalSearchResponse,
-    TwoStageSearchRequest, TwoStageSearchResponse
+    TwoStageSearchRequest, TwoStageSearchResponse,
+    HybridSearchRequest
 )
 from services.database_adapter import DatabaseAdapter
 from services.database_factory import create_database_adapter
@@ -224,6 +225,38 @@ async def two_stage_search(
         logger.error(f"Two-stage search failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/hybrid")
+async def hybrid_search(
+    request: HybridSearchRequest,
+    search_service: MultimodalSearchService = Depends(get_multimodal_search_service),
+    current_user: dict = Depends(require_permission("search:read")),
+):
+    """
+    Hybrid full-text + vector chunk search fused with reciprocal rank fusion
+
+    Disabled unless ENABLE_HYBRID_SEARCH=true (needs migration 033+).
+
+    Args:
+        request: Hybrid search request
+
+    Returns:
+        Text results with fusion score and per-list ranks
+    """
+    if os.getenv("ENABLE_HYBRID_SEARCH", "false").lower() != "true":
+        raise HTTPException(status_code=404, detail="Hybrid search is disabled")
+
+    results = await search_service.search_hybrid(
+        query=request.query,
+        limit=request.limit,
+        exact_token=request.exact_token,
+        candidate_count=request.candidate_count,
+        rrf_k=request.rrf_k
+    )
+    if "error" in results:
+        logger.error(f"Hybrid search failed: {results['error']}")
+        raise HTTPException(status_code=500, detail=results["error"])
+    return results
+
 @router.post("/images/context")
 async def search_images_by_context(
     request: ImageContextSearchRequest,
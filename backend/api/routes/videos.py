@@ -253,9 +253,12 @@ def _detect_content_type(filename: str) -> Optional[str]:
     return mapping.get(extension)
 
 
-def _deserialize_metadata(raw: Optional[str]) -> Dict[str, Any]:
+def _deserialize_metadata(raw: Any) -> Dict[str, Any]:
     if not raw:
         return {}
+    if isinstance(raw, dict):
+        # JSONB columns are already decoded by the pool's codec
+        return raw
     try:
         return json.loads(raw)
     except json.JSONDecodeError:
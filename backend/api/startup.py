@@ -0,0 +1,188 @@
+"""Deferred service construction and startup profiling for the FastAPI app.
+
+Heavy services (pipeline, reranker, LangGraph agent, object storage) are wrapped
+in :class:`LazyService` and built on first use instead of in ``startup_events``.
+:class:`StartupProfiler` records how long each import and init phase took; it is
+enabled with ``python api/app.py --profile-startup`` or ``KRAI_PROFILE_STARTUP=true``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, Union
+
+logger = logging.getLogger("krai.startup")
+
+PROFILE_FLAG = "--profile-startup"
+
+# Packages that are reported per sub-module instead of as one block
+_PROJECT_PACKAGES = {"api", "core", "config", "models", "pipeline", "processors", "services", "utils", "backend"}
+
+Factory = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+def profiling_requested(argv: list[str] | None = None) -> bool:
+    """Return True when startup profiling was requested via CLI flag or env."""
+    argv = sys.argv if argv is None else argv
+    if PROFILE_FLAG in argv:
+        return True
+    return os.getenv("KRAI_PROFILE_STARTUP", "false").lower() in {"1", "true", "yes"}
+
+
+@dataclass
+class PhaseTiming:
+    """Duration of one named import/init phase."""
+
+    name: str
+    kind: str
+    seconds: float
+    error: str | None = None
+
+
+class StartupProfiler:
+    """Collects per-component import and init timings."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.timings: list[PhaseTiming] = []
+
+    def record(self, name: str, kind: str, seconds: float, error: str | None = None) -> None:
+        if self.enabled:
+            self.timings.append(PhaseTiming(name=name, kind=kind, seconds=seconds, error=error))
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "init") -> Iterator[None]:
+        """Time the enclosed block (usable inside sync and async code)."""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self.record(name, kind, time.perf_counter() - started, error)
+
+    def format_report(self, limit: int = 25) -> str:
+        """Render the recorded timings, slowest first within each kind."""
+        lines = ["Startup profile", "=" * 60]
+        for kind in ("import", "init", "lazy"):
+            entries = sorted((t for t in self.timings if t.kind == kind), key=lambda t: t.seconds, reverse=True)
+            if not entries:
+                continue
+            total = sum(t.seconds for t in entries) if kind != "import" else entries[0].seconds
+            lines.append(f"{kind.upper():<8} total {total * 1000:9.1f} ms")
+            for timing in entries[:limit]:
+                suffix = f"  [{timing.error}]" if timing.error else ""
+                lines.append(f"  {timing.seconds * 1000:9.1f} ms  {timing.name}{suffix}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler(enabled=profiling_requested())
+
+
+class LazyService:
+    """Async-safe holder that builds a service on first :meth:`get`.
+
+    ``factory`` may be sync or async. Construction errors propagate to the caller
+    and the next call retries, so a transient failure (e.g. storage offline) does
+    not poison the holder.
+    """
+
+    def __init__(self, name: str, factory: Factory, profiler: StartupProfiler | None = None) -> None:
+        self.name = name
+        self._factory = factory
+        self._profiler = profiler or startup_profiler
+        self._instance: Any = None
+        self._initialized = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def peek(self) -> Any:
+        """Return the instance if it was already built, else None (never builds)."""
+        return self._instance
+
+    async def get(self) -> Any:
+        if self._initialized:
+            return self._instance
+        async with self._lock:
+            if not self._initialized:
+                with self._profiler.phase(self.name, kind="lazy"):
+                    instance = self._factory()
+                    if inspect.isawaitable(instance):
+                        instance = await instance
+                self._instance = instance
+                self._initialized = True
+                logger.info("Lazy service '%s' initialized", self.name)
+        return self._instance
+
+
+async def resolve_service(state: Any, name: str, default: Any = None) -> Any:
+    """Return ``state.<name>``, building it first if it is a :class:`LazyService`."""
+    value = getattr(state, name, default)
+    if isinstance(value, LazyService):
+        return await value.get()
+    return value
+
+
+def parse_importtime(output: str, limit: int = 25) -> list[PhaseTiming]:
+    """Aggregate ``python -X importtime`` output into per-component cumulative times.
+
+    Project packages are reported per module (``api.routes.search``), third-party
+    packages by their top-level name (``torch``). Cumulative times are used, so a
+    package entry includes everything it imported.
+    """
+    components: dict[str, float] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue  # header line
+        module = name.strip()
+        parts = module.split(".")
+        if parts[0] in _PROJECT_PACKAGES:
+            key = ".".join(parts[:4] if parts[0] == "backend" else parts[:3])
+        else:
+            key = parts[0]
+        # Parents report cumulative time including children, so keep the largest value
+        components[key] = max(components.get(key, 0.0), cumulative_us / 1_000_000)
+
+    timings = [PhaseTiming(name=key, kind="import", seconds=seconds) for key, seconds in components.items()]
+    timings.sort(key=lambda t: t.seconds, reverse=True)
+    return timings[:limit]
+
+
+def collect_import_times(module: str = "api.app", limit: int = 25) -> list[PhaseTiming]:
+    """Import ``module`` in a fresh interpreter with ``-X importtime`` and aggregate."""
+    backend_dir = Path(__file__).resolve().parents[1]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(backend_dir), str(backend_dir.parent), env.get("PYTHONPATH")])
+    )
+    env.pop("KRAI_PROFILE_STARTUP", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(backend_dir),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        logger.warning("Import profiling of %s failed: %s", module, result.stderr.strip().splitlines()[-1:])
+    return parse_importtime(result.stderr, limit=limit)
@@ -1,14 +1,37 @@
-"""WebSocket API for real-time monitoring updates."""
+"""WebSocket API for real-time monitoring updates.
+
+Updates are event-driven: pipeline stages, the stage tracker and the alert
+service publish to the in-process event bus (``backend.core.event_bus``).
+While clients are connected, :class:`MonitoringBroadcaster` collects events
+for a short coalescing window, re-reads only the metrics they touched and
+sends just the fields that changed (``"delta": true``). Pipeline and queue
+metrics are also re-read on a slow fallback interval to pick up changes made
+by other processes; nothing is polled while no client is connected.
+
+Every connection has a bounded send queue drained by its own writer task. A
+client that falls behind has its backlog replaced by one full ``snapshot``
+message, so it cannot stall the broadcast.
+
+Environment:
+    - WEBSOCKET_COALESCE_MS       - window for batching bursts of events (default: 250)
+    - WEBSOCKET_REFRESH_SECONDS   - fallback pipeline/queue refresh (default: 10)
+    - WEBSOCKET_HARDWARE_SECONDS  - hardware refresh while clients are connected (default: 5)
+    - WEBSOCKET_SEND_QUEUE_SIZE   - messages buffered per client before resync (default: 64)
+"""
 from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 
+from backend.core.event_bus import EventBus, MonitoringEvent, get_event_bus, publish_event
 from models.monitoring import (
     Alert,
     HardwareStatus,
@@ -24,6 +47,107 @@ LOGGER = logging.getLogger(__name__)
 
 router = APIRouter()
 
+COALESCE_SECONDS = int(os.getenv("WEBSOCKET_COALESCE_MS", "250")) / 1000.0
+REFRESH_SECONDS = float(os.getenv("WEBSOCKET_REFRESH_SECONDS", "10"))
+HARDWARE_SECONDS = float(os.getenv("WEBSOCKET_HARDWARE_SECONDS", "5"))
+SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "64"))
+
+# topic -> (message type, MetricsService cache key, MetricsService getter)
+STATE_TOPICS = {
+    "pipeline": (WebSocketEvent.PIPELINE_UPDATE.value, "pipeline_metrics", "get_pipeline_metrics"),
+    "queue": (WebSocketEvent.QUEUE_UPDATE.value, "queue_metrics", "get_queue_metrics"),
+    "hardware": (WebSocketEvent.HARDWARE_UPDATE.value, None, "get_hardware_metrics"),
+}
+
+
+def _payload(message_type: str, data: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    return {"type": message_type, "data": data, "timestamp": datetime.utcnow().isoformat(), **extra}
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of ``new`` that differ from ``old``.
+
+    Nested dicts are compared recursively; removed keys are reported as None.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = diff_state(old[key], value)
+            if nested:
+                delta[key] = nested
+        elif old[key] != value:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+class ClientConnection:
+    """One WebSocket client with a bounded send queue and its own writer task."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        permissions: List[str],
+        snapshot: Callable[[], Dict[str, Any]],
+        on_failure: Callable[[WebSocket], None],
+        queue_size: int = SEND_QUEUE_SIZE,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.permissions = permissions
+        self.dropped = 0
+        self._snapshot = snapshot
+        self._on_failure = on_failure
+        self._queue_size = max(1, queue_size)
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._resync = False
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self) -> None:
+        if self._writer is not None and not self._writer.done():
+            self._writer.cancel()
+
+    def offer(self, payload: Dict[str, Any]) -> None:
+        """Queue a message without waiting for the client."""
+        if self._resync and payload.get("delta"):
+            return  # the pending snapshot already carries the latest state
+        if len(self._queue) >= self._queue_size:
+            # Too far behind: drop the backlog and send the latest snapshot next
+            self.dropped += len(self._queue) + 1
+            self._queue.clear()
+            self._resync = True
+        else:
+            self._queue.append(payload)
+        self._ready.set()
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                if self._resync:
+                    self._resync = False
+                    await self._send(_payload("snapshot", self._snapshot()))
+                while self._queue:
+                    await self._send(self._queue.popleft())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER.debug(f"WebSocket writer stopped for user={self.user_id}: {e}")
+            self._on_failure(self.websocket)
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        if self.websocket.client_state == WebSocketState.CONNECTED:
+            await self.websocket.send_json(payload)
+
 
 class WebSocketManager:
     """Manager for WebSocket connections."""
@@ -32,6 +156,11 @@ class WebSocketManager:
         """Initialize WebSocket manager."""
         self.active_connections: List[WebSocket] = []
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.clients_present = asyncio.Event()
+        # Hooks set by MonitoringBroadcaster
+        self.snapshot: Callable[[], Dict[str, Any]] = dict
+        self.on_idle: Callable[[], None] = lambda: None
         self.logger = LOGGER
 
     async def connect(self, websocket: WebSocket, user_id: str, permissions: List[str]) -> None:
@@ -43,12 +172,24 @@ class WebSocketManager:
             "permissions": permissions,
             "connected_at": datetime.utcnow(),
         }
+        client = ClientConnection(
+            websocket, user_id, permissions, snapshot=lambda: self.snapshot(), on_failure=self.disconnect
+        )
+        self.clients[websocket] = client
+        client.start()
+        self.clients_present.set()
         self.logger.info(f"WebSocket connected: user={user_id}, total_connections={len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove WebSocket connection."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.stop()
+        if not self.clients and self.clients_present.is_set():
+            self.clients_present.clear()
+            self.on_idle()
         if websocket in self.connection_metadata:
             user_id = self.connection_metadata[websocket].get("user_id", "unknown")
             del self.connection_metadata[websocket]
@@ -63,36 +204,173 @@ class WebSocketManager:
             self.logger.error(f"Failed to send personal message: {e}")
             self.disconnect(websocket)
 
+    def deliver(self, payload: Dict[str, Any], permission_required: Optional[str] = None) -> None:
+        """Queue a payload for every authorized connection; never waits on a client."""
+        for client in list(self.clients.values()):
+            if permission_required and permission_required not in client.permissions:
+                continue
+            client.offer(payload)
+
     async def broadcast(self, message: WebSocketMessage, permission_required: Optional[str] = None) -> None:
         """Broadcast message to all authorized connections."""
-        disconnected = []
-        
-        for connection in self.active_connections:
+        self.deliver(message.model_dump(mode="json"), permission_required)
+
+
+class MonitoringBroadcaster:
+    """Turns monitoring events into coalesced, diff-based WebSocket updates.
+
+    Subscribes to the event bus only while clients are connected. Events with
+    the same key that arrive within the coalescing window collapse into the
+    latest one; stage events mark pipeline/queue metrics stale, and stale
+    metrics are re-read once per flush and sent as deltas against the last
+    broadcast state.
+    """
+
+    def __init__(
+        self,
+        manager: WebSocketManager,
+        bus: Optional[EventBus] = None,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        refresh_seconds: float = REFRESH_SECONDS,
+        hardware_seconds: float = HARDWARE_SECONDS,
+    ):
+        self.manager = manager
+        self.bus = bus or get_event_bus()
+        self.coalesce_seconds = coalesce_seconds
+        self.refresh_seconds = refresh_seconds
+        self.hardware_seconds = hardware_seconds
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[Any, MonitoringEvent] = {}
+        self._stale: Set[str] = set()
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        manager.snapshot = self.snapshot
+        manager.on_idle = self._wakeup.set
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest full state of every topic (used for initial data and resyncs)."""
+        return dict(self.state)
+
+    async def initial_snapshot(self, metrics_service: MetricsService) -> Dict[str, Any]:
+        """Full state for a new client, fetching topics that are not known yet."""
+        for topic, (_, _, getter) in STATE_TOPICS.items():
+            if topic not in self.state:
+                self.state[topic] = (await getattr(metrics_service, getter)()).model_dump(mode="json")
+        return self.snapshot()
+
+    # -------------------------------------------------------------- events
+
+    def _attach(self) -> None:
+        if self._unsubscribe is None:
+            self._unsubscribe = self.bus.subscribe(self._on_event)
+
+    def _detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self._pending.clear()
+        self._stale.clear()
+        # Nobody saw the changes made while detached; start from fresh state
+        self.state.clear()
+
+    def _on_event(self, event: MonitoringEvent) -> None:
+        """Bus callback; may run on any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._record(event)
+        else:
+            loop.call_soon_threadsafe(self._record, event)
+
+    def _record(self, event: MonitoringEvent) -> None:
+        if event.key is None:
+            self._sequence += 1
+            key: Any = ("event", self._sequence)
+        else:
+            key = event.key
+        # Re-insert so delivery order follows the latest update of each key
+        self._pending.pop(key, None)
+        self._pending[key] = event
+        if event.type.startswith("stage_") or event.type == WebSocketEvent.PROCESSOR_STATE_CHANGE.value:
+            self._stale.update(("pipeline", "queue"))
+        self._wakeup.set()
+
+    # -------------------------------------------------------------- loop
+
+    async def run(self, metrics_service: MetricsService) -> None:
+        self._loop = asyncio.get_running_loop()
+        next_refresh = next_hardware = 0.0
+        while True:
+            if not self.manager.clients_present.is_set():
+                self._detach()
+                await self.manager.clients_present.wait()
+            if self._unsubscribe is None:
+                self._attach()
+                next_refresh = next_hardware = 0.0
+
+            now = time.monotonic()
+            if now >= next_refresh:
+                self._stale.update(("pipeline", "queue"))
+                next_refresh = now + self.refresh_seconds
+            if now >= next_hardware:
+                self._stale.add("hardware")
+                next_hardware = now + self.hardware_seconds
+
+            if not self._pending and not self._stale:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=max(0.0, min(next_refresh, next_hardware) - now)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            # Let a burst of events settle into a single update
+            if self._pending and self.coalesce_seconds > 0:
+                await asyncio.sleep(self.coalesce_seconds)
+            self._wakeup.clear()
+            await self.flush(metrics_service)
+
+    async def flush(self, metrics_service: MetricsService) -> None:
+        """Deliver pending events, then re-read stale metrics and send their deltas."""
+        events = list(self._pending.values())
+        self._pending.clear()
+        stale, self._stale = self._stale, set()
+
+        for event in events:
+            self.manager.deliver(_payload(event.type, event.data), event.permission)
+
+        for topic, (message_type, cache_key, getter) in STATE_TOPICS.items():
+            if topic not in stale:
+                continue
             try:
-                # Check permission if required
-                if permission_required:
-                    metadata = self.connection_metadata.get(connection, {})
-                    permissions = metadata.get("permissions", [])
-                    if permission_required not in permissions:
-                        continue
-                
-                # Send message
-                if connection.client_state == WebSocketState.CONNECTED:
-                    await connection.send_json(message.model_dump())
-            
-            except WebSocketDisconnect:
-                disconnected.append(connection)
+                if cache_key:
+                    metrics_service.invalidate_cache(cache_key)
+                current = (await getattr(metrics_service, getter)()).model_dump(mode="json")
             except Exception as e:
-                self.logger.error(f"Failed to broadcast to connection: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
+                LOGGER.error(f"Failed to refresh {topic} metrics for WebSocket clients: {e}")
+                continue
+            previous = self.state.get(topic)
+            self.state[topic] = current
+            if previous is None:
+                self.manager.deliver(_payload(message_type, current, delta=False), "monitoring:read")
+                continue
+            delta = diff_state(previous, current)
+            if delta:
+                self.manager.deliver(_payload(message_type, delta, delta=True), "monitoring:read")
 
 
-# Global manager instance
+# Global manager and broadcaster instances
 manager = WebSocketManager()
+broadcaster = MonitoringBroadcaster(manager)
 
 
 async def broadcast_pipeline_update(pipeline_metrics: PipelineMetrics) -> None:
@@ -123,12 +401,8 @@ async def broadcast_hardware_update(hardware_status: HardwareStatus) -> None:
 
 
 async def broadcast_alert(alert: Alert) -> None:
-    """Broadcast alert trigger."""
-    message = WebSocketMessage(
-        type=WebSocketEvent.ALERT_TRIGGERED.value,
-        data=alert.model_dump(),
-    )
-    await manager.broadcast(message, "monitoring:read")
+    """Publish alert trigger (alerts are never coalesced)."""
+    publish_event(WebSocketEvent.ALERT_TRIGGERED.value, alert.model_dump(mode="json"))
 
 
 async def broadcast_stage_event(
@@ -137,16 +411,16 @@ async def broadcast_stage_event(
     document_id: str,
     status: str,
 ) -> None:
-    """Broadcast stage event."""
-    message = WebSocketMessage(
-        type=event_type.value,
-        data={
+    """Publish stage event."""
+    publish_event(
+        event_type.value,
+        {
             "stage": stage_name,
             "document_id": document_id,
             "status": status,
         },
+        key=f"stage:{document_id}:{stage_name}",
     )
-    await manager.broadcast(message, "monitoring:read")
 
 
 async def broadcast_processor_state_change(
@@ -155,17 +429,17 @@ async def broadcast_processor_state_change(
     status: str,
     document_id: Optional[str] = None,
 ) -> None:
-    """Broadcast processor state change event."""
-    message = WebSocketMessage(
-        type=WebSocketEvent.PROCESSOR_STATE_CHANGE.value,
-        data={
+    """Publish processor state change event."""
+    publish_event(
+        WebSocketEvent.PROCESSOR_STATE_CHANGE.value,
+        {
             "processor_name": processor_name,
             "stage_name": stage_name,
             "status": status,
             "document_id": document_id,
         },
+        key=f"processor:{processor_name}",
     )
-    await manager.broadcast(message, "monitoring:read")
 
 
 async def broadcast_stage_update(
@@ -175,12 +449,12 @@ async def broadcast_stage_update(
     progress: int,
     error: Optional[str] = None,
 ) -> None:
-    """Broadcast stage status change to connected clients."""
+    """Publish stage status change to connected clients."""
     event_type = "STAGE_COMPLETED" if status == "completed" else "STAGE_FAILED" if status == "failed" else "STAGE_PROCESSING"
     
-    message = WebSocketMessage(
-        type=event_type,
-        data={
+    publish_event(
+        event_type,
+        {
             "document_id": document_id,
             "stage_name": stage_name,
             "status": status,
@@ -188,8 +462,9 @@ async def broadcast_stage_update(
             "error": error,
             "timestamp": datetime.utcnow().isoformat(),
         },
+        key=f"stage:{document_id}:{stage_name}",
+        permission="documents:read",
     )
-    await manager.broadcast(message, "documents:read")
 
 
 @router.websocket("/ws/monitoring")
@@ -227,25 +502,17 @@ async def websocket_endpoint(
         
         # Connect
         await manager.connect(websocket, user_id, permissions)
+        client = manager.clients[websocket]
         
         # Send initial data
         try:
             from api.app import get_metrics_service
             metrics_service = await get_metrics_service()
             
-            pipeline_metrics = await metrics_service.get_pipeline_metrics()
-            queue_metrics = await metrics_service.get_queue_metrics()
-            hardware_metrics = await metrics_service.get_hardware_metrics()
-            
-            await websocket.send_json({
-                "type": "initial_data",
-                "data": {
-                    "pipeline": pipeline_metrics.model_dump(),
-                    "queue": queue_metrics.model_dump(),
-                    "hardware": hardware_metrics.model_dump(),
-                },
-                "timestamp": datetime.utcnow().isoformat(),
-            })
+            # Full state once; afterwards the client only receives deltas
+            client.offer(
+                _payload("initial_data", await broadcaster.initial_snapshot(metrics_service))
+            )
         except Exception as e:
             LOGGER.error(f"Failed to send initial data: {e}")
         
@@ -265,7 +532,7 @@ async def websocket_endpoint(
             except asyncio.TimeoutError:
                 # Send heartbeat
                 if (datetime.utcnow() - last_heartbeat).total_seconds() > 30:
-                    await websocket.send_json({
+                    client.offer({
                         "type": "heartbeat",
                         "timestamp": datetime.utcnow().isoformat(),
                     })
@@ -286,40 +553,21 @@ async def websocket_endpoint(
         manager.disconnect(websocket)
 
 
-async def start_periodic_broadcast(metrics_service: MetricsService, interval_seconds: int = 1) -> None:
-    """Start periodic broadcast of metrics to all connected clients."""
-    LOGGER.info(f"Starting periodic WebSocket broadcast (interval: {interval_seconds}s)")
-    
-    broadcast_count = 0
-    
+async def start_periodic_broadcast(metrics_service: MetricsService) -> None:
+    """Run the event-driven broadcaster until cancelled.
+
+    Idle (no bus subscription, no metrics queries) while no client is connected.
+    """
+    LOGGER.info(
+        f"Starting WebSocket broadcaster (coalesce: {broadcaster.coalesce_seconds}s, "
+        f"fallback refresh: {broadcaster.refresh_seconds}s)"
+    )
     while True:
         try:
-            await asyncio.sleep(interval_seconds)
-            
-            if not manager.active_connections:
-                continue
-            
-            broadcast_count += 1
-            
-            # Broadcast pipeline update every second
-            pipeline_metrics = await metrics_service.get_pipeline_metrics()
-            await broadcast_pipeline_update(pipeline_metrics)
-            
-            # Broadcast queue update every second
-            queue_metrics = await metrics_service.get_queue_metrics()
-            await broadcast_queue_update(queue_metrics)
-            
-            # Broadcast hardware update every 5 seconds
-            if broadcast_count % 5 == 0:
-                hardware_metrics = await metrics_service.get_hardware_metrics()
-                await broadcast_hardware_update(hardware_metrics)
-            
-            if broadcast_count % 60 == 0:
-                LOGGER.debug(f"Periodic broadcast active: {len(manager.active_connections)} connections")
-
+            await broadcaster.run(metrics_service)
         except asyncio.CancelledError:
-            LOGGER.info("Periodic broadcast stopped")
+            LOGGER.info("WebSocket broadcaster stopped")
             break
         except Exception as e:
-            LOGGER.error(f"Error in periodic broadcast: {e}", exc_info=True)
-            await asyncio.sleep(interval_seconds)
+            LOGGER.error(f"Error in WebSocket broadcaster: {e}", exc_info=True)
+            await asyncio.sleep(broadcaster.refresh_seconds)
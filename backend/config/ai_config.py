@@ -419,21 +419,34 @@ class AIConfigManager:
             }
         }
 
-# Global AI Configuration
-ai_config = AIConfigManager()
+# Global AI Configuration (hardware detection runs on first access, not at import)
+_ai_config: Optional[AIConfigManager] = None
+
+def get_ai_config_manager() -> AIConfigManager:
+    """Get the shared AIConfigManager, detecting hardware on first call"""
+    global _ai_config
+    if _ai_config is None:
+        _ai_config = AIConfigManager()
+    return _ai_config
+
+def __getattr__(name: str):
+    # Keeps ``from config.ai_config import ai_config`` working without eager detection
+    if name == 'ai_config':
+        return get_ai_config_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Export for easy access
 def get_ai_config() -> ModelConfig:
     """Get current AI configuration"""
-    return ai_config.get_config()
+    return get_ai_config_manager().get_config()
 
 def get_ollama_models() -> Dict[str, str]:
     """Get Ollama model names"""
-    return ai_config.get_ollama_models()
+    return get_ai_config_manager().get_ollama_models()
 
 def get_model_requirements() -> Dict[str, any]:
     """Get model requirements"""
-    return ai_config.get_model_requirements()
+    return get_ai_config_manager().get_model_requirements()
 
 # Model-specific configurations
 OLLAMA_MODELS = {
@@ -63,6 +63,12 @@ class SecurityConfig(BaseSettings):
     API_KEY_ROTATION_DAYS: int = 90
     API_KEY_GRACE_PERIOD_DAYS: int = 7
     API_KEY_VERSION_LIMIT: int = 3
+    # How often buffered API key last_used_at timestamps are written back
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 60
+
+    # Principal / permission / token blacklist cache (0 disables)
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
 
     # Password policy (mirrors env flags)
     PASSWORD_MIN_LENGTH: int = 12
@@ -20,6 +20,7 @@ from backend.core.types import (
     Stage
 )
 from backend.core.retry_engine import ErrorClassifier, RetryPolicyManager, RetryOrchestrator
+from backend.core.stage_profiler import SamplingProfiler, profile_request_for
 
 if TYPE_CHECKING:
     from backend.core.idempotency import IdempotencyChecker
@@ -308,6 +309,40 @@ class BaseProcessor(ABC):
         )
     
     async def safe_process(self, context: ProcessingContext) -> ProcessingResult:
+        """
+        Run :meth:`_safe_process`, under the sampling profiler when profiling
+        is requested for this document and stage (see ``core.stage_profiler``).
+
+        The artifact paths are attached to ``result.metadata['profile']``.
+        """
+        stage = getattr(self, 'stage', None)
+        request = profile_request_for(
+            context.document_id, self.name, getattr(stage, 'value', stage) or ''
+        )
+        if request is None:
+            return await self._safe_process(context)
+
+        profiler = SamplingProfiler(interval=request.interval).start()
+        result = None
+        try:
+            result = await self._safe_process(context)
+        finally:
+            profiler.stop()
+            try:
+                profile = profiler.save(context.document_id, getattr(stage, 'value', None) or self.name)
+            except Exception as profile_error:
+                self.logger.warning(f"Failed to write stage profile: {profile_error}")
+                profile = None
+            if profile:
+                self.logger.info(
+                    f"Profile for {self.name} ({profile['samples']} samples): {profile['speedscope']}"
+                )
+                metadata = result.get('metadata') if isinstance(result, dict) else getattr(result, 'metadata', None)
+                if isinstance(metadata, dict):
+                    metadata['profile'] = profile
+        return result
+
+    async def _safe_process(self, context: ProcessingContext) -> ProcessingResult:
         """
         Safely execute processing with hybrid retry loop.
         
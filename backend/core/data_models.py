@@ -213,6 +213,7 @@ class ErrorCodeModel(BaseModel):
     """Error code model for krai_intelligence.error_codes"""
     id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()))
     document_id: str
+    chunk_id: Optional[str] = None
     error_code: str
     error_description: str = "No description available"
     solution_customer_text: Optional[str] = None    # Level 1: basic user steps
@@ -376,3 +377,11 @@ class TwoStageSearchResponse(BaseModel):
     processing_time_ms: float
     reranking_time_ms: float
     threshold_used: float
+
+class HybridSearchRequest(BaseModel):
+    """Hybrid full-text + vector chunk search request model"""
+    query: str
+    limit: int = Field(default=10, ge=1, le=100)
+    exact_token: Optional[str] = Field(default=None, description="Identifier to match verbatim (default: detected)")
+    candidate_count: int = Field(default=50, ge=1, le=500)
+    rrf_k: int = Field(default=60, ge=1)
@@ -0,0 +1,113 @@
+"""
+Event Bus - in-process publish/subscribe for monitoring state changes
+
+Pipeline stages, the stage tracker and the alert service publish
+:class:`MonitoringEvent` objects here; the WebSocket broadcaster subscribes
+while clients are connected and pushes coalesced updates to them.
+
+Publishing is synchronous and cheap: with no subscribers it returns
+immediately, and subscribers are expected to only record the event (the
+broadcaster hands it to its own loop). Import this module as
+``backend.core.event_bus`` so the API and the pipeline share one bus.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("krai.event_bus")
+
+Subscriber = Callable[["MonitoringEvent"], None]
+
+
+@dataclass(frozen=True)
+class MonitoringEvent:
+    """A monitoring state change.
+
+    Events with the same ``key`` supersede each other, so a subscriber that
+    batches them only needs the latest one; events without a key (alerts) are
+    always delivered.
+    """
+
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[str] = None
+    permission: str = "monitoring:read"
+
+
+class EventBus:
+    """Fan-out of monitoring events to synchronous subscribers."""
+
+    def __init__(self):
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Register ``callback``; returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+        return unsubscribe
+
+    def publish(self, event: MonitoringEvent) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.warning("Monitoring event subscriber failed", exc_info=True)
+
+
+_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    return _bus
+
+
+def publish_event(
+    event_type: str,
+    data: Dict[str, Any],
+    key: Optional[str] = None,
+    permission: str = "monitoring:read",
+) -> None:
+    """Publish a monitoring event on the shared bus (no-op without subscribers)."""
+    if _bus.has_subscribers:
+        _bus.publish(MonitoringEvent(type=event_type, data=data, key=key, permission=permission))
+
+
+def publish_stage_status(
+    document_id: Any,
+    stage_name: str,
+    status: str,
+    error: Optional[str] = None,
+) -> None:
+    """Publish a document stage transition (running / completed / failed / skipped)."""
+    if not _bus.has_subscribers:
+        return
+    if status == "completed":
+        event_type = "stage_completed"
+    elif status == "failed":
+        event_type = "stage_failed"
+    else:
+        event_type = "stage_processing"
+    publish_event(
+        event_type,
+        {
+            "document_id": str(document_id),
+            "stage_name": stage_name,
+            "status": status,
+            "error": error,
+        },
+        key=f"stage:{document_id}:{stage_name}",
+    )
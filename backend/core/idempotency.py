@@ -36,6 +36,8 @@ Example Usage:
 import hashlib
 import json
 import logging
+import re
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from datetime import datetime
 
@@ -89,6 +91,106 @@ def compute_context_hash(context: "ProcessingContext") -> str:
     return hash_value
 
 
+def compute_content_fingerprint(text: str) -> str:
+    """
+    Compute the content fingerprint of a piece of text.
+    
+    Case and whitespace differences are ignored, so re-extracting the same
+    page or chunk yields the same fingerprint. This is the format stored in
+    krai_intelligence.chunks.fingerprint and krai_intelligence.page_fingerprints.
+    
+    Args:
+        text: Page or chunk text
+        
+    Returns:
+        First 32 hex characters of the SHA-256 of the normalized text
+    """
+    normalized = re.sub(r'\s+', ' ', (text or '').lower().strip())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+def compute_page_fingerprints(page_texts: Dict[int, str]) -> Dict[int, str]:
+    """
+    Compute content fingerprints for every page of a document.
+    
+    Args:
+        page_texts: Page text keyed by page number (as in context.page_texts)
+        
+    Returns:
+        Fingerprint per page number
+    """
+    return {int(page): compute_content_fingerprint(text) for page, text in page_texts.items()}
+
+
+@dataclass
+class FingerprintDiff:
+    """
+    Result of comparing a new document version with the stored one.
+    
+    Keys are page numbers (or chunk indexes). A key counts as unchanged when
+    its fingerprint occurs anywhere in the previous version, so pages that
+    only moved (inserted or removed pages before them) are not re-processed.
+    """
+    unchanged: List[Any] = field(default_factory=list)
+    changed: List[Any] = field(default_factory=list)
+    added: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    
+    @property
+    def total(self) -> int:
+        """Number of keys in the new version."""
+        return len(self.unchanged) + len(self.changed) + len(self.added)
+    
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of the new version that can be reused (0.0 - 1.0)."""
+        return len(self.unchanged) / self.total if self.total else 0.0
+    
+    def summary(self) -> Dict[str, Any]:
+        """Counts for logging and stage metadata."""
+        return {
+            'unchanged': len(self.unchanged),
+            'changed': len(self.changed),
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'reuse_ratio': round(self.reuse_ratio, 3),
+        }
+
+
+def diff_fingerprints(previous: Dict[Any, str], current: Dict[Any, str]) -> FingerprintDiff:
+    """
+    Diff two fingerprint maps (e.g. the page fingerprints of two versions).
+    
+    Args:
+        previous: Fingerprints of the stored version
+        current: Fingerprints of the new version
+        
+    Returns:
+        FingerprintDiff with keys sorted ascending
+        
+    Example:
+        ```python
+        diff = diff_fingerprints({1: "a", 2: "b"}, {1: "a", 2: "x", 3: "b"})
+        # unchanged=[1, 3], changed=[2], added=[], removed=[]
+        ```
+    """
+    previous_values = set(previous.values())
+    current_values = set(current.values())
+    diff = FingerprintDiff()
+    for key in sorted(current):
+        if current[key] in previous_values:
+            diff.unchanged.append(key)
+        elif key in previous:
+            diff.changed.append(key)
+        else:
+            diff.added.append(key)
+    diff.removed = sorted(
+        key for key, value in previous.items()
+        if key not in current and value not in current_values
+    )
+    return diff
+
+
 class IdempotencyChecker:
     """
     Service class for managing idempotency in pipeline processing.
@@ -391,3 +493,159 @@ class IdempotencyChecker:
                 exc_info=True
             )
             return False
+
+    async def find_previous_version(self, document_id: str) -> Optional[str]:
+        """
+        Find the most recent earlier version of a document.
+        
+        A document with the same filename that has recorded page
+        fingerprints counts as the previous version (e.g. a revised manual
+        uploaded under the same name).
+        
+        Args:
+            document_id: Unique identifier of the new document
+            
+        Returns:
+            Document ID of the previous version, or None
+            
+        Raises:
+            None - Errors are logged and None is returned
+        """
+        if not document_id:
+            return None
+        
+        query = """
+            SELECT d.id
+            FROM krai_core.documents d
+            JOIN krai_core.documents current_doc ON current_doc.id = $1::uuid
+            WHERE d.filename = current_doc.filename
+              AND d.id <> current_doc.id
+              AND EXISTS (
+                  SELECT 1 FROM krai_intelligence.page_fingerprints pf
+                  WHERE pf.document_id = d.id
+              )
+            ORDER BY d.created_at DESC
+            LIMIT 1
+        """
+        
+        try:
+            result = await self.db_adapter.execute_query(query, [document_id])
+            if result:
+                return str(result[0]['id'])
+            return None
+            
+        except Exception as e:
+            self.logger.error(
+                f"Error looking up previous version of document {document_id}: {e}",
+                exc_info=True
+            )
+            return None
+    
+    async def load_page_fingerprints(self, document_id: str) -> Dict[int, str]:
+        """
+        Load the recorded page fingerprints of a document.
+        
+        Args:
+            document_id: Unique identifier for the document
+            
+        Returns:
+            Fingerprint per page number (empty if none are recorded)
+            
+        Raises:
+            None - Errors are logged and an empty dict is returned
+        """
+        query = """
+            SELECT page_number, fingerprint
+            FROM krai_intelligence.page_fingerprints
+            WHERE document_id = $1::uuid
+        """
+        
+        try:
+            result = await self.db_adapter.execute_query(query, [document_id])
+            return {int(row['page_number']): row['fingerprint'] for row in result or []}
+            
+        except Exception as e:
+            self.logger.error(
+                f"Error loading page fingerprints for document {document_id}: {e}",
+                exc_info=True
+            )
+            return {}
+    
+    async def store_page_fingerprints(
+        self,
+        document_id: str,
+        fingerprints: Dict[int, str]
+    ) -> bool:
+        """
+        Record the page fingerprints of a document (upsert per page).
+        
+        Args:
+            document_id: Unique identifier for the document
+            fingerprints: Fingerprint per page number
+            
+        Returns:
+            True if the fingerprints were stored, False otherwise
+            
+        Raises:
+            None - Errors are logged and False is returned
+        """
+        if not document_id or not fingerprints:
+            return False
+        
+        pages = sorted(fingerprints)
+        query = """
+            INSERT INTO krai_intelligence.page_fingerprints
+                (document_id, page_number, fingerprint)
+            SELECT $1::uuid, page_number, fingerprint
+            FROM unnest($2::int[], $3::text[]) AS p(page_number, fingerprint)
+            ON CONFLICT (document_id, page_number)
+            DO UPDATE SET fingerprint = EXCLUDED.fingerprint, created_at = NOW()
+        """
+        
+        try:
+            await self.db_adapter.execute_query(
+                query, [document_id, pages, [fingerprints[page] for page in pages]]
+            )
+            self.logger.debug(
+                f"Stored {len(pages)} page fingerprints for document {document_id}"
+            )
+            return True
+            
+        except Exception as e:
+            self.logger.error(
+                f"Error storing page fingerprints for document {document_id}: {e}",
+                exc_info=True
+            )
+            return False
+    
+    async def diff_against_previous_version(
+        self,
+        document_id: str,
+        fingerprints: Dict[int, str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record a document's page fingerprints and diff them against its previous version.
+        
+        Args:
+            document_id: Unique identifier for the new document
+            fingerprints: Page fingerprints of the new document
+            
+        Returns:
+            ``FingerprintDiff.summary()`` plus ``previous_document_id``, or
+            None if there is no previous version
+        """
+        previous_id = await self.find_previous_version(document_id)
+        await self.store_page_fingerprints(document_id, fingerprints)
+        if not previous_id:
+            return None
+        
+        previous = await self.load_page_fingerprints(previous_id)
+        diff = diff_fingerprints(previous, fingerprints)
+        summary = diff.summary()
+        summary['previous_document_id'] = previous_id
+        self.logger.info(
+            f"Document {document_id} vs previous version {previous_id}: "
+            f"{summary['unchanged']} pages unchanged, {summary['changed']} changed, "
+            f"{summary['added']} added, {summary['removed']} removed"
+        )
+        return summary
@@ -0,0 +1,343 @@
+"""
+Stage Profiler - on-demand sampling profiles of pipeline stages
+
+When profiling is requested for a document/stage, ``BaseProcessor.safe_process``
+runs the stage under :class:`SamplingProfiler`. A background thread wakes up
+every ``interval`` seconds and records:
+
+- the stage's own asyncio task: the executing stack while it runs, or its
+  chain of suspended coroutines (ending in ``<awaiting>``) while it waits for
+  I/O
+- every other busy thread (``run_in_executor`` / ``to_thread`` workers),
+  prefixed with the thread name; idle pool workers and waits are dropped
+
+The stage pays nothing beyond the sampler thread itself; untargeted stages
+only pay a context-variable lookup and three environment reads (the parsed
+environment request is cached per set of values).
+
+Profiles are written as collapsed stacks (``stage.collapsed.txt``, for
+flamegraph.pl / speedscope) and speedscope JSON (``stage.speedscope.json``)
+under ``<profile dir>/<document_id>/``; the paths are attached to the stage
+result metadata under ``profile``.
+
+Toggles (first match wins):
+    - :func:`profiling` context manager (API parameter / CLI flag)
+    - PIPELINE_PROFILE            - "all" or comma-separated stage/processor names
+    - PIPELINE_PROFILE_DOCUMENTS  - optional comma-separated document ids to limit profiling
+    - PIPELINE_PROFILE_INTERVAL_MS - sampling interval (default: 10)
+    - PIPELINE_PROFILE_DIR        - artifact directory (default: $KRAI_STATE_DIR/profiles)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("krai.stage_profiler")
+
+# (function, file, first line) - one node in a flame graph
+FrameKey = Tuple[str, str, int]
+
+_ALL = "all"
+_AWAITING: FrameKey = ("<awaiting>", "", 0)
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_LEAVES = {
+    ("wait", "threading.py"),
+    ("_wait_for_tstate_lock", "threading.py"),
+    ("select", "selectors.py"),
+    ("get", "queue.py"),
+    ("_worker", "thread.py"),  # concurrent.futures worker blocked on its queue
+}
+
+
+@dataclass(frozen=True)
+class ProfileRequest:
+    """Which stages and documents to profile.
+
+    ``stages`` / ``documents`` of None match everything.
+    """
+
+    stages: Optional[FrozenSet[str]] = None
+    documents: Optional[FrozenSet[str]] = None
+    interval: float = 0.01
+
+    @classmethod
+    def parse(
+        cls,
+        stages: Optional[str],
+        documents: Optional[str] = None,
+        interval_ms: Optional[float] = None,
+    ) -> Optional["ProfileRequest"]:
+        """Build a request from "all"/"1"/"true" or comma-separated names; None if disabled."""
+        spec = (stages or "").strip().lower()
+        if spec in ("", "0", "false", "no", "off"):
+            return None
+        stage_set = None if spec in (_ALL, "1", "true", "yes", "on", "*") else _split(spec)
+        document_set = _split(documents) or None
+        interval = (interval_ms if interval_ms and interval_ms > 0 else 10.0) / 1000.0
+        return cls(stages=stage_set, documents=document_set, interval=interval)
+
+    @classmethod
+    def from_env(cls) -> Optional["ProfileRequest"]:
+        return _request_from_env(
+            os.getenv("PIPELINE_PROFILE"),
+            os.getenv("PIPELINE_PROFILE_DOCUMENTS"),
+            os.getenv("PIPELINE_PROFILE_INTERVAL_MS", "10"),
+        )
+
+    def matches(self, document_id: Any, stage_names: Iterable[str]) -> bool:
+        if self.documents is not None and str(document_id).lower() not in self.documents:
+            return False
+        if self.stages is None:
+            return True
+        return any(name and name.lower() in self.stages for name in stage_names)
+
+
+@lru_cache(maxsize=8)
+def _request_from_env(
+    stages: Optional[str], documents: Optional[str], interval_ms: str
+) -> Optional[ProfileRequest]:
+    """Parsed PIPELINE_PROFILE* values; cached because every safe_process asks."""
+    try:
+        interval = float(interval_ms)
+    except ValueError:
+        interval = 10.0
+    return ProfileRequest.parse(stages, documents, interval)
+
+
+def _split(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(part.strip().lower() for part in (value or "").split(",") if part.strip())
+
+
+PROFILE_REQUEST: contextvars.ContextVar[Optional[ProfileRequest]] = contextvars.ContextVar(
+    "stage_profile_request", default=None
+)
+
+
+@contextmanager
+def profiling(
+    stages: Optional[str] = _ALL, documents: Optional[str] = None, interval_ms: Optional[float] = None
+) -> Iterator[None]:
+    """Profile matching stages run inside this block (and tasks started from it)."""
+    token = PROFILE_REQUEST.set(ProfileRequest.parse(stages, documents, interval_ms))
+    try:
+        yield
+    finally:
+        PROFILE_REQUEST.reset(token)
+
+
+def profile_request_for(document_id: Any, *stage_names: str) -> Optional[ProfileRequest]:
+    """The active request if it covers this document and any of ``stage_names``."""
+    request = PROFILE_REQUEST.get() or ProfileRequest.from_env()
+    if request is not None and request.matches(document_id, stage_names):
+        return request
+    return None
+
+
+def profile_directory() -> Path:
+    configured = os.getenv("PIPELINE_PROFILE_DIR")
+    if configured:
+        return Path(configured)
+    return Path(os.getenv("KRAI_STATE_DIR", Path.cwd() / "state")) / "profiles"
+
+
+class SamplingProfiler:
+    """Wall-clock sampler for one asyncio task plus busy worker threads.
+
+    Stacks of the task are cut at the function that called :meth:`start`, so
+    every sample is rooted at the profiled stage rather than the event loop.
+
+    Args:
+        interval: seconds between samples
+        task: task to follow through its awaits (default: the current task)
+    """
+
+    def __init__(self, interval: float = 0.01, task: Optional[asyncio.Task] = None):
+        self.interval = max(0.001, interval)
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._task = task
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._root_code = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._task = self._task or asyncio.current_task()
+        except RuntimeError:
+            self._loop = None
+        self._loop_thread_id = threading.get_ident()
+        self._root_code = sys._getframe(1).f_code
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stage-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    # -------------------------------------------------------------- sampling
+
+    def _run(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample(sampler_id)
+            except Exception:  # pragma: no cover - never let the sampler kill the stage
+                logger.debug("Profiler sample failed", exc_info=True)
+
+    def _sample(self, sampler_id: int) -> None:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.sample_count += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_id:
+                continue
+            if thread_id == self._loop_thread_id:
+                stack = self._task_stack(frame)
+            else:
+                stack = _frame_stack(frame)
+                if not stack or (stack[-1][0], os.path.basename(stack[-1][1])) in _IDLE_LEAVES:
+                    continue
+                stack = [(f"thread:{thread_names.get(thread_id, thread_id)}", "", 0)] + stack
+            if stack:
+                self.samples[tuple(stack)] += 1
+
+    def _task_stack(self, loop_frame) -> List[FrameKey]:
+        if self._task is None or self._task.done() or asyncio.current_task(self._loop) is self._task:
+            stack = _frame_stack(loop_frame)
+        else:
+            stack = _coroutine_stack(self._task.get_coro()) + [_AWAITING]
+        return self._from_root(stack)
+
+    def _from_root(self, stack: List[FrameKey]) -> List[FrameKey]:
+        code = self._root_code
+        if code is None:
+            return stack
+        root = (code.co_name, code.co_filename, code.co_firstlineno)
+        try:
+            return stack[stack.index(root):]
+        except ValueError:
+            return stack
+
+    # -------------------------------------------------------------- export
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: ``root;child;leaf count`` per line."""
+        lines = [
+            f"{';'.join(_frame_label(key) for key in stack)} {count}"
+            for stack, count in self.samples.most_common()
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Sampled profile in the speedscope file format (weights in seconds)."""
+        frame_index: Dict[FrameKey, int] = {}
+        frames: List[Dict[str, Any]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.samples.most_common():
+            indices = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    entry: Dict[str, Any] = {"name": key[0]}
+                    if key[1]:
+                        entry.update(file=key[1], line=key[2])
+                    frames.append(entry)
+                indices.append(frame_index[key])
+            samples.append(indices)
+            weights.append(round(count * self.interval, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "krai-stage-profiler",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def save(self, document_id: Any, stage: str, directory: Optional[Path] = None) -> Dict[str, Any]:
+        """Write both artifacts and return the metadata that links them to the stage."""
+        target = (directory or profile_directory()) / str(document_id)
+        target.mkdir(parents=True, exist_ok=True)
+        stem = f"{stage}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+        collapsed_path = target / f"{stem}.collapsed.txt"
+        speedscope_path = target / f"{stem}.speedscope.json"
+        collapsed_path.write_text(self.collapsed(), encoding="utf-8")
+        speedscope_path.write_text(
+            json.dumps(self.speedscope(f"{stage} {document_id}")), encoding="utf-8"
+        )
+        return {
+            "collapsed": str(collapsed_path),
+            "speedscope": str(speedscope_path),
+            "samples": self.sample_count,
+            "interval_ms": round(self.interval * 1000, 3),
+            "duration_seconds": round(self.duration, 3),
+        }
+
+
+def _frame_stack(frame) -> List[FrameKey]:
+    """Root-to-leaf frame keys of a thread stack."""
+    stack: List[FrameKey] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_stack(coro) -> List[FrameKey]:
+    """Outermost-to-innermost frames of a suspended coroutine chain."""
+    stack: List[FrameKey] = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+    return stack
+
+
+def _frame_label(key: FrameKey) -> str:
+    name, filename, line = key
+    if not filename:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
@@ -19,6 +19,14 @@ from models.validators import (
 )
 
 
+class TotalMode(str, Enum):
+    """How list endpoints compute the ``total`` field."""
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
 class PaginationParams(BaseModel):
     """Standard pagination parameters."""
 
@@ -29,12 +37,21 @@ class PaginationParams(BaseModel):
         le=100,
         description="Number of items per page (max 100)",
     )
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque keyset cursor (next_cursor of the previous page); takes precedence over page",
+    )
+    total_mode: TotalMode = Field(
+        TotalMode.EXACT,
+        description="Total count strategy: exact (COUNT), estimated (planner statistics) or none",
+    )
 
     class Config:
         json_schema_extra = {
             "example": {
                 "page": 1,
                 "page_size": 25,
+                "total_mode": "estimated",
             }
         }
 
@@ -391,10 +408,12 @@ class DocumentListResponse(BaseModel):
     """Paginated document list response."""
 
     documents: List[DocumentResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
 
     class Config:
         json_schema_extra = {
@@ -415,6 +434,9 @@ class DocumentStatsResponse(BaseModel):
     by_type: Dict[str, int]
     by_status: Dict[str, int]
     by_manufacturer: Dict[str, int]
+    stats_updated_at: Optional[datetime] = Field(
+        None, description="When the underlying counters last changed"
+    )
 
     class Config:
         json_schema_extra = {
@@ -323,12 +323,20 @@ class ErrorCodeListResponse(BaseModel):
     """Paginated error code listing."""
 
     error_codes: List[ErrorCodeResponse] = Field(..., description="List of error codes.")
-    total: int = Field(..., ge=0, description="Total number of matching records.")
+    total: Optional[int] = Field(
+        ..., ge=0, description="Total number of matching records (None when total_mode=none)."
+    )
     page: int = Field(..., ge=1, description="Current page number.")
     page_size: int = Field(..., ge=1, description="Number of records per page.")
-    total_pages: int = Field(
+    total_pages: Optional[int] = Field(
         ..., ge=1, description="Total number of pages based on the current page size."
     )
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque keyset cursor for the next page, None on the last page."
+    )
+    total_estimated: bool = Field(
+        False, description="True when total comes from planner statistics."
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
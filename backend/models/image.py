@@ -218,10 +218,12 @@ class ImageListResponse(BaseModel):
     """Paginated image listing."""
 
     images: List[ImageResponse] = Field(...)
-    total: int = Field(..., ge=0)
+    total: Optional[int] = Field(..., ge=0)
     page: int = Field(..., ge=1)
     page_size: int = Field(..., ge=1)
-    total_pages: int = Field(..., ge=1)
+    total_pages: Optional[int] = Field(..., ge=1)
+    next_cursor: Optional[str] = Field(None)
+    total_estimated: bool = Field(False)
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -491,6 +491,7 @@ class WebSocketEvent(str, Enum):
     ALERT_TRIGGERED = "alert_triggered"
     STAGE_COMPLETED = "stage_completed"
     STAGE_FAILED = "stage_failed"
+    STAGE_PROCESSING = "stage_processing"
     PROCESSOR_STATE_CHANGE = "processor_state_change"
 
 
@@ -454,10 +454,12 @@ class ProductListResponse(BaseModel):
     """Paginated list response for products."""
 
     products: List[ProductResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
 
     class Config:
         json_schema_extra = {
@@ -479,6 +481,9 @@ class ProductStatsResponse(BaseModel):
     by_manufacturer: Dict[str, int]
     active_products: int
     discontinued_products: int
+    stats_updated_at: Optional[datetime] = Field(
+        None, description="When the underlying counters last changed"
+    )
 
     class Config:
         json_schema_extra = {
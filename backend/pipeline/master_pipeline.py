@@ -9,6 +9,7 @@ Ein einziges Script für alle Pipeline-Funktionen:
 - Status Management
 """
 
+import argparse
 import asyncio
 import os
 import sys
@@ -31,6 +32,8 @@ from backend.pipeline.service_locator import ServiceLocator
 
 # Standard imports
 from backend.core.base_processor import ProcessingContext
+from backend.core.stage_profiler import PROFILE_REQUEST, ProfileRequest
+from backend.core.event_bus import publish_stage_status
 
 class KRMasterPipeline:
     """
@@ -299,6 +302,16 @@ class KRMasterPipeline:
             config={'enable_brightcove_enrichment': True},
         )
         
+        if getattr(self.pipeline_config, 'streaming_pages', False):
+            # Text, chunking and embedding run per page window inside the text stage
+            self.processors['text'].enable_streaming(
+                self.pipeline_config.stream_window_pages,
+                embedding_processor if self.pipeline_config.enable_embeddings else None,
+            )
+            self.logger.info(
+                "Streaming page mode enabled (window=%s pages)", self.pipeline_config.stream_window_pages
+            )
+        
         # Wire performance collector to all processors
         for processor_name, processor in self.processors.items():
             if processor and hasattr(processor, 'set_performance_collector'):
@@ -306,6 +319,11 @@ class KRMasterPipeline:
         
         self.logger.info("All services initialized via ServiceLocator!")
 
+    async def close(self):
+        """Write buffered pipeline-error rows before the event loop shuts down."""
+        from backend.services.error_logging_service import close_error_loggers
+        await close_error_loggers()
+
     async def _get_document_row_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
         """Lookup document row by filename (used only to resume processing for local files)."""
         try:
@@ -596,10 +614,11 @@ class KRMasterPipeline:
                         if series_count > 0:
                             stage_status['series_detection'] = True
                         
-                        # Check embeddings - krai_intelligence.chunks with embedding IS NOT NULL
+                        # Check embeddings - embedded chunks or near-duplicate references to one
                         current_check = "embedding:krai_intelligence.chunks"
                         embeddings_count = await conn.fetchval(
-                            "SELECT COUNT(*) FROM krai_intelligence.chunks WHERE document_id = $1 AND embedding IS NOT NULL",
+                            "SELECT COUNT(*) FROM krai_intelligence.chunks WHERE document_id = $1 "
+                            "AND (embedding IS NOT NULL OR duplicate_of IS NOT NULL)",
                             document_id
                         )
                         if embeddings_count > 0:
@@ -1033,6 +1052,14 @@ class KRMasterPipeline:
             processor = self.processors['text']
             result2 = await processor.safe_process(context) if hasattr(processor, 'safe_process') else await processor.process(context)
             chunks_count = result2.data.get('chunks_created', 0)
+            version_diff = result2.data.get('version_diff') if result2.success else None
+            if version_diff:
+                self.logger.info(
+                    "    → %s pages unchanged, %s changed, %s added since previous version (unchanged chunks reuse stored embeddings)",
+                    version_diff['unchanged'],
+                    version_diff['changed'],
+                    version_diff['added'],
+                )
             
             # Stage 2b: Table Processor (NEW! - Multi-modal support)
             current_stage = "table"
@@ -1184,6 +1211,7 @@ class KRMasterPipeline:
                 'videos_enriched': enriched_count,
                 'video_enrichment_failed': failed_video_enrichment_count,
                 'video_enrichment_skipped': skipped_video_enrichment_count,
+                'version_diff': version_diff,
                 'smart_processing': False
             }
             
@@ -1925,6 +1953,7 @@ class KRMasterPipeline:
                 """,
                 [document_id, stage_number, stage_name, status, error_message, json.dumps(safe_metadata)],
             )
+            publish_stage_status(document_id, stage_name, status, error_message)
         except Exception as tracking_error:
             self.logger.warning(
                 "Failed to persist stage_tracking row (document=%s, stage=%s, status=%s): %s",
@@ -2309,12 +2338,16 @@ class KRMasterPipeline:
                         )
             
             success = result.success if hasattr(result, 'success') else True
+            stage_metadata: Dict[str, Any] = {'processor': processor_key}
+            profile = (getattr(result, 'metadata', None) or {}).get('profile')
+            if profile:
+                stage_metadata['profile'] = profile
             if success:
                 await self.track_stage_status(
                     document_id=document_id,
                     stage=stage,
                     status='completed',
-                    metadata={'processor': processor_key},
+                    metadata=stage_metadata,
                 )
 
                 stage_value = stage.value if hasattr(stage, "value") else str(stage)
@@ -2449,8 +2482,10 @@ class KRMasterPipeline:
                 'error': str(e)
             }
 
-async def main():
+async def main(profile: Optional[str] = None, profile_documents: Optional[str] = None):
     """Main function with menu system"""
+    if profile:
+        PROFILE_REQUEST.set(ProfileRequest.parse(profile, profile_documents))
     pipeline = KRMasterPipeline()
     await pipeline.initialize_services()
     logger = pipeline.logger
@@ -2750,5 +2785,21 @@ async def main():
         else:
             logger.warning("Ungültige Option. Bitte 1-8 oder x/q wählen.")
 
+    await pipeline.close()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="KR-AI-Engine Master Pipeline")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="all",
+        metavar="STAGES",
+        help="Record sampling profiles for all stages or a comma-separated list of stages",
+    )
+    parser.add_argument(
+        "--profile-documents",
+        metavar="IDS",
+        help="Only profile these comma-separated document ids",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(profile=args.profile, profile_documents=args.profile_documents))
@@ -1,14 +1,17 @@
 """Prometheus metrics instrumentation for KR pipeline."""
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import re
 import statistics
 import threading
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from contextlib import ContextDecorator
-from typing import Deque, DefaultDict, Dict, Optional, Tuple
+from typing import Any, Deque, DefaultDict, Dict, Optional, Tuple
+from urllib.parse import urlparse
 
 try:
     from prometheus_client import CollectorRegistry, Counter, Histogram, push_to_gateway, start_http_server
@@ -67,6 +70,162 @@ class StageTimer(ContextDecorator):
             self.stop(success=exc is None, error_label=str(exc) if exc else None)
 
 
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\$\d+|%s|(?<![\w.])\d+(?:\.\d+)?\b")
+_SQL_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_SQL_WS_RE = re.compile(r"\s+")
+_SQL_TABLE_RE = re.compile(r"\b(?:from|into|update|join)\s+([a-z_][\w.]*)")
+
+# Fingerprints are memoised per query text; the label set is capped so ad-hoc
+# SQL cannot blow up the series count
+_FINGERPRINT_CACHE_SIZE = 2048
+_MAX_STATEMENT_LABELS = int(os.getenv("PROMETHEUS_MAX_STATEMENT_LABELS", "500"))
+
+
+def statement_fingerprint(query: str) -> Tuple[str, str]:
+    """Return ``(operation, fingerprint)`` for a SQL statement.
+
+    Literals, numbers and placeholders are replaced by ``?`` and IN lists are
+    collapsed, so the same statement with different parameters shares one
+    label. The fingerprint reads ``<operation> <first table>#<hash>``.
+    """
+    cached = _fingerprints.get(query)
+    if cached is not None:
+        return cached
+
+    normalized = _SQL_COMMENT_RE.sub(" ", query).lower()
+    normalized = _SQL_LITERAL_RE.sub("?", normalized)
+    normalized = _SQL_LIST_RE.sub("?", normalized)
+    normalized = _SQL_WS_RE.sub(" ", normalized).strip()
+
+    operation = normalized.split(" ", 1)[0] if normalized else "unknown"
+    table = _SQL_TABLE_RE.search(normalized)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:10]
+    result = (operation, f"{operation} {table.group(1) if table else '-'}#{digest}")
+
+    with _fingerprint_lock:
+        _fingerprints[query] = result
+        if len(_fingerprints) > _FINGERPRINT_CACHE_SIZE:
+            _fingerprints.popitem(last=False)
+    return result
+
+
+_fingerprints: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_fingerprint_lock = threading.Lock()
+
+
+class QueryTimer:
+    """Times one database round trip: pool acquire wait, execution and rows.
+
+    Call :meth:`acquired` once the connection is checked out and set ``rows``
+    before leaving the block::
+
+        with metrics.query_timer(sql) as timer:
+            async with pool.acquire() as conn:
+                timer.acquired()
+                rows = await conn.fetch(sql)
+                timer.rows = len(rows)
+    """
+
+    __slots__ = ("_metrics", "_query", "_start", "_acquired", "rows")
+
+    def __init__(self, metrics: "PipelineMetrics", query: str) -> None:
+        self._metrics = metrics
+        self._query = query
+        self._start = 0.0
+        self._acquired: Optional[float] = None
+        self.rows = 0
+
+    def __enter__(self) -> "QueryTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def acquired(self) -> None:
+        self._acquired = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, exc_tb) -> None:
+        end = time.perf_counter()
+        acquired = self._acquired if self._acquired is not None else end
+        self._metrics.record_db_query(
+            self._query,
+            duration=end - acquired,
+            acquire_wait=acquired - self._start,
+            rows=self.rows,
+            error=exc_type.__name__ if exc_type else None,
+        )
+
+
+class ModelCallTimer:
+    """Times one Ollama request for a model.
+
+    Exceptions raised inside the block count as errors. Call :meth:`observe`
+    with the HTTP response (``requests`` or ``httpx``) to record the endpoint,
+    payload sizes and non-2xx status codes.
+    """
+
+    __slots__ = ("_metrics", "model", "endpoint", "bytes_sent", "bytes_received", "error", "_start")
+
+    def __init__(self, metrics: "PipelineMetrics", model: str) -> None:
+        self._metrics = metrics
+        self.model = model
+        self.endpoint = "unknown"
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error: Optional[str] = None
+        self._start = 0.0
+
+    def __enter__(self) -> "ModelCallTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def observe(self, response: Any) -> None:
+        try:
+            self.endpoint = urlparse(str(response.url)).path or "unknown"
+            request = getattr(response, "request", None)
+            body = getattr(request, "body", None)  # requests
+            if body is None:
+                body = getattr(request, "content", None)  # httpx
+            self.bytes_sent = len(body or b"")
+            self.bytes_received = len(response.content or b"")
+            if response.status_code >= 400:
+                self.error = f"status_{response.status_code}"
+        except Exception:  # pragma: no cover - instrumentation must not break the call
+            pass
+
+    def __exit__(self, exc_type, exc, exc_tb) -> None:
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self._metrics.record_model_call(
+            self.model,
+            self.endpoint,
+            duration=time.perf_counter() - self._start,
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+            error=self.error,
+        )
+
+
+class _NullTimer:
+    """Shared stand-in for QueryTimer/ModelCallTimer when metrics are disabled."""
+
+    __slots__ = ("rows", "endpoint", "bytes_sent", "bytes_received", "error")
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, exc_tb) -> None:
+        return None
+
+    def acquired(self) -> None:
+        return None
+
+    def observe(self, response: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
 class PipelineMetrics:
     """Central metrics facade for pipeline and processor instrumentation."""
 
@@ -82,6 +241,9 @@ class PipelineMetrics:
         30.0,
         60.0,
     )
+    _DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    _ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+    _MODEL_BUCKETS = _HISTOGRAM_BUCKETS + (120.0, 300.0)
 
     def __init__(self) -> None:
         self.enabled = os.getenv("ENABLE_PROMETHEUS_METRICS", "1") != "0"
@@ -125,12 +287,94 @@ class PipelineMetrics:
                 ("model", "error"),
                 registry=self.registry,
             )
+            self.model_cache_counter = Counter(
+                "krai_model_cache_requests_total",
+                "Model result cache lookups",
+                ("namespace", "result"),
+                registry=self.registry,
+            )
+            self.db_query_histogram = Histogram(
+                "krai_db_query_duration_seconds",
+                "Database statement execution time (excluding pool wait)",
+                ("operation", "statement"),
+                buckets=self._DB_BUCKETS,
+                registry=self.registry,
+            )
+            self.db_pool_wait_histogram = Histogram(
+                "krai_db_pool_acquire_seconds",
+                "Time spent waiting for a pooled database connection",
+                buckets=self._DB_BUCKETS,
+                registry=self.registry,
+            )
+            self.db_rows_histogram = Histogram(
+                "krai_db_rows_returned",
+                "Rows returned (or affected, for mutations) per statement",
+                ("operation", "statement"),
+                buckets=self._ROW_BUCKETS,
+                registry=self.registry,
+            )
+            self.db_error_counter = Counter(
+                "krai_db_query_errors_total",
+                "Failed database statements",
+                ("operation", "statement", "error"),
+                registry=self.registry,
+            )
+            self.model_call_histogram = Histogram(
+                "krai_ollama_request_duration_seconds",
+                "Ollama request latency",
+                ("model", "endpoint"),
+                buckets=self._MODEL_BUCKETS,
+                registry=self.registry,
+            )
+            self.model_bytes_counter = Counter(
+                "krai_ollama_bytes_total",
+                "Bytes exchanged with Ollama",
+                ("model", "direction"),
+                registry=self.registry,
+            )
+            self.model_error_counter = Counter(
+                "krai_ollama_errors_total",
+                "Failed Ollama requests",
+                ("model", "error"),
+                registry=self.registry,
+            )
+            self.storage_histogram = Histogram(
+                "krai_object_storage_duration_seconds",
+                "Object storage call latency",
+                ("bucket", "operation"),
+                buckets=self._DB_BUCKETS + (10.0, 30.0),
+                registry=self.registry,
+            )
+            self.storage_bytes_counter = Counter(
+                "krai_object_storage_bytes_total",
+                "Object payload bytes uploaded or downloaded",
+                ("bucket", "operation"),
+                registry=self.registry,
+            )
+            self.storage_error_counter = Counter(
+                "krai_object_storage_errors_total",
+                "Failed object storage calls",
+                ("bucket", "operation", "error"),
+                registry=self.registry,
+            )
         else:  # Graceful fallbacks when metrics disabled
             self.stage_success_counter = None
             self.stage_failure_counter = None
             self.stage_duration_histogram = None
             self.vision_success_counter = None
             self.vision_failure_counter = None
+            self.model_cache_counter = None
+            self.db_query_histogram = None
+            self.db_pool_wait_histogram = None
+            self.db_rows_histogram = None
+            self.db_error_counter = None
+            self.model_call_histogram = None
+            self.model_bytes_counter = None
+            self.model_error_counter = None
+            self.storage_histogram = None
+            self.storage_bytes_counter = None
+            self.storage_error_counter = None
+        self._statement_labels: set = set()
 
         self.push_gateway_url = os.getenv("PROMETHEUS_PUSHGATEWAY_URL")
         self.push_job = os.getenv("PROMETHEUS_PUSH_JOB", "krai_pipeline")
@@ -245,5 +489,85 @@ class PipelineMetrics:
                     error=error_label or "unknown",
                 ).inc()
 
+    def record_model_cache(self, namespace: str, hit: bool) -> None:
+        if self.enabled and self.model_cache_counter is not None:
+            self.model_cache_counter.labels(
+                namespace=namespace or "default",
+                result="hit" if hit else "miss",
+            ).inc()
+
+    # ------------------------------------------------------------- hot paths
+
+    def query_timer(self, query: str) -> QueryTimer:
+        if not self.enabled:
+            return _NULL_TIMER  # type: ignore[return-value]
+        return QueryTimer(self, query)
+
+    def model_call_timer(self, model: str) -> ModelCallTimer:
+        if not self.enabled:
+            return _NULL_TIMER  # type: ignore[return-value]
+        return ModelCallTimer(self, model)
+
+    def record_db_query(
+        self,
+        query: str,
+        duration: float,
+        acquire_wait: float = 0.0,
+        rows: int = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        if not self.enabled or self.db_query_histogram is None:
+            return
+        operation, statement = statement_fingerprint(query)
+        if statement not in self._statement_labels:
+            if len(self._statement_labels) >= _MAX_STATEMENT_LABELS:
+                statement = "other"
+            else:
+                self._statement_labels.add(statement)
+
+        self.db_pool_wait_histogram.observe(max(0.0, acquire_wait))
+        if error:
+            self.db_error_counter.labels(operation=operation, statement=statement, error=error).inc()
+            return
+        self.db_query_histogram.labels(operation=operation, statement=statement).observe(max(0.0, duration))
+        self.db_rows_histogram.labels(operation=operation, statement=statement).observe(rows)
+
+    def record_model_call(
+        self,
+        model: Optional[str],
+        endpoint: str,
+        duration: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        if not self.enabled or self.model_call_histogram is None:
+            return
+        model_label = model or "unknown"
+        self.model_call_histogram.labels(model=model_label, endpoint=endpoint or "unknown").observe(max(0.0, duration))
+        if bytes_sent:
+            self.model_bytes_counter.labels(model=model_label, direction="sent").inc(bytes_sent)
+        if bytes_received:
+            self.model_bytes_counter.labels(model=model_label, direction="received").inc(bytes_received)
+        if error:
+            self.model_error_counter.labels(model=model_label, error=error).inc()
+
+    def record_storage_call(
+        self,
+        bucket: Optional[str],
+        operation: str,
+        duration: float,
+        size: int = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        if not self.enabled or self.storage_histogram is None:
+            return
+        bucket_label = bucket or "none"
+        self.storage_histogram.labels(bucket=bucket_label, operation=operation).observe(max(0.0, duration))
+        if size:
+            self.storage_bytes_counter.labels(bucket=bucket_label, operation=operation).inc(size)
+        if error:
+            self.storage_error_counter.labels(bucket=bucket_label, operation=operation, error=error).inc()
+
 
 metrics = PipelineMetrics()
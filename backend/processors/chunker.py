@@ -8,7 +8,7 @@ Respects paragraph boundaries and error code sections.
 import re
 import hashlib
 import os
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from uuid import UUID
 
 from .logger import get_logger
@@ -17,6 +17,11 @@ from .models import TextChunk
 
 logger = get_logger()
 
+# Every match of the structure patterns (chapters, numbered sections, error
+# code sections) starts inside one page and contains one of these, so pages
+# without a hit cannot contribute to _detect_document_structure()
+STRUCTURE_HINT_PATTERN = re.compile(r'chapter|error\s+code|\d\.\d|--- PAGE', re.IGNORECASE)
+
 
 class SmartChunker:
     """Intelligent text chunking with context preservation"""
@@ -69,40 +74,23 @@ class SmartChunker:
         Returns:
             List of TextChunk objects
         """
-        all_chunks = []
-        chunk_index = 0
-        
         # Detect document structure if hierarchical chunking is enabled
         structure = None
         if self.enable_hierarchical_chunking:
             structure = self._detect_document_structure(page_texts)
             self.logger.info(f"Hierarchical structure: {len(structure.get('sections', []))} sections, {len(structure.get('error_code_sections', []))} error code sections")
         
-        # Process pages in order
+        # Process pages in order (chunks are linked as they are produced)
         sorted_pages = sorted(page_texts.keys())
-        
-        for page_num in sorted_pages:
-            text = page_texts[page_num]
-            
-            if not text or len(text.strip()) < self.min_chunk_size:
-                continue
-            
-            # Chunk this page with structure information
-            page_chunks = self._chunk_text(
-                text=text,
-                page_start=page_num,
-                page_end=page_num,
+        all_chunks = list(
+            self.iter_chunks(
+                ((page_num, page_texts[page_num]) for page_num in sorted_pages),
                 document_id=document_id,
-                start_index=chunk_index,
                 structure=structure
             )
-            
-            all_chunks.extend(page_chunks)
-            chunk_index += len(page_chunks)
+        )
         
-        # Link chunks if enabled
         if self.link_chunks and all_chunks:
-            all_chunks = self._link_chunks(all_chunks)
             self.logger.info(f"Linked {len(all_chunks)} chunks with previous/next references")
         
         # Summary statistics
@@ -125,6 +113,79 @@ class SmartChunker:
         
         return all_chunks
     
+    def iter_chunks(
+        self,
+        pages: Iterable[Tuple[int, str]],
+        document_id: UUID,
+        structure: Dict[str, Any] = None
+    ) -> Iterator[TextChunk]:
+        """
+        Chunk pages lazily, in page order
+        
+        Produces the same chunks as chunk_document() for the same pages and
+        structure. With link_chunks enabled each chunk is held back until the
+        next one exists, so yielded chunks already carry their final
+        previous/next references.
+        
+        Args:
+            pages: Iterable of (page_number, text), sorted by page number
+            document_id: Document UUID
+            structure: Document structure (see detect_structure_streaming())
+            
+        Yields:
+            TextChunk objects with consecutive chunk_index values
+        """
+        chunk_index = 0
+        pending = None
+        
+        for page_num, text in pages:
+            if not text or len(text.strip()) < self.min_chunk_size:
+                continue
+            
+            page_chunks = self._chunk_text(
+                text=text,
+                page_start=page_num,
+                page_end=page_num,
+                document_id=document_id,
+                start_index=chunk_index,
+                structure=structure
+            )
+            chunk_index += len(page_chunks)
+            
+            for chunk in page_chunks:
+                if not self.link_chunks:
+                    yield chunk
+                    continue
+                if pending is not None:
+                    chunk.metadata['previous_chunk_id'] = str(pending.chunk_id)
+                    pending.metadata['next_chunk_id'] = str(chunk.chunk_id)
+                    yield pending
+                pending = chunk
+        
+        if pending is not None:
+            yield pending
+    
+    def detect_structure_streaming(self, pages: Iterable[Tuple[int, str]]) -> Dict[str, Any]:
+        """
+        Detect document structure from a page stream without keeping the pages
+        
+        Only pages that can contain a chapter, section or error code heading
+        keep their text; every other page is kept as an empty placeholder so
+        page positions stay the same. The result equals
+        detect_document_structure() over the full page dict.
+        
+        Args:
+            pages: Iterable of (page_number, text), sorted by page number
+            
+        Returns:
+            Dictionary with sections and error_code_sections
+        """
+        outline = {
+            page_num: text if STRUCTURE_HINT_PATTERN.search(text or '') else ''
+            for page_num, text in pages
+        }
+        return self._detect_document_structure(outline)
+    
     def _chunk_text(
         self,
         text: str,
@@ -782,24 +843,6 @@ class SmartChunker:
             hierarchy_info['section_hierarchy'] = error_code_section['hierarchy']
         
         return hierarchy_info
-    
-    def _link_chunks(self, chunks: List[TextChunk]) -> List[TextChunk]:
-        """
-        Link chunks with previous/next references
-        
-        Args:
-            chunks: List of chunks
-            
-        Returns:
-            List of linked chunks
-        """
-        for i, chunk in enumerate(chunks):
-            if i > 0:
-                chunk.metadata['previous_chunk_id'] = str(chunks[i-1].chunk_id)
-            if i < len(chunks) - 1:
-                chunk.metadata['next_chunk_id'] = str(chunks[i+1].chunk_id)
-        
-        return chunks
 
 
 # Convenience function
@@ -38,7 +38,10 @@ from datetime import datetime, timezone
 
 from backend.core.base_processor import BaseProcessor, Stage
 from .stage_tracker import StageTracker
+from .near_duplicate_index import NearDuplicateIndex
 from backend.pipeline.metrics import metrics
+from backend.services.db_pool import embedding_storage_type
+from backend.services.ollama_scheduler import get_ollama_scheduler
 from backend.processors.logger import text_stats
 
 # Import from refactored modules
@@ -105,6 +108,11 @@ class EmbeddingProcessor(BaseProcessor):
         self.batch_size = max(self.min_batch_size, min(self.max_batch_size, batch_size))
         self.embedding_dimension = embedding_dimension
 
+        # Reuse stored embeddings of chunks with identical content (revised manuals, re-runs)
+        self.reuse_by_fingerprint = os.getenv("EMBEDDING_REUSE_BY_FINGERPRINT", "true").lower() == "true"
+        # Cross-document near-duplicates are stored as references to one embedded chunk
+        self.near_duplicate_index = NearDuplicateIndex(database_adapter) if database_adapter else None
+
         # Unified multi-modal embeddings support
 
         # Phase 5: Context embedding configuration
@@ -407,8 +415,9 @@ class EmbeddingProcessor(BaseProcessor):
         }
 
     @staticmethod
-    def _vector_literal(values: List[float]) -> str:
-        return "[" + ",".join(f"{v:.8f}" for v in values) + "]"
+    def _vector_param(values: List[float]) -> List[float]:
+        # Bound as a float list; the shared pool's pgvector codec encodes it in binary
+        return [float(v) for v in values]
 
     async def process(self, context) -> Dict[str, Any]:
         """Async pipeline entrypoint wrapping `process_document`."""
@@ -427,31 +436,16 @@ class EmbeddingProcessor(BaseProcessor):
                     rows = await self.database_adapter.execute_query(
                         """
                         SELECT id AS chunk_id, text_chunk AS text, chunk_index, page_start,
-                               page_end, metadata
+                               page_end, fingerprint, metadata
                         FROM krai_intelligence.chunks
                         WHERE document_id = $1::uuid
                           AND embedding IS NULL
+                          AND duplicate_of IS NULL
                         ORDER BY chunk_index ASC
                         """,
                         [str(context.document_id)],
                     )
                     chunks = rows or []
-                    if chunks:
-                        self.logger.info(
-                            "Loaded %d un-embedded chunks from DB for document %s",
-                            len(chunks),
-                            context.document_id,
-                        )
-                    else:
-                        self.logger.info(
-                            "All chunks already embedded for document %s — nothing to do",
-                            context.document_id,
-                        )
-                        return {
-                            "success": True,
-                            "embeddings_created": 0,
-                            "message": "All chunks already embedded",
-                        }
                 except Exception as exc:
                     self.logger.error("Failed to load chunks from DB: %s", exc)
                     return {
@@ -459,6 +453,26 @@ class EmbeddingProcessor(BaseProcessor):
                         "error": f"No chunks in context and DB fetch failed: {exc}",
                         "embeddings_created": 0,
                     }
+                if not chunks:
+                    # Streaming text mode embeds every chunk itself; media context
+                    # embeddings (images, tables, videos, links) are still due here
+                    self.logger.info(
+                        "All chunks already embedded for document %s — generating context embeddings only",
+                        context.document_id,
+                    )
+                    return {
+                        "success": True,
+                        "embeddings_created": 0,
+                        "context_embeddings_created": await self._generate_context_embeddings_only(
+                            context.document_id
+                        ),
+                        "message": "All chunks already embedded",
+                    }
+                self.logger.info(
+                    "Loaded %d un-embedded chunks from DB for document %s",
+                    len(chunks),
+                    context.document_id,
+                )
             else:
                 return {
                     "success": False,
@@ -563,6 +577,8 @@ class EmbeddingProcessor(BaseProcessor):
                 adapter.info("Generating embeddings for %d chunks...", len(chunks))
                 start_time = time.time()
                 total_embedded = 0
+                total_reused = 0
+                total_referenced = 0
                 failed_chunks = []
 
                 total_chunks = len(chunks)
@@ -623,6 +639,8 @@ class EmbeddingProcessor(BaseProcessor):
                         self._on_batch_success()
 
                     total_embedded += batch_result["success_count"]
+                    total_reused += batch_result.get("reused_count", 0)
+                    total_referenced += batch_result.get("referenced_count", 0)
                     failed_chunks.extend(batch_result["failed_chunks"])
                     processed_count += len(batch)
                     if (processed_count % progress_batch_size == 0) or (processed_count == total_chunks):
@@ -673,6 +691,8 @@ class EmbeddingProcessor(BaseProcessor):
                 if stage_tracker:
                     metadata = {
                         "embeddings_created": total_embedded,
+                        "embeddings_reused": total_reused,
+                        "near_duplicate_references": total_referenced,
                         "context_embeddings_created": context_embeddings_created,
                         "processing_time": round(processing_time, 2),
                         "chunks_per_second": round(chunks_per_second, 2),
@@ -692,8 +712,11 @@ class EmbeddingProcessor(BaseProcessor):
                         await stage_tracker.complete_stage(str(document_id), self.stage.value, metadata=metadata)
 
                 self.logger.success(
-                    "Created %d embeddings in %.1fs (%.1f chunks/s) | total_chars=%d truncated=%d",
+                    "Created %d embeddings (%d reused, %d near-duplicate references) in %.1fs (%.1f chunks/s) | "
+                    "total_chars=%d truncated=%d",
                     total_embedded,
+                    total_reused,
+                    total_referenced,
                     processing_time,
                     chunks_per_second,
                     total_characters,
@@ -711,6 +734,8 @@ class EmbeddingProcessor(BaseProcessor):
                     "success": total_embedded > 0,
                     "partial_success": partial_success,
                     "embeddings_created": total_embedded,
+                    "embeddings_reused": total_reused,
+                    "near_duplicate_references": total_referenced,
                     "context_embeddings_created": context_embeddings_created,
                     "error": (
                         f"Failed to embed all {len(failed_chunks)} chunks"
@@ -732,6 +757,47 @@ class EmbeddingProcessor(BaseProcessor):
 
                 return {"success": False, "error": error_msg, "embeddings_created": 0}
 
+    async def embed_chunks(self, chunks: List[Dict[str, Any]], document_id: UUID) -> Dict[str, Any]:
+        """
+        Embed and store a slice of a document's chunks without stage tracking.
+
+        Used by the streaming text stage for each page window; batches adapt
+        their size exactly as in ``process_document``. Media context
+        embeddings are left to the embedding stage.
+        """
+        success_count = 0
+        reused_count = 0
+        referenced_count = 0
+        failed_chunks: List[Dict[str, Any]] = []
+        processed_count = 0
+
+        while processed_count < len(chunks):
+            batch = chunks[processed_count : processed_count + self.batch_size]
+            batch_start = time.perf_counter()
+            batch_result = await self._embed_batch(batch, document_id)
+            batch_latency = time.perf_counter() - batch_start
+
+            if batch_latency > 0:
+                self._record_batch_latency(batch_latency)
+                self._adjust_batch_size(batch_latency)
+            if batch_result["failed_chunks"]:
+                self._on_batch_errors(len(batch_result["failed_chunks"]))
+            else:
+                self._on_batch_success()
+
+            success_count += batch_result["success_count"]
+            reused_count += batch_result.get("reused_count", 0)
+            referenced_count += batch_result.get("referenced_count", 0)
+            failed_chunks.extend(batch_result["failed_chunks"])
+            processed_count += len(batch)
+
+        return {
+            "success_count": success_count,
+            "reused_count": reused_count,
+            "referenced_count": referenced_count,
+            "failed_chunks": failed_chunks,
+        }
+
     async def _embed_batch(self, chunks: List[Dict[str, Any]], document_id: UUID) -> Dict[str, Any]:
         """
         Generate embeddings for a batch of chunks (parallel requests to Ollama).
@@ -740,7 +806,13 @@ class EmbeddingProcessor(BaseProcessor):
         semaphore = asyncio.Semaphore(parallel)
         loop = asyncio.get_event_loop()
         success_count = 0
+        reused_count = 0
+        referenced_count = 0
         failed_chunks = []
+        near_duplicates = (
+            await self.near_duplicate_index.find_canonical(chunks) if self.near_duplicate_index else {}
+        )
+        reusable = await self._find_reusable_embeddings(chunks)
 
         async def _embed_one(chunk: Dict[str, Any]) -> Dict[str, Any]:
             chunk_id = chunk.get("chunk_id") or chunk.get("id")
@@ -750,11 +822,20 @@ class EmbeddingProcessor(BaseProcessor):
             if not isinstance(text_value, str):
                 text_value = str(text_value)
 
-            async with semaphore:
-                try:
-                    embedding = await loop.run_in_executor(None, self._generate_embedding, text_value)
-                except Exception as exc:
-                    return {"ok": False, "chunk_id": chunk_id, "error": str(exc)}
+            match = near_duplicates.get(str(chunk_id))
+            if match and await self.near_duplicate_index.store_reference(
+                chunk_id, match["canonical_id"], match["similarity"]
+            ):
+                return {"ok": True, "chunk_id": chunk_id, "referenced": True}
+
+            embedding = reusable.get((chunk.get("fingerprint"), text_value))
+            reused = embedding is not None
+            if not reused:
+                async with semaphore:
+                    try:
+                        embedding = await loop.run_in_executor(None, self._generate_embedding, text_value)
+                    except Exception as exc:
+                        return {"ok": False, "chunk_id": chunk_id, "error": str(exc)}
 
             if embedding is None:
                 return {"ok": False, "chunk_id": chunk_id, "error": "Failed to generate embedding"}
@@ -770,7 +851,9 @@ class EmbeddingProcessor(BaseProcessor):
                 return {"ok": False, "chunk_id": chunk_id, "error": str(exc)}
 
             if stored:
-                return {"ok": True, "chunk_id": chunk_id}
+                if self.near_duplicate_index:
+                    await self.near_duplicate_index.register(chunk_id, text_value)
+                return {"ok": True, "chunk_id": chunk_id, "reused": reused}
             return {"ok": False, "chunk_id": chunk_id, "error": "Failed to store embedding"}
 
         results = await asyncio.gather(*[_embed_one(c) for c in chunks], return_exceptions=True)
@@ -780,10 +863,68 @@ class EmbeddingProcessor(BaseProcessor):
                 failed_chunks.append({"chunk_id": None, "error": str(result)})
             elif result.get("ok"):
                 success_count += 1
+                reused_count += 1 if result.get("reused") else 0
+                referenced_count += 1 if result.get("referenced") else 0
             else:
                 failed_chunks.append({"chunk_id": result.get("chunk_id"), "error": result.get("error")})
 
-        return {"success_count": success_count, "failed_chunks": failed_chunks}
+        return {
+            "success_count": success_count,
+            "reused_count": reused_count,
+            "referenced_count": referenced_count,
+            "failed_chunks": failed_chunks,
+        }
+
+    async def _find_reusable_embeddings(self, chunks: List[Dict[str, Any]]) -> Dict[tuple, List[float]]:
+        """
+        Look up stored embeddings for chunks whose content was embedded before.
+
+        Chunks are matched on fingerprint and exact text, and only embeddings
+        from the current model count, so a revised manual only sends its
+        changed chunks to Ollama.
+
+        Returns:
+            Embedding keyed by ``(fingerprint, text)``
+        """
+        if not (self.reuse_by_fingerprint and self.database_adapter):
+            return {}
+        pairs = {
+            (chunk.get("fingerprint"), chunk.get("text"))
+            for chunk in chunks
+            if chunk.get("fingerprint") and isinstance(chunk.get("text"), str)
+        }
+        if not pairs:
+            return {}
+
+        fingerprints, texts = zip(*pairs)
+        try:
+            rows = await self.database_adapter.execute_query(
+                """
+                SELECT DISTINCT ON (c.fingerprint, c.text_chunk)
+                       c.fingerprint, c.text_chunk, c.embedding
+                FROM unnest($1::text[], $2::text[]) AS wanted(fingerprint, text_chunk)
+                JOIN krai_intelligence.chunks c
+                  ON c.fingerprint = wanted.fingerprint
+                 AND c.text_chunk = wanted.text_chunk
+                JOIN krai_intelligence.unified_embeddings ue
+                  ON ue.source_id = c.id
+                 AND ue.source_type = 'text'
+                 AND ue.model_name = $3
+                WHERE c.embedding IS NOT NULL
+                ORDER BY c.fingerprint, c.text_chunk, c.updated_at DESC
+                """.strip(),
+                [list(fingerprints), list(texts), self.model_name],
+            )
+        except Exception as exc:
+            self.logger.warning("Embedding reuse lookup failed, embedding all chunks: %s", exc)
+            return {}
+
+        reusable = {}
+        for row in rows or []:
+            embedding = row.get("embedding")
+            if embedding is not None and not isinstance(embedding, str):
+                reusable[(row["fingerprint"], row["text_chunk"])] = list(embedding)
+        return reusable
 
     def _generate_embedding(self, text: str) -> Optional[List[float]]:
         """
@@ -809,11 +950,13 @@ class EmbeddingProcessor(BaseProcessor):
                 prompt = text
                 if prompt and prompt_limit > 0 and len(prompt) > prompt_limit:
                     prompt = prompt[:prompt_limit]
-                response = self.session.post(
-                    f"{self.ollama_url}/api/embeddings",
-                    json={"model": self.model_name, "prompt": prompt},
-                    timeout=self.request_timeout,
-                )
+                with get_ollama_scheduler().slot(self.model_name) as call:
+                    response = self.session.post(
+                        f"{self.ollama_url}/api/embeddings",
+                        json={"model": self.model_name, "prompt": prompt},
+                        timeout=self.request_timeout,
+                    )
+                    call.observe(response)
 
                 if response.status_code == 200:
                     try:
@@ -992,19 +1135,20 @@ class EmbeddingProcessor(BaseProcessor):
                 if key not in metadata:  # Don't overwrite the standard fields
                     metadata[key] = value
 
-            embedding_literal = self._vector_literal(embedding)
+            embedding_param = self._vector_param(embedding)
             metadata_update = self._make_json_safe(metadata)
 
+            # Cast to the configured storage type (vector / halfvec)
             await self.database_adapter.execute_query(
-                """
+                f"""
                 UPDATE krai_intelligence.chunks
                 SET
-                    embedding = $2::vector,
-                    metadata = COALESCE(metadata, '{}'::jsonb) || $3::jsonb,
+                    embedding = $2::{embedding_storage_type()},
+                    metadata = COALESCE(metadata, '{{}}'::jsonb) || $3::jsonb,
                     updated_at = NOW()
                 WHERE id = $1
                 """.strip(),
-                [str(chunk_id), embedding_literal, json.dumps(metadata_update)],
+                [str(chunk_id), embedding_param, json.dumps(metadata_update)],
             )
 
             await self._store_unified_embedding(
@@ -1065,18 +1209,18 @@ class EmbeddingProcessor(BaseProcessor):
 
             embedding_data = self._make_json_safe(embedding_data)
 
-            embedding_literal = self._vector_literal(embedding)
+            embedding_param = self._vector_param(embedding)
             await self.database_adapter.execute_query(
-                """
+                f"""
                 INSERT INTO krai_intelligence.unified_embeddings
                     (source_id, source_type, embedding, model_name, embedding_context, metadata)
                 VALUES
-                    ($1::uuid, $2, $3::vector, $4, $5, $6::jsonb)
+                    ($1::uuid, $2, $3::{embedding_storage_type()}, $4, $5, $6::jsonb)
                 """.strip(),
                 [
                     str(source_id),
                     source_type,
-                    embedding_literal,
+                    embedding_param,
                     self.model_name,
                     embedding_context[:500] if embedding_context else None,
                     json.dumps(embedding_data.get("metadata") or {}),
@@ -1226,6 +1370,19 @@ class EmbeddingProcessor(BaseProcessor):
             self.logger.error(f"Similarity search failed: {e}")
             return []
 
+    async def _generate_context_embeddings_only(self, document_id: UUID) -> int:
+        """Context embeddings for a document whose chunks are all embedded (errors are logged, not raised)."""
+        if not (self.enable_context_embeddings and self.is_configured()):
+            return 0
+        with self.logger_context(document_id=document_id, stage=self.stage) as adapter:
+            try:
+                created = await self._generate_context_embeddings(document_id=document_id, adapter=adapter)
+            except Exception as e:
+                adapter.error("Failed to generate context embeddings: %s", e)
+                return 0
+            adapter.info("Generated %d context embeddings", created)
+            return created
+
     async def _generate_context_embeddings(self, document_id: UUID, adapter) -> int:
         """
         Generate embeddings for context fields of media items (images, videos, links).
@@ -1280,7 +1437,7 @@ class EmbeddingProcessor(BaseProcessor):
                         context_text = " | ".join(context_parts)
 
                         # Generate embedding
-                        embedding = self._generate_embedding(context_text)
+                        embedding = await asyncio.to_thread(self._generate_embedding, context_text)
                         if embedding:
                             image_embeddings.append(
                                 {
@@ -1334,7 +1491,7 @@ class EmbeddingProcessor(BaseProcessor):
                     if context_parts:
                         context_text = " | ".join(context_parts)
 
-                        embedding = self._generate_embedding(context_text)
+                        embedding = await asyncio.to_thread(self._generate_embedding, context_text)
                         if embedding:
                             video_embeddings.append(
                                 {
@@ -1387,7 +1544,7 @@ class EmbeddingProcessor(BaseProcessor):
                     if context_parts:
                         context_text = " | ".join(context_parts)
 
-                        embedding = self._generate_embedding(context_text)
+                        embedding = await asyncio.to_thread(self._generate_embedding, context_text)
                         if embedding:
                             link_embeddings.append(
                                 {
@@ -1469,7 +1626,7 @@ class EmbeddingProcessor(BaseProcessor):
                         context_text = " | ".join(context_parts)
 
                         # Generate embedding
-                        embedding = self._generate_embedding(context_text)
+                        embedding = await asyncio.to_thread(self._generate_embedding, context_text)
                         if embedding:
                             table_embeddings.append(
                                 {
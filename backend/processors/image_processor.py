@@ -27,12 +27,13 @@ import shutil
 import statistics
 import sys
 import tempfile
+import threading
 import time
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urlparse, urlunparse
 from uuid import UUID, uuid4
 
@@ -47,8 +48,12 @@ from backend.core.base_processor import BaseProcessor, Stage, ProcessingContext,
 from backend.pipeline.metrics import metrics
 from backend.processors.logger import sanitize_document_name, text_stats
 from backend.services.context_extraction_service import ContextExtractionService
+from backend.services.model_result_cache import get_model_cache, make_key
+from backend.services.ollama_scheduler import get_ollama_scheduler
+from backend.utils.memory_budget import MemoryBudget
 
 from .stage_tracker import StageTracker
+from .image_ranking import image_signals, rank_for_vision, score_image
 from .image_config import (
     create_image_session,
     apply_image_preprocessing,
@@ -58,6 +63,40 @@ from .image_config import (
 )
 
 
+VISION_CACHE_NAMESPACE = "image_vision"
+
+# Per-image fields kept in memory for the whole document (vision ranking,
+# visual embeddings); the full dicts are spilled to IMAGE_SPILL_FILENAME
+IMAGE_RECORD_KEYS = (
+    "id",
+    "filename",
+    "path",
+    "temp_path",
+    "page_number",
+    "width",
+    "height",
+    "format",
+    "size_bytes",
+    "file_size",
+    "type",
+    "image_type",
+    "has_png_derivative",
+    "dhash",
+    "vision_score",
+)
+# Set on the records by Vision AI and merged back into the spilled dicts
+VISION_RESULT_KEYS = ("ai_description", "ai_confidence", "contains_text", "vision_score", "vision_duplicate_of")
+IMAGE_SPILL_FILENAME = ".image_windows.jsonl"
+VISION_PROMPT = (
+    "Analyze this technical diagram or image from a service manual.\n"
+    "Describe what you see in 2-3 sentences. Focus on:\n"
+    "- Type of component or diagram (e.g., circuit board, exploded view, flowchart)\n"
+    "- Key parts or elements visible\n"
+    "- Any labels or numbers you can read\n\n"
+    "Keep it concise and technical."
+)
+
+
 def _raster_to_jpeg(image_bytes: bytes, original_ext: str, quality: int = 85) -> tuple[bytes, str]:
     """Convert raster image bytes to JPEG with a white background.
 
@@ -165,22 +204,14 @@ class ImageProcessor(BaseProcessor):
         self._vision_model_cache: str | None = None
         self._vision_model_checked_at: float = 0.0
         self.vision_model_cache_ttl = float(os.getenv("VISION_MODEL_CACHE_TTL_SECONDS", "300"))
+        self.result_cache = get_model_cache()
+        # Images sent to the vision model per document, chosen by informativeness
+        self.vision_budget = int(os.getenv("VISION_BUDGET_PER_DOCUMENT", "50"))
+        self.vision_parallel_requests = max(1, int(os.getenv("VISION_PARALLEL_REQUESTS", "2")))
+        self._vision_state_lock = threading.Lock()
 
-    def close(self) -> None:
-        """Cleanup resources - call when processor is no longer needed."""
-        if hasattr(self, "ocr_executor") and self.ocr_executor:
-            self.ocr_executor.shutdown(wait=True)
-            self.ocr_executor = None
-        if hasattr(self, "session") and self.session:
-            self.session.close()
-            self.session = None
-
-    def __del__(self):
-        """Destructor to ensure cleanup."""
-        try:
-            self.close()
-        except Exception:
-            pass
+        # Streaming: pages per extract/context/OCR window (0 = whole document at once)
+        self.stream_window_pages = int(os.getenv("IMAGE_STREAM_WINDOW_PAGES", "50"))
 
         # Check OCR availability
         if self.enable_ocr:
@@ -229,6 +260,22 @@ class ImageProcessor(BaseProcessor):
         self.enable_context_extraction = os.getenv("ENABLE_CONTEXT_EXTRACTION", "true").lower() == "true"
         self.logger.info(f"Context extraction enabled: {self.enable_context_extraction}")
 
+    def close(self) -> None:
+        """Cleanup resources - call when processor is no longer needed."""
+        if hasattr(self, "ocr_executor") and self.ocr_executor:
+            self.ocr_executor.shutdown(wait=True)
+            self.ocr_executor = None
+        if hasattr(self, "session") and self.session:
+            self.session.close()
+            self.session = None
+
+    def __del__(self):
+        """Destructor to ensure cleanup."""
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _create_session(self) -> requests.Session:
         session = requests.Session()
         adapter_retries = max(0, self.max_retries - 1)
@@ -317,9 +364,10 @@ class ImageProcessor(BaseProcessor):
 
     def _vision_quota_allows(self) -> bool:
         now = time.time()
-        while self._vision_usage and (now - self._vision_usage[0]) > self.global_vision_window:
-            self._vision_usage.popleft()
-        allowed = len(self._vision_usage) < self.global_vision_limit
+        with self._vision_state_lock:
+            while self._vision_usage and (now - self._vision_usage[0]) > self.global_vision_window:
+                self._vision_usage.popleft()
+            allowed = len(self._vision_usage) < self.global_vision_limit
         if not allowed:
             self.logger.warning(
                 "Vision guardrails global limit reached (%d in %.0fs window)",
@@ -330,28 +378,33 @@ class ImageProcessor(BaseProcessor):
 
     def _record_vision_usage(self) -> None:
         now = time.time()
-        self._vision_usage.append(now)
+        with self._vision_state_lock:
+            self._vision_usage.append(now)
 
     def _reset_vision_failures(self) -> None:
-        if self._vision_failure_count:
-            self.logger.debug("Vision circuit breaker reset after successful request")
-        self._vision_failure_count = 0
-        self._vision_breaker_until = None
+        with self._vision_state_lock:
+            if self._vision_failure_count:
+                self.logger.debug("Vision circuit breaker reset after successful request")
+            self._vision_failure_count = 0
+            self._vision_breaker_until = None
 
     def _record_vision_failure(self, reason: str) -> None:
-        self._vision_failure_count += 1
+        with self._vision_state_lock:
+            self._vision_failure_count += 1
+            failure_count = self._vision_failure_count
+            if failure_count >= self.circuit_breaker_threshold:
+                self._vision_breaker_until = time.time() + self.circuit_breaker_timeout
         self.logger.warning(
             "Vision request failed (%s) - failure count %d/%d",
             reason,
-            self._vision_failure_count,
+            failure_count,
             self.circuit_breaker_threshold,
         )
-        if self._vision_failure_count >= self.circuit_breaker_threshold:
-            self._vision_breaker_until = time.time() + self.circuit_breaker_timeout
+        if failure_count >= self.circuit_breaker_threshold:
             self.logger.error(
                 "Vision circuit breaker OPEN for %.0fs after %d consecutive failures",
                 self.circuit_breaker_timeout,
-                self._vision_failure_count,
+                failure_count,
             )
 
     def _get_vision_model_name(self) -> str | None:
@@ -450,7 +503,9 @@ class ImageProcessor(BaseProcessor):
                         data=raw_result, 
                         metadata={
                             "images_processed": raw_result.get("images_processed", 0),
-                            "total_extracted": raw_result.get("total_extracted", 0)
+                            "total_extracted": raw_result.get("total_extracted", 0),
+                            "peak_rss_mb": raw_result.get("peak_rss_mb"),
+                            "backpressure_events": raw_result.get("backpressure_events", 0),
                         }
                     )
                 else:
@@ -502,10 +557,62 @@ class ImageProcessor(BaseProcessor):
 
                 output_dir.mkdir(parents=True, exist_ok=True)
 
-                # Extract images
-                extracted_images = self._extract_images(pdf_path, output_dir)
+                # Extract, add context, filter, classify and OCR page window by page window.
+                # Image bytes stay on disk; the full per-image dicts (OCR text, page
+                # context) are spilled to a JSONL file per window and only a small
+                # record per image is kept for the vision ranking.
+                budget = MemoryBudget.from_env()
+                page_texts: dict[int, str] | None = None
+                total_extracted = 0
+                total_filtered = 0
+                images_with_context = 0
+                classified_images: list[dict[str, Any]] = []
+                windows = 0
+                spill_path = output_dir / IMAGE_SPILL_FILENAME
+                with open(spill_path, "w", encoding="utf-8") as spill:
+                    for window in self._iter_image_windows(pdf_path, output_dir, budget):
+                        windows += 1
+                        total_extracted += len(window)
+
+                        # Phase 5: Extract context for images (NEW!)
+                        if self.enable_context_extraction and context:
+                            if page_texts is None:
+                                page_texts = await self._load_page_texts(context, pdf_path, adapter) or {}
+                            if page_texts:
+                                window = await self._extract_image_contexts(
+                                    images=window,
+                                    page_texts=page_texts,
+                                    adapter=adapter,
+                                    pdf_path=pdf_path,  # Pass PDF path for bbox-aware extraction
+                                    document_id=document_id,  # Pass document ID for related chunks
+                                )
+
+                        # Filter images (skip logos, headers, etc.)
+                        filtered_window = self._filter_images(window)
+                        total_filtered += len(filtered_window)
+                        images_with_context += sum(1 for img in filtered_window if img.get("context_caption"))
+
+                        # Classify images
+                        filtered_window = self._classify_images(filtered_window)
+
+                        # OCR if enabled
+                        if self.ocr_available and self.enable_ocr:
+                            adapter.info("Running OCR on %d images...", len(filtered_window))
+                            filtered_window = self._run_ocr(filtered_window)
+
+                        # Pixel signals and vision score, computed while OCR text and context are in memory
+                        for img in filtered_window:
+                            img.update(image_signals(img["path"]))
+                            img["vision_score"], _ = score_image(img)
+
+                        if filtered_window:
+                            spill.write(json.dumps(filtered_window, default=str) + "\n")
+                        classified_images.extend(self._image_record(img) for img in filtered_window)
+                        del window, filtered_window
+                        budget.sample()
 
-                if not extracted_images:
+                if not total_extracted:
+                    spill_path.unlink(missing_ok=True)
                     if self.stage_tracker:
                         await self.stage_tracker.skip_stage(
                             str(document_id), self.stage.value, reason="No images found in document"
@@ -517,76 +624,78 @@ class ImageProcessor(BaseProcessor):
                         "vision_enabled": self.enable_vision and self.vision_available,
                         "ocr_enabled": self.enable_ocr and self.ocr_available,
                         "message": "No images found in document",
+                        **budget.report(),
                     }
 
-                adapter.info("Extracted %d images", len(extracted_images))
-
-                # Phase 5: Extract context for images (NEW!)
-                if self.enable_context_extraction and context:
-                    page_texts = await self._load_page_texts(context, pdf_path, adapter)
-                    if page_texts:
-                        extracted_images = await self._extract_image_contexts(
-                            images=extracted_images,
-                            page_texts=page_texts,
-                            adapter=adapter,
-                            pdf_path=pdf_path,  # Pass PDF path for bbox-aware extraction
-                            document_id=document_id,  # Pass document ID for related chunks
-                        )
-
-                # Filter images (skip logos, headers, etc.)
-                filtered_images = self._filter_images(extracted_images)
-
+                adapter.info("Extracted %d images in %d window(s)", total_extracted, windows)
                 adapter.info(
                     "Filtered to %d relevant images (removed %d logos/headers)",
-                    len(filtered_images),
-                    len(extracted_images) - len(filtered_images),
+                    total_filtered,
+                    total_extracted - total_filtered,
                 )
 
-                # Classify images
-                classified_images = self._classify_images(filtered_images)
-
-                # OCR if enabled
-                if self.ocr_available and self.enable_ocr:
-                    adapter.info("Running OCR on images...")
-                    classified_images = self._run_ocr(classified_images)
-
                 # Vision AI if enabled
                 if self.vision_available and self.enable_vision:
                     adapter.info("Running Vision AI analysis...")
-                    classified_images = self._run_vision_ai(classified_images)
+                    # In a worker thread: the vision threads wait on Ollama slots, and
+                    # slot holders on this event loop must keep running to release them
+                    classified_images = await asyncio.to_thread(self._run_vision_ai, classified_images)
 
+                # Read the spilled windows back, add the vision results and persist
+                # them to krai_content.images; IDs are propagated to the records
+                records = {record["filename"]: record for record in classified_images}
                 storage_task_count = 0
-                if context is not None:
-                    for image in classified_images:
-                        if not image.get("id"):
-                            image["id"] = str(uuid4())
-                        if image.get("path") and not image.get("temp_path"):
-                            image["temp_path"] = image.get("path")
-                        if image.get("type") and not image.get("image_type"):
-                            image["image_type"] = image.get("type")
-                    context.images = classified_images
-                    context.output_dir = output_dir
+                image_index = 0
+                try:
+                    for window in self._iter_spilled_windows(spill_path):
+                        for image in window:
+                            record = records[image["filename"]]
+                            image.update({key: record[key] for key in VISION_RESULT_KEYS if key in record})
+                            if context is not None:
+                                if not image.get("id"):
+                                    image["id"] = str(uuid4())
+                                if image.get("path") and not image.get("temp_path"):
+                                    image["temp_path"] = image.get("path")
+                                if image.get("type") and not image.get("image_type"):
+                                    image["image_type"] = image.get("type")
+
+                        if self.database_service:
+                            storage_task_count += await self._queue_storage_tasks(
+                                document_id,
+                                window,
+                                adapter,
+                                start_index=image_index,
+                            )
+                        image_index += len(window)
+
+                        for image in window:
+                            records[image["filename"]].update(
+                                {key: image[key] for key in ("id", "temp_path", "image_type") if key in image}
+                            )
+                        del window
+                finally:
+                    spill_path.unlink(missing_ok=True)
 
-                # Persist images to krai_content.images and propagate IDs
                 if self.database_service and classified_images:
-                    storage_task_count = await self._queue_storage_tasks(
-                        document_id,
-                        classified_images,
-                        adapter,
-                    )
                     adapter.info("Persisted %d images to krai_content.images", storage_task_count)
 
+                if context is not None:
+                    context.images = classified_images
+                    context.output_dir = output_dir
+
                 # Complete stage tracking
                 if self.stage_tracker:
                     await self.stage_tracker.complete_stage(
                         str(document_id),
                         self.stage.value,
                         metadata={
-                            "images_extracted": len(extracted_images),
-                            "images_filtered": len(filtered_images),
+                            "images_extracted": total_extracted,
+                            "images_filtered": total_filtered,
                             "images_classified": len(classified_images),
-                            "images_with_context": sum(1 for img in classified_images if img.get("context_caption")),
+                            "images_with_context": images_with_context,
                             "storage_tasks_created": storage_task_count,
+                            "stream_windows": windows,
+                            **budget.report(),
                         },
                     )
 
@@ -598,12 +707,17 @@ class ImageProcessor(BaseProcessor):
                     "success": True,
                     "images": classified_images,
                     "images_processed": len(classified_images),
-                    "total_extracted": len(extracted_images),
-                    "total_filtered": len(filtered_images),
+                    "total_extracted": total_extracted,
+                    "total_filtered": total_filtered,
                     "output_dir": str(output_dir) if output_dir else None,
                     "storage_tasks_created": storage_task_count,
+                    "stream_windows": windows,
+                    **budget.report(),
                 }
-                self.logger.success(f"Processed {len(classified_images)} images (extracted {len(extracted_images)})")
+                self.logger.success(
+                    f"Processed {len(classified_images)} images (extracted {total_extracted}, "
+                    f"peak RSS {result['peak_rss_mb']} MB)"
+                )
                 return result
 
             except Exception as e:
@@ -626,92 +740,151 @@ class ImageProcessor(BaseProcessor):
         Returns:
             List of extracted image info dicts
         """
-        images = []
-
         try:
-            # Open PDF
-            pdf_document = fitz.open(str(pdf_path))
+            return [image for _, page_images in self._iter_page_images(pdf_path, output_dir) for image in page_images]
+        except Exception as e:
+            self.logger.error(f"Image extraction failed: {e}")
+            return []
 
-            image_counter = 0
+    @staticmethod
+    def _image_record(image: dict[str, Any]) -> dict[str, Any]:
+        """The fields of an image dict kept in memory for the whole document."""
+        return {key: image[key] for key in IMAGE_RECORD_KEYS if key in image}
 
-            try:
-                # Iterate through pages
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document[page_num]
+    @staticmethod
+    def _iter_spilled_windows(spill_path: Path) -> Iterator[list[dict[str, Any]]]:
+        """Yield the image windows written to ``spill_path`` by ``process_document``."""
+        with open(spill_path, encoding="utf-8") as spill:
+            for line in spill:
+                yield json.loads(line)
 
-                    # Get images on page
-                    image_list = page.get_images(full=True)
+    def _iter_image_windows(
+        self,
+        pdf_path: Path,
+        output_dir: Path,
+        budget: MemoryBudget,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Yield extracted images in windows of ``stream_window_pages`` pages.
 
-                    for img_index, img_info in enumerate(image_list):
-                        if image_counter >= self.max_images_per_doc:
-                            self.logger.warning(f"Reached max images limit: {self.max_images_per_doc}")
-                            break
+        A window is yielded early (and following windows are halved) when the
+        memory budget reports that the window grew RSS beyond its ceiling;
+        windows that fit grow back to ``stream_window_pages``. Extraction
+        errors end the iteration after logging, like ``_extract_images``.
+        """
+        window_pages = self.stream_window_pages
+        window: list[dict[str, Any]] = []
+        pages_in_window = 0
+        budget.start_window()
+        try:
+            for _, page_images in self._iter_page_images(pdf_path, output_dir):
+                window.extend(page_images)
+                pages_in_window += 1
+                over_ceiling = budget.over_ceiling()
+                if over_ceiling:
+                    self.logger.info(
+                        "Window grew RSS by more than %.0f MB; flushing %d images early",
+                        budget.ceiling_mb,
+                        len(window),
+                    )
+                elif not window_pages or pages_in_window < window_pages:
+                    continue
+                if window:
+                    yield window
+                window = []
+                pages_in_window = 0
+                window_pages = budget.next_window_pages(window_pages, self.stream_window_pages, over_ceiling)
+                # The caller has released the yielded window by now
+                if over_ceiling:
+                    budget.relieve()
+                else:
+                    budget.start_window()
+        except Exception as e:
+            self.logger.error(f"Image extraction failed: {e}")
+        if window:
+            yield window
 
-                        try:
-                            # Extract image
-                            xref = img_info[0]
-                            base_image = pdf_document.extract_image(xref)
-
-                            image_bytes = base_image["image"]
-                            image_ext = base_image["ext"]
-
-                            # Skip SVGs — they are handled by SVGProcessor
-                            if image_ext.lower() in ("svg", "svgz"):
-                                continue
-
-                            # Convert to JPEG with white background immediately so no
-                            # PNG/GIF files ever reach disk or storage.
-                            image_bytes, image_ext = _raster_to_jpeg(image_bytes, image_ext)
-
-                            # Open with PIL to get dimensions
-                            with Image.open(io.BytesIO(image_bytes)) as pil_image:
-                                width, height = pil_image.size
-
-                            # Check minimum size
-                            if width * height < self.min_image_size:
-                                continue
-
-                            # Compute image bounding box using display list
-                            image_bbox = self._get_image_bbox(page, img_index)
-
-                            # Save image
-                            image_filename = f"page_{page_num:04d}_img_{img_index:03d}.{image_ext}"
-                            image_path = output_dir / image_filename
-
-                            with open(image_path, "wb") as img_file:
-                                img_file.write(image_bytes)
-
-                            # Store image info
-                            images.append(
-                                {
-                                    "path": str(image_path),
-                                    "filename": image_filename,
-                                    "page_number": page_num + 1,  # 1-indexed - standardized key
-                                    "width": width,
-                                    "height": height,
-                                    "format": image_ext,
-                                    "size_bytes": len(image_bytes),
-                                    "bbox": image_bbox,  # Add bounding box
-                                    "extracted_at": datetime.utcnow().isoformat(),
-                                }
-                            )
+    def _iter_page_images(self, pdf_path: Path, output_dir: Path) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Yield ``(page_number, images)`` per page; image bytes are written to ``output_dir``."""
+        pdf_document = fitz.open(str(pdf_path))
 
-                            image_counter += 1
+        image_counter = 0
 
-                        except Exception as e:
-                            self.logger.debug(f"Failed to extract image {img_index} from page {page_num}: {e}")
-                            continue
+        try:
+            # Iterate through pages
+            for page_num in range(len(pdf_document)):
+                page = pdf_document[page_num]
+                images: list[dict[str, Any]] = []
+
+                # Get images on page
+                image_list = page.get_images(full=True)
 
+                for img_index, img_info in enumerate(image_list):
                     if image_counter >= self.max_images_per_doc:
+                        self.logger.warning(f"Reached max images limit: {self.max_images_per_doc}")
                         break
-            finally:
-                pdf_document.close()
 
-            return images
+                    try:
+                        # Extract image
+                        xref = img_info[0]
+                        base_image = pdf_document.extract_image(xref)
 
-        except Exception as e:
-            self.logger.error(f"Image extraction failed: {e}")
-            return []
+                        image_bytes = base_image["image"]
+                        image_ext = base_image["ext"]
+
+                        # Skip SVGs — they are handled by SVGProcessor
+                        if image_ext.lower() in ("svg", "svgz"):
+                            continue
+
+                        # Convert to JPEG with white background immediately so no
+                        # PNG/GIF files ever reach disk or storage.
+                        image_bytes, image_ext = _raster_to_jpeg(image_bytes, image_ext)
+
+                        # Open with PIL to get dimensions
+                        with Image.open(io.BytesIO(image_bytes)) as pil_image:
+                            width, height = pil_image.size
+
+                        # Check minimum size
+                        if width * height < self.min_image_size:
+                            continue
+
+                        # Compute image bounding box using display list
+                        image_bbox = self._get_image_bbox(page, img_index)
+
+                        # Save image
+                        image_filename = f"page_{page_num:04d}_img_{img_index:03d}.{image_ext}"
+                        image_path = output_dir / image_filename
+
+                        with open(image_path, "wb") as img_file:
+                            img_file.write(image_bytes)
+
+                        # Store image info
+                        images.append(
+                            {
+                                "path": str(image_path),
+                                "filename": image_filename,
+                                "page_number": page_num + 1,  # 1-indexed - standardized key
+                                "width": width,
+                                "height": height,
+                                "format": image_ext,
+                                "size_bytes": len(image_bytes),
+                                "bbox": image_bbox,  # Add bounding box
+                                "extracted_at": datetime.utcnow().isoformat(),
+                            }
+                        )
+
+                        image_counter += 1
+
+                    except Exception as e:
+                        self.logger.debug(f"Failed to extract image {img_index} from page {page_num}: {e}")
+                        continue
+
+                yield page_num + 1, images
+
+                if image_counter >= self.max_images_per_doc:
+                    break
+        finally:
+            pdf_document.close()
 
     def _get_image_bbox(self, page, img_index: int) -> tuple | None:
         """
@@ -760,10 +933,17 @@ class ImageProcessor(BaseProcessor):
             self.logger.debug(f"Failed to compute image bbox for index {img_index}: {e}")
             return None
 
-    async def _queue_storage_tasks(self, document_id: UUID, images: list[dict[str, Any]], adapter) -> int:
+    async def _queue_storage_tasks(
+        self,
+        document_id: UUID,
+        images: list[dict[str, Any]],
+        adapter,
+        start_index: int = 0,
+    ) -> int:
         """
         Persist each processed image to krai_content.images via the database adapter.
         Propagate generated image IDs back into in-memory image dicts.
+        ``start_index`` is the document-wide image_index of ``images[0]``.
         Returns the count of successfully written images.
         """
         if not self.database_service or not hasattr(self.database_service, "create_image"):
@@ -789,7 +969,7 @@ class ImageProcessor(BaseProcessor):
             return hashlib.sha256(f"{path}|{size}|{page}".encode()).hexdigest()
 
         success_count = 0
-        for idx, img in enumerate(images):
+        for idx, img in enumerate(images, start=start_index):
             temp_path = img.get("temp_path") or img.get("path")
             if not temp_path or not os.path.exists(temp_path):
                 adapter.debug("Skipping image without valid temp_path: %s", img.get("filename"))
@@ -999,14 +1179,19 @@ class ImageProcessor(BaseProcessor):
     def _run_vision_ai(
         self,
         images: list[dict[str, Any]],
-        max_images: int = 50,  # Increased from 20 to process more diagrams/technical drawings
+        max_images: int | None = None,
     ) -> list[dict[str, Any]]:
         """
-        Run Vision AI (LLaVA) on images
+        Run Vision AI (LLaVA) on the most informative images
+
+        Cached answers are applied first and cost nothing. The remaining images
+        are ranked by informativeness (see image_ranking) and the top
+        ``max_images`` are analysed with up to ``vision_parallel_requests``
+        requests in flight; near-duplicates reuse their original's description.
 
         Args:
             images: List of images
-            max_images: Maximum images to process (default: 50, ~10-15 min processing time)
+            max_images: Vision budget for this document (default: VISION_BUDGET_PER_DOCUMENT)
 
         Returns:
             Images with 'ai_description' and 'ai_confidence' fields added
@@ -1015,16 +1200,7 @@ class ImageProcessor(BaseProcessor):
             self.logger.debug("Vision AI not available, skipping")
             return images
 
-        # Limit to max_images to avoid overwhelming the system
-        images_to_process = images[:max_images]
-        skipped_count = len(images) - len(images_to_process)
-
-        if skipped_count > 0:
-            self.logger.info(
-                f"Processing first {len(images_to_process)} images (skipping {skipped_count} to avoid overload)"
-            )
-        else:
-            self.logger.info(f"Processing {len(images_to_process)} images with Vision AI...")
+        budget = self.vision_budget if max_images is None else max_images
 
         try:
             if not self._vision_quota_allows():
@@ -1051,181 +1227,92 @@ class ImageProcessor(BaseProcessor):
             except Exception:
                 pass
 
-            success_count = 0
-            processed_count = 0
-            total_images = len(images_to_process)
-            batch_size = max(1, total_images // 10) if total_images else 1
-
-            for i, img in enumerate(images_to_process):
-                if i % batch_size == 0 or i == total_images - 1:
-                    self.logger.warning(
-                        "Image processing: %d/%d (%.0f%%)",
-                        i + 1,
-                        total_images,
-                        ((i + 1) / total_images) * 100 if total_images else 100,
-                    )
-
+            # Same bytes + model + prompt -> reuse the earlier answer, no budget or quota used
+            cache_hits = 0
+            candidates = []
+            for img in images:
                 if img.get("has_png_derivative") is False:
                     self.logger.debug(
                         "Skipping Vision AI for %s because PNG derivative is unavailable",
                         img.get("filename"),
                     )
                     continue
-
-                if not self._vision_guard_allows(img, processed_count):
-                    continue
-
-                if not self._vision_quota_allows():
-                    self.logger.warning("Vision quota reached mid-run - stopping vision analysis")
-                    break
-
-                processed_count += 1
                 try:
                     with open(img["path"], "rb") as f:
-                        image_data = base64.b64encode(f.read()).decode("utf-8")
-
-                    prompt = (
-                        "Analyze this technical diagram or image from a service manual.\n"
-                        "Describe what you see in 2-3 sentences. Focus on:\n"
-                        "- Type of component or diagram (e.g., circuit board, exploded view, flowchart)\n"
-                        "- Key parts or elements visible\n"
-                        "- Any labels or numbers you can read\n\n"
-                        "Keep it concise and technical."
-                    )
-
-                    max_attempts = max(1, self.max_retries)
-                    last_error = None
-                    succeeded = False
-
-                    for attempt in range(1, max_attempts + 1):
-                        try:
-                            self._record_vision_usage()
-                            response = self.session.post(
-                                f"{ollama_url}/api/generate",
-                                json={
-                                    "model": model_name,
-                                    "prompt": prompt,
-                                    "images": [image_data],
-                                    "stream": False,
-                                },
-                                timeout=self.request_timeout,
-                            )
+                        img["_vision_cache_key"] = make_key(VISION_CACHE_NAMESPACE, model_name, VISION_PROMPT, f.read())
+                    cached = self.result_cache.get(img["_vision_cache_key"], VISION_CACHE_NAMESPACE)
+                except Exception:
+                    cached = None
+                if cached and cached.get("description"):
+                    self._apply_vision_description(img, cached["description"])
+                    cache_hits += 1
+                else:
+                    candidates.append(img)
 
-                            if response.status_code == 200:
-                                result = response.json()
-                                description = result.get("response", "").strip()
-                                img["ai_description"] = description
-                                img["ai_confidence"] = 0.8
-                                img["contains_text"] = any(
-                                    keyword in description.lower() for keyword in ["label", "text", "number", "code"]
-                                )
-                                success_count += 1
-                                self._reset_vision_failures()
-                                metrics.record_vision_result(model_name, True)
-                                desc_stats = text_stats(description)
-                                self.logger.debug(
-                                    "Vision analysis stats for %s: %s",
-                                    img.get("filename"),
-                                    desc_stats,
-                                )
-                                succeeded = True
-                                break
+            selected, skipped = rank_for_vision(candidates, budget)
+            self._log_vision_selection(selected, skipped, cache_hits)
 
-                            last_error = f"status_{response.status_code}"
-                            if response.status_code >= 500 and attempt < max_attempts:
-                                delay = self.retry_base_delay * (2 ** (attempt - 1)) + random.uniform(
-                                    0, self.retry_jitter
-                                )
-                                self.logger.warning(
-                                    "Vision API transient error %s on attempt %d/%d for %s - retrying in %.2fs",
-                                    response.status_code,
-                                    attempt,
-                                    max_attempts,
-                                    img["filename"],
-                                    delay,
-                                )
-                                time.sleep(delay)
-                                continue
-
-                            if response.status_code >= 500:
-                                self.logger.error(
-                                    "Vision API persistent server error %s for %s after %d attempts",
-                                    response.status_code,
-                                    img["filename"],
-                                    attempt,
-                                )
-                            else:
-                                self.logger.warning(
-                                    "Vision API returned HTTP %s for %s (attempt %d/%d) - not retrying",
-                                    response.status_code,
-                                    img["filename"],
-                                    attempt,
-                                    max_attempts,
-                                )
-
-                            self._record_vision_failure(last_error or "unexpected_status")
-                            img["ai_description"] = ""
-                            img["ai_confidence"] = 0.0
+            success_count = 0
+            processed_count = 0
+            total_images = len(selected)
+            progress_step = max(1, total_images // 10) if total_images else 1
+            pending = iter(selected)
+            in_flight: dict[Any, dict[str, Any]] = {}
+            stop_reason = None
+
+            with ThreadPoolExecutor(max_workers=self.vision_parallel_requests) as executor:
+                while True:
+                    # Admit new requests while there is room and no guard has tripped
+                    while stop_reason is None and len(in_flight) < self.vision_parallel_requests:
+                        img = next(pending, None)
+                        if img is None:
                             break
-
-                        except (requests_exceptions.Timeout, requests_exceptions.ConnectionError) as exc:
-                            last_error = str(exc)
-                            if attempt < max_attempts:
-                                delay = self.retry_base_delay * (2 ** (attempt - 1)) + random.uniform(
-                                    0, self.retry_jitter
-                                )
-                                self.logger.warning(
-                                    "Vision request error on attempt %d/%d for %s: %s - retrying in %.2fs",
-                                    attempt,
-                                    max_attempts,
-                                    img["filename"],
-                                    exc,
-                                    delay,
-                                )
-                                time.sleep(delay)
-                                continue
-                            self.logger.error(
-                                "Vision request failed for %s after %d attempts due to connection issues: %s",
-                                img["filename"],
-                                attempt,
-                                exc,
-                            )
-                            self._record_vision_failure("connection_error")
-                            img["ai_description"] = ""
-                            img["ai_confidence"] = 0.0
+                        if not self._vision_guard_allows(img, processed_count):
+                            continue
+                        if not self._vision_quota_allows():
+                            stop_reason = "Vision quota reached mid-run - stopping vision analysis"
                             break
-                        except Exception as exc:
-                            last_error = str(exc)
-                            self._record_vision_failure("exception")
-                            img["ai_description"] = ""
-                            img["ai_confidence"] = 0.0
-                            self.logger.debug(
-                                "Vision AI failed for %s: %s",
-                                img.get("filename"),
-                                exc,
+                        processed_count += 1
+                        in_flight[executor.submit(self._describe_image, img, model_name, ollama_url)] = img
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.pop(future)
+                        if future.result():
+                            success_count += 1
+                        finished = processed_count - len(in_flight)
+                        if finished % progress_step == 0 or finished == total_images:
+                            self.logger.warning(
+                                "Image processing: %d/%d (%.0f%%)",
+                                finished,
+                                total_images,
+                                (finished / total_images) * 100 if total_images else 100,
                             )
-                            break
-                    else:  # pragma: no cover - defensive
-                        self._record_vision_failure(last_error or "unknown")
 
-                    if not succeeded:
-                        metrics.record_vision_result(model_name, False, error_label=last_error or "failed")
+                    if stop_reason is None and self._vision_breaker_until and time.time() < self._vision_breaker_until:
+                        stop_reason = "Vision circuit breaker triggered mid-run - stopping analysis"
 
-                except Exception as exc:
-                    self._record_vision_failure("read_error")
-                    self.logger.debug("Vision preprocessing failed for %s: %s", img.get("filename"), exc)
-                    img["ai_description"] = ""
-                    img["ai_confidence"] = 0.0
-                    metrics.record_vision_result(model_name, False, error_label="read_error")
-
-                if self._vision_breaker_until and time.time() < self._vision_breaker_until:
-                    self.logger.warning("Vision circuit breaker triggered mid-run - stopping analysis")
-                    break
+            if stop_reason:
+                self.logger.warning(stop_reason)
+
+            # Near-duplicates share the description of the copy that was analysed
+            described = {img.get("filename"): img for img in images if img.get("ai_description")}
+            for img in skipped["duplicate"]:
+                original = described.get(img.get("vision_duplicate_of"))
+                if original is not None:
+                    self._apply_vision_description(img, original["ai_description"])
+
+            for img in images:
+                img.pop("_vision_cache_key", None)
 
             self.logger.success(
-                "✅ Vision AI analyzed %d/%d permitted images",
-                success_count,
-                processed_count,
+                "✅ Vision AI analyzed %d/%d permitted images (%d from cache)",
+                success_count + cache_hits,
+                processed_count + cache_hits,
+                cache_hits,
             )
 
             return images
@@ -1234,6 +1321,163 @@ class ImageProcessor(BaseProcessor):
             self.logger.error(f"Vision AI processing failed: {e}")
             return images
 
+    def _log_vision_selection(
+        self,
+        selected: list[dict[str, Any]],
+        skipped: dict[str, list[dict[str, Any]]],
+        cache_hits: int,
+    ) -> None:
+        """Log how the vision budget was spent (scores and image types per bucket)."""
+
+        def describe(group: list[dict[str, Any]]) -> str:
+            if not group:
+                return "0"
+            scores = [img.get("vision_score", 0.0) for img in group]
+            types = Counter(img.get("type", "unknown") for img in group)
+            type_summary = ", ".join(f"{name}={count}" for name, count in types.most_common())
+            return f"{len(group)} (score {min(scores):.2f}-{max(scores):.2f}; {type_summary})"
+
+        self.logger.info(
+            "Vision budget: selected %s | skipped over budget %s | duplicates %s | cached %d",
+            describe(selected),
+            describe(skipped["budget"]),
+            describe(skipped["duplicate"]),
+            cache_hits,
+        )
+
+    def _describe_image(self, img: dict[str, Any], model_name: str, ollama_url: str) -> bool:
+        """Send one image to the vision model (with retries); runs in a worker thread."""
+        try:
+            with open(img["path"], "rb") as f:
+                raw_image = f.read()
+            cache_key = img.get("_vision_cache_key")
+            image_data = base64.b64encode(raw_image).decode("utf-8")
+            prompt = VISION_PROMPT
+        except Exception as exc:
+            self._record_vision_failure("read_error")
+            self.logger.debug("Vision preprocessing failed for %s: %s", img.get("filename"), exc)
+            img["ai_description"] = ""
+            img["ai_confidence"] = 0.0
+            metrics.record_vision_result(model_name, False, error_label="read_error")
+            return False
+
+        max_attempts = max(1, self.max_retries)
+        last_error = None
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                self._record_vision_usage()
+                with get_ollama_scheduler().slot(model_name) as call:
+                    response = self.session.post(
+                        f"{ollama_url}/api/generate",
+                        json={
+                            "model": model_name,
+                            "prompt": prompt,
+                            "images": [image_data],
+                            "stream": False,
+                        },
+                        timeout=self.request_timeout,
+                    )
+                    call.observe(response)
+
+                if response.status_code == 200:
+                    result = response.json()
+                    description = result.get("response", "").strip()
+                    self._apply_vision_description(img, description)
+                    if cache_key and description:
+                        self.result_cache.set(
+                            cache_key,
+                            {"description": description},
+                            VISION_CACHE_NAMESPACE,
+                            model_name,
+                        )
+                    self._reset_vision_failures()
+                    metrics.record_vision_result(model_name, True)
+                    self.logger.debug(
+                        "Vision analysis stats for %s: %s",
+                        img.get("filename"),
+                        text_stats(description),
+                    )
+                    return True
+
+                last_error = f"status_{response.status_code}"
+                if response.status_code >= 500 and attempt < max_attempts:
+                    delay = self.retry_base_delay * (2 ** (attempt - 1)) + random.uniform(0, self.retry_jitter)
+                    self.logger.warning(
+                        "Vision API transient error %s on attempt %d/%d for %s - retrying in %.2fs",
+                        response.status_code,
+                        attempt,
+                        max_attempts,
+                        img["filename"],
+                        delay,
+                    )
+                    time.sleep(delay)
+                    continue
+
+                if response.status_code >= 500:
+                    self.logger.error(
+                        "Vision API persistent server error %s for %s after %d attempts",
+                        response.status_code,
+                        img["filename"],
+                        attempt,
+                    )
+                else:
+                    self.logger.warning(
+                        "Vision API returned HTTP %s for %s (attempt %d/%d) - not retrying",
+                        response.status_code,
+                        img["filename"],
+                        attempt,
+                        max_attempts,
+                    )
+
+                self._record_vision_failure(last_error or "unexpected_status")
+                break
+
+            except (requests_exceptions.Timeout, requests_exceptions.ConnectionError) as exc:
+                last_error = str(exc)
+                if attempt < max_attempts:
+                    delay = self.retry_base_delay * (2 ** (attempt - 1)) + random.uniform(0, self.retry_jitter)
+                    self.logger.warning(
+                        "Vision request error on attempt %d/%d for %s: %s - retrying in %.2fs",
+                        attempt,
+                        max_attempts,
+                        img["filename"],
+                        exc,
+                        delay,
+                    )
+                    time.sleep(delay)
+                    continue
+                self.logger.error(
+                    "Vision request failed for %s after %d attempts due to connection issues: %s",
+                    img["filename"],
+                    attempt,
+                    exc,
+                )
+                self._record_vision_failure("connection_error")
+                break
+            except Exception as exc:
+                last_error = str(exc)
+                self._record_vision_failure("exception")
+                self.logger.debug(
+                    "Vision AI failed for %s: %s",
+                    img.get("filename"),
+                    exc,
+                )
+                break
+
+        img["ai_description"] = ""
+        img["ai_confidence"] = 0.0
+        metrics.record_vision_result(model_name, False, error_label=last_error or "failed")
+        return False
+
+    @staticmethod
+    def _apply_vision_description(img: dict[str, Any], description: str) -> None:
+        img["ai_description"] = description
+        img["ai_confidence"] = 0.8
+        img["contains_text"] = any(
+            keyword in description.lower() for keyword in ["label", "text", "number", "code"]
+        )
+
     def analyze_page(self, pdf_path: Path, page_number: int, prompt: str) -> dict[str, Any] | None:
         """
         Analyze a specific PDF page with Vision AI
@@ -1278,11 +1522,13 @@ class ImageProcessor(BaseProcessor):
             self._record_vision_usage()
 
             model_name = self._get_vision_model_name() or "llava:latest"
-            response = self.session.post(
-                "http://localhost:11434/api/generate",
-                json={"model": model_name, "prompt": prompt, "images": [img_base64], "stream": False},
-                timeout=self.request_timeout,
-            )
+            with get_ollama_scheduler().slot(model_name) as call:
+                response = self.session.post(
+                    "http://localhost:11434/api/generate",
+                    json={"model": model_name, "prompt": prompt, "images": [img_base64], "stream": False},
+                    timeout=self.request_timeout,
+                )
+                call.observe(response)
 
             if response.status_code == 200:
                 result_text = response.json().get("response", "")
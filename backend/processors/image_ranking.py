@@ -0,0 +1,176 @@
+"""Image Ranking Module
+
+Cheap informativeness scoring for extracted images, so the per-document
+vision budget is spent on the most useful diagrams instead of the first
+images in page order.
+
+Signals (all computed from a 128px grayscale thumbnail or data the stage
+already has):
+- OCR text density (labelled diagrams beat blank photos and text scans)
+- pixel area
+- grey-level entropy and edge density (line drawings vs. flat fills)
+- error-code references in OCR text or the surrounding page context
+- a 64-bit difference hash to suppress repeated images
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageFilter
+
+
+ERROR_CODE_PATTERN = re.compile(r'\b\d{2}\.\d{2}(?:\.\d{2})?\b|\b[A-Z]\d{3,4}(?:-\d{2,4})?\b')
+
+# Two images whose hashes differ in at most this many bits count as duplicates
+DUPLICATE_MAX_DISTANCE = 6
+
+# Below this entropy (bits) the image is nearly a flat fill
+LOW_ENTROPY_BITS = 1.5
+
+WEIGHTS = {
+    'text': 0.2,
+    'size': 0.15,
+    'entropy': 0.15,
+    'edges': 0.2,
+    'error_codes': 0.3,
+}
+
+_THUMBNAIL_SIZE = (128, 128)
+_EDGE_THRESHOLD = 40
+
+
+def image_signals(path: str) -> Dict[str, Any]:
+    """Entropy, edge density and difference hash of an image file.
+
+    Returns an empty dict if the file cannot be read; scoring then falls back
+    to the metadata-only signals.
+    """
+    try:
+        with Image.open(path) as img:
+            gray = img.convert('L')
+            gray.thumbnail(_THUMBNAIL_SIZE)
+    except Exception:
+        return {}
+
+    pixels = gray.width * gray.height or 1
+    histogram = gray.histogram()
+    entropy = -sum((n / pixels) * math.log2(n / pixels) for n in histogram if n)
+
+    edges = gray.filter(ImageFilter.FIND_EDGES).histogram()
+    edge_density = sum(edges[_EDGE_THRESHOLD:]) / pixels
+
+    return {
+        'entropy': round(entropy, 3),
+        'edge_density': round(edge_density, 4),
+        'dhash': difference_hash(gray),
+    }
+
+
+def difference_hash(gray: Image.Image) -> int:
+    """64-bit gradient hash; near-identical images differ in only a few bits"""
+    small = gray.resize((9, 8), Image.BILINEAR)
+    values = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = values[row * 9 + col]
+            right = values[row * 9 + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+    return bits
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def score_image(img: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+    """Informativeness score in [0, 1] and its components.
+
+    Uses the keys set by image_signals(), OCR (ocr_text) and context
+    extraction (related_error_codes, context_caption, surrounding_paragraphs);
+    missing signals count as neutral.
+    """
+    words = len((img.get('ocr_text') or '').split())
+    # A handful of labels is ideal; a page of prose is better served by OCR alone
+    text = min(words, 30) / 30
+    if words > 150:
+        text *= 0.5
+
+    area = max(1, int(img.get('width') or 0) * int(img.get('height') or 0))
+    size = min(1.0, max(0.0, math.log10(area / 1e4) / 2))  # 100x100 -> 0, 1000x1000 -> 1
+
+    entropy_bits = img.get('entropy')
+    entropy = min(1.0, entropy_bits / 7) if entropy_bits is not None else 0.5
+    edge_density = img.get('edge_density')
+    edges = min(1.0, edge_density / 0.15) if edge_density is not None else 0.5
+
+    error_codes = 0.0
+    if img.get('related_error_codes') or ERROR_CODE_PATTERN.search(img.get('ocr_text') or ''):
+        error_codes = 1.0
+    else:
+        nearby = ' '.join(
+            [img.get('context_caption') or '', *(img.get('surrounding_paragraphs') or [])]
+        )
+        if ERROR_CODE_PATTERN.search(nearby):
+            error_codes = 0.6
+
+    components = {
+        'text': text,
+        'size': size,
+        'entropy': entropy,
+        'edges': edges,
+        'error_codes': error_codes,
+    }
+    score = sum(WEIGHTS[name] * value for name, value in components.items())
+    if entropy_bits is not None and entropy_bits < LOW_ENTROPY_BITS:
+        score *= 0.2
+    return round(score, 4), components
+
+
+def rank_for_vision(
+    images: List[Dict[str, Any]],
+    budget: int,
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Pick up to ``budget`` images by descending score, skipping duplicates.
+
+    Every image gets ``vision_score`` (kept if the caller already scored it,
+    e.g. before dropping the OCR text); duplicates get ``vision_duplicate_of``
+    (the filename of the higher-ranked copy) so its description can be reused.
+
+    Returns:
+        (selected in rank order, {"duplicate": [...], "budget": [...]})
+    """
+    for img in images:
+        if 'vision_score' not in img:
+            img['vision_score'], _ = score_image(img)
+
+    # sorted() is stable: equal scores keep page order
+    ranked = sorted(images, key=lambda img: img['vision_score'], reverse=True)
+    selected: List[Dict[str, Any]] = []
+    skipped: Dict[str, List[Dict[str, Any]]] = {'duplicate': [], 'budget': []}
+    kept_hashes: List[Tuple[int, str]] = []
+
+    for img in ranked:
+        original = _find_duplicate(img.get('dhash'), kept_hashes)
+        if original is not None:
+            img['vision_duplicate_of'] = original
+            skipped['duplicate'].append(img)
+            continue
+        if img.get('dhash') is not None:
+            kept_hashes.append((img['dhash'], img.get('filename')))
+        if len(selected) >= budget:
+            skipped['budget'].append(img)
+            continue
+        selected.append(img)
+
+    return selected, skipped
+
+
+def _find_duplicate(dhash: Optional[int], kept_hashes: List[Tuple[int, str]]) -> Optional[str]:
+    if dhash is None:
+        return None
+    for other, filename in kept_hashes:
+        if hamming_distance(dhash, other) <= DUPLICATE_MAX_DISTANCE:
+            return filename
+    return None
@@ -42,6 +42,9 @@ from uuid import UUID
 import hashlib
 import mimetypes
 
+from backend.pipeline.metrics import metrics
+from backend.services.object_storage_service import instrument_client
+
 from .logger import get_logger
 
 
@@ -88,6 +91,8 @@ class ImageStorageProcessor:
                     config=Config(signature_version='s3v4'),
                     region_name='auto'
                 )
+                if metrics.enabled:
+                    instrument_client(self.storage_client)
                 self.logger.info("S3-compatible storage client initialized successfully")
             except Exception as e:
                 self.logger.warning(f"Failed to initialize storage client: {e}")
@@ -362,255 +362,229 @@ class LinkExtractionProcessorAI(BaseProcessor):
 
         return unique_codes
 
+    _LINK_COLUMNS = (
+        "url", "description", "link_type", "link_category", "page_number", "position_data",
+        "confidence_score", "manufacturer_id", "series_id", "related_error_codes",
+        "context_description", "related_chunks", "metadata",
+    )
+
+    _VIDEO_COLUMNS = (
+        "link_id", "document_id", "youtube_id", "platform", "video_url", "title", "description",
+        "thumbnail_url", "duration", "manufacturer_id", "series_id", "metadata",
+        "context_description", "related_products", "related_chunks", "page_number",
+    )
+
+    # Conflict targets match the partial unique indexes on krai_content.videos
+    _VIDEO_CONFLICT_TARGETS = {
+        "youtube": "(youtube_id) WHERE youtube_id IS NOT NULL",
+        "url": "(video_url) WHERE video_url IS NOT NULL AND youtube_id IS NULL",
+    }
+
     async def _save_links_to_db(self, links: List[Dict], document_id: str, adapter) -> Dict[str, str]:
-        """Persist links to the database. Returns a URL → link_id map."""
+        """Upsert links with one set-based statement. Returns a URL → link_id map.
+
+        Relies on the unique index on ``(document_id, url)`` (migration 032). If
+        the batch is rejected (e.g. one malformed row), links are retried one by
+        one so a single bad link does not drop the rest.
+        """
         if not links or not self.database_service:
             return {}
 
-        link_id_map: Dict[str, str] = {}
+        # ON CONFLICT cannot touch the same row twice in one statement: last occurrence wins
+        rows: Dict[str, Dict[str, Any]] = {}
+        for link in links:
+            url = link.get("url")
+            if url:
+                rows[url] = self._link_row(link)
+        if not rows:
+            return {}
+
+        try:
+            link_id_map = await self._upsert_links(document_id, list(rows.values()))
+        except Exception as exc:
+            adapter.warning("Bulk link upsert failed (%s) - retrying %d links individually", exc, len(rows))
+            link_id_map = {}
+            for row in rows.values():
+                try:
+                    link_id_map.update(await self._upsert_links(document_id, [row]))
+                except Exception as row_exc:
+                    adapter.warning("Failed to persist link %s: %s", row["url"], row_exc)
 
         for link in links:
-            try:
-                url = link.get("url")
-                if not url:
-                    continue
-
-                link_payload = {
-                    "document_id": document_id,
-                    "url": url,
-                    "description": link.get("description"),
-                    "link_type": link.get("link_type", "external"),
-                    "link_category": link.get("link_category", "external"),
-                    "page_number": link.get("page_number"),
-                    "position_data": json.dumps(link.get("position_data") or {}),
-                    "confidence_score": link.get("confidence_score", 0.5),
-                    "manufacturer_id": link.get("manufacturer_id"),
-                    "series_id": link.get("series_id"),
-                    "related_error_codes": link.get("related_error_codes") or [],
-                    # Phase 5: Context extraction fields
-                    "context_description": link.get("context_description"),
-                    "related_chunks": link.get("related_chunks", []),
-                    "metadata": json.dumps(
-                        {
-                            **(link.get("scraped_metadata") or {}),
-                            "scrape_status": link.get("scrape_status", "pending"),
-                            "scraped_at": link.get("scraped_at"),
-                        }
-                    ),
-                }
+            link_id = link_id_map.get(link.get("url"))
+            if link_id:
+                link["id"] = link_id
 
-                existing_rows = await self.database_service.execute_query(
-                    "SELECT id FROM krai_content.links WHERE document_id = $1 AND url = $2 LIMIT 1",
-                    [document_id, url],
-                )
-                existing_id = existing_rows[0].get("id") if existing_rows else None
-
-                if existing_id:
-                    update_rows = await self.database_service.execute_query(
-                        """
-                        UPDATE krai_content.links
-                        SET
-                            description = $2,
-                            link_type = $3,
-                            link_category = $4,
-                            page_number = $5,
-                            position_data = $6::jsonb,
-                            confidence_score = $7,
-                            manufacturer_id = $8,
-                            series_id = $9,
-                            related_error_codes = $10::text[],
-                            context_description = $11,
-                            related_chunks = $12::uuid[],
-                            metadata = $13::jsonb,
-                            updated_at = NOW()
-                        WHERE id = $1
-                        RETURNING id
-                        """.strip(),
-                        [
-                            str(existing_id),
-                            link_payload["description"],
-                            link_payload["link_type"],
-                            link_payload["link_category"],
-                            link_payload["page_number"],
-                            link_payload["position_data"],
-                            link_payload["confidence_score"],
-                            link_payload["manufacturer_id"],
-                            link_payload["series_id"],
-                            link_payload["related_error_codes"],
-                            link_payload["context_description"],
-                            link_payload["related_chunks"],
-                            link_payload["metadata"],
-                        ],
-                    )
-                    link_id = update_rows[0].get("id") if update_rows else str(existing_id)
-                else:
-                    insert_rows = await self.database_service.execute_query(
-                        """
-                        INSERT INTO krai_content.links
-                            (document_id, url, description, link_type, link_category, page_number,
-                             position_data, confidence_score, manufacturer_id, series_id,
-                             related_error_codes, context_description, related_chunks, metadata)
-                        VALUES
-                            ($1::uuid, $2, $3, $4, $5, $6, $7::jsonb, $8, $9, $10,
-                             $11::text[], $12, $13::uuid[], $14::jsonb)
-                        RETURNING id
-                        """.strip(),
-                        [
-                            document_id,
-                            url,
-                            link_payload["description"],
-                            link_payload["link_type"],
-                            link_payload["link_category"],
-                            link_payload["page_number"],
-                            link_payload["position_data"],
-                            link_payload["confidence_score"],
-                            link_payload["manufacturer_id"],
-                            link_payload["series_id"],
-                            link_payload["related_error_codes"],
-                            link_payload["context_description"],
-                            link_payload["related_chunks"],
-                            link_payload["metadata"],
-                        ],
-                    )
-                    link_id = insert_rows[0].get("id") if insert_rows else None
+        return link_id_map
 
-                if link_id:
-                    link_id_map[url] = str(link_id)
-                    link["id"] = str(link_id)
+    @staticmethod
+    def _link_row(link: Dict) -> Dict[str, Any]:
+        return {
+            "url": link.get("url"),
+            "description": link.get("description"),
+            "link_type": link.get("link_type", "external"),
+            "link_category": link.get("link_category", "external"),
+            "page_number": link.get("page_number"),
+            "position_data": json.dumps(link.get("position_data") or {}),
+            "confidence_score": link.get("confidence_score", 0.5),
+            "manufacturer_id": link.get("manufacturer_id"),
+            "series_id": link.get("series_id"),
+            "related_error_codes": json.dumps(link.get("related_error_codes") or []),
+            # Phase 5: Context extraction fields
+            "context_description": link.get("context_description"),
+            "related_chunks": json.dumps([str(c) for c in link.get("related_chunks") or []]),
+            "metadata": json.dumps(
+                {
+                    **(link.get("scraped_metadata") or {}),
+                    "scrape_status": link.get("scrape_status", "pending"),
+                    "scraped_at": link.get("scraped_at"),
+                }
+            ),
+        }
 
-            except Exception as exc:
-                adapter.warning("Failed to persist link %s: %s", link.get("url"), exc)
+    async def _upsert_links(self, document_id: str, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        """INSERT ... SELECT FROM unnest(...) ON CONFLICT (document_id, url) DO UPDATE for ``rows``.
 
-        return link_id_map
+        Per-row arrays travel as jsonb because unnest() would flatten text[][].
+        """
+        result = await self.database_service.execute_query(
+            """
+            INSERT INTO krai_content.links
+                (document_id, url, description, link_type, link_category, page_number,
+                 position_data, confidence_score, manufacturer_id, series_id,
+                 related_error_codes, context_description, related_chunks, metadata)
+            SELECT
+                $1::uuid, r.url, r.description, r.link_type, r.link_category, r.page_number,
+                r.position_data, r.confidence_score, r.manufacturer_id, r.series_id,
+                ARRAY(SELECT jsonb_array_elements_text(r.related_error_codes)),
+                r.context_description,
+                ARRAY(SELECT jsonb_array_elements_text(r.related_chunks))::uuid[],
+                r.metadata
+            FROM unnest(
+                $2::text[], $3::text[], $4::text[], $5::text[], $6::integer[], $7::jsonb[],
+                $8::float8[], $9::uuid[], $10::uuid[], $11::jsonb[], $12::text[], $13::jsonb[], $14::jsonb[]
+            ) AS r(url, description, link_type, link_category, page_number, position_data,
+                   confidence_score, manufacturer_id, series_id, related_error_codes,
+                   context_description, related_chunks, metadata)
+            ON CONFLICT (document_id, url) DO UPDATE SET
+                description = EXCLUDED.description,
+                link_type = EXCLUDED.link_type,
+                link_category = EXCLUDED.link_category,
+                page_number = EXCLUDED.page_number,
+                position_data = EXCLUDED.position_data,
+                confidence_score = EXCLUDED.confidence_score,
+                manufacturer_id = EXCLUDED.manufacturer_id,
+                series_id = EXCLUDED.series_id,
+                related_error_codes = EXCLUDED.related_error_codes,
+                context_description = EXCLUDED.context_description,
+                related_chunks = EXCLUDED.related_chunks,
+                metadata = EXCLUDED.metadata,
+                updated_at = NOW()
+            RETURNING url, id
+            """.strip(),
+            [
+                document_id,
+                *([row[column] for row in rows] for column in self._LINK_COLUMNS),
+            ],
+        )
+        return {row["url"]: str(row["id"]) for row in result or []}
 
     async def _save_videos_to_db(self, videos: List[Dict], link_id_map: Dict[str, str], adapter):
-        """Persist associated videos to the database."""
+        """Upsert associated videos, one statement per dedup key (YouTube id or URL)."""
         if not videos or not self.database_service:
             return
 
+        groups: Dict[str, Dict[Any, Dict[str, Any]]] = {"youtube": {}, "url": {}, "plain": {}}
         for video in videos:
-            try:
-                video_url = video.get("source_url") or video.get("url") or video.get("video_url")
-                link_id = link_id_map.get(video_url) if video_url else video.get("link_id")
-
-                if not link_id:
-                    continue
-
-                video_payload = {
-                    "link_id": link_id,
-                    "document_id": video.get("document_id"),
-                    "youtube_id": video.get("youtube_id"),
-                    "title": video.get("title"),
-                    "description": video.get("description"),
-                    "thumbnail_url": video.get("thumbnail_url"),
-                    "duration": video.get("duration"),
-                    "platform": video.get("link_category") or video.get("platform") or "youtube",
-                    "video_url": video_url,
-                    "metadata": json.dumps(video.get("metadata") or {}),
-                    "manufacturer_id": video.get("manufacturer_id"),
-                    "series_id": video.get("series_id"),
-                    # Phase 5: Context extraction fields
-                    "context_description": video.get("context_description"),
-                    "page_number": video.get("page_number"),
-                    "related_products": video.get("related_products", []),
-                    "related_chunks": video.get("related_chunks", []),
-                }
-
-                existing: List[Dict] = []
-                if video_payload["youtube_id"]:
-                    existing = await self.database_service.execute_query(
-                        "SELECT id FROM krai_content.videos WHERE youtube_id = $1 LIMIT 1",
-                        [video_payload["youtube_id"]],
-                    )
-                elif video_payload["video_url"]:
-                    existing = await self.database_service.execute_query(
-                        """
-                        SELECT id
-                        FROM krai_content.videos
-                        WHERE video_url = $1 AND youtube_id IS NULL
-                        LIMIT 1
-                        """.strip(),
-                        [video_payload["video_url"]],
-                    )
-
-                if existing:
-                    await self.database_service.execute_query(
-                        """
-                        UPDATE krai_content.videos
-                        SET
-                            link_id = $2,
-                            document_id = $3,
-                            youtube_id = $4,
-                            platform = $5,
-                            video_url = $6,
-                            title = $7,
-                            description = $8,
-                            thumbnail_url = $9,
-                            duration = $10,
-                            manufacturer_id = $11,
-                            series_id = $12,
-                            metadata = $13::jsonb,
-                            context_description = $14,
-                            related_products = $15::text[],
-                            related_chunks = $16::uuid[],
-                            page_number = $17,
-                            updated_at = NOW()
-                        WHERE id = $1
-                        """.strip(),
-                        [
-                            str(existing[0]["id"]),
-                            link_id,
-                            video_payload["document_id"],
-                            video_payload["youtube_id"],
-                            video_payload["platform"],
-                            video_payload["video_url"],
-                            video_payload["title"],
-                            video_payload["description"],
-                            video_payload["thumbnail_url"],
-                            video_payload["duration"],
-                            video_payload["manufacturer_id"],
-                            video_payload["series_id"],
-                            video_payload["metadata"],
-                            video_payload["context_description"],
-                            video_payload["related_products"],
-                            video_payload["related_chunks"],
-                            video_payload["page_number"],
-                        ],
-                    )
-                    continue
-
-                await self.database_service.execute_query(
-                    """
-                    INSERT INTO krai_content.videos
-                        (link_id, document_id, youtube_id, platform, video_url, title, description, thumbnail_url,
-                         duration, manufacturer_id, series_id, metadata, context_description,
-                         related_products, related_chunks, page_number)
-                    VALUES
-                        ($1::uuid, $2::uuid, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12::jsonb, $13,
-                         $14::text[], $15::uuid[], $16)
-                    """.strip(),
-                    [
-                        link_id,
-                        video_payload["document_id"],
-                        video_payload["youtube_id"],
-                        video_payload["platform"],
-                        video_payload["video_url"],
-                        video_payload["title"],
-                        video_payload["description"],
-                        video_payload["thumbnail_url"],
-                        video_payload["duration"],
-                        video_payload["manufacturer_id"],
-                        video_payload["series_id"],
-                        video_payload["metadata"],
-                        video_payload["context_description"],
-                        video_payload["related_products"],
-                        video_payload["related_chunks"],
-                        video_payload["page_number"],
-                    ],
-                )
+            video_url = video.get("source_url") or video.get("url") or video.get("video_url")
+            link_id = link_id_map.get(video_url) if video_url else video.get("link_id")
+            if not link_id:
+                continue
 
+            row = {
+                "link_id": link_id,
+                "document_id": video.get("document_id"),
+                "youtube_id": video.get("youtube_id"),
+                "title": video.get("title"),
+                "description": video.get("description"),
+                "thumbnail_url": video.get("thumbnail_url"),
+                "duration": video.get("duration"),
+                "platform": video.get("link_category") or video.get("platform") or "youtube",
+                "video_url": video_url,
+                "metadata": json.dumps(video.get("metadata") or {}),
+                "manufacturer_id": video.get("manufacturer_id"),
+                "series_id": video.get("series_id"),
+                # Phase 5: Context extraction fields
+                "context_description": video.get("context_description"),
+                "page_number": video.get("page_number"),
+                "related_products": json.dumps(video.get("related_products") or []),
+                "related_chunks": json.dumps([str(c) for c in video.get("related_chunks") or []]),
+            }
+            if row["youtube_id"]:
+                groups["youtube"][row["youtube_id"]] = row
+            elif row["video_url"]:
+                groups["url"][row["video_url"]] = row
+            else:
+                groups["plain"][id(video)] = row
+
+        for group, keyed_rows in groups.items():
+            if not keyed_rows:
+                continue
+            rows = list(keyed_rows.values())
+            try:
+                await self._upsert_videos(rows, self._VIDEO_CONFLICT_TARGETS.get(group))
             except Exception as exc:
-                adapter.warning("Failed to persist video %s: %s", video.get("title"), exc)
+                adapter.warning("Bulk video upsert failed (%s) - retrying %d videos individually", exc, len(rows))
+                for row in rows:
+                    try:
+                        await self._upsert_videos([row], self._VIDEO_CONFLICT_TARGETS.get(group))
+                    except Exception as row_exc:
+                        adapter.warning("Failed to persist video %s: %s", row.get("title"), row_exc)
+
+    async def _upsert_videos(self, rows: List[Dict[str, Any]], conflict_target: Optional[str]) -> None:
+        conflict = ""
+        if conflict_target:
+            conflict = f"""
+            ON CONFLICT {conflict_target} DO UPDATE SET
+                link_id = EXCLUDED.link_id,
+                document_id = EXCLUDED.document_id,
+                youtube_id = EXCLUDED.youtube_id,
+                platform = EXCLUDED.platform,
+                video_url = EXCLUDED.video_url,
+                title = EXCLUDED.title,
+                description = EXCLUDED.description,
+                thumbnail_url = EXCLUDED.thumbnail_url,
+                duration = EXCLUDED.duration,
+                manufacturer_id = EXCLUDED.manufacturer_id,
+                series_id = EXCLUDED.series_id,
+                metadata = EXCLUDED.metadata,
+                context_description = EXCLUDED.context_description,
+                related_products = EXCLUDED.related_products,
+                related_chunks = EXCLUDED.related_chunks,
+                page_number = EXCLUDED.page_number,
+                updated_at = NOW()"""
+        await self.database_service.execute_query(
+            f"""
+            INSERT INTO krai_content.videos
+                (link_id, document_id, youtube_id, platform, video_url, title, description, thumbnail_url,
+                 duration, manufacturer_id, series_id, metadata, context_description,
+                 related_products, related_chunks, page_number)
+            SELECT
+                r.link_id, r.document_id, r.youtube_id, r.platform, r.video_url, r.title, r.description,
+                r.thumbnail_url, r.duration, r.manufacturer_id, r.series_id, r.metadata, r.context_description,
+                ARRAY(SELECT jsonb_array_elements_text(r.related_products)),
+                ARRAY(SELECT jsonb_array_elements_text(r.related_chunks))::uuid[],
+                r.page_number
+            FROM unnest(
+                $1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::text[], $6::text[], $7::text[], $8::text[],
+                $9::integer[], $10::uuid[], $11::uuid[], $12::jsonb[], $13::text[], $14::jsonb[], $15::jsonb[],
+                $16::integer[]
+            ) AS r(link_id, document_id, youtube_id, platform, video_url, title, description, thumbnail_url,
+                   duration, manufacturer_id, series_id, metadata, context_description,
+                   related_products, related_chunks, page_number){conflict}
+            """.strip(),
+            [[row[column] for row in rows] for column in self._VIDEO_COLUMNS],
+        )
 
     async def _extract_link_contexts(
         self, 
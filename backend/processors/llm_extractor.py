@@ -9,6 +9,9 @@ from typing import List, Dict, Optional, Any
 import requests
 from pydantic import ValidationError
 
+from backend.services.model_result_cache import get_model_cache
+from backend.services.ollama_scheduler import get_ollama_scheduler
+
 from .logger import get_logger
 from .models import ExtractedProduct
 
@@ -127,6 +130,15 @@ JSON:"""
         return prompt
     
     def _call_ollama(self, prompt: str) -> str:
+        """Call Ollama API, reusing cached responses for identical model + prompt"""
+        return get_model_cache().get_or_compute(
+            "llm_extractor",
+            self.model_name,
+            prompt,
+            lambda: self._request_ollama(prompt),
+        )
+    
+    def _request_ollama(self, prompt: str) -> str:
         """Call Ollama API (supports both old and new API)"""
         
         # Try new API first (/api/chat)
@@ -148,7 +160,9 @@ JSON:"""
         }
         
         try:
-            response = requests.post(url_chat, json=payload_chat, timeout=300)
+            with get_ollama_scheduler().slot(self.model_name) as call:
+                response = requests.post(url_chat, json=payload_chat, timeout=300)
+                call.observe(response)
             response.raise_for_status()
             result = response.json()
             llm_response = result.get("message", {}).get("content", "")
@@ -176,7 +190,9 @@ JSON:"""
                     }
                 }
                 
-                response = requests.post(url_generate, json=payload_generate, timeout=300)
+                with get_ollama_scheduler().slot(self.model_name) as call:
+                    response = requests.post(url_generate, json=payload_generate, timeout=300)
+                    call.observe(response)
                 response.raise_for_status()
                 result = response.json()
                 llm_response = result.get("response", "")
@@ -7,14 +7,65 @@ Extracts error codes, version numbers, and other metadata from documents.
 Uses pattern matching and AI for intelligent extraction.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
 from backend.core.base_processor import BaseProcessor, Stage, ProcessingError, ProcessingContext, ProcessingResult
 from backend.core.data_models import ErrorCodeModel
-from .error_code_extractor import ErrorCodeExtractor
+from .error_code_extractor import ErrorCodeExtractor, find_chunk_for_error_code
 from .version_extractor import VersionExtractor
 
+# Chunker overlap is ~100 chars; look a bit further back to be safe
+MAX_CHUNK_OVERLAP = 1000
+MIN_CHUNK_OVERLAP = 20
+
+
+def _chunk_page(chunk: Dict[str, Any]) -> int:
+    return chunk.get("page_start") or chunk.get("page_number") or 1
+
+
+def _chunk_text(chunk: Dict[str, Any]) -> str:
+    return chunk.get("text_chunk") or chunk.get("content") or chunk.get("text") or ""
+
+
+def _page_number(error_code: Any) -> int:
+    page_num = getattr(error_code, 'page_number', None)
+    return int(page_num) if page_num is not None else 1
+
+
+def chunk_overlap_length(previous: str, current: str) -> int:
+    """Length of the prefix of ``current`` that repeats the end of ``previous``.
+
+    The chunker starts each chunk with the tail of the one before it; this
+    finds the longest such repeat (at least ``MIN_CHUNK_OVERLAP`` chars).
+    """
+    tail = previous.rstrip()[-MAX_CHUNK_OVERLAP:]
+    if len(current) < MIN_CHUNK_OVERLAP or len(tail) < MIN_CHUNK_OVERLAP:
+        return 0
+    probe = current[:MIN_CHUNK_OVERLAP]
+    pos = tail.find(probe)
+    while pos != -1:
+        if current.startswith(tail[pos:]):
+            return len(tail) - pos
+        pos = tail.find(probe, pos + 1)
+    return 0
+
+
+def stitch_chunk_pages(chunks: List[Dict[str, Any]]) -> Dict[int, str]:
+    """Rebuild per-page text from chunks, dropping the overlap between neighbours."""
+    ordered = sorted(chunks, key=lambda c: (int(_chunk_page(c)), c.get("chunk_index") or 0))
+    pages: Dict[int, List[str]] = {}
+    previous = ""
+    for chunk in ordered:
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        fresh = text[chunk_overlap_length(previous, text):]
+        previous = text
+        if fresh.strip():
+            pages.setdefault(int(_chunk_page(chunk)), []).append(fresh)
+    return {page: "\n\n".join(parts) for page, parts in pages.items()}
+
 
 class MetadataProcessorAI(BaseProcessor):
     """
@@ -69,10 +120,12 @@ class MetadataProcessorAI(BaseProcessor):
                     manufacturer = "AUTO"
 
                 adapter.info("Extracting error codes (manufacturer: %s)...", manufacturer)
+                page_texts = getattr(context, "page_texts", None)
                 error_codes = await self._extract_error_codes_from_chunks(
                     document_id=context.document_id,
                     manufacturer=manufacturer,
                     adapter=adapter,
+                    page_texts=page_texts if isinstance(page_texts, dict) else None,
                 )
 
                 if error_codes:
@@ -93,7 +146,6 @@ class MetadataProcessorAI(BaseProcessor):
 
                 version_info = None
                 version_text = None
-                page_texts = getattr(context, "page_texts", None)
                 if isinstance(page_texts, dict) and page_texts:
                     first_pages = sorted(page_texts.keys())[:5]
                     version_text = "\n\n".join(
@@ -156,42 +208,57 @@ class MetadataProcessorAI(BaseProcessor):
         
         return "AUTO"
 
-    async def _extract_error_codes_from_chunks(self, document_id: str, manufacturer: str, adapter) -> List:
-        """Extract error codes by scanning document chunks."""
-        if not self.database_service or not hasattr(self.database_service, "get_chunks_by_document"):
+    async def _extract_error_codes_from_chunks(
+        self,
+        document_id: str,
+        manufacturer: str,
+        adapter,
+        page_texts: Optional[Dict[int, str]] = None,
+    ) -> List:
+        """Extract error codes page by page and link each code to its chunk.
+
+        Every page is scanned exactly once: from ``page_texts`` when the text
+        stage provided them, otherwise from the document's chunks stitched back
+        together with the overlap between consecutive chunks removed.
+        """
+        chunks: List[Dict[str, Any]] = []
+        if self.database_service and hasattr(self.database_service, "get_chunks_by_document"):
+            rows = await self.database_service.get_chunks_by_document(document_id) or []
+            chunks = [dict(row) if not isinstance(row, dict) else row for row in rows]
+        elif not page_texts:
             adapter.warning("Chunk access unavailable - cannot extract error codes")
             return []
 
-        chunks = await self.database_service.get_chunks_by_document(document_id)
-        if not chunks:
-            adapter.warning("No chunks found for error code extraction")
-            return []
+        if not page_texts:
+            if not chunks:
+                adapter.warning("No chunks found for error code extraction")
+                return []
+            page_texts = stitch_chunk_pages(chunks)
+
+        chunks_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        for chunk in chunks:
+            first = int(_chunk_page(chunk))
+            last = int(chunk.get("page_end") or first)
+            for page in range(first, max(first, last) + 1):
+                chunks_by_page.setdefault(page, []).append(chunk)
 
         extracted = []
         seen_codes = set()
-        for chunk in chunks:
-            chunk_dict = dict(chunk) if not isinstance(chunk, dict) else chunk
-            text = (
-                chunk_dict.get("text_chunk")
-                or chunk_dict.get("content")
-                or chunk_dict.get("text")
-                or ""
-            )
+        for page_number in sorted(page_texts):
+            text = page_texts[page_number]
             if not text:
                 continue
-
-            page_number = chunk_dict.get("page_start") or chunk_dict.get("page_number") or 1
-            chunk_codes = self.error_code_extractor.extract_from_text(
+            page_codes = self.error_code_extractor.extract_from_text(
                 text=text,
                 page_number=int(page_number),
                 manufacturer_name=manufacturer if manufacturer != "AUTO" else None,
             )
-            for code in chunk_codes:
+            for code in page_codes:
                 key = getattr(code, "error_code", None)
                 if not key or key in seen_codes:
                     continue
-                # Preserve chunk linkage where possible.
-                setattr(code, "chunk_id", chunk_dict.get("id"))
+                chunk_id = find_chunk_for_error_code(key, int(page_number), chunks_by_page.get(int(page_number), []))
+                setattr(code, "chunk_id", chunk_id or find_chunk_for_error_code(key, int(page_number), chunks))
                 seen_codes.add(key)
                 extracted.append(code)
 
@@ -204,71 +271,97 @@ class MetadataProcessorAI(BaseProcessor):
         manufacturer: str,
         adapter
     ) -> int:
-        """Save error codes to database via DatabaseAdapter or Supabase client. Fails or logs when neither is available."""
+        """Save error codes in one bulk insert (DatabaseAdapter) or one client insert. Fails or logs when neither is available."""
         if not self.database_service:
             adapter.error("Cannot save error codes: no database_service available")
             return 0
 
+        has_bulk = hasattr(self.database_service, 'create_error_codes_bulk')
         has_adapter = hasattr(self.database_service, 'create_error_code')
         has_client = hasattr(self.database_service, 'client') and self.database_service.client is not None
 
-        if not has_adapter and not has_client:
+        if not has_bulk and not has_adapter and not has_client:
             adapter.error(
                 "Cannot save error codes: neither DatabaseAdapter (create_error_code) nor Supabase client available"
             )
             return 0
 
-        saved_count = 0
-        for error_code in error_codes:
-            try:
-                code_value = getattr(error_code, 'error_code', None) or ''
-                page_num = getattr(error_code, 'page_number', None)
-                page_num = page_num if page_num is not None else 1
-
-                if has_adapter:
-                    model = ErrorCodeModel(
-                        document_id=str(document_id),
-                        error_code=str(code_value),
-                        error_description=getattr(error_code, 'error_description', None) or 'No description available',
-                        solution_customer_text=getattr(error_code, 'solution_customer_text', None),
-                        solution_agent_text=getattr(error_code, 'solution_agent_text', None),
-                        solution_technician_text=getattr(error_code, 'solution_technician_text', None),
-                        page_number=int(page_num),
-                        confidence_score=float(getattr(error_code, 'confidence', 0) or 0),
-                        extraction_method=getattr(error_code, 'extraction_method', None) or 'pattern',
-                        requires_parts=bool(getattr(error_code, 'requires_parts', False)),
-                        severity_level=str(getattr(error_code, 'severity_level', None) or 'low'),
-                        parent_code=getattr(error_code, 'parent_code', None),
-                        is_category=bool(getattr(error_code, 'is_category', False)),
-                    )
+        if has_bulk or has_adapter:
+            models = []
+            for error_code in error_codes:
+                try:
+                    models.append(self._to_error_code_model(error_code, document_id))
+                except Exception as e:
+                    adapter.warning("Skipping invalid error code %s: %s", getattr(error_code, 'error_code', None), e)
+            if not models:
+                return 0
+
+            if has_bulk:
+                try:
+                    inserted = await self.database_service.create_error_codes_bulk(str(document_id), models)
+                    return len(inserted)
+                except Exception as e:
+                    adapter.warning("Bulk error code insert failed: %s", e)
+                    return 0
+
+            saved_count = 0
+            for model in models:
+                try:
                     await self.database_service.create_error_code(model)
                     saved_count += 1
-                elif has_client:
-                    error_data = {
-                        'document_id': str(document_id),
-                        'error_code': code_value,
-                        'error_description': getattr(error_code, 'error_description', None),
-                        'solution_customer_text': getattr(error_code, 'solution_customer_text', None),
-                        'solution_agent_text': getattr(error_code, 'solution_agent_text', None),
-                        'solution_technician_text': getattr(error_code, 'solution_technician_text', None),
-                        'page_number': page_num,
-                        'confidence_score': getattr(error_code, 'confidence', None),
-                        'extraction_method': getattr(error_code, 'extraction_method', None),
-                        'requires_parts': getattr(error_code, 'requires_parts', False),
-                        'severity_level': getattr(error_code, 'severity_level', None),
-                        'chunk_id': getattr(error_code, 'chunk_id', None),
-                        'product_id': getattr(error_code, 'product_id', None),
-                        'video_id': getattr(error_code, 'video_id', None),
-                        'parent_code': getattr(error_code, 'parent_code', None),
-                        'is_category': getattr(error_code, 'is_category', False),
-                    }
-                    result = self.database_service.client.table('error_codes').insert(error_data).execute()
-                    if result.data:
-                        saved_count += 1
-            except Exception as e:
-                adapter.warning("Failed to save error code %s: %s", getattr(error_code, 'error_code', None), e)
+                except Exception as e:
+                    adapter.warning("Failed to save error code %s: %s", model.error_code, e)
+            return saved_count
+
+        rows = [
+            {
+                'document_id': str(document_id),
+                'error_code': getattr(error_code, 'error_code', None) or '',
+                'error_description': getattr(error_code, 'error_description', None),
+                'solution_customer_text': getattr(error_code, 'solution_customer_text', None),
+                'solution_agent_text': getattr(error_code, 'solution_agent_text', None),
+                'solution_technician_text': getattr(error_code, 'solution_technician_text', None),
+                'page_number': _page_number(error_code),
+                'confidence_score': getattr(error_code, 'confidence', None),
+                'extraction_method': getattr(error_code, 'extraction_method', None),
+                'requires_parts': getattr(error_code, 'requires_parts', False),
+                'severity_level': getattr(error_code, 'severity_level', None),
+                'chunk_id': getattr(error_code, 'chunk_id', None),
+                'product_id': getattr(error_code, 'product_id', None),
+                'video_id': getattr(error_code, 'video_id', None),
+                'parent_code': getattr(error_code, 'parent_code', None),
+                'is_category': getattr(error_code, 'is_category', False),
+            }
+            for error_code in error_codes
+        ]
+        if not rows:
+            return 0
+        try:
+            result = self.database_service.client.table('error_codes').insert(rows).execute()
+            return len(result.data or [])
+        except Exception as e:
+            adapter.warning("Failed to save %d error codes: %s", len(rows), e)
+            return 0
 
-        return saved_count
+    @staticmethod
+    def _to_error_code_model(error_code: Any, document_id: str) -> ErrorCodeModel:
+        chunk_id = getattr(error_code, 'chunk_id', None)
+        return ErrorCodeModel(
+            document_id=str(document_id),
+            chunk_id=str(chunk_id) if chunk_id else None,
+            error_code=str(getattr(error_code, 'error_code', None) or ''),
+            error_description=getattr(error_code, 'error_description', None) or 'No description available',
+            solution_customer_text=getattr(error_code, 'solution_customer_text', None),
+            solution_agent_text=getattr(error_code, 'solution_agent_text', None),
+            solution_technician_text=getattr(error_code, 'solution_technician_text', None),
+            page_number=_page_number(error_code),
+            confidence_score=float(getattr(error_code, 'confidence', 0) or 0),
+            extraction_method=getattr(error_code, 'extraction_method', None) or 'pattern',
+            requires_parts=bool(getattr(error_code, 'requires_parts', False)),
+            severity_level=str(getattr(error_code, 'severity_level', None) or 'low'),
+            parent_code=getattr(error_code, 'parent_code', None),
+            is_category=bool(getattr(error_code, 'is_category', False)),
+        )
     
     async def _update_document_version(self, document_id: str, version_info: str, adapter):
         """Update document with version information via DatabaseAdapter or Supabase client. Fails or logs when neither is available."""
@@ -0,0 +1,147 @@
+"""
+Near-Duplicate Chunk Index - cross-document MinHash/LSH index
+
+Persists MinHash signatures and LSH band hashes of embedded chunks in
+krai_intelligence.chunk_minhash (migration 037). Before a chunk is embedded
+the embedding stage asks the index for an already embedded chunk whose
+estimated Jaccard similarity reaches the threshold; if one exists, the new
+chunk is stored as a reference (chunks.duplicate_of) without its own
+embedding, so it costs no model call, no vector-index entry and cannot show
+up as a second search hit.
+
+Only chunks that were embedded themselves are registered, so every
+candidate the index returns has an embedding and boilerplate repeated across
+hundreds of manuals stays a single index entry.
+
+Configuration (env):
+    NEAR_DUPLICATE_CHUNKS_ENABLED  - "false" disables the index (default: true)
+    NEAR_DUPLICATE_THRESHOLD       - minimum estimated Jaccard similarity (default: 0.9)
+    NEAR_DUPLICATE_MIN_SHINGLES    - shorter chunks are never deduplicated (default: 20)
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.utils.minhash import MinHasher, estimate_jaccard, shingles
+
+logger = logging.getLogger("krai.near_duplicates")
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH lookup and registration of chunks against the database."""
+
+    def __init__(self, database_adapter, threshold: Optional[float] = None, min_shingles: Optional[int] = None):
+        self.database_adapter = database_adapter
+        self.enabled = os.getenv("NEAR_DUPLICATE_CHUNKS_ENABLED", "true").lower() == "true"
+        self.threshold = threshold if threshold is not None else float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+        self.min_shingles = (
+            min_shingles if min_shingles is not None else int(os.getenv("NEAR_DUPLICATE_MIN_SHINGLES", "20"))
+        )
+        self.hasher = MinHasher()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Signature of ``text``, or None when it is too short to deduplicate safely."""
+        if len(shingles(text, self.hasher.shingle_size)) < self.min_shingles:
+            return None
+        return self.hasher.signature(text)
+
+    async def find_canonical(self, chunks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Find an embedded near-duplicate for each chunk of a batch.
+
+        Args:
+            chunks: Chunk dicts with ``chunk_id`` and ``text``
+
+        Returns:
+            ``{chunk_id: {"canonical_id": ..., "similarity": ...}}`` for chunks
+            with a match; chunks without one are absent
+        """
+        if not (self.enabled and self.database_adapter):
+            return {}
+
+        pending = {}
+        for chunk in chunks:
+            chunk_id = chunk.get("chunk_id")
+            signature = self.signature(chunk.get("text") or "") if chunk_id else None
+            if signature is not None:
+                pending[str(chunk_id)] = (signature, set(self.hasher.band_hashes(signature)))
+        if not pending:
+            return {}
+
+        all_bands = sorted(set().union(*(bands for _, bands in pending.values())))
+        try:
+            rows = await self.database_adapter.execute_query(
+                """
+                SELECT chunk_id, signature, bands
+                FROM krai_intelligence.chunk_minhash
+                WHERE bands && $1::bigint[]
+                  AND chunk_id <> ALL($2::uuid[])
+                """.strip(),
+                [all_bands, list(pending)],
+            )
+        except Exception as exc:
+            logger.warning("Near-duplicate lookup failed, embedding all chunks: %s", exc)
+            return {}
+
+        candidates = [
+            (str(row["chunk_id"]), np.asarray(row["signature"], dtype=np.uint32), set(row["bands"]))
+            for row in rows or []
+        ]
+        matches = {}
+        for chunk_id, (signature, bands) in pending.items():
+            best_id, best_similarity = None, 0.0
+            for candidate_id, candidate_signature, candidate_bands in candidates:
+                if not bands & candidate_bands:
+                    continue
+                similarity = estimate_jaccard(signature, candidate_signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = candidate_id, similarity
+            if best_id and best_similarity >= self.threshold:
+                matches[chunk_id] = {"canonical_id": best_id, "similarity": round(best_similarity, 3)}
+        return matches
+
+    async def store_reference(self, chunk_id: str, canonical_id: str, similarity: float) -> bool:
+        """Mark a chunk as a near-duplicate of ``canonical_id`` (no embedding of its own)."""
+        try:
+            await self.database_adapter.execute_query(
+                """
+                UPDATE krai_intelligence.chunks
+                SET
+                    duplicate_of = $2::uuid,
+                    embedding = NULL,
+                    metadata = COALESCE(metadata, '{}'::jsonb) || $3::jsonb,
+                    updated_at = NOW()
+                WHERE id = $1::uuid
+                """.strip(),
+                [str(chunk_id), str(canonical_id), json.dumps({"near_duplicate_similarity": similarity})],
+            )
+            return True
+        except Exception as exc:
+            logger.warning("Failed to store near-duplicate reference %s -> %s: %s", chunk_id, canonical_id, exc)
+            return False
+
+    async def register(self, chunk_id: str, text: str) -> bool:
+        """Add an embedded chunk to the index so later chunks can reference it."""
+        if not (self.enabled and self.database_adapter and chunk_id):
+            return False
+        signature = self.signature(text or "")
+        if signature is None:
+            return False
+        try:
+            await self.database_adapter.execute_query(
+                """
+                INSERT INTO krai_intelligence.chunk_minhash (chunk_id, signature, bands)
+                VALUES ($1::uuid, $2::bigint[], $3::bigint[])
+                ON CONFLICT (chunk_id) DO UPDATE
+                SET signature = EXCLUDED.signature, bands = EXCLUDED.bands
+                """.strip(),
+                [str(chunk_id), [int(value) for value in signature], self.hasher.band_hashes(signature)],
+            )
+            return True
+        except Exception as exc:
+            logger.warning("Failed to register chunk %s in near-duplicate index: %s", chunk_id, exc)
+            return False
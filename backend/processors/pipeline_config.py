@@ -34,12 +34,23 @@ class PipelineConfig:
         # Storage settings (MinIO/object-storage only)
         self.upload_images_to_storage = self._get_bool('UPLOAD_IMAGES_TO_STORAGE', False)
         self.upload_documents_to_storage = self._get_bool('UPLOAD_DOCUMENTS_TO_STORAGE', False)
+        
+        # Streaming page mode: text -> chunk -> persist -> embed in page windows
+        self.streaming_pages = self._get_bool('PIPELINE_STREAMING_PAGES', False)
+        self.stream_window_pages = self._get_int('PIPELINE_STREAM_WINDOW_PAGES', 25)
     
     def _get_bool(self, key: str, default: bool = False) -> bool:
         """Get boolean value from environment"""
         value = os.getenv(key, str(default)).lower()
         return value in ('true', '1', 'yes', 'on')
     
+    def _get_int(self, key: str, default: int) -> int:
+        """Get integer value from environment"""
+        try:
+            return int(os.getenv(key, str(default)))
+        except ValueError:
+            return default
+    
     def get_summary(self) -> Dict[str, Any]:
         """Get configuration summary"""
         return {
@@ -60,6 +71,10 @@ class PipelineConfig:
             'storage': {
                 'images_to_storage': self.upload_images_to_storage,
                 'documents_to_storage': self.upload_documents_to_storage,
+            },
+            'streaming': {
+                'pages': self.streaming_pages,
+                'window_pages': self.stream_window_pages,
             }
         }
 
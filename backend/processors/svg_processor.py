@@ -21,6 +21,8 @@ from PIL import Image
 from svglib.svglib import svg2rlg
 from reportlab.graphics import renderPM
 
+from backend.utils.drawing_clusters import cluster_drawings
+from backend.utils.memory_budget import MemoryBudget
 from backend.core.base_processor import BaseProcessor, Stage, ProcessingResult, ProcessingStatus, ProcessingError, ProcessingContext
 
 
@@ -57,6 +59,12 @@ class SVGProcessor(BaseProcessor):
         self.dpi = dpi
         self.max_dimension = max_dimension
         self.svg_inline_storage_threshold_kb = int(os.getenv('SVG_INLINE_STORAGE_THRESHOLD_KB', '100'))
+        # Figure clustering of get_drawings() output (sizes in PDF points)
+        self.cluster_gap = float(os.getenv('SVG_CLUSTER_GAP', '12'))
+        self.min_cluster_size = float(os.getenv('SVG_MIN_CLUSTER_SIZE', '32'))
+        self.max_clusters_per_page = int(os.getenv('SVG_MAX_CLUSTERS_PER_PAGE', '20'))
+        # Pages per convert/upload/queue window; 0 buffers the whole document
+        self.stream_window_pages = int(os.getenv('SVG_STREAM_WINDOW_PAGES', '20'))
         self._svg_workers = int(os.getenv('SVG_PROCESSING_WORKERS', str(min(8, os.cpu_count() or 4))))
         self._pymupdf_lock = threading.Lock()  # fitz.Document is not thread-safe across pages
         # Reduce svglib log noise (e.g. "Unsupported shape type Group for clipping" – we handle failure and use fallback)
@@ -108,7 +116,9 @@ class SVGProcessor(BaseProcessor):
                     "stage": self.get_stage().value,
                     "svgs_extracted": result_data.get("svgs_extracted", 0),
                     "svgs_converted": result_data.get("svgs_converted", 0),
-                    "images_queued": result_data.get("images_queued", 0)
+                    "images_queued": result_data.get("images_queued", 0),
+                    "peak_rss_mb": result_data.get("peak_rss_mb"),
+                    "backpressure_events": result_data.get("backpressure_events", 0),
                 }
             )
             
@@ -136,82 +146,116 @@ class SVGProcessor(BaseProcessor):
         
         # Open PDF document
         doc = fitz.open(pdf_path)
-        try:
-            # Extract SVGs from all pages
-            all_svgs = []
-            page_count = doc.page_count
-            for page_num, page in enumerate(doc):
-                # Fortschritt auf Seitenebene loggen, z. B. „Seite 10/1023“
-                if page_count:
-                    self.logger.info(
-                        "SVG processing page %s/%s for document %s",
-                        page_num + 1,
-                        page_count,
-                        document_id,
-                    )
-                page_svgs = self._extract_page_svgs(page, page_num + 1)
-                if page_svgs:
-                    all_svgs.extend(page_svgs)
-                    self.logger.debug(f"Extracted {len(page_svgs)} SVGs from page {page_num + 1}")
-
-            converted_count = 0
-            svg_storage_success_count = 0
-            vision_skip_count = 0
-            vision_enabled = bool(self.ai_service)
+        budget = MemoryBudget.from_env()
+        vision_enabled = bool(self.ai_service)
+        totals = {'extracted': 0, 'converted': 0, 'stored': 0, 'queued': 0, 'windows': 0}
 
-            def _process_single_svg(svg_data: Dict[str, Any]) -> Dict[str, Any]:
-                """Process one SVG: upload to storage + optional PNG conversion."""
-                svg_data['document_id'] = str(document_id)
-                storage_result = self._upload_svg_to_storage(svg_data)
-                svg_data.update(storage_result)
+        def _process_single_svg(svg_data: Dict[str, Any]) -> Dict[str, Any]:
+            """Process one SVG: upload to storage + optional PNG conversion."""
+            svg_data['document_id'] = str(document_id)
+            storage_result = self._upload_svg_to_storage(svg_data)
+            svg_data.update(storage_result)
 
-                if vision_enabled:
-                    png_bytes = self._convert_svg_to_png(svg_data['svg_content'])
-                    if not png_bytes and svg_data.get('bounding_box') and svg_data.get('page_number'):
-                        with self._pymupdf_lock:
-                            png_bytes = self._render_svg_region_with_pymupdf(doc, svg_data)
-                    if png_bytes:
-                        svg_data['png_bytes'] = png_bytes
-                        svg_data['image_type'] = 'vector_graphic'
-                        svg_data['has_png_derivative'] = True
-                    else:
-                        svg_data['has_png_derivative'] = False
-                        self.logger.info(
-                            "Skipping Vision AI for SVG without PNG derivative (document=%s, page=%s, file=%s)",
-                            document_id, svg_data.get('page_number'), svg_data.get('filename'),
-                        )
+            if vision_enabled:
+                png_bytes = self._convert_svg_to_png(svg_data['svg_content'])
+                if not png_bytes and svg_data.get('bounding_box') and svg_data.get('page_number'):
+                    with self._pymupdf_lock:
+                        png_bytes = self._render_svg_region_with_pymupdf(doc, svg_data)
+                if png_bytes:
+                    svg_data['png_bytes'] = png_bytes
+                    svg_data['image_type'] = 'vector_graphic'
+                    svg_data['has_png_derivative'] = True
                 else:
                     svg_data['has_png_derivative'] = False
+                    self.logger.info(
+                        "Skipping Vision AI for SVG without PNG derivative (document=%s, page=%s, file=%s)",
+                        document_id, svg_data.get('page_number'), svg_data.get('filename'),
+                    )
+            else:
+                svg_data['has_png_derivative'] = False
 
-                return svg_data
+            return svg_data
 
-            self.logger.info(
-                "Processing %d SVGs with %d parallel workers", len(all_svgs), self._svg_workers
-            )
+        try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=self._svg_workers) as executor:
-                all_svgs = list(executor.map(_process_single_svg, all_svgs))
+                window: List[Dict[str, Any]] = []
 
-            converted_count = sum(1 for s in all_svgs if s.get('has_png_derivative'))
-            svg_storage_success_count = sum(1 for s in all_svgs if s.get('svg_storage_url'))
-            vision_skip_count = len(all_svgs) - converted_count
+                def _flush_window() -> None:
+                    """Convert, upload and queue the buffered SVGs, then release them."""
+                    if window:
+                        processed = list(executor.map(_process_single_svg, window))
+                        totals['converted'] += sum(1 for s in processed if s.get('has_png_derivative'))
+                        totals['stored'] += sum(1 for s in processed if s.get('svg_storage_url'))
+                        totals['queued'] += self._queue_svg_images(document_id, processed, context)
+                        totals['windows'] += 1
+                        # Drop svg_content / png_bytes of this window before extracting more pages
+                        processed.clear()
+                        window.clear()
+                    budget.relieve()
 
-            queued_count = self._queue_svg_images(document_id, all_svgs, context)
+                # 0 = buffer the whole document (previous behaviour)
+                window_pages = self.stream_window_pages
+                pages_in_window = 0
+                page_count = doc.page_count
+                self.logger.info(
+                    "Processing SVGs with %d parallel workers (window: %s pages)",
+                    self._svg_workers,
+                    window_pages or "all",
+                )
+                for page_num, page in enumerate(doc):
+                    # Fortschritt auf Seitenebene loggen, z. B. „Seite 10/1023“
+                    if page_count:
+                        self.logger.info(
+                            "SVG processing page %s/%s for document %s",
+                            page_num + 1,
+                            page_count,
+                            document_id,
+                        )
+                    page_svgs = self._extract_page_svgs(page, page_num + 1)
+                    if page_svgs:
+                        window.extend(page_svgs)
+                        totals['extracted'] += len(page_svgs)
+                        self.logger.debug(f"Extracted {len(page_svgs)} SVGs from page {page_num + 1}")
+                    pages_in_window += 1
+
+                    over_ceiling = budget.over_ceiling()
+                    if over_ceiling:
+                        # Backpressure: flush early and shrink the following windows
+                        self.logger.info(
+                            "Window grew RSS by more than %.0f MB at page %s; flushing %d SVGs early",
+                            budget.ceiling_mb, page_num + 1, len(window),
+                        )
+                    if over_ceiling or (window_pages and pages_in_window >= window_pages):
+                        _flush_window()
+                        pages_in_window = 0
+                        window_pages = budget.next_window_pages(
+                            window_pages, self.stream_window_pages, over_ceiling
+                        )
+
+                _flush_window()
         finally:
             doc.close()
 
+        extracted = totals['extracted']
+        converted_count = totals['converted']
+        svg_storage_success_count = totals['stored']
+        queued_count = totals['queued']
         result_data = {
-            'svgs_extracted': len(all_svgs),
+            'svgs_extracted': extracted,
             'svgs_converted': converted_count,
             'images_queued': queued_count,
             'svg_storage_success': svg_storage_success_count,
-            'vision_skipped_due_to_missing_png': vision_skip_count,
-            'png_conversion_success_rate': converted_count / len(all_svgs) if all_svgs else 0,
-            'svg_storage_success_rate': svg_storage_success_count / len(all_svgs) if all_svgs else 0,
+            'vision_skipped_due_to_missing_png': extracted - converted_count,
+            'png_conversion_success_rate': converted_count / extracted if extracted else 0,
+            'svg_storage_success_rate': svg_storage_success_count / extracted if extracted else 0,
+            'stream_windows': totals['windows'],
+            **budget.report(),
         }
         
         self.logger.success(
-            f"SVG processing completed: {len(all_svgs)} extracted, "
-            f"{converted_count} converted, {queued_count} queued"
+            f"SVG processing completed: {extracted} extracted, "
+            f"{converted_count} converted, {queued_count} queued "
+            f"(peak RSS {result_data['peak_rss_mb']} MB)"
         )
         
         return result_data
@@ -235,26 +279,29 @@ class SVGProcessor(BaseProcessor):
             page_width = page_rect.width
             page_height = page_rect.height
             
-            # Method 1: Try to extract individual vector graphics through display list analysis
+            # Method 1: Group drawing operations into figures and export one SVG per figure
+            only_small_drawings = False
             try:
-                # Get the page's display list to analyze individual drawing operations
                 dl = page.get_drawings()
                 
-                if dl and len(dl) > 1:
-                    # Multiple drawing operations detected - extract individual graphics
-                    self.logger.debug(f"Page {page_number}: Found {len(dl)} drawing operations")
+                if dl:
+                    clusters = cluster_drawings(
+                        [tuple(drawing['rect']) for drawing in dl],
+                        page_rect=(page_rect.x0, page_rect.y0, page_rect.x1, page_rect.y1),
+                        gap=self.cluster_gap,
+                        min_size=self.min_cluster_size,
+                        max_clusters=self.max_clusters_per_page,
+                    )
+                    self.logger.debug(
+                        f"Page {page_number}: {len(dl)} drawing operations -> {len(clusters)} figure clusters"
+                    )
+                    # Rules, underlines and frames only: no figure, so no page-level export either
+                    only_small_drawings = not clusters
                     
-                    for i, drawing in enumerate(dl):
-                        # Extract bounding box for this drawing
-                        bbox = drawing['rect']  # PyMuPDF provides bounding box
-                        
-                        # Create a clip area for this specific graphic
-                        clip_area = fitz.Rect(bbox)
-                        
-                        # Extract SVG for this specific area
+                    for i, cluster in enumerate(clusters):
+                        bbox = fitz.Rect(cluster.rect)
                         try:
-                            # Create a temporary page with clipping to isolate this graphic
-                            svg_content = page.get_svg_image(clip=clip_area)
+                            svg_content = page.get_svg_image(clip=bbox)
                             
                             if svg_content and len(svg_content.strip()) > 0:
                                 svg_data = {
@@ -264,6 +311,7 @@ class SVGProcessor(BaseProcessor):
                                     'svg_content': svg_content,
                                     'svg_size': len(svg_content),
                                     'filename': f'page_{page_number}_graphic_{i+1:02d}.svg',
+                                    'drawing_count': len(cluster.members),
                                     'bounding_box': {
                                         'x0': bbox.x0,
                                         'y0': bbox.y0,
@@ -287,15 +335,12 @@ class SVGProcessor(BaseProcessor):
                         except Exception as e:
                             self.logger.debug(f"Failed to extract graphic {i} from page {page_number}: {e}")
                             continue
-                else:
-                    # Single graphic or no display list - use traditional method
-                    pass
                     
             except Exception as e:
                 self.logger.debug(f"Display list analysis failed for page {page_number}: {e}")
             
             # Method 2: Fallback to traditional page-level SVG extraction
-            if not svgs:
+            if not svgs and not only_small_drawings:
                 # Extract full page SVG content
                 svg_content = page.get_svg_image()
                 
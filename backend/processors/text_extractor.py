@@ -7,7 +7,7 @@ Fallback to pdfplumber if needed.
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
 
 try:
@@ -197,21 +197,9 @@ class TextExtractor:
             for page_num in range(len(doc)):
                 try:
                     page = doc[page_num]
-                    text = page.get_text("text") or ""
-                    had_text = bool(text.strip())
-
-                    if not had_text:
-                        ocr_text = self._try_ocr(page)
-                        if ocr_text:
-                            text = ocr_text
-                        else:
-                            self.metrics["pages_failed"] = int(self.metrics.get("pages_failed", 0) or 0) + 1
-
+                    text = self._page_text_pymupdf(page)
                     structured = self._extract_structured_text(page)
 
-                    # Clean up text
-                    text = self._clean_text(text)
-
                     if text.strip():
                         page_texts[page_num + 1] = text  # 1-indexed
                     if structured:
@@ -240,6 +228,80 @@ class TextExtractor:
             else:
                 raise
     
+    def _page_text_pymupdf(self, page: 'fitz.Page') -> str:
+        """Cleaned text of one PyMuPDF page, with OCR fallback for pages without a text layer"""
+        text = page.get_text("text") or ""
+        if not text.strip():
+            ocr_text = self._try_ocr(page)
+            if ocr_text:
+                text = ocr_text
+            else:
+                self.metrics["pages_failed"] = int(self.metrics.get("pages_failed", 0) or 0) + 1
+        return self._clean_text(text)
+
+    def iter_pages(self, pdf_path: Path) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) one page at a time
+        
+        Pages are cleaned exactly like extract_text() and pages without text
+        are skipped, so the sequence matches sorted(page_texts.items()).
+        Structured text and metadata are not produced (see extract_metadata()).
+        Only the current page is held in memory.
+        """
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+        self._reset_metrics()
+
+        if self.prefer_engine == "pymupdf" and PYMUPDF_AVAILABLE:
+            self.metrics["engine_used"] = "pymupdf"
+            doc = fitz.open(pdf_path)
+            try:
+                for page_num in range(len(doc)):
+                    try:
+                        text = self._page_text_pymupdf(doc[page_num])
+                    except Exception as page_error:
+                        logger.warning(f"Failed to extract page {page_num + 1}: {page_error}")
+                        self.metrics["pages_failed"] = int(self.metrics.get("pages_failed", 0) or 0) + 1
+                        continue
+                    if text.strip():
+                        yield page_num + 1, text
+            finally:
+                doc.close()
+        elif PDFPLUMBER_AVAILABLE:
+            self.metrics["engine_used"] = "pdfplumber"
+            with pdfplumber.open(pdf_path) as pdf:
+                for page_num, page in enumerate(pdf.pages, start=1):
+                    text = page.extract_text()
+                    if text:
+                        yield page_num, self._clean_text(text)
+                    # pdfplumber caches parsed layout objects on the page
+                    page.flush_cache()
+        else:
+            raise RuntimeError("No extraction engine available")
+
+    def extract_metadata(self, pdf_path: Path, document_id: UUID) -> DocumentMetadata:
+        """Document metadata without extracting page text (reads at most the first pages for language)"""
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+        if self.prefer_engine == "pymupdf" and PYMUPDF_AVAILABLE:
+            doc = fitz.open(pdf_path)
+            try:
+                metadata = self._extract_metadata_pymupdf(doc, pdf_path, document_id)
+            finally:
+                doc.close()
+        elif PDFPLUMBER_AVAILABLE:
+            with pdfplumber.open(pdf_path) as pdf:
+                metadata = self._extract_metadata_pdfplumber(pdf, pdf_path, document_id)
+        else:
+            raise RuntimeError("No extraction engine available")
+
+        metadata.engine_used = self.metrics.get("engine_used", self.prefer_engine)
+        metadata.fallback_used = self.metrics.get("fallback_used")
+        metadata.pages_failed = int(self.metrics.get("pages_failed", 0) or 0)
+        return metadata
+
     def _extract_with_pdfplumber(
         self,
         pdf_path: Path,
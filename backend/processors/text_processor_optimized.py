@@ -9,12 +9,14 @@ for embedding and search.
 
 import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import hashlib
 
 from backend.core.base_processor import BaseProcessor, Stage, ProcessingContext, ProcessingResult, ProcessingError
 from backend.core.data_models import IntelligenceChunkModel
+from backend.core.idempotency import compute_content_fingerprint, compute_page_fingerprints
+from backend.utils.memory_budget import MemoryBudget
 from .text_extractor import TextExtractor
 from .chunker import SmartChunker
 from .models import TextChunk
@@ -68,11 +70,34 @@ class OptimizedTextProcessor(BaseProcessor):
             link_chunks=link_chunks
         )
         
+        # Streaming page mode (see enable_streaming); 0 = whole-document mode
+        self.stream_window_pages = 0
+        self.embedding_processor = None
+        
         self.logger.info(
             f"OptimizedTextProcessor initialized (chunk_size={chunk_size}, overlap={chunk_overlap}, "
             f"hierarchical={enable_hier}, error_sections={detect_err}, link_chunks={link_chunks})"
         )
     
+    def enable_streaming(self, window_pages: int, embedding_processor=None) -> None:
+        """
+        Switch to streaming page mode
+        
+        Pages are read one at a time and flow through chunk -> persist -> embed
+        in windows of ``window_pages`` pages, so memory does not grow with the
+        page count. Chunks are identical to whole-document mode. context.page_texts
+        and context.chunks are not populated; downstream stages read the chunks
+        from the database, and the embedding stage only picks up chunks whose
+        embedding failed here (plus the media context embeddings).
+        
+        Args:
+            window_pages: Pages per window (0 restores whole-document mode)
+            embedding_processor: EmbeddingProcessor used to embed each window
+                (None = leave embedding to the embedding stage)
+        """
+        self.stream_window_pages = max(0, int(window_pages))
+        self.embedding_processor = embedding_processor
+    
     async def process(self, context: ProcessingContext) -> ProcessingResult:
         """
         Process text extraction and chunking
@@ -98,6 +123,9 @@ class OptimizedTextProcessor(BaseProcessor):
                         data={}
                     )
 
+                if self.stream_window_pages:
+                    return await self._process_streaming(context, file_path, adapter)
+
                 adapter.info("Extracting text from %s", file_path.name)
                 # Ensure document_id is available as UUID for TextExtractor
                 doc_id = UUID(context.document_id) if isinstance(context.document_id, str) else context.document_id
@@ -115,6 +143,10 @@ class OptimizedTextProcessor(BaseProcessor):
                 context.page_texts = page_texts
                 adapter.debug("Attached page_texts to context (%d pages)", len(page_texts))
 
+                version_diff = await self._record_page_fingerprints(
+                    context.document_id, compute_page_fingerprints(page_texts), adapter
+                )
+
                 self.logger.success(f"✅ Extracted text from {len(page_texts)} pages")
 
                 adapter.info("Creating chunks...")
@@ -132,19 +164,7 @@ class OptimizedTextProcessor(BaseProcessor):
                     )
 
                 # Attach chunks to context for downstream processors (embedding stage)
-                context.chunks = [
-                    {
-                        'chunk_id': str(chunk.chunk_id),
-                        'text': chunk.text,
-                        'chunk_index': chunk.chunk_index,
-                        'page_start': chunk.page_start,
-                        'page_end': chunk.page_end,
-                        'chunk_type': chunk.chunk_type,
-                        'fingerprint': chunk.fingerprint,
-                        'metadata': chunk.metadata or {},
-                    }
-                    for chunk in chunks
-                ]
+                context.chunks = [self._chunk_payload(chunk) for chunk in chunks]
                 context.chunk_data = context.chunks
 
                 self.logger.success(f"✅ Created {len(chunks)} chunks")
@@ -166,6 +186,7 @@ class OptimizedTextProcessor(BaseProcessor):
                         'chunks_saved': chunks_saved,
                         'total_characters': sum(len(chunk.text) for chunk in chunks),
                         'page_texts_attached': True,  # Signal downstream processors
+                        'version_diff': version_diff,
                         'metadata': metadata
                     }
                 )
@@ -179,6 +200,158 @@ class OptimizedTextProcessor(BaseProcessor):
                     data={}
                 )
     
+    async def _process_streaming(self, context: ProcessingContext, file_path: Path, adapter) -> ProcessingResult:
+        """
+        Streaming page mode: text -> chunk -> persist -> embed per page window
+        
+        Only the current window's chunks are held; the hierarchical structure
+        (if enabled) comes from a first pass that keeps only heading pages.
+        """
+        doc_id = UUID(context.document_id) if isinstance(context.document_id, str) else context.document_id
+        window_pages = self.stream_window_pages
+        budget = MemoryBudget.from_env()
+        embedder = self.embedding_processor
+        if embedder is not None and not embedder.is_configured():
+            adapter.warning("Embedding processor not configured - embeddings left to the embedding stage")
+            embedder = None
+
+        adapter.info("Streaming text from %s (window=%d pages)", file_path.name, window_pages)
+        metadata = self.text_extractor.extract_metadata(file_path, doc_id)
+
+        structure = None
+        if self.chunker.enable_hierarchical_chunking:
+            structure = self.chunker.detect_structure_streaming(self.text_extractor.iter_pages(file_path))
+
+        stats = {'pages': 0, 'chunks': 0, 'saved': 0, 'embedded': 0, 'embed_failed': 0, 'characters': 0, 'windows': 0}
+        page_fingerprints: Dict[int, str] = {}
+
+        def pages():
+            for page in self.text_extractor.iter_pages(file_path):
+                stats['pages'] += 1
+                page_number, text = page
+                page_fingerprints[page_number] = compute_content_fingerprint(text)
+                yield page
+
+        async def flush(window: List[TextChunk]) -> None:
+            stats['windows'] += 1
+            stats['chunks'] += len(window)
+            stats['characters'] += sum(len(chunk.text) for chunk in window)
+            if not self.database_service:
+                return
+            stats['saved'] += await self._save_chunks_to_db(window, context.document_id)
+            if embedder is not None:
+                result = await embedder.embed_chunks([self._chunk_payload(chunk) for chunk in window], doc_id)
+                stats['embedded'] += result['success_count']
+                stats['embed_failed'] += len(result['failed_chunks'])
+
+        window: List[TextChunk] = []
+        window_end = window_pages
+        checked_at = 0
+        for chunk in self.chunker.iter_chunks(pages(), document_id=doc_id, structure=structure):
+            window.append(chunk)
+            over_ceiling = False
+            if stats['pages'] != checked_at:
+                checked_at = stats['pages']
+                over_ceiling = budget.over_ceiling()
+            if stats['pages'] >= window_end or over_ceiling:
+                await flush(window)
+                window = []
+                # Shrinks after backpressure, grows back once windows fit again
+                window_pages = budget.next_window_pages(window_pages, self.stream_window_pages, over_ceiling)
+                if over_ceiling:
+                    budget.relieve()
+                else:
+                    budget.start_window()
+                window_end = stats['pages'] + window_pages
+        if window:
+            await flush(window)
+            window = []
+
+        # Extraction metrics are only final once every page has been read
+        metrics = self.text_extractor.metrics
+        metadata.engine_used = metrics.get("engine_used", metadata.engine_used)
+        metadata.fallback_used = metrics.get("fallback_used")
+        metadata.pages_failed = int(metrics.get("pages_failed", 0) or 0)
+
+        if not stats['pages']:
+            adapter.warning("No text extracted from PDF")
+            return self._create_result(
+                success=False,
+                message="No text extracted from PDF",
+                data={'pages_processed': 0}
+            )
+        if not stats['chunks']:
+            adapter.warning("No chunks created")
+            return self._create_result(
+                success=False,
+                message="No chunks created",
+                data={'pages_processed': stats['pages']}
+            )
+
+        version_diff = await self._record_page_fingerprints(context.document_id, page_fingerprints, adapter)
+
+        self.logger.success(
+            f"✅ Streamed {stats['pages']} pages into {stats['chunks']} chunks "
+            f"({stats['windows']} windows, {stats['embedded']} embedded)"
+        )
+        if not self.database_service:
+            adapter.warning("No database service - chunks not saved")
+
+        return self._create_result(
+            success=True,
+            message=f"Text processing completed: {stats['chunks']} chunks created",
+            data={
+                'pages_processed': stats['pages'],
+                'chunks_created': stats['chunks'],
+                'chunks_saved': stats['saved'],
+                'chunks_embedded': stats['embedded'],
+                'embedding_failures': stats['embed_failed'],
+                'total_characters': stats['characters'],
+                'page_texts_attached': False,
+                'streaming_windows': stats['windows'],
+                'version_diff': version_diff,
+                'metadata': metadata,
+                **budget.report(),
+            }
+        )
+
+    @staticmethod
+    def _chunk_payload(chunk: TextChunk) -> Dict[str, Any]:
+        """Chunk dict as attached to context.chunks in whole-document mode"""
+        return {
+            'chunk_id': str(chunk.chunk_id),
+            'text': chunk.text,
+            'chunk_index': chunk.chunk_index,
+            'page_start': chunk.page_start,
+            'page_end': chunk.page_end,
+            'chunk_type': chunk.chunk_type,
+            'fingerprint': chunk.fingerprint,
+            'metadata': chunk.metadata or {},
+        }
+
+    async def _record_page_fingerprints(
+        self, document_id: str, fingerprints: Dict[int, str], adapter
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store page fingerprints and diff them against the previous version
+        
+        Returns:
+            Diff summary (unchanged / changed / added / removed pages), or None
+            when there is no database or no previous version
+        """
+        checker = self._get_idempotency_checker()
+        if checker is None or not fingerprints:
+            return None
+        version_diff = await checker.diff_against_previous_version(str(document_id), fingerprints)
+        if version_diff:
+            adapter.info(
+                "%d/%d pages unchanged since previous version %s",
+                version_diff['unchanged'],
+                len(fingerprints),
+                version_diff['previous_document_id'],
+            )
+        return version_diff
+
     async def _save_chunks_to_db(self, chunks: List[TextChunk], document_id: str) -> int:
         """
         Save chunks to database
@@ -11,6 +11,9 @@ from pathlib import Path
 import requests
 import fitz  # PyMuPDF
 
+from backend.services.model_result_cache import get_model_cache
+from backend.services.ollama_scheduler import get_ollama_scheduler
+
 from .logger import get_logger
 from .models import ExtractedProduct
 
@@ -185,14 +188,26 @@ Output as structured text."""
             }
         }
         
-        if self.debug:
-            self.logger.debug(f"Calling Vision model: {self.vision_model}")
-        
-        response = requests.post(url, json=payload, timeout=120)
-        response.raise_for_status()
+        def _call() -> str:
+            if self.debug:
+                self.logger.debug(f"Calling Vision model: {self.vision_model}")
+            
+            with get_ollama_scheduler().slot(self.vision_model) as call:
+                response = requests.post(url, json=payload, timeout=120)
+                call.observe(response)
+            response.raise_for_status()
+            
+            result = response.json()
+            return result.get("response", "")
         
-        result = response.json()
-        return result.get("response", "")
+        # Same page image + model + prompt -> cached analysis
+        return get_model_cache().get_or_compute(
+            "vision_extractor",
+            self.vision_model,
+            prompt,
+            _call,
+            content=image_base64,
+        )
     
     def _refine_with_text_model(
         self,
@@ -261,7 +276,9 @@ JSON:"""
             }
         }
         
-        response = requests.post(url, json=payload, timeout=60)
+        with get_ollama_scheduler().slot(self.text_model) as call:
+            response = requests.post(url, json=payload, timeout=60)
+            call.observe(response)
         response.raise_for_status()
         
         result = response.json()
@@ -1,23 +1,44 @@
 """
 KR-AI-Engine Services Module
 Core services for storage, and AI operations
+
+Exports are resolved lazily (PEP 562) so that importing one service module,
+e.g. ``services.db_pool``, does not pull in the AI, storage and scraping stacks.
 """
 
-from .object_storage_service import ObjectStorageService
-from .ai_service import AIService, create_ai_service
-from .config_service import ConfigService
-from .storage_factory import StorageFactory, create_storage_service
-from .web_scraping_service import (
-    WebScrapingService,
-    create_web_scraping_service,
-    FirecrawlBackend,
-    BeautifulSoupBackend,
-    WebScraperBackend,
-)
-from .link_enrichment_service import LinkEnrichmentService
-from .structured_extraction_service import StructuredExtractionService
-from .manufacturer_crawler import ManufacturerCrawler
-from .manufacturer_verification_service import ManufacturerVerificationService
+from importlib import import_module
+
+_EXPORTS = {
+    "ObjectStorageService": ".object_storage_service",
+    "AIService": ".ai_service",
+    "create_ai_service": ".ai_service",
+    "ConfigService": ".config_service",
+    "StorageFactory": ".storage_factory",
+    "create_storage_service": ".storage_factory",
+    "WebScrapingService": ".web_scraping_service",
+    "create_web_scraping_service": ".web_scraping_service",
+    "FirecrawlBackend": ".web_scraping_service",
+    "BeautifulSoupBackend": ".web_scraping_service",
+    "WebScraperBackend": ".web_scraping_service",
+    "LinkEnrichmentService": ".link_enrichment_service",
+    "StructuredExtractionService": ".structured_extraction_service",
+    "ManufacturerCrawler": ".manufacturer_crawler",
+    "ManufacturerVerificationService": ".manufacturer_verification_service",
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
 
 __all__ = [
     "AIService",
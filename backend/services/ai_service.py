@@ -14,6 +14,8 @@ import httpx
 
 from backend.config.ai_config import get_ai_config, get_ollama_models, get_model_requirements
 from backend.utils.gpu_detector import get_gpu_info, get_recommended_vision_model
+from backend.services.model_result_cache import get_model_cache, make_key
+from backend.services.ollama_scheduler import get_ollama_scheduler
 
 class AIService:
     """
@@ -160,10 +162,12 @@ class AIService:
             
             for attempt in range(max_retries):
                 try:
-                    response = await self.client.post(
-                        f"{self.ollama_url}/api/generate",
-                        json=payload
-                    )
+                    async with get_ollama_scheduler().aslot(model) as call:
+                        response = await self.client.post(
+                            f"{self.ollama_url}/api/generate",
+                            json=payload
+                        )
+                        call.observe(response)
                     
                     if response.status_code == 200:
                         return response.json()
@@ -201,10 +205,12 @@ class AIService:
                             images_b64 = [base64.b64encode(img).decode() for img in images]
                             payload["images"] = images_b64
                         
-                        response = await self.client.post(
-                            f"{self.ollama_url}/api/generate",
-                            json=payload
-                        )
+                        async with get_ollama_scheduler().aslot(fallback) as call:
+                            response = await self.client.post(
+                                f"{self.ollama_url}/api/generate",
+                                json=payload
+                            )
+                            call.observe(response)
                         if response.status_code == 200:
                             return response.json()
                         else:
@@ -439,13 +445,15 @@ class AIService:
             model = self.models['embeddings']
             
             # Use Ollama's embedding endpoint
-            response = await self.client.post(
-                f"{self.ollama_url}/api/embeddings",
-                json={
-                    "model": model,
-                    "prompt": text
-                }
-            )
+            async with get_ollama_scheduler().aslot(model) as call:
+                response = await self.client.post(
+                    f"{self.ollama_url}/api/embeddings",
+                    json={
+                        "model": model,
+                        "prompt": text
+                    }
+                )
+                call.observe(response)
             
             if response.status_code == 200:
                 result = response.json()
@@ -571,11 +579,21 @@ Answer:"""
             {description or "Analyze this technical image"}
             """
             
+            # Cached by (model, prompt, image bytes); mock responses are never cached
+            cache = get_model_cache() if self.client is not None else None
+            cache_key = make_key("ai_analyze_image", model, prompt, image) if cache else None
+            cached = cache.get(cache_key, "ai_analyze_image") if cache else None
+            if cached:
+                self.logger.info(f"Image analysis served from cache: {cached.get('image_type')}")
+                return cached
+
             result = await self._call_ollama(model, prompt, images=[image])
             response_text = result.get('response', '{}')
             
             try:
                 analysis = json.loads(response_text)
+                if cache and isinstance(analysis, dict):
+                    cache.set(cache_key, analysis, "ai_analyze_image", model)
             except json.JSONDecodeError:
                 analysis = {
                     "image_type": "photo",
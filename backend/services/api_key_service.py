@@ -2,18 +2,49 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
-from config.security_config import get_security_config
+from cachetools import TTLCache
+from config.security_config import SecurityConfig, get_security_config
 import asyncpg
 import json
 
 logger = logging.getLogger("krai.api_keys")
 
+# Services are created per request, so the key cache and the buffered
+# last_used_at writes live at module level.
+_key_cache: Optional[TTLCache] = None
+_pending_last_used: Dict[str, datetime] = {}
+_last_flush = time.monotonic()
+_flush_lock = asyncio.Lock()
+
+
+def _get_key_cache(config: SecurityConfig) -> Optional[TTLCache]:
+    """Key records by key hash; None when AUTH_CACHE_TTL_SECONDS disables caching."""
+    global _key_cache
+    if config.AUTH_CACHE_TTL_SECONDS <= 0 or config.AUTH_CACHE_MAX_ENTRIES <= 0:
+        return None
+    if _key_cache is None:
+        _key_cache = TTLCache(
+            maxsize=config.AUTH_CACHE_MAX_ENTRIES, ttl=config.AUTH_CACHE_TTL_SECONDS
+        )
+    return _key_cache
+
+
+def invalidate_api_key(key_id: Any) -> None:
+    """Drop the cached record of a key (revocation, rotation, deletion)."""
+    if _key_cache is None:
+        return
+    for key_hash, record in list(_key_cache.items()):
+        if str(record["id"]) == str(key_id):
+            _key_cache.pop(key_hash, None)
+
 
 class APIKeyService:
     """Service for API key CRUD, validation, and rotation."""
@@ -102,19 +133,27 @@ class APIKeyService:
         """
         async with self.pool.acquire() as conn:
             await conn.execute(query, key_id, user_id)
+        invalidate_api_key(key_id)
         logger.info("Revoked API key %s", key_id)
 
     async def validate_api_key(self, raw_key: str) -> Optional[Dict[str, str]]:
         key_hash = self._hash_key(raw_key)
-        query = """
-            SELECT id, user_id, permissions, expires_at, revoked
-            FROM krai_system.api_keys
-            WHERE key_hash = $1
-        """
-        async with self.pool.acquire() as conn:
-            record = await conn.fetchrow(query, key_hash)
-        if not record:
-            return None
+        cache = _get_key_cache(self.config)
+        record = cache.get(key_hash) if cache is not None else None
+        if record is None:
+            query = """
+                SELECT id, user_id, permissions, expires_at, revoked
+                FROM krai_system.api_keys
+                WHERE key_hash = $1
+            """
+            async with self.pool.acquire() as conn:
+                record = await conn.fetchrow(query, key_hash)
+            if not record:
+                return None
+            record = dict(record)
+            if cache is not None:
+                cache[key_hash] = record
+        # Revocation and expiry are re-checked on cached records as well
         record = dict(record)
         if record["revoked"]:
             logger.warning("Attempt to use revoked API key %s", record["id"])
@@ -122,13 +161,43 @@ class APIKeyService:
         if record["expires_at"] < datetime.now(timezone.utc):
             logger.warning("Attempt to use expired API key %s", record["id"])
             return None
-        async with self.pool.acquire() as conn:
-            await conn.execute(
-                "UPDATE krai_system.api_keys SET last_used_at = NOW() WHERE id = $1",
-                record["id"],
-            )
+        _pending_last_used[str(record["id"])] = datetime.now(timezone.utc)
+        flush_interval = self.config.API_KEY_LAST_USED_FLUSH_SECONDS
+        if time.monotonic() - _last_flush >= flush_interval:
+            try:
+                await self.flush_last_used()
+            except Exception as exc:
+                logger.warning("Failed to flush API key last_used_at: %s", exc)
         return record
 
+    async def flush_last_used(self) -> int:
+        """Write buffered last_used_at timestamps in one statement.
+
+        Returns the number of keys written. On failure the timestamps stay
+        buffered for the next flush.
+        """
+        global _last_flush
+        async with _flush_lock:
+            _last_flush = time.monotonic()
+            if not _pending_last_used:
+                return 0
+            pending = dict(_pending_last_used)
+            _pending_last_used.clear()
+            query = """
+                UPDATE krai_system.api_keys AS k
+                SET last_used_at = GREATEST(k.last_used_at, v.used_at)
+                FROM unnest($1::uuid[], $2::timestamptz[]) AS v(id, used_at)
+                WHERE k.id = v.id
+            """
+            try:
+                async with self.pool.acquire() as conn:
+                    await conn.execute(query, list(pending), list(pending.values()))
+            except Exception:
+                for key_id, used_at in pending.items():
+                    _pending_last_used[key_id] = max(used_at, _pending_last_used.get(key_id, used_at))
+                raise
+            return len(pending)
+
     async def rotate_api_key(self, key_id: str, user_id: str) -> Dict[str, str]:
         new_key = self.generate_api_key()
         key_hash = self._hash_key(new_key)
@@ -148,6 +217,7 @@ class APIKeyService:
         """
         async with self.pool.acquire() as conn:
             record = await conn.fetchrow(query, key_hash, expires_at, key_id, user_id)
+        invalidate_api_key(key_id)
         logger.info("Rotated API key %s for user %s", key_id, user_id)
         return {
             "id": record["id"],
@@ -168,4 +238,6 @@ class APIKeyService:
                 "DELETE FROM krai_system.api_keys WHERE expires_at < NOW() - make_interval(days => $1)",
                 self.config.API_KEY_GRACE_PERIOD_DAYS,
             )
+        if _key_cache is not None:
+            _key_cache.clear()
         logger.info("Cleaned up expired API keys")
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 
+from cachetools import TTLCache
 from passlib.context import CryptContext
 
 # Import models and config
@@ -21,6 +22,7 @@ from config.auth_config import (
     get_jwt_config, get_jwt_validator, ACCESS_TOKEN, REFRESH_TOKEN,
     CLAIM_USER_ID, CLAIM_EMAIL, CLAIM_ROLE, CLAIM_TOKEN_TYPE, CLAIM_JTI
 )
+from config.security_config import get_security_config
 
 # Import database service
 from services.database_adapter import DatabaseAdapter
@@ -100,6 +102,13 @@ ROLE_PERMISSIONS: Dict[UserRole, List[str]] = {
     ],
 }
 
+def _ttl_cache(max_entries: int, ttl_seconds: int) -> Optional[TTLCache]:
+    """Bounded TTL cache, or None when caching is disabled"""
+    if max_entries <= 0 or ttl_seconds <= 0:
+        return None
+    return TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+
 class AuthenticationError(Exception):
     """Authentication exception"""
     pass
@@ -125,6 +134,17 @@ class AuthService:
         self.login_attempts = {}  # ip -> [timestamps]
         self.max_login_attempts = 5
         self.lockout_duration = timedelta(minutes=15)
+
+        # Principal and blacklist caches for the per-request auth path. Entries
+        # are dropped explicitly on logout, revocation and user changes; the TTL
+        # bounds staleness from changes made by other processes.
+        security_config = get_security_config()
+        self._principal_cache = _ttl_cache(
+            security_config.AUTH_CACHE_MAX_ENTRIES, security_config.AUTH_CACHE_TTL_SECONDS
+        )
+        self._blacklist_cache = _ttl_cache(
+            security_config.AUTH_CACHE_MAX_ENTRIES, security_config.AUTH_CACHE_TTL_SECONDS
+        )
     
     async def initialize(self):
         """Initialize database connection"""
@@ -292,6 +312,38 @@ class AuthService:
             logger.error(f"Get user by ID error: {e}")
             return None
     
+    async def get_principal(self, user_id: str) -> Optional[UserResponse]:
+        """Get user by ID, served from the principal cache while fresh"""
+        if not user_id:
+            return None
+        key = str(user_id)
+        if self._principal_cache is not None:
+            user = self._principal_cache.get(key)
+            if user is not None:
+                return user
+
+        user = await self._get_user_by_id(key)
+        # Misses and lookup errors are not cached
+        if user is not None and self._principal_cache is not None:
+            self._principal_cache[key] = user
+        return user
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a cached principal after its role, status or permissions change"""
+        if self._principal_cache is not None and user_id:
+            self._principal_cache.pop(str(user_id), None)
+
+    def invalidate_token(self, jti: str) -> None:
+        """Drop a cached blacklist lookup"""
+        if self._blacklist_cache is not None and jti:
+            self._blacklist_cache.pop(jti, None)
+
+    def clear_auth_cache(self) -> None:
+        """Drop all cached principals and blacklist lookups"""
+        for cache in (self._principal_cache, self._blacklist_cache):
+            if cache is not None:
+                cache.clear()
+
     async def get_user_by_email(self, email: str) -> Optional[UserResponse]:
         """Retrieve user details by email address."""
         try:
@@ -353,6 +405,7 @@ class AuthService:
             result = await self.db.fetch_one(query, params)
             if not result:
                 raise AuthenticationError("Failed to promote user to admin")
+            self.invalidate_user(user_id)
 
             user_dict = self._normalize_user_record(result)
             if not user_dict.get("permissions"):
@@ -548,9 +601,11 @@ class AuthService:
         if not user_id or not permission:
             return False
             
-        # Get user with permissions
-        user = await self._get_user_by_id(user_id)
-        if not user or not user.is_active or user.status != UserStatus.ACTIVE:
+        return self.principal_has_permission(await self.get_principal(user_id), permission)
+
+    def principal_has_permission(self, user: Optional[UserResponse], permission: str) -> bool:
+        """Check a permission against an already loaded user"""
+        if not user or not permission or not user.is_active or user.status != UserStatus.ACTIVE:
             return False
             
         # Admins have all permissions
@@ -562,6 +617,20 @@ class AuthService:
         role_perms = ROLE_PERMISSIONS.get(user.role, [])
         
         return permission in user_perms or permission in role_perms
+
+    def principal_permissions(self, user: Optional[UserResponse]) -> List[str]:
+        """Combined role and user-specific permissions of an already loaded user"""
+        if not user or not user.is_active or user.status != UserStatus.ACTIVE:
+            return []
+
+        # Start with role permissions
+        permissions = set(ROLE_PERMISSIONS.get(user.role, []))
+
+        # Add user-specific permissions if any
+        user_perms = getattr(user, 'permissions', []) or []
+        permissions.update(user_perms)
+
+        return list(permissions)
     
     async def check_permission(self, user_id: str, permission: str) -> bool:
         """Check permission and raise AuthorizationError if not authorized"""
@@ -585,6 +654,8 @@ class AuthService:
                 'expires_at': expires_at,
                 'blacklisted_at': datetime.now(timezone.utc)
             })
+            if self._blacklist_cache is not None:
+                self._blacklist_cache[jti] = True
             return True
         except Exception as e:
             logger.error(f"Failed to blacklist token: {e}")
@@ -592,13 +663,21 @@ class AuthService:
     
     async def is_token_blacklisted(self, jti: str) -> bool:
         """Check if token is blacklisted"""
+        if self._blacklist_cache is not None:
+            cached = self._blacklist_cache.get(jti)
+            if cached is not None:
+                return cached
         try:
             query = "SELECT 1 FROM krai_users.token_blacklist WHERE jti = :jti AND (expires_at IS NULL OR expires_at > :now)"
             result = await self.db.fetch_one(query, {
                 'jti': jti,
                 'now': datetime.now(timezone.utc)
             })
-            return result is not None
+            # Only verified answers are cached, never the fail-safe below
+            blacklisted = result is not None
+            if self._blacklist_cache is not None:
+                self._blacklist_cache[jti] = blacklisted
+            return blacklisted
         except Exception as e:
             logger.error(f"Error checking token blacklist: {e}")
             message = str(e)
@@ -622,6 +701,7 @@ class AuthService:
                 params['user_id'] = user_id
                 
             result = await self.db.execute_query(query, params)
+            self.invalidate_token(jti)
             return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error revoking token: {e}")
@@ -640,6 +720,10 @@ class AuthService:
                 'user_id': user_id,
                 'now': datetime.now(timezone.utc)
             })
+            # Cached lookups are keyed by jti only, so drop them all
+            if self._blacklist_cache is not None:
+                self._blacklist_cache.clear()
+            self.invalidate_user(user_id)
             return result.rowcount
         except Exception as e:
             logger.error(f"Error revoking user tokens: {e}")
@@ -706,9 +790,10 @@ class AuthService:
                 
                 if not result:
                     raise Exception("Failed to update user")
+                self.invalidate_user(user_id)
             
-            # Return updated user
-            return await self._get_user_by_id(user_id)
+            # Return updated user (and re-warm the principal cache)
+            return await self.get_principal(user_id)
             
         except (AuthenticationError, AuthorizationError):
             raise
@@ -788,6 +873,7 @@ class AuthService:
                 'status': UserStatus.DELETED.value,
                 'now': datetime.now(timezone.utc)
             })
+            self.invalidate_user(user_id)
             
             # Revoke all user tokens
             await self.revoke_all_user_tokens(user_id)
@@ -803,19 +889,7 @@ class AuthService:
     async def get_user_permissions(self, user_id: str) -> List[str]:
         """Get all permissions for a user (combined role and user-specific permissions)"""
         try:
-            # Get user with permissions
-            user = await self._get_user_by_id(user_id)
-            if not user or not user.is_active or user.status != UserStatus.ACTIVE:
-                return []
-                
-            # Start with role permissions
-            permissions = set(ROLE_PERMISSIONS.get(user.role, []))
-            
-            # Add user-specific permissions if any
-            user_perms = getattr(user, 'permissions', []) or []
-            permissions.update(user_perms)
-            
-            return list(permissions)
+            return self.principal_permissions(await self.get_principal(user_id))
             
         except Exception as e:
             logger.error(f"Get user permissions error: {e}")
@@ -845,6 +919,7 @@ class AuthService:
                 'permissions': permissions,
                 'now': datetime.now(timezone.utc)
             })
+            self.invalidate_user(user_id)
             
             return result.rowcount > 0
             
@@ -131,6 +131,10 @@ class ConfigService:
             'retries': int(os.getenv('FIRECRAWL_RETRIES', '3') or 3),
             'enable_link_enrichment': _to_bool(os.getenv('ENABLE_LINK_ENRICHMENT'), False),
             'enable_manufacturer_crawling': _to_bool(os.getenv('ENABLE_MANUFACTURER_CRAWLING'), False),
+            'crawler_max_concurrency': int(os.getenv('CRAWLER_MAX_CONCURRENCY', '4') or 4),
+            'crawler_per_host_concurrency': int(os.getenv('CRAWLER_PER_HOST_CONCURRENCY', '2') or 2),
+            'crawler_per_host_delay': float(os.getenv('CRAWLER_PER_HOST_DELAY', '0.5') or 0.5),
+            'crawler_persist_batch_size': int(os.getenv('CRAWLER_PERSIST_BATCH_SIZE', '50') or 50),
         }
 
         if backend == 'firecrawl' and not firecrawl_api_url:
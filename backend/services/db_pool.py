@@ -4,28 +4,401 @@ PostgreSQL Connection Pool Utility
 
 Centralized asyncpg connection pool management for the application.
 Replaces the DatabaseAdapter abstraction layer with direct asyncpg usage.
+
+The API routers, the ``PostgreSQLAdapter`` and the pipeline all share the
+pool returned by :func:`get_pool`, so the application holds a single,
+env-sized set of Postgres connections.
+
+Environment:
+    DB_POOL_MIN_SIZE: Minimum open connections (default 2)
+    DB_POOL_MAX_SIZE: Maximum open connections (default 10)
+    DB_POOL_COMMAND_TIMEOUT: Per-statement timeout in seconds (default 60)
+    DB_POOL_MAX_INACTIVE_LIFETIME: Seconds before idle connections are closed (default 300)
+    DB_STATEMENT_CACHE_SIZE: Prepared statements cached per connection (default 256,
+        set to 0 behind PgBouncer in transaction mode)
+    EMBEDDING_STORAGE: Type embedding writers bind as, ``vector`` (float32,
+        default) or ``halfvec`` (float16; see migration 035)
+
+Every pool connection gets binary pgvector (vector / halfvec) and JSONB codecs,
+so vectors can be bound as plain float lists and JSONB columns come back as
+Python objects.
 """
 
+from __future__ import annotations
+
 import asyncio
+import json
 import os
 import logging
-from typing import Optional
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 import asyncpg
 
+try:
+    from prometheus_client import REGISTRY, Histogram
+except ImportError:  # pragma: no cover - prometheus optional at runtime
+    REGISTRY = None  # type: ignore[assignment]
+    Histogram = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 # Global connection pool
 _pool: Optional[asyncpg.Pool] = None
 _pool_lock = asyncio.Lock()
 
+_ACQUIRE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning("Invalid integer for %s, using %s", name, default)
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning("Invalid number for %s, using %s", name, default)
+        return default
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Pool sizing and connection options read from the environment."""
+
+    min_size: int = 2
+    max_size: int = 10
+    command_timeout: float = 60.0
+    max_inactive_connection_lifetime: float = 300.0
+    statement_cache_size: int = 256
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        max_size = max(1, _env_int('DB_POOL_MAX_SIZE', cls.max_size))
+        min_size = min(max(0, _env_int('DB_POOL_MIN_SIZE', cls.min_size)), max_size)
+        return cls(
+            min_size=min_size,
+            max_size=max_size,
+            command_timeout=_env_float('DB_POOL_COMMAND_TIMEOUT', cls.command_timeout),
+            max_inactive_connection_lifetime=_env_float(
+                'DB_POOL_MAX_INACTIVE_LIFETIME', cls.max_inactive_connection_lifetime
+            ),
+            statement_cache_size=max(0, _env_int('DB_STATEMENT_CACHE_SIZE', cls.statement_cache_size)),
+        )
+
+
+def resolve_database_url() -> str:
+    """
+    Resolve the PostgreSQL DSN shared by the pool and the database adapter.
+
+    Preference order: POSTGRES_URL, DATABASE_CONNECTION_URL, then the
+    individual POSTGRES_* parameters. ``create_database_adapter()`` resolves
+    its URL here too, so the adapter shares this pool.
+    """
+    postgres_url = os.getenv('POSTGRES_URL') or os.getenv('DATABASE_CONNECTION_URL')
+
+    if not postgres_url:
+        # Fallback: construct from individual parameters
+        db_host = os.getenv('POSTGRES_HOST', 'localhost')
+        db_port = os.getenv('POSTGRES_PORT', '5432')
+        db_name = os.getenv('POSTGRES_DB', 'krai')
+        db_user = os.getenv('POSTGRES_USER', 'postgres')
+        db_password = os.getenv('POSTGRES_PASSWORD', '')
+
+        postgres_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+    return postgres_url
+
+
+# ---------------------------------------------------------------------------
+# Type codecs
+# ---------------------------------------------------------------------------
+
+def _parse_vector_literal(value: str) -> list:
+    text = value.strip()
+    if text.startswith('[') and text.endswith(']'):
+        text = text[1:-1]
+    if not text.strip():
+        return []
+    return [float(part) for part in text.split(',')]
+
+
+def encode_vector(value: Any) -> bytes:
+    """
+    Encode a vector in pgvector's binary wire format.
+
+    Accepts sequences/arrays of floats as well as the ``'[0.1,0.2,...]'``
+    text literals the code base historically passed, so existing call sites
+    keep working while new ones can hand over plain lists.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        values = _parse_vector_literal(value)
+    else:
+        values = [float(v) for v in value]
+    dim = len(values)
+    return struct.pack(f'>HH{dim}f', dim, 0, *values)
+
+
+def decode_vector(data: bytes) -> list:
+    """Decode pgvector's binary wire format into a list of floats."""
+    dim, _unused = struct.unpack_from('>HH', data)
+    return list(struct.unpack_from(f'>{dim}f', data, 4))
+
+
+def encode_halfvec(value: Any) -> bytes:
+    """Encode a halfvec (same header as vector, IEEE half-precision elements)."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        values = _parse_vector_literal(value)
+    else:
+        values = [float(v) for v in value]
+    dim = len(values)
+    return struct.pack(f'>HH{dim}e', dim, 0, *values)
+
+
+def decode_halfvec(data: bytes) -> list:
+    """Decode pgvector's binary halfvec format into a list of floats."""
+    dim, _unused = struct.unpack_from('>HH', data)
+    return list(struct.unpack_from(f'>{dim}e', data, 4))
+
+
+EMBEDDING_STORAGE_TYPES = ('vector', 'halfvec')
+
+
+def embedding_storage_type() -> str:
+    """
+    SQL type embedding writers cast their parameter to (``EMBEDDING_STORAGE``).
+
+    ``halfvec`` halves the bytes sent per embedding; the column type itself is
+    switched with ``krai_intelligence.convert_embedding_storage()``. Either
+    value works against either column type through pgvector's casts.
+    """
+    storage = os.getenv('EMBEDDING_STORAGE', 'vector').strip().lower()
+    if storage not in EMBEDDING_STORAGE_TYPES:
+        logger.warning("Invalid EMBEDDING_STORAGE %r, using 'vector'", storage)
+        return 'vector'
+    return storage
+
+
+_JSONB_FORMAT_VERSION = b'\x01'
+
+
+def _encode_json_text(value: Any) -> str:
+    # Strings are treated as already-serialized JSON (json.dumps() output)
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a value as binary JSONB (version byte followed by the JSON text)."""
+    return _JSONB_FORMAT_VERSION + _encode_json_text(value).encode('utf-8')
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode binary JSONB into Python objects."""
+    return json.loads(data[1:].decode('utf-8'))
+
+
+async def _find_type_schema(conn: asyncpg.Connection, type_name: str) -> Optional[str]:
+    return await conn.fetchval(
+        """
+        SELECT n.nspname
+        FROM pg_type t
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE t.typname = $1
+        ORDER BY (n.nspname = 'public') DESC
+        LIMIT 1
+        """,
+        type_name,
+    )
+
+
+async def init_connection(conn: asyncpg.Connection) -> None:
+    """
+    Pool ``init`` hook: register the JSON/JSONB and pgvector codecs.
+
+    Runs once per physical connection. The vector codec is skipped when the
+    pgvector extension is not installed in the target database.
+    """
+    await conn.set_type_codec(
+        'jsonb',
+        schema='pg_catalog',
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        format='binary',
+    )
+    await conn.set_type_codec(
+        'json',
+        schema='pg_catalog',
+        encoder=_encode_json_text,
+        decoder=json.loads,
+        format='text',
+    )
+
+    vector_schema = await _find_type_schema(conn, 'vector')
+    if vector_schema:
+        await conn.set_type_codec(
+            'vector',
+            schema=vector_schema,
+            encoder=encode_vector,
+            decoder=decode_vector,
+            format='binary',
+        )
+
+    # halfvec exists from pgvector 0.7
+    halfvec_schema = await _find_type_schema(conn, 'halfvec')
+    if halfvec_schema:
+        await conn.set_type_codec(
+            'halfvec',
+            schema=halfvec_schema,
+            encoder=encode_halfvec,
+            decoder=decode_halfvec,
+            format='binary',
+        )
+
+
+# ---------------------------------------------------------------------------
+# Acquire-wait metrics
+# ---------------------------------------------------------------------------
+
+def _acquire_wait_histogram():
+    if Histogram is None or REGISTRY is None:
+        return None
+    name = 'krai_db_pool_acquire_wait_seconds'
+    try:
+        return Histogram(
+            name,
+            'Time spent waiting for a connection from the asyncpg pool',
+            ['pool'],
+            buckets=_ACQUIRE_WAIT_BUCKETS,
+        )
+    except ValueError:
+        # Already registered (module reloaded); reuse the existing collector
+        return REGISTRY._names_to_collectors.get(name)
+
+
+_ACQUIRE_WAIT_HISTOGRAM = _acquire_wait_histogram()
+
+
+class PoolAcquireMetrics:
+    """Running counters for how long callers wait on ``pool.acquire()``."""
+
+    def __init__(self, pool_name: str):
+        self.pool_name = pool_name
+        self.acquire_count = 0
+        self.acquire_failures = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.waiting = 0
+
+    def record(self, wait_seconds: float, success: bool = True) -> None:
+        if success:
+            self.acquire_count += 1
+        else:
+            self.acquire_failures += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        if _ACQUIRE_WAIT_HISTOGRAM is not None:
+            _ACQUIRE_WAIT_HISTOGRAM.labels(pool=self.pool_name).observe(wait_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        attempts = self.acquire_count + self.acquire_failures
+        return {
+            'acquire_count': self.acquire_count,
+            'acquire_failures': self.acquire_failures,
+            'waiting': self.waiting,
+            'avg_wait_ms': round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+            'max_wait_ms': round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class _MeteredAcquire:
+    """Wraps a ``PoolAcquireContext`` and records how long the acquire waited."""
+
+    __slots__ = ('_context', '_metrics')
+
+    def __init__(self, context: Any, metrics: PoolAcquireMetrics):
+        self._context = context
+        self._metrics = metrics
+
+    async def _measure(self, acquiring: Any) -> Any:
+        metrics = self._metrics
+        metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await acquiring
+        except BaseException:
+            metrics.record(time.perf_counter() - started, success=False)
+            raise
+        finally:
+            metrics.waiting -= 1
+        metrics.record(time.perf_counter() - started)
+        return connection
+
+    async def __aenter__(self) -> Any:
+        return await self._measure(self._context.__aenter__())
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._context.__aexit__(*exc_info)
+
+    def __await__(self):
+        return self._measure(self._context).__await__()
+
+
+class MeteredPool(asyncpg.Pool):
+    """asyncpg pool that records how long each ``acquire()`` waited."""
+
+    def __init__(self, *args, pool_name: str = 'default', **kwargs):
+        self.acquire_metrics = PoolAcquireMetrics(pool_name)
+        super().__init__(*args, **kwargs)
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _MeteredAcquire:
+        # Wraps the public API; Pool.fetch/execute/... acquire through here as well
+        return _MeteredAcquire(super().acquire(timeout=timeout), self.acquire_metrics)
+
+
+def get_pool_stats(pool: Optional[asyncpg.Pool] = None) -> Dict[str, Any]:
+    """
+    Return size and acquire-wait statistics for a pool (default: the shared one).
+
+    Returns:
+        dict: Empty when the pool has not been created yet.
+    """
+    pool = pool if pool is not None else _pool
+    if pool is None:
+        return {}
+    stats: Dict[str, Any] = {
+        'size': pool.get_size(),
+        'idle': pool.get_idle_size(),
+        'min_size': pool.get_min_size(),
+        'max_size': pool.get_max_size(),
+    }
+    metrics = getattr(pool, 'acquire_metrics', None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Pool lifecycle
+# ---------------------------------------------------------------------------
 
 async def get_pool() -> asyncpg.Pool:
     """
     Get or create the global asyncpg connection pool.
-    
+
     Returns:
         asyncpg.Pool: The connection pool instance
-        
+
     Raises:
         RuntimeError: If pool cannot be created
     """
@@ -39,52 +412,72 @@ async def get_pool() -> asyncpg.Pool:
     return _pool
 
 
-async def create_pool() -> asyncpg.Pool:
+async def create_pool(
+    dsn: Optional[str] = None,
+    settings: Optional[PoolSettings] = None,
+    pool_name: str = 'shared',
+) -> asyncpg.Pool:
     """
     Create a new asyncpg connection pool.
-    
+
+    Args:
+        dsn: Connection string (default: :func:`resolve_database_url`)
+        settings: Pool options (default: :meth:`PoolSettings.from_env`)
+        pool_name: Label used for the acquire-wait metrics
+
     Returns:
         asyncpg.Pool: New connection pool instance
-        
+
     Raises:
-        RuntimeError: If required environment variables are missing
+        RuntimeError: If the pool cannot be created
     """
-    # Get database connection parameters from environment
-    postgres_url = os.getenv('POSTGRES_URL')
-    
-    if not postgres_url:
-        # Fallback: construct from individual parameters
-        db_host = os.getenv('POSTGRES_HOST', 'localhost')
-        db_port = os.getenv('POSTGRES_PORT', '5432')
-        db_name = os.getenv('POSTGRES_DB', 'krai')
-        db_user = os.getenv('POSTGRES_USER', 'postgres')
-        db_password = os.getenv('POSTGRES_PASSWORD', '')
-        
-        postgres_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    
+    postgres_url = dsn or resolve_database_url()
+    settings = settings or PoolSettings.from_env()
+
     try:
-        pool = await asyncpg.create_pool(
+        pool = await MeteredPool(
             postgres_url,
-            min_size=2,
-            max_size=10,
-            command_timeout=60,
+            pool_name=pool_name,
+            connection_class=asyncpg.Connection,
+            record_class=asyncpg.Record,
+            min_size=settings.min_size,
+            max_size=settings.max_size,
+            max_queries=50000,
+            max_inactive_connection_lifetime=settings.max_inactive_connection_lifetime,
+            setup=None,
+            init=init_connection,
+            reset=None,
+            loop=None,
+            command_timeout=settings.command_timeout,
+            statement_cache_size=settings.statement_cache_size,
             server_settings={
                 'application_name': 'krai-engine'
             }
         )
-        
-        logger.info("✅ PostgreSQL connection pool created successfully")
+
+        logger.info(
+            "✅ PostgreSQL connection pool '%s' created (min=%s, max=%s, statement_cache=%s)",
+            pool_name,
+            settings.min_size,
+            settings.max_size,
+            settings.statement_cache_size,
+        )
         return pool
-        
+
     except Exception as e:
         logger.error(f"❌ Failed to create PostgreSQL connection pool: {e}")
         raise RuntimeError(f"Failed to create database connection pool: {e}")
 
 
+def is_shared_pool(pool: Optional[asyncpg.Pool]) -> bool:
+    """Return True if ``pool`` is the process-wide pool from :func:`get_pool`."""
+    return pool is not None and pool is _pool
+
+
 async def close_pool():
     """Close the global connection pool."""
     global _pool
-    
+
     if _pool is not None:
         await _pool.close()
         _pool = None
@@ -94,7 +487,7 @@ async def close_pool():
 async def test_connection() -> bool:
     """
     Test the database connection.
-    
+
     Returns:
         bool: True if connection is successful, False otherwise
     """
@@ -5,6 +5,20 @@ Provides dual-target error logging to both PostgreSQL (pipeline_errors table)
 and structured JSON log files. Integrates with retry engine for comprehensive
 error tracking and correlation.
 
+Database rows are buffered and written as batched INSERTs: a batch is
+flushed when ``batch_size`` rows are pending, otherwise at most
+``flush_interval`` seconds after the first buffered row. At most
+``max_pending`` rows are held; further rows are dropped (counted in
+``dropped_rows``) while their JSON log entries are still written. Call
+``await error_logger.close()`` (or ``close_error_loggers()``) on shutdown to
+flush what is left; if the loop is torn down first (asyncio.run() cancelling
+the flush task), the pending rows are written during the cancellation.
+
+Configuration (env):
+    ERROR_LOG_BATCH_SIZE      - rows per INSERT, 1 disables buffering (default: 100)
+    ERROR_LOG_FLUSH_INTERVAL  - seconds before a partial batch is written (default: 1.0)
+    ERROR_LOG_MAX_PENDING     - buffered rows before new rows are dropped (default: 10000)
+
 Usage:
     from backend.services.error_logging_service import ErrorLogger
     from backend.core.retry_engine import ErrorClassifier
@@ -36,10 +50,14 @@ Usage:
     )
 """
 
+import asyncio
+import logging
+import os
 import traceback
 import json
+import weakref
 from uuid import uuid4
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from backend.core.base_processor import ProcessingContext
@@ -47,6 +65,29 @@ from backend.core.retry_engine import ErrorClassification
 from backend.services.structured_logger import StructuredLogger
 from backend.services.database_adapter import DatabaseAdapter
 
+logger = logging.getLogger(__name__)
+
+_PIPELINE_ERROR_COLUMNS = (
+    "error_id", "document_id", "stage_name", "error_type", "error_category",
+    "error_message", "stack_trace", "context", "retry_count", "max_retries",
+    "status", "is_transient", "correlation_id",
+)
+# Array element type per column for the unnest() insert
+_PIPELINE_ERROR_ARRAY_TYPES = (
+    "text", "uuid", "text", "text", "text",
+    "text", "text", "jsonb", "int", "int",
+    "text", "boolean", "text",
+)
+
+# Live instances, flushed by close_error_loggers() on shutdown
+_ERROR_LOGGERS: "weakref.WeakSet[ErrorLogger]" = weakref.WeakSet()
+
+
+async def close_error_loggers():
+    """Flush and close every live ErrorLogger."""
+    for error_logger in list(_ERROR_LOGGERS):
+        await error_logger.close()
+
 
 class ErrorLogger:
     """
@@ -62,18 +103,23 @@ class ErrorLogger:
     - Stack trace capture and storage
     - Error classification (transient/permanent)
     - Status tracking (pending/retrying/resolved/failed)
-    - Async operations to avoid blocking pipeline
+    - Buffered multi-row inserts to avoid blocking pipeline
     
     Attributes:
         db_adapter (DatabaseAdapter): Database adapter for PostgreSQL operations
         structured_logger (StructuredLogger): JSON file logger
         log_file_path (str): Path to JSON log file
+        dropped_rows (int): Rows dropped because the buffer was full
+        failed_rows (int): Rows whose INSERT failed
     """
     
     def __init__(
         self,
         db_adapter: DatabaseAdapter,
-        log_file_path: str = "logs/pipeline.log"
+        log_file_path: str = "logs/pipeline.log",
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None
     ):
         """
         Initialize the error logger.
@@ -81,6 +127,12 @@ class ErrorLogger:
         Args:
             db_adapter: Database adapter instance for PostgreSQL operations
             log_file_path: Path to JSON log file (default: logs/pipeline.log)
+            batch_size: Rows per INSERT; 1 writes every error immediately
+                (default: ERROR_LOG_BATCH_SIZE or 100)
+            flush_interval: Seconds before a partial batch is written
+                (default: ERROR_LOG_FLUSH_INTERVAL or 1.0)
+            max_pending: Buffered rows before new rows are dropped
+                (default: ERROR_LOG_MAX_PENDING or 10000)
         """
         self.db_adapter = db_adapter
         self.log_file_path = log_file_path
@@ -88,6 +140,17 @@ class ErrorLogger:
             logger_name="pipeline_errors",
             log_file_path=log_file_path
         )
+        self.batch_size = max(1, batch_size if batch_size is not None else int(os.getenv("ERROR_LOG_BATCH_SIZE", "100")))
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else float(os.getenv("ERROR_LOG_FLUSH_INTERVAL", "1.0"))
+        )
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("ERROR_LOG_MAX_PENDING", "10000"))
+        self.dropped_rows = 0
+        self.failed_rows = 0
+        self._pending_rows: List[List[Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        _ERROR_LOGGERS.add(self)
     
     def _generate_error_id(self) -> str:
         """
@@ -192,6 +255,116 @@ class ErrorLogger:
         
         return sanitized
     
+    async def _enqueue_row(self, row: List[Any]):
+        """
+        Buffer a pipeline_errors row and flush when a batch is full.
+        
+        Args:
+            row: Column values in _PIPELINE_ERROR_COLUMNS order
+        """
+        if len(self._pending_rows) >= self.max_pending:
+            self.dropped_rows += 1
+            if self.dropped_rows == 1 or self.dropped_rows % 1000 == 0:
+                logger.warning(
+                    "Error row buffer full (%d rows), %d rows dropped so far",
+                    self.max_pending,
+                    self.dropped_rows
+                )
+            return
+        
+        self._pending_rows.append(row)
+        if len(self._pending_rows) >= self.batch_size:
+            # A running flush drains the buffer, including this row
+            if not self._flush_lock.locked():
+                await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+    
+    async def _flush_periodically(self):
+        """
+        Write partial batches until the buffer is empty.
+        
+        asyncio.run() cancels this task when the main coroutine returns, so
+        CLI runs that never call close() still write the pending rows before
+        the loop shuts down.
+        """
+        try:
+            while self._pending_rows:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+    
+    async def _insert_rows(self, rows: List[List[Any]]):
+        """
+        Write rows with one INSERT ... SELECT FROM unnest().
+        
+        One array parameter per column keeps the statement (and its cached
+        plan) the same for every batch size and far below asyncpg's 32767
+        parameter limit.
+        
+        Args:
+            rows: Column values in _PIPELINE_ERROR_COLUMNS order
+        """
+        columns = ", ".join(_PIPELINE_ERROR_COLUMNS)
+        arrays = ", ".join(
+            f"${index + 1}::{array_type}[]" for index, array_type in enumerate(_PIPELINE_ERROR_ARRAY_TYPES)
+        )
+        query = f"""
+            INSERT INTO krai_system.pipeline_errors ({columns})
+            SELECT {columns}
+            FROM unnest({arrays}) AS v({columns})
+        """
+        
+        try:
+            await self.db_adapter.execute_query(query, [list(column) for column in zip(*rows)])
+        except Exception as db_error:
+            # Log database error but don't fail the entire operation
+            self.failed_rows += len(rows)
+            await self.structured_logger.log_error(
+                error=db_error,
+                context={
+                    "operation": "database_insert",
+                    "error_ids": [row[0] for row in rows],
+                    "document_ids": sorted({str(row[1]) for row in rows})
+                },
+                correlation_id=rows[0][12],
+                error_id=f"{rows[0][0]}_db_error",
+                error_category="database_error"
+            )
+    
+    async def flush(self):
+        """Write all buffered rows in batches of ``batch_size``."""
+        async with self._flush_lock:
+            while self._pending_rows:
+                batch = self._pending_rows[:self.batch_size]
+                del self._pending_rows[:self.batch_size]
+                await self._insert_rows(batch)
+    
+    async def close(self):
+        """Flush buffered rows and stop the JSON log writer thread."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        _ERROR_LOGGERS.discard(self)
+        self.structured_logger.close()
+    
+    def get_buffer_stats(self) -> Dict[str, int]:
+        """
+        Buffer and overflow counters.
+        
+        Returns:
+            Dictionary with pending, dropped and failed row counts and the
+            number of JSON log records dropped by the structured logger
+        """
+        return {
+            "pending_rows": len(self._pending_rows),
+            "dropped_rows": self.dropped_rows,
+            "failed_rows": self.failed_rows,
+            "dropped_log_records": getattr(self.structured_logger, "dropped_records", 0),
+        }
+    
     async def log_error(
         self,
         context: ProcessingContext,
@@ -248,47 +421,22 @@ class ErrorLogger:
                 raw = parts[1]
                 stage_name = raw[6:] if raw.startswith('stage_') else raw
         
-        # Write to database
-        try:
-            query = """
-                INSERT INTO krai_system.pipeline_errors (
-                    error_id, document_id, stage_name, error_type, error_category,
-                    error_message, stack_trace, context, retry_count, max_retries,
-                    status, is_transient, correlation_id
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-            """
-            
-            params = [
-                error_id,
-                context.document_id,
-                stage_name or "unknown",
-                type(error).__name__,
-                classification.error_category,
-                str(error),
-                stack_trace,
-                json.dumps(sanitized_context, default=str),
-                retry_count,
-                max_retries,
-                "pending",
-                classification.is_transient,
-                correlation_id
-            ]
-            
-            await self.db_adapter.execute_query(query, params)
-            
-        except Exception as db_error:
-            # Log database error but don't fail the entire operation
-            await self.structured_logger.log_error(
-                error=db_error,
-                context={
-                    "operation": "database_insert",
-                    "error_id": error_id,
-                    "document_id": context.document_id
-                },
-                correlation_id=correlation_id,
-                error_id=f"{error_id}_db_error",
-                error_category="database_error"
-            )
+        # Buffer the database row (written in batches)
+        await self._enqueue_row([
+            error_id,
+            context.document_id,
+            stage_name or "unknown",
+            type(error).__name__,
+            classification.error_category,
+            str(error),
+            stack_trace,
+            json.dumps(sanitized_context, default=str),
+            retry_count,
+            max_retries,
+            "pending",
+            classification.is_transient,
+            correlation_id
+        ])
         
         # Write to JSON log file
         await self.structured_logger.log_error(
@@ -332,6 +480,8 @@ class ErrorLogger:
         
         params = [status, next_retry_at, error_id]
         
+        # The row may still be buffered
+        await self.flush()
         await self.db_adapter.execute_query(query, params)
         
         # Log status update to JSON file
@@ -373,6 +523,8 @@ class ErrorLogger:
         
         params = [resolved_by, notes, error_id]
         
+        # The row may still be buffered
+        await self.flush()
         await self.db_adapter.execute_query(query, params)
         
         # Log resolution to JSON file
@@ -404,6 +556,7 @@ class ErrorLogger:
             WHERE error_id = $1
         """
         
+        await self.flush()
         result = await self.db_adapter.fetch_one(query, [error_id])
         
         if result:
@@ -437,6 +590,7 @@ class ErrorLogger:
             ORDER BY created_at ASC
         """
         
+        await self.flush()
         results = await self.db_adapter.fetch_all(query, [correlation_id])
         
         return [dict(row) for row in results]
@@ -465,6 +619,7 @@ class ErrorLogger:
             LIMIT $1
         """
         
+        await self.flush()
         results = await self.db_adapter.fetch_all(query, [limit])
         
         return [dict(row) for row in results]
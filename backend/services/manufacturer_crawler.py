@@ -12,8 +12,11 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import logging
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Sequence
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+from urllib.parse import urlparse
 
 try:
     from croniter import croniter
@@ -307,56 +310,85 @@ class ManufacturerCrawler:
         }
 
     async def process_crawled_pages(self, job_id: str) -> Dict[str, Any]:
+        """Run structured extraction over the scraped pages of a crawl job.
+
+        Pages are extracted concurrently (``crawler_max_concurrency`` in
+        total, ``crawler_per_host_concurrency`` per host, request starts on
+        one host at least ``crawler_per_host_delay`` seconds apart). A page
+        whose content hash matches an already processed page with the same
+        URL from an earlier crawl is marked processed without a new
+        extraction. Status updates are written in batches of
+        ``crawler_persist_batch_size``.
+        """
         if not self._structured_extraction_service:
             return {"processed": 0, "extractions": 0}
 
         try:
             query = """
-                SELECT id, page_type
+                SELECT id, url, url_hash, content_hash, page_type
                 FROM krai_system.crawled_pages
                 WHERE crawl_job_id = $1 AND status = $2
             """
-            pages = await self._database_service.execute_query(query, [str(job_id), "scraped"])
-            
-            extraction_count = 0
-            processed_ids = []
-            failed_ids = []
-
-            for page in pages or []:
-                result = await self._structured_extraction_service.extract_from_crawled_page(page["id"])
-                if result.get("success"):
-                    extraction_count += 1
-                    processed_ids.append(page["id"])
-                else:
-                    failed_ids.append(page["id"])
+            pages = await self._database_service.execute_query(query, [str(job_id), "scraped"]) or []
 
-            # Update pages individually based on extraction outcome
-            if processed_ids:
-                update_query = """
-                    UPDATE krai_system.crawled_pages
-                    SET status = $1, processed_at = $2
-                    WHERE id = ANY($3)
-                """
-                await self._database_service.execute_query(
-                    update_query,
-                    ["processed", datetime.now(timezone.utc), processed_ids]
-                )
-            if failed_ids:
-                update_query = """
-                    UPDATE krai_system.crawled_pages
-                    SET status = $1, processed_at = $2
-                    WHERE id = ANY($3)
-                """
-                await self._database_service.execute_query(
-                    update_query,
-                    ["failed", datetime.now(timezone.utc), failed_ids]
-                )
+            unchanged_ids = await self._find_unchanged_pages(job_id, pages)
+            pending = [page for page in pages if str(page["id"]) not in unchanged_ids]
+
+            writer = _PageStatusWriter(
+                self._database_service, self._config.get("persist_batch_size", 50), self._logger
+            )
+            await writer.add("processed", unchanged_ids)
 
-            return {"processed": len(processed_ids), "failed": len(failed_ids), "extractions": extraction_count}
+            semaphore = asyncio.Semaphore(max(1, int(self._config.get("max_concurrency", 4))))
+            hosts = _HostLimiter(
+                self._config.get("per_host_concurrency", 2), self._config.get("per_host_delay", 0.5)
+            )
+            counts = {"processed": 0, "failed": 0}
+
+            async def _extract(page: Dict[str, Any]) -> None:
+                async with hosts.slot(page.get("url"), semaphore):
+                    try:
+                        result = await self._structured_extraction_service.extract_from_crawled_page(page["id"])
+                    except Exception as exc:
+                        self._logger.warning("Extraction failed for crawled page %s: %s", page["id"], exc)
+                        result = {"success": False}
+                status = "processed" if result.get("success") else "failed"
+                counts[status] += 1
+                await writer.add(status, [page["id"]])
+
+            await asyncio.gather(*(_extract(page) for page in pending))
+            await writer.flush()
+
+            return {
+                "processed": counts["processed"] + len(unchanged_ids),
+                "failed": counts["failed"],
+                "skipped": len(unchanged_ids),
+                "extractions": counts["processed"],
+            }
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to process crawled pages: %s", exc)
             return {"processed": 0, "extractions": 0}
 
+    async def _find_unchanged_pages(self, job_id: str, pages: Sequence[Dict[str, Any]]) -> Set[str]:
+        """IDs of pages whose URL was already processed with the same content hash."""
+        hashed = [page for page in pages if page.get("url_hash") and page.get("content_hash")]
+        if not hashed:
+            return set()
+        try:
+            query = """
+                SELECT DISTINCT url_hash, content_hash
+                FROM krai_system.crawled_pages
+                WHERE url_hash = ANY($1) AND crawl_job_id <> $2 AND status = $3
+            """
+            rows = await self._database_service.execute_query(
+                query, [[page["url_hash"] for page in hashed], str(job_id), "processed"]
+            )
+        except Exception as exc:
+            self._logger.debug("Content hash lookup failed, extracting all pages: %s", exc)
+            return set()
+        seen = {(row.get("url_hash"), row.get("content_hash")) for row in rows or []}
+        return {str(page["id"]) for page in hashed if (page["url_hash"], page["content_hash"]) in seen}
+
     async def detect_content_changes(self, manufacturer_id: str) -> List[Dict[str, Any]]:
         try:
             query = """
@@ -704,6 +736,10 @@ class ManufacturerCrawler:
                     "enable_manufacturer_crawling": config.get("enable_manufacturer_crawling", False),
                     "default_max_pages": config.get("crawler_default_max_pages", 100),
                     "default_max_depth": config.get("crawler_default_max_depth", 2),
+                    "max_concurrency": config.get("crawler_max_concurrency", 4),
+                    "per_host_concurrency": config.get("crawler_per_host_concurrency", 2),
+                    "per_host_delay": config.get("crawler_per_host_delay", 0.5),
+                    "persist_batch_size": config.get("crawler_persist_batch_size", 50),
                 }
             except Exception as exc:  # pragma: no cover - defensive logging
                 self._logger.debug("Failed loading crawler config: %s", exc)
@@ -711,4 +747,88 @@ class ManufacturerCrawler:
             "enable_manufacturer_crawling": False,
             "default_max_pages": 100,
             "default_max_depth": 2,
+            "max_concurrency": 4,
+            "per_host_concurrency": 2,
+            "per_host_delay": 0.5,
+            "persist_batch_size": 50,
         }
+
+
+class _HostLimiter:
+    """Per-host politeness: bounded concurrency and a minimum gap between request starts.
+
+    :meth:`slot` takes the host slot, reserves the host's next start time under the
+    host lock, sleeps until then and only then queues for the global slot, so a page
+    waiting out its host delay never holds a global slot other hosts could use. If
+    queueing for the global slot let the previous start on the host catch up, the
+    global slot is handed back and a new start time is reserved.
+    """
+
+    def __init__(self, concurrency: int, delay: float) -> None:
+        self._concurrency = max(1, int(concurrency))
+        self._delay = max(0.0, float(delay))
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+        self._last_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: Optional[str], global_slots: asyncio.Semaphore) -> AsyncIterator[None]:
+        host = urlparse(url or "").netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self._concurrency))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            while True:
+                async with lock:
+                    start = max(
+                        time.monotonic(),
+                        self._next_start.get(host, float("-inf")),
+                        self._last_start.get(host, float("-inf")) + self._delay,
+                    )
+                    self._next_start[host] = start + self._delay
+                wait = start - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await global_slots.acquire()
+                # Time spent queueing for the global slot does not count as the gap
+                if time.monotonic() >= self._last_start.get(host, float("-inf")) + self._delay:
+                    self._last_start[host] = time.monotonic()
+                    break
+                global_slots.release()
+            try:
+                yield
+            finally:
+                global_slots.release()
+
+
+class _PageStatusWriter:
+    """Collects crawled page status changes and writes them with one UPDATE per status."""
+
+    def __init__(self, database_service: Any, batch_size: int, logger: logging.Logger) -> None:
+        self._database_service = database_service
+        self._batch_size = max(1, int(batch_size))
+        self._logger = logger
+        self._pending: Dict[str, List[str]] = {}
+
+    async def add(self, status: str, page_ids: Sequence[Any]) -> None:
+        if not page_ids:
+            return
+        self._pending.setdefault(status, []).extend(str(page_id) for page_id in page_ids)
+        if sum(len(ids) for ids in self._pending.values()) >= self._batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        # Swap before awaiting so concurrent add() calls start a new batch
+        pending, self._pending = self._pending, {}
+        for status, page_ids in pending.items():
+            try:
+                await self._database_service.execute_query(
+                    """
+                    UPDATE krai_system.crawled_pages
+                    SET status = $1, processed_at = $2
+                    WHERE id = ANY($3)
+                    """,
+                    [status, datetime.now(timezone.utc), page_ids],
+                )
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self._logger.error("Failed to update %d crawled pages to %s: %s", len(page_ids), status, exc)
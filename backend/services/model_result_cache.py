@@ -0,0 +1,276 @@
+"""
+Model Result Cache - content-addressed cache for vision and LLM responses
+
+Vision and extraction calls are deterministic enough (temperature ~0) that the
+same model, prompt and input always yield a usable answer. Results are keyed by
+``sha256(namespace, model, prompt version, sha256(prompt), sha256(content))``
+and stored in a local SQLite file, so re-processing a document, retrying a
+stage or meeting the same diagram in another manual does not call the model
+again.
+
+Configuration (env):
+    MODEL_CACHE_ENABLED      - "false" disables the cache (default: true)
+    MODEL_CACHE_PATH         - SQLite file (default: ~/.cache/krai/model_results.sqlite3)
+    MODEL_CACHE_TTL_SECONDS  - entry lifetime (default: 30 days, 0 = no expiry)
+    MODEL_CACHE_MAX_MB       - size cap, least recently used entries go first (default: 512)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+from backend.pipeline.metrics import metrics
+
+logger = logging.getLogger("krai.model_cache")
+
+T = TypeVar("T")
+Content = Union[bytes, str, None]
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_MB = 512
+# Run TTL/size eviction after this many writes
+EVICT_EVERY_WRITES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_results (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_model_results_last_accessed ON model_results(last_accessed);
+CREATE INDEX IF NOT EXISTS idx_model_results_created_at ON model_results(created_at);
+"""
+
+
+def content_hash(content: Content) -> str:
+    """SHA-256 hex digest of image bytes or text (empty input hashes to the empty digest)."""
+    if content is None:
+        content = b""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_key(namespace: str, model: str, prompt: str, content: Content = None, prompt_version: str = "1") -> str:
+    """Cache key for one model call.
+
+    ``prompt`` is hashed as a whole, so editing a prompt template invalidates
+    its entries; bump ``prompt_version`` to invalidate on changes outside the
+    prompt text (e.g. a new response parser).
+    """
+    parts = [namespace, model or "", prompt_version, content_hash(prompt), content_hash(content)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ModelResultCache:
+    """Thread-safe SQLite-backed result cache with TTL and LRU size eviction."""
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.path = Path(path) if path else Path.home() / ".cache" / "krai" / "model_results.sqlite3"
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.enabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.executescript(_SCHEMA)
+                self.evict()
+            except Exception as exc:
+                logger.warning("Model result cache disabled (cannot open %s): %s", self.path, exc)
+                self.enabled = False
+                self._conn = None
+
+    @classmethod
+    def from_env(cls) -> "ModelResultCache":
+        enabled = os.getenv("MODEL_CACHE_ENABLED", "true").lower() in {"1", "true", "yes"}
+        try:
+            ttl = float(os.getenv("MODEL_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+            max_mb = float(os.getenv("MODEL_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+        except ValueError:
+            logger.warning("Invalid MODEL_CACHE_* setting, using defaults")
+            ttl, max_mb = DEFAULT_TTL_SECONDS, DEFAULT_MAX_MB
+        return cls(
+            path=os.getenv("MODEL_CACHE_PATH") or None,
+            ttl_seconds=ttl,
+            max_bytes=int(max_mb * 1024 * 1024),
+            enabled=enabled,
+        )
+
+    def get(self, key: str, namespace: str = "default") -> Optional[Any]:
+        """Return the cached value or None (counts as hit/miss)."""
+        if not self.enabled or self._conn is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM model_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM model_results WHERE key = ?", (key,))
+                row = None
+            if row:
+                self._conn.execute("UPDATE model_results SET last_accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.record_model_cache(namespace, hit=row is not None)
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, namespace: str = "default", model: str = "") -> None:
+        """Store a JSON-serialisable value."""
+        if not self.enabled or self._conn is None:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO model_results (key, namespace, model, value, size_bytes, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at,
+                    last_accessed = excluded.last_accessed
+                """,
+                (key, namespace, model, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._writes_since_evict += 1
+            due = self._writes_since_evict >= EVICT_EVERY_WRITES
+        if due:
+            self.evict()
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        model: str,
+        prompt: str,
+        compute: Callable[[], T],
+        content: Content = None,
+        prompt_version: str = "1",
+        should_cache: Callable[[T], bool] = bool,
+    ) -> T:
+        """Return the cached result or call ``compute`` and cache it if ``should_cache`` allows."""
+        key = make_key(namespace, model, prompt, content, prompt_version)
+        cached = self.get(key, namespace)
+        if cached is not None:
+            return cached
+        result = compute()
+        if should_cache(result):
+            self.set(key, result, namespace, model)
+        return result
+
+    async def aget_or_compute(
+        self,
+        namespace: str,
+        model: str,
+        prompt: str,
+        compute: Callable[[], Awaitable[T]],
+        content: Content = None,
+        prompt_version: str = "1",
+        should_cache: Callable[[T], bool] = bool,
+    ) -> T:
+        """Async variant of :meth:`get_or_compute` (SQLite lookups are sub-millisecond)."""
+        key = make_key(namespace, model, prompt, content, prompt_version)
+        cached = self.get(key, namespace)
+        if cached is not None:
+            return cached
+        result = await compute()
+        if should_cache(result):
+            self.set(key, result, namespace, model)
+        return result
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones above the size cap."""
+        if self._conn is None:
+            return 0
+        removed = 0
+        with self._lock:
+            self._writes_since_evict = 0
+            if self.ttl_seconds:
+                cur = self._conn.execute(
+                    "DELETE FROM model_results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+                removed += cur.rowcount or 0
+            total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM model_results").fetchone()[0]
+            if self.max_bytes and total > self.max_bytes:
+                # Trim to 90% so eviction does not run on every subsequent write
+                target = int(self.max_bytes * 0.9)
+                freed = 0
+                victims = []
+                for key, size in self._conn.execute(
+                    "SELECT key, size_bytes FROM model_results ORDER BY last_accessed"
+                ):
+                    if total - freed <= target:
+                        break
+                    victims.append((key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM model_results WHERE key = ?", victims)
+                removed += len(victims)
+        if removed:
+            logger.info("Model result cache evicted %d entries", removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        entries, size = 0, 0
+        if self._conn is not None:
+            with self._lock:
+                entries, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM model_results"
+                ).fetchone()
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[ModelResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_model_cache() -> ModelResultCache:
+    """Process-wide cache configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ModelResultCache.from_env()
+    return _cache
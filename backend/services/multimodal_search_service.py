@@ -7,12 +7,61 @@ context-aware embeddings and two-stage retrieval strategies.
 
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+import os
+import re
+from typing import Dict, Any, Hashable, List, Optional, Sequence, Tuple
 
 from services.database_adapter import DatabaseAdapter
 from services.ai_service import AIService
 
 
+# Default reciprocal rank fusion constant; larger values
+# flatten the contribution of the top ranks of each list
+RRF_K = 60
+
+# Identifier-like tokens: error codes (13.A2.FF, C-2801, SC542) and part
+# numbers (RM1-1234-000, 40X5852). Must contain a digit.
+_EXACT_TOKEN_RE = re.compile(r'\b[A-Za-z0-9]+(?:[.\-][A-Za-z0-9]+)*\b')
+
+
+def extract_exact_token(query: str) -> Optional[str]:
+    """Return the longest error-code / part-number token in ``query``, if any.
+
+    Such tokens are matched verbatim (trigram index) in hybrid search because
+    embeddings do not separate near-identical identifiers.
+    """
+    candidates = [
+        token for token in _EXACT_TOKEN_RE.findall(query or '')
+        if len(token) >= 4
+        and any(ch.isdigit() for ch in token)
+        and (any(ch.isalpha() for ch in token) or '.' in token or '-' in token)
+    ]
+    return max(candidates, key=len) if candidates else None
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = RRF_K,
+    limit: Optional[int] = None
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked id lists: ``score(id) = sum(1 / (k + rank))`` over the lists
+    containing it (ranks start at 1).
+
+    Mirrors krai_intelligence.hybrid_search_chunks() so offline benchmarks
+    and tests rank exactly like the database.
+
+    Returns:
+        (id, score) pairs, best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda pair: (-pair[1], str(pair[0])))
+    return fused[:limit] if limit is not None else fused
+
+
 class MultimodalSearchService:
     """
     Unified multimodal search service with advanced retrieval strategies
@@ -27,7 +76,9 @@ class MultimodalSearchService:
         ai_service: AIService,
         reranking_service=None,  # RerankingService | None
         default_threshold: float = 0.5,
-        default_limit: int = 10
+        default_limit: int = 10,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None
     ):
         """
         Initialize Multimodal Search Service
@@ -38,12 +89,20 @@ class MultimodalSearchService:
             reranking_service: Optional reranking service for post-retrieval reranking
             default_threshold: Default similarity threshold (0.0-1.0)
             default_limit: Default maximum number of results
+            ef_search: Default hnsw.ef_search per query (env HNSW_EF_SEARCH;
+                unset keeps the server setting, raised to the rows requested)
+            iterative_scan: Default hnsw.iterative_scan per query (env
+                HNSW_ITERATIVE_SCAN: relaxed_order / strict_order / off)
         """
         self.database_service = database_service
         self.ai_service = ai_service
         self.reranking_service = reranking_service
         self.default_threshold = default_threshold
         self.default_limit = default_limit
+        if ef_search is None and os.getenv("HNSW_EF_SEARCH"):
+            ef_search = int(os.getenv("HNSW_EF_SEARCH"))
+        self.ef_search = ef_search
+        self.iterative_scan = iterative_scan or os.getenv("HNSW_ITERATIVE_SCAN") or None
         self.logger = logging.getLogger('krai.multimodal_search')
         
         self.logger.info(
@@ -56,7 +115,12 @@ class MultimodalSearchService:
         query: str,
         modalities: List[str] = ['text', 'image', 'video', 'table', 'link'],
         threshold: float = None,
-        limit: int = None
+        limit: int = None,
+        document_id: Optional[str] = None,
+        manufacturer_id: Optional[str] = None,
+        product_id: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Unified search across all content types
@@ -66,6 +130,11 @@ class MultimodalSearchService:
             modalities: List of modalities to search (default: all)
             threshold: Similarity threshold (default: 0.5)
             limit: Maximum number of results (default: 10)
+            document_id: Restrict to one document
+            manufacturer_id: Restrict to one manufacturer's documents
+            product_id: Restrict to documents linked to one product
+            ef_search: hnsw.ef_search override for this query
+            iterative_scan: hnsw.iterative_scan override for this query
             
         Returns:
             Dictionary with query, results, and metadata
@@ -88,7 +157,11 @@ class MultimodalSearchService:
             results = await self.database_service.match_multimodal(
                 query_embedding=query_embedding,
                 match_threshold=threshold or self.default_threshold,
-                match_count=fetch_limit
+                match_count=fetch_limit,
+                document_id=document_id,
+                manufacturer_id=manufacturer_id,
+                product_id=product_id,
+                **self._hnsw_options(ef_search, iterative_scan, document_id, manufacturer_id, product_id)
             )
 
             # Filter by modalities if specified
@@ -99,7 +172,7 @@ class MultimodalSearchService:
             if self.reranking_service and self.reranking_service.enabled and results:
                 texts = [r.get('content', '') for r in results]
                 top_n = limit or self.default_limit
-                top_texts = self.reranking_service.rerank(query, texts, top_n=top_n)
+                top_texts = await self.reranking_service.arerank(query, texts, top_n=top_n)
                 used_indices: set[int] = set()
                 reranked_results = []
                 for text in top_texts:
@@ -151,6 +224,129 @@ class MultimodalSearchService:
                 'error': str(e)
             }
     
+    async def search_hybrid(
+        self,
+        query: str,
+        limit: int = None,
+        exact_token: Optional[str] = None,
+        candidate_count: int = 50,
+        rrf_k: int = RRF_K,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Hybrid lexical + vector search over text chunks
+
+        Full-text (GIN tsvector), vector (HNSW) and exact-token (trigram)
+        candidates are fused with reciprocal rank fusion in a single database
+        round trip. Identifiers such as error codes and part numbers are
+        detected in the query and matched verbatim unless ``exact_token`` is
+        given explicitly.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results (default: 10)
+            exact_token: Identifier to match verbatim (default: detected)
+            candidate_count: Candidates taken from each ranked list
+            rrf_k: Reciprocal rank fusion constant
+            ef_search: hnsw.ef_search override for the vector list
+            iterative_scan: hnsw.iterative_scan override for the vector list
+
+        Returns:
+            Dictionary with query, results, and metadata (same shape as
+            search_multimodal, text modality only)
+        """
+        import time
+        start_time = time.time()
+        exact_token = exact_token or extract_exact_token(query)
+
+        try:
+            # Lexical ranking still works when the embedding model is down
+            try:
+                query_embedding = await self.ai_service.generate_embeddings(query)
+            except Exception as e:
+                self.logger.warning(f"Hybrid search without vector ranking: {e}")
+                query_embedding = None
+
+            rows = await self.database_service.hybrid_search_chunks(
+                query_text=query,
+                query_embedding=query_embedding,
+                match_count=limit or self.default_limit,
+                exact_token=exact_token,
+                candidate_count=max(candidate_count, limit or self.default_limit),
+                rrf_k=rrf_k,
+                **self._hnsw_options(ef_search, iterative_scan)
+            )
+
+            results = [
+                {
+                    'source_id': str(row['id']),
+                    'source_type': 'text',
+                    'content': row['content'],
+                    'document_id': str(row['document_id']) if row.get('document_id') else None,
+                    'page_number': row.get('page_start'),
+                    'similarity': row.get('similarity'),
+                    'score': row['score'],
+                    'ranks': {
+                        'fts': row.get('fts_rank'),
+                        'vector': row.get('vector_rank'),
+                        'exact': row.get('exact_rank'),
+                    },
+                }
+                for row in rows
+            ]
+            enriched_results = await self._enrich_results(results)
+            processing_time = (time.time() - start_time) * 1000
+
+            self.logger.info(
+                f"Hybrid search completed: {len(enriched_results)} results "
+                f"in {processing_time:.2f}ms (exact token: {exact_token})"
+            )
+
+            return {
+                'query': query,
+                'results': enriched_results,
+                'results_by_modality': {'text': enriched_results} if enriched_results else {},
+                'total_count': len(enriched_results),
+                'modalities_searched': ['text'],
+                'exact_token': exact_token,
+                'processing_time_ms': round(processing_time, 2)
+            }
+
+        except Exception as e:
+            self.logger.error(f"Hybrid search failed: {e}")
+            return {
+                'query': query,
+                'results': [],
+                'results_by_modality': {},
+                'total_count': 0,
+                'modalities_searched': ['text'],
+                'exact_token': exact_token,
+                'processing_time_ms': 0,
+                'error': str(e)
+            }
+
+    def _hnsw_options(
+        self,
+        ef_search: Optional[int],
+        iterative_scan: Optional[str],
+        *filters: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Per-query HNSW settings: explicit arguments, else the service defaults.
+
+        Filtered searches switch on relaxed iterative scans when nothing is
+        configured, so a selective filter does not exhaust the ef_search
+        candidate list and return fewer rows than requested.
+        """
+        iterative_scan = iterative_scan or self.iterative_scan
+        if iterative_scan is None and any(filters):
+            iterative_scan = 'relaxed_order'
+        return {
+            'ef_search': ef_search or self.ef_search,
+            'iterative_scan': iterative_scan,
+        }
+
     async def search_images_by_context(
         self,
         query: str,
@@ -10,9 +10,12 @@ import json
 import logging
 import mimetypes
 import os
+import time
 from datetime import UTC, datetime
 from typing import Any
 
+from backend.pipeline.metrics import metrics
+
 try:
     import boto3
     from botocore.client import Config
@@ -27,6 +30,50 @@ except ImportError:
     BOTO3_AVAILABLE = False
 
 
+_METRICS_CONTEXT_KEY = "krai_metrics"
+
+
+def _on_call_params(params, model, context, **kwargs):
+    body = params.get("Body")
+    size = len(body) if isinstance(body, (bytes, bytearray, str)) else 0
+    context[_METRICS_CONTEXT_KEY] = (params.get("Bucket"), model.name, size, time.perf_counter())
+
+
+def _on_call_done(http_response, parsed, context, **kwargs):
+    state = context.pop(_METRICS_CONTEXT_KEY, None)
+    if state is None:
+        return
+    bucket, operation, size, started = state
+    status = getattr(http_response, "status_code", 200)
+    if operation == "GetObject" and isinstance(parsed, dict):
+        size += int(parsed.get("ContentLength") or 0)
+    metrics.record_storage_call(
+        bucket,
+        operation,
+        time.perf_counter() - started,
+        size=size,
+        error=f"status_{status}" if status >= 300 else None,
+    )
+
+
+def _on_call_error(exception, context, **kwargs):
+    state = context.pop(_METRICS_CONTEXT_KEY, None)
+    if state is None:
+        return
+    bucket, operation, _size, started = state
+    metrics.record_storage_call(bucket, operation, time.perf_counter() - started, error=type(exception).__name__)
+
+
+def instrument_client(client) -> None:
+    """Report latency, payload bytes and errors of every S3 call to the metrics registry."""
+    events = getattr(getattr(client, "meta", None), "events", None)
+    if events is None:  # not a botocore client
+        return
+    events.register("provide-client-params.s3", _on_call_params)
+    events.register("after-call.s3", _on_call_done)
+    events.register("after-call-error.s3", _on_call_error)
+
+
 class ObjectStorageService:
     """
     Generic S3-compatible object storage service
@@ -136,6 +183,8 @@ class ObjectStorageService:
                 use_ssl=self.use_ssl,
                 config=Config(signature_version="s3v4"),
             )
+            if metrics.enabled:
+                instrument_client(self.client)
 
             self.logger.info(f"Connected to S3-compatible storage at {self.endpoint_url}")
 
@@ -0,0 +1,276 @@
+"""
+Ollama Scheduler - model-affinity admission control for the shared Ollama backend
+
+Chat, vision, extraction and embedding calls all hit one Ollama instance. When
+requests for different models interleave, Ollama keeps evicting and reloading
+weights (seconds per swap on a single GPU). The scheduler sits in front of
+every call site: callers wait for a slot for their model, and slots are granted
+so that one model's queue is drained before switching to the next.
+
+Rules:
+    - interactive requests (agent chat) are always admitted before batch work
+      (ingestion), whatever model is loaded
+    - within a priority, requests for the active model go first; after
+      ``max_batch`` consecutive grants another waiting model gets its turn, so
+      a busy model cannot starve the rest
+    - the active model only changes once its in-flight requests have finished
+
+Configuration (env):
+    OLLAMA_SCHEDULER_ENABLED      - "false" admits every call immediately (default: true)
+    OLLAMA_SCHEDULER_CONCURRENCY  - requests in flight at once (default: 2)
+    OLLAMA_SCHEDULER_MAX_BATCH    - grants before yielding to another model (default: 32)
+    OLLAMA_SLOT_TIMEOUT           - seconds a caller waits for a slot before TimeoutError
+                                    (default: 300; 0 waits forever)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from backend.pipeline.metrics import ModelCallTimer, metrics
+
+logger = logging.getLogger("krai.ollama_scheduler")
+
+
+class Priority(IntEnum):
+    """Lower value is admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+# Default priority for slots requested without one; the agent sets INTERACTIVE
+# for the duration of a chat turn so its tool calls (embeddings, reranking) are
+# not queued behind ingestion.
+CURRENT_PRIORITY: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "ollama_priority", default=Priority.BATCH
+)
+
+
+@dataclass
+class _Ticket:
+    model: str
+    priority: int
+    seq: int
+    enqueued_at: float
+    event: Optional[threading.Event] = None
+    future: Optional[asyncio.Future] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    granted: bool = field(default=False)
+
+
+class OllamaScheduler:
+    """
+    Grants Ollama request slots grouped by model and ordered by priority.
+
+    Usable from threads (``slot``) and event loops (``aslot``) at the same time;
+    all state is guarded by one lock.
+
+    Args:
+        max_concurrency: requests allowed in flight at once (all for the same model)
+        max_batch: consecutive grants for one model before a waiting model is served
+        enabled: when False, slots are granted immediately and nothing is tracked
+        slot_timeout: default wait limit in seconds for ``slot``/``aslot`` (None waits forever)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        max_batch: int = 32,
+        enabled: bool = True,
+        slot_timeout: Optional[float] = 300.0,
+    ):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_batch = max(1, int(max_batch))
+        self.enabled = enabled
+        self.slot_timeout = slot_timeout if slot_timeout and slot_timeout > 0 else None
+        self.active_model: Optional[str] = None
+        self.in_flight = 0
+        self.swaps = 0
+        self.grants = 0
+        self.total_wait_seconds = 0.0
+        self._streak = 0
+        self._waiting: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "OllamaScheduler":
+        enabled = os.getenv("OLLAMA_SCHEDULER_ENABLED", "true").lower() in {"1", "true", "yes"}
+        try:
+            concurrency = int(os.getenv("OLLAMA_SCHEDULER_CONCURRENCY", "2"))
+            max_batch = int(os.getenv("OLLAMA_SCHEDULER_MAX_BATCH", "32"))
+            slot_timeout = float(os.getenv("OLLAMA_SLOT_TIMEOUT", "300"))
+        except ValueError:
+            logger.warning("Invalid OLLAMA_SCHEDULER_* / OLLAMA_SLOT_TIMEOUT setting, using defaults")
+            concurrency, max_batch, slot_timeout = 2, 32, 300.0
+        return cls(max_concurrency=concurrency, max_batch=max_batch, enabled=enabled, slot_timeout=slot_timeout)
+
+    # ------------------------------------------------------------------ slots
+
+    @contextmanager
+    def slot(
+        self, model: str, priority: Optional[Priority] = None, timeout: Optional[float] = None
+    ) -> Iterator[ModelCallTimer]:
+        """Block until a slot for ``model`` is granted (raises TimeoutError after ``timeout``).
+
+        ``timeout`` defaults to ``slot_timeout``, so a thread never waits
+        forever on a slot whose holder cannot run. ``priority`` defaults to
+        :data:`CURRENT_PRIORITY`. Yields the call's
+        latency timer; pass the HTTP response to ``call.observe()`` to record
+        its endpoint, size and status.
+        """
+        if not self.enabled:
+            with metrics.model_call_timer(model) as call:
+                yield call
+            return
+        if timeout is None:
+            timeout = self.slot_timeout
+        ticket = self._enqueue(model, priority, event=threading.Event())
+        if not ticket.event.wait(timeout):
+            with self._lock:
+                if not ticket.granted:
+                    self._waiting.remove(ticket)
+                    raise TimeoutError(f"No Ollama slot for {model} within {timeout}s")
+        try:
+            with metrics.model_call_timer(model) as call:
+                yield call
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(
+        self, model: str, priority: Optional[Priority] = None, timeout: Optional[float] = None
+    ) -> AsyncIterator[ModelCallTimer]:
+        """Async variant of :meth:`slot`; cancellation while waiting gives the place up."""
+        if not self.enabled:
+            with metrics.model_call_timer(model) as call:
+                yield call
+            return
+        if timeout is None:
+            timeout = self.slot_timeout
+        loop = asyncio.get_running_loop()
+        ticket = self._enqueue(model, priority, future=loop.create_future(), loop=loop)
+        try:
+            await asyncio.wait_for(ticket.future, timeout)
+        except BaseException:
+            with self._lock:
+                granted = ticket.granted
+                if not granted:
+                    self._waiting.remove(ticket)
+            if granted:
+                self._release()
+            raise
+        try:
+            with metrics.model_call_timer(model) as call:
+                yield call
+        finally:
+            self._release()
+
+    # -------------------------------------------------------------- internals
+
+    def _enqueue(self, model: str, priority: Optional[Priority], **waiter: Any) -> _Ticket:
+        if priority is None:
+            priority = CURRENT_PRIORITY.get()
+        ticket = _Ticket(
+            model=model or "",
+            priority=int(priority),
+            seq=next(self._seq),
+            enqueued_at=time.monotonic(),
+            **waiter,
+        )
+        with self._lock:
+            self._waiting.append(ticket)
+            self._dispatch()
+        return ticket
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant as many waiting tickets as the rules allow (caller holds the lock)."""
+        while self._waiting and self.in_flight < self.max_concurrency:
+            ticket = self._pick()
+            if ticket is None:
+                return
+            self._grant(ticket)
+
+    def _pick(self) -> Optional[_Ticket]:
+        top = min(t.priority for t in self._waiting)
+        candidates = [t for t in self._waiting if t.priority == top]
+        same = [t for t in candidates if t.model == self.active_model]
+        others = [t for t in candidates if t.model != self.active_model]
+
+        if same and not (others and self._streak >= self.max_batch):
+            return same[0]
+        if not others or self.in_flight:
+            # Let the active model drain before loading another one
+            return None
+
+        ticket = others[0]
+        if self.active_model is not None:
+            self.swaps += 1
+            logger.debug("Switching Ollama model %s -> %s", self.active_model, ticket.model)
+        self.active_model = ticket.model
+        self._streak = 0
+        return ticket
+
+    def _grant(self, ticket: _Ticket) -> None:
+        self._waiting.remove(ticket)
+        ticket.granted = True
+        self.in_flight += 1
+        self.grants += 1
+        self._streak += 1
+        self.total_wait_seconds += time.monotonic() - ticket.enqueued_at
+        if ticket.event is not None:
+            ticket.event.set()
+        else:
+            ticket.loop.call_soon_threadsafe(_resolve, ticket.future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth: Dict[str, int] = {}
+            for ticket in self._waiting:
+                depth[ticket.model] = depth.get(ticket.model, 0) + 1
+            return {
+                "enabled": self.enabled,
+                "active_model": self.active_model,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiting),
+                "queue_depth_by_model": depth,
+                "interactive_waiting": sum(1 for t in self._waiting if t.priority == Priority.INTERACTIVE),
+                "swaps": self.swaps,
+                "grants": self.grants,
+                "avg_wait_ms": round(self.total_wait_seconds / self.grants * 1000, 2) if self.grants else 0.0,
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+_scheduler: Optional[OllamaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ollama_scheduler() -> OllamaScheduler:
+    """Process-wide scheduler configured from the environment."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = OllamaScheduler.from_env()
+    return _scheduler
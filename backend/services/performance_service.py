@@ -5,6 +5,7 @@ from datetime import datetime
 
 from backend.services.database_adapter import DatabaseAdapter
 from backend.core.types import ProcessingResult
+from backend.utils.quantile_sketch import DDSketch
 
 
 class PerformanceCollector:
@@ -15,6 +16,12 @@ class PerformanceCollector:
     aggregates (avg, p50, p95, p99), stores baseline metrics, and tracks performance
     improvements over time.
     
+    Durations are recorded into DDSketch quantile sketches rather than lists, so
+    memory per stage/query/endpoint stays bounded and flushing does not sort the
+    samples. avg is exact; p50/p95/p99 are within ``relative_accuracy`` (default
+    1%) of the exact order statistic. Collectors in different workers can
+    exchange ``snapshot()`` results and combine them with ``merge_snapshot()``.
+    
     Usage Example:
         ```python
         # Initialize the collector
@@ -43,13 +50,17 @@ class PerformanceCollector:
     Attributes:
         db_adapter: PostgreSQL database adapter for storing metrics
         logger: Logger instance for tracking operations
-        _metrics_buffer: In-memory buffer for collecting stage metrics before aggregation
+        _metrics_buffer: Duration sketches per stage, collected before aggregation
+        _outcomes_buffer: Success/failure counters per stage
+        _db_buffer: Duration sketches per DB query type
+        _api_buffer: Duration sketches per API endpoint
     """
     
     def __init__(
         self,
         db_adapter: DatabaseAdapter,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        relative_accuracy: float = 0.01
     ):
         """
         Initialize the PerformanceCollector.
@@ -57,13 +68,22 @@ class PerformanceCollector:
         Args:
             db_adapter: PostgreSQL adapter instance for database operations
             logger: Optional logger instance (creates default if not provided)
+            relative_accuracy: Relative error bound of buffered percentiles (default: 1%)
         """
         self.db_adapter = db_adapter
         self.logger = logger or logging.getLogger(__name__)
-        self._metrics_buffer: Dict[str, List[float]] = {}
-        self._outcomes_buffer: Dict[str, List[bool]] = {}  # success/failure for rate calculation
-        self._db_buffer: Dict[str, List[float]] = {}
-        self._api_buffer: Dict[str, List[float]] = {}
+        self.relative_accuracy = relative_accuracy
+        self._metrics_buffer: Dict[str, DDSketch] = {}
+        self._outcomes_buffer: Dict[str, List[int]] = {}  # [success, failure] for rate calculation
+        self._db_buffer: Dict[str, DDSketch] = {}
+        self._api_buffer: Dict[str, DDSketch] = {}
+    
+    def _record(self, buffer: Dict[str, DDSketch], key: str, duration: float) -> None:
+        """Add a duration to the sketch for ``key``, creating it on first use."""
+        sketch = buffer.get(key)
+        if sketch is None:
+            sketch = buffer[key] = DDSketch(self.relative_accuracy)
+        sketch.add(duration)
     
     async def collect_stage_metrics(
         self,
@@ -99,14 +119,11 @@ class PerformanceCollector:
             )
             
             # Buffer processing time (including failures - time spent before failure)
-            if stage_name not in self._metrics_buffer:
-                self._metrics_buffer[stage_name] = []
-            self._metrics_buffer[stage_name].append(processing_time)
+            self._record(self._metrics_buffer, stage_name, max(processing_time, 0.0))
             
             # Buffer success/failure for rate calculation
-            if stage_name not in self._outcomes_buffer:
-                self._outcomes_buffer[stage_name] = []
-            self._outcomes_buffer[stage_name].append(is_success)
+            outcomes = self._outcomes_buffer.setdefault(stage_name, [0, 0])
+            outcomes[0 if is_success else 1] += 1
             
             document_id = processing_result.metadata.get('document_id', 'unknown')
             correlation_id = processing_result.metadata.get('correlation_id', 'N/A')
@@ -159,10 +176,7 @@ class PerformanceCollector:
                 )
                 return
             
-            if query_type not in self._db_buffer:
-                self._db_buffer[query_type] = []
-            
-            self._db_buffer[query_type].append(duration)
+            self._record(self._db_buffer, query_type, duration)
             
             self.logger.debug(
                 f"Collected DB metric for query '{query_type}': {duration:.3f}s"
@@ -206,10 +220,7 @@ class PerformanceCollector:
                 )
                 return
             
-            if endpoint not in self._api_buffer:
-                self._api_buffer[endpoint] = []
-            
-            self._api_buffer[endpoint].append(duration)
+            self._record(self._api_buffer, endpoint, duration)
             
             self.logger.debug(
                 f"Collected API metric for endpoint '{endpoint}': {duration:.3f}s"
@@ -630,6 +641,61 @@ class PerformanceCollector:
                 'p99_seconds': 0.0
             }
     
+    async def aggregate_sketch(
+        self,
+        stage_name: str,
+        sketch: Optional[DDSketch]
+    ) -> Dict[str, float]:
+        """
+        Calculate statistical aggregates (avg, p50, p95, p99) from a duration sketch.
+        
+        Same result keys and small-sample handling as aggregate_metrics(); avg is
+        exact, percentiles are within the sketch's relative accuracy.
+        
+        Args:
+            stage_name: Name of the pipeline stage (used for logging)
+            sketch: Durations recorded in seconds
+        
+        Returns:
+            Dictionary with keys: avg_seconds, p50_seconds, p95_seconds, p99_seconds
+            Returns zeros if the sketch is empty
+        """
+        if sketch is None or not sketch.count:
+            self.logger.warning(f"No durations provided for stage '{stage_name}'")
+            return {
+                'avg_seconds': 0.0,
+                'p50_seconds': 0.0,
+                'p95_seconds': 0.0,
+                'p99_seconds': 0.0
+            }
+        
+        if sketch.count < 5:
+            self.logger.warning(
+                f"Only {sketch.count} samples for stage '{stage_name}'. "
+                f"Using max value for p95 and p99."
+            )
+            p95 = p99 = sketch.max
+        else:
+            p95 = sketch.quantile(0.95)
+            p99 = sketch.quantile(0.99)
+        
+        metrics = {
+            'avg_seconds': round(sketch.avg, 3),
+            'p50_seconds': round(sketch.quantile(0.5), 3),
+            'p95_seconds': round(p95, 3),
+            'p99_seconds': round(p99, 3)
+        }
+        
+        self.logger.debug(
+            f"Aggregated {sketch.count} samples for stage '{stage_name}': "
+            f"avg={metrics['avg_seconds']:.3f}s, "
+            f"p50={metrics['p50_seconds']:.3f}s, "
+            f"p95={metrics['p95_seconds']:.3f}s, "
+            f"p99={metrics['p99_seconds']:.3f}s"
+        )
+        
+        return metrics
+    
     async def flush_db_buffer(
         self,
         query_type: Optional[str] = None
@@ -668,23 +734,22 @@ class PerformanceCollector:
             
             if query_type:
                 if query_type in self._db_buffer:
-                    durations = self._db_buffer[query_type]
-                    aggregated[query_type] = await self.aggregate_metrics(
-                        f"db__{query_type}", durations
+                    sketch = self._db_buffer.pop(query_type)
+                    aggregated[query_type] = await self.aggregate_sketch(
+                        f"db__{query_type}", sketch
                     )
-                    del self._db_buffer[query_type]
                     self.logger.info(
-                        f"Flushed {len(durations)} DB metrics for query '{query_type}'"
+                        f"Flushed {sketch.count} DB metrics for query '{query_type}'"
                     )
                 else:
                     self.logger.warning(f"No buffered DB metrics for query '{query_type}'")
             else:
-                for query, durations in list(self._db_buffer.items()):
-                    aggregated[query] = await self.aggregate_metrics(
-                        f"db__{query}", durations
+                for query, sketch in list(self._db_buffer.items()):
+                    aggregated[query] = await self.aggregate_sketch(
+                        f"db__{query}", sketch
                     )
                     self.logger.info(
-                        f"Flushed {len(durations)} DB metrics for query '{query}'"
+                        f"Flushed {sketch.count} DB metrics for query '{query}'"
                     )
                 self._db_buffer.clear()
             
@@ -732,23 +797,22 @@ class PerformanceCollector:
             
             if endpoint:
                 if endpoint in self._api_buffer:
-                    durations = self._api_buffer[endpoint]
-                    aggregated[endpoint] = await self.aggregate_metrics(
-                        f"api__{endpoint}", durations
+                    sketch = self._api_buffer.pop(endpoint)
+                    aggregated[endpoint] = await self.aggregate_sketch(
+                        f"api__{endpoint}", sketch
                     )
-                    del self._api_buffer[endpoint]
                     self.logger.info(
-                        f"Flushed {len(durations)} API metrics for endpoint '{endpoint}'"
+                        f"Flushed {sketch.count} API metrics for endpoint '{endpoint}'"
                     )
                 else:
                     self.logger.warning(f"No buffered API metrics for endpoint '{endpoint}'")
             else:
-                for ep, durations in list(self._api_buffer.items()):
-                    aggregated[ep] = await self.aggregate_metrics(
-                        f"api__{ep}", durations
+                for ep, sketch in list(self._api_buffer.items()):
+                    aggregated[ep] = await self.aggregate_sketch(
+                        f"api__{ep}", sketch
                     )
                     self.logger.info(
-                        f"Flushed {len(durations)} API metrics for endpoint '{ep}'"
+                        f"Flushed {sketch.count} API metrics for endpoint '{ep}'"
                     )
                 self._api_buffer.clear()
             
@@ -788,12 +852,10 @@ class PerformanceCollector:
             aggregated = {}
             
             async def flush_one(sname: str) -> None:
-                durations = self._metrics_buffer.get(sname, [])
-                outcomes = self._outcomes_buffer.get(sname, [])
-                metrics = await self.aggregate_metrics(sname, durations)
-                success_count = sum(1 for o in outcomes if o)
-                failure_count = len(outcomes) - success_count
-                total = len(outcomes)
+                sketch = self._metrics_buffer.get(sname)
+                success_count, failure_count = self._outcomes_buffer.get(sname, [0, 0])
+                metrics = await self.aggregate_sketch(sname, sketch)
+                total = success_count + failure_count
                 metrics['success_count'] = success_count
                 metrics['failure_count'] = failure_count
                 metrics['success_rate'] = success_count / total if total else 0.0
@@ -803,7 +865,7 @@ class PerformanceCollector:
                 if sname in self._outcomes_buffer:
                     del self._outcomes_buffer[sname]
                 self.logger.info(
-                    f"Flushed {len(durations)} metrics for stage '{sname}' "
+                    f"Flushed {sketch.count if sketch else 0} metrics for stage '{sname}' "
                     f"(success={success_count}, failure={failure_count})"
                 )
             
@@ -994,10 +1056,10 @@ class PerformanceCollector:
             collector.clear_buffer()
             ```
         """
-        stage_count = sum(len(durations) for durations in self._metrics_buffer.values())
-        outcome_count = sum(len(o) for o in self._outcomes_buffer.values())
-        db_count = sum(len(durations) for durations in self._db_buffer.values())
-        api_count = sum(len(durations) for durations in self._api_buffer.values())
+        stage_count = sum(sketch.count for sketch in self._metrics_buffer.values())
+        outcome_count = sum(sum(o) for o in self._outcomes_buffer.values())
+        db_count = sum(sketch.count for sketch in self._db_buffer.values())
+        api_count = sum(sketch.count for sketch in self._api_buffer.values())
 
         self._metrics_buffer.clear()
         self._outcomes_buffer.clear()
@@ -1009,6 +1071,53 @@ class PerformanceCollector:
             f"DB: {db_count}, API: {api_count} samples)"
         )
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        JSON-serializable copy of all buffers for merging into another collector.
+        
+        Returns:
+            Dictionary with 'stages', 'outcomes', 'db' and 'api' sections
+        
+        Example:
+            ```python
+            # In each worker
+            payload = json.dumps(collector.snapshot())
+            
+            # In the aggregating process
+            main_collector.merge_snapshot(json.loads(payload))
+            aggregated = await main_collector.flush_metrics_buffer()
+            ```
+        """
+        return {
+            'stages': {name: sketch.to_dict() for name, sketch in self._metrics_buffer.items()},
+            'outcomes': {name: list(counts) for name, counts in self._outcomes_buffer.items()},
+            'db': {name: sketch.to_dict() for name, sketch in self._db_buffer.items()},
+            'api': {name: sketch.to_dict() for name, sketch in self._api_buffer.items()},
+        }
+    
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Add another collector's snapshot() to this collector's buffers.
+        
+        Args:
+            snapshot: Result of snapshot() (possibly after a JSON round trip)
+        """
+        for section, buffer in (
+            ('stages', self._metrics_buffer),
+            ('db', self._db_buffer),
+            ('api', self._api_buffer),
+        ):
+            for name, data in snapshot.get(section, {}).items():
+                sketch = DDSketch.from_dict(data)
+                if name in buffer:
+                    buffer[name].merge(sketch)
+                else:
+                    buffer[name] = sketch
+        for name, (success_count, failure_count) in snapshot.get('outcomes', {}).items():
+            outcomes = self._outcomes_buffer.setdefault(name, [0, 0])
+            outcomes[0] += success_count
+            outcomes[1] += failure_count
+    
     async def store_stage_metric(
         self,
         document_id: str,
@@ -34,7 +34,9 @@ from backend.core.data_models import (
     ProductSeriesModel,
     SearchAnalyticsModel,
 )
+from backend.pipeline.metrics import metrics
 
+from . import db_pool
 from .database_adapter import DatabaseAdapter
 
 
@@ -60,6 +62,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
         self.postgres_url = postgres_url
         self.schema_prefix = schema_prefix
         self.pg_pool: asyncpg.Pool | None = None
+        # Only pools this adapter created itself are closed on disconnect()
+        self._owns_pool = False
 
         # Query cache: original_query -> (formatted_query, param_names_or_is_positional)
         self._query_cache: dict[str, tuple[str, Any]] = {}
@@ -78,13 +82,24 @@ class PostgreSQLAdapter(DatabaseAdapter):
     async def initialize(self):
         """Initialize database connection pool."""
         try:
-            self.pg_pool = await asyncpg.create_pool(self.postgres_url, min_size=2, max_size=10, command_timeout=60)
+            await self._attach_pool()
             self.logger.info("PostgreSQL connection pool initialized")
             return True
         except Exception as e:
             self.logger.error(f"Failed to initialize PostgreSQL pool: {e}")
             raise
 
+    async def _attach_pool(self) -> None:
+        """Use the process-wide pool when the DSN matches, else create a private one."""
+        if self.pg_pool is not None:
+            return
+        if self.postgres_url == db_pool.resolve_database_url():
+            self.pg_pool = await db_pool.get_pool()
+            self._owns_pool = False
+        else:
+            self.pg_pool = await db_pool.create_pool(dsn=self.postgres_url, pool_name="adapter")
+            self._owns_pool = True
+
     def _ensure_pool(self) -> asyncpg.Pool:
         if self.pg_pool is None:
             raise RuntimeError("PostgreSQL connection pool is not initialized. Call connect() first.")
@@ -167,15 +182,23 @@ class PostgreSQLAdapter(DatabaseAdapter):
         """Execute query and return a single row."""
         pool = self._ensure_pool()
         formatted_query, values = self._prepare_query(query, params)
-        async with pool.acquire() as conn:
-            return await conn.fetchrow(formatted_query, *values)
+        with metrics.query_timer(formatted_query) as timer:
+            async with pool.acquire() as conn:
+                timer.acquired()
+                row = await conn.fetchrow(formatted_query, *values)
+                timer.rows = 0 if row is None else 1
+                return row
 
     async def fetch_all(self, query: str, params: Any | None = None) -> list[Any]:
         """Execute query and return all rows."""
         pool = self._ensure_pool()
         formatted_query, values = self._prepare_query(query, params)
-        async with pool.acquire() as conn:
-            return await conn.fetch(formatted_query, *values)
+        with metrics.query_timer(formatted_query) as timer:
+            async with pool.acquire() as conn:
+                timer.acquired()
+                rows = await conn.fetch(formatted_query, *values)
+                timer.rows = len(rows)
+                return rows
 
     async def execute_query(self, query: str, params: Any | None = None):
         """Execute arbitrary SQL query supporting SELECT and mutation statements."""
@@ -183,24 +206,28 @@ class PostgreSQLAdapter(DatabaseAdapter):
         formatted_query, values = self._prepare_query(query, params)
         lower_query = formatted_query.lstrip().lower()
 
-        async with pool.acquire() as conn:
-            # Return rows for SELECT/RETURNING/CTE statements
-            if lower_query.startswith(("select", "with")) or " returning " in lower_query:
-                rows = await conn.fetch(formatted_query, *values)
-                return [dict(row) for row in rows]
+        with metrics.query_timer(formatted_query) as timer:
+            async with pool.acquire() as conn:
+                timer.acquired()
+                # Return rows for SELECT/RETURNING/CTE statements
+                if lower_query.startswith(("select", "with")) or " returning " in lower_query:
+                    rows = await conn.fetch(formatted_query, *values)
+                    timer.rows = len(rows)
+                    return [dict(row) for row in rows]
 
-            status = await conn.execute(formatted_query, *values)
+                status = await conn.execute(formatted_query, *values)
 
-            # Extract rowcount from command tag (e.g., "UPDATE 1")
-            rowcount = 0
-            try:
-                parts = status.split()
-                if parts and parts[-1].isdigit():
-                    rowcount = int(parts[-1])
-            except Exception:  # pragma: no cover - fallback safety
+                # Extract rowcount from command tag (e.g., "UPDATE 1")
                 rowcount = 0
+                try:
+                    parts = status.split()
+                    if parts and parts[-1].isdigit():
+                        rowcount = int(parts[-1])
+                except Exception:  # pragma: no cover - fallback safety
+                    rowcount = 0
 
-            return SimpleNamespace(status=status, rowcount=rowcount)
+                timer.rows = rowcount
+                return SimpleNamespace(status=status, rowcount=rowcount)
 
     async def rpc(self, function_name: str, params: dict[str, Any] | None = None) -> Any:
         """Execute a PostgreSQL stored procedure.
@@ -255,13 +282,14 @@ class PostgreSQLAdapter(DatabaseAdapter):
         return columns, placeholders, values
 
     @staticmethod
-    def _vector_literal(values: list[float]) -> str:
-        return "[" + ",".join(f"{v:.8f}" for v in values) + "]"
+    def _vector_param(values: list[float]) -> list[float]:
+        # Bound as a float list; the pool's binary pgvector codec does the encoding
+        return [float(v) for v in values]
 
     async def connect(self) -> None:
         """Establish PostgreSQL connection pool"""
         try:
-            self.pg_pool = await asyncpg.create_pool(self.postgres_url, min_size=2, max_size=10, command_timeout=60)
+            await self._attach_pool()
             self.logger.info("Connected to PostgreSQL database (asyncpg pool)")
             await self.test_connection()
         except Exception as e:
@@ -269,11 +297,13 @@ class PostgreSQLAdapter(DatabaseAdapter):
             raise RuntimeError(f"Cannot connect to PostgreSQL database: {e}")
 
     async def disconnect(self) -> None:
-        """Close PostgreSQL connection pool"""
+        """Close PostgreSQL connection pool (the shared pool is left to db_pool.close_pool())"""
         if self.pg_pool is not None:
-            await self.pg_pool.close()
+            if self._owns_pool:
+                await self.pg_pool.close()
+                self.logger.info("PostgreSQL connection pool closed")
             self.pg_pool = None
-            self.logger.info("PostgreSQL connection pool closed")
+            self._owns_pool = False
 
     async def test_connection(self) -> bool:
         """Test database connection"""
@@ -782,8 +812,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
 
                 # Add vector field if present
                 if vector_value is not None:
-                    set_clauses.append(f"context_embedding = ${param_idx}::vector")
-                    values.append(self._vector_literal(vector_value))
+                    set_clauses.append(f"context_embedding = ${param_idx}::{db_pool.embedding_storage_type()}")
+                    values.append(self._vector_param(vector_value))
                     param_idx += 1
 
                 values.append(image_id)  # WHERE clause parameter
@@ -830,8 +860,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
 
                 # Add vector field if present
                 if vector_value is not None:
-                    set_clauses.append(f"context_embedding = ${param_idx}::vector")
-                    values.append(self._vector_literal(vector_value))
+                    set_clauses.append(f"context_embedding = ${param_idx}::{db_pool.embedding_storage_type()}")
+                    values.append(self._vector_param(vector_value))
                     param_idx += 1
 
                 values.append(video_id)  # WHERE clause parameter
@@ -878,8 +908,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
 
                 # Add vector field if present
                 if vector_value is not None:
-                    set_clauses.append(f"context_embedding = ${param_idx}::vector")
-                    values.append(self._vector_literal(vector_value))
+                    set_clauses.append(f"context_embedding = ${param_idx}::{db_pool.embedding_storage_type()}")
+                    values.append(self._vector_param(vector_value))
                     param_idx += 1
 
                 values.append(link_id)  # WHERE clause parameter
@@ -1015,10 +1045,10 @@ class PostgreSQLAdapter(DatabaseAdapter):
         embedding_data = embedding.model_dump(mode="python", exclude_none=True)
         embedding_vector = embedding_data.pop("embedding")
         columns, placeholders, values = self._prepare_insert(embedding_data)
-        vector_placeholder = f"${len(values) + 1}::vector"
+        vector_placeholder = f"${len(values) + 1}::{db_pool.embedding_storage_type()}"
         columns.insert(2, "embedding")
         placeholders.insert(2, vector_placeholder)
-        values.insert(2, self._vector_literal(embedding_vector))
+        values.insert(2, self._vector_param(embedding_vector))
         sql = (
             f"INSERT INTO {self._intelligence_schema}.embeddings "
             f"({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING id"
@@ -1039,13 +1069,13 @@ class PostgreSQLAdapter(DatabaseAdapter):
     ) -> str:
         pool = self._ensure_pool()
 
-        vector_literal = self._vector_literal([float(v) for v in embedding])
+        vector_param = self._vector_param(embedding)
         metadata_json = json.dumps(metadata or {}, ensure_ascii=False)
 
         sql = (
             f"INSERT INTO {self._intelligence_schema}.unified_embeddings "
             "(source_id, source_type, embedding, model_name, embedding_context, metadata) "
-            "VALUES ($1::uuid, $2, $3::vector, $4, $5, $6::jsonb) "
+            f"VALUES ($1::uuid, $2, $3::{db_pool.embedding_storage_type()}, $4, $5, $6::jsonb) "
             "RETURNING id"
         )
 
@@ -1054,7 +1084,7 @@ class PostgreSQLAdapter(DatabaseAdapter):
                 sql,
                 source_id,
                 source_type,
-                vector_literal,
+                vector_param,
                 model_name,
                 embedding_context,
                 metadata_json,
@@ -1083,14 +1113,15 @@ class PostgreSQLAdapter(DatabaseAdapter):
         columns, placeholders, values = self._prepare_insert(table_data)
 
         # Add vector fields if present
+        storage_type = db_pool.embedding_storage_type()
         if table_embedding:
             columns.append("table_embedding")
-            placeholders.append(f"${len(values) + 1}::vector")
-            values.append(self._vector_literal(table_embedding))
+            placeholders.append(f"${len(values) + 1}::{storage_type}")
+            values.append(self._vector_param(table_embedding))
         if context_embedding:
             columns.append("context_embedding")
-            placeholders.append(f"${len(values) + 1}::vector")
-            values.append(self._vector_literal(context_embedding))
+            placeholders.append(f"${len(values) + 1}::{storage_type}")
+            values.append(self._vector_param(context_embedding))
 
         sql = (
             f"INSERT INTO {self._intelligence_schema}.structured_tables "
@@ -1121,26 +1152,72 @@ class PostgreSQLAdapter(DatabaseAdapter):
             return [dict(row) for row in rows]
 
     async def search_embeddings(
-        self, query_embedding: list[float], limit: int = 10, match_threshold: float = 0.7, match_count: int = 10
+        self,
+        query_embedding: list[float],
+        limit: int = 10,
+        match_threshold: float = 0.7,
+        match_count: int = 10,
+        source_type: str | None = None,
+        rescore_factor: int | None = None,
     ) -> list[dict[str, Any]]:
+        """
+        Nearest unified embeddings, taken from the HNSW index and thresholded afterwards.
+
+        With ``rescore_factor`` the first pass runs over the binary-quantized
+        index (migration 035): ``match_count * rescore_factor`` candidates by
+        Hamming distance, re-ranked by cosine distance on the stored embedding.
+        ``chunk_id`` carries the source id for callers of the former
+        ``embeddings`` table.
+        """
         pool = self._ensure_pool()
-        vector_literal = self._vector_literal(query_embedding)
         effective_limit = max(limit, match_count)
+        schema = self._intelligence_schema
+        if rescore_factor and rescore_factor > 1:
+            candidates = effective_limit * rescore_factor
+            candidate_sql = f"""
+                SELECT q.* FROM (
+                    SELECT e.id, e.source_id, e.source_type, e.model_name, e.created_at, e.embedding
+                    FROM {schema}.unified_embeddings e
+                    ORDER BY binary_quantize(e.embedding)::bit(768) <~> binary_quantize($1::vector)
+                    LIMIT $4
+                ) q
+                WHERE $5::text IS NULL OR q.source_type = $5
+            """
+        else:
+            candidates = effective_limit
+            candidate_sql = f"""
+                SELECT e.id, e.source_id, e.source_type, e.model_name, e.created_at, e.embedding
+                FROM {schema}.unified_embeddings e
+                WHERE $5::text IS NULL OR e.source_type = $5
+                ORDER BY e.embedding <=> $1::vector
+                LIMIT $4
+            """
         sql = f"""
-            SELECT
-                e.id,
-                e.chunk_id,
-                e.model_name,
-                e.model_version,
-                e.created_at,
-                (1 - (e.embedding <=> {vector_literal}::vector)) AS similarity
-            FROM {self._intelligence_schema}.embeddings e
-            WHERE (1 - (e.embedding <=> {vector_literal}::vector)) >= $1
-            ORDER BY similarity DESC
-            LIMIT $2
+            SELECT nn.id, nn.source_id AS chunk_id, nn.source_type, nn.model_name, nn.created_at,
+                   (1 - nn.distance) AS similarity
+            FROM (
+                SELECT c.*, c.embedding <=> $1::vector AS distance
+                FROM ({candidate_sql}) c
+                ORDER BY distance
+                LIMIT $2
+            ) nn
+            WHERE 1 - nn.distance >= $3
+            ORDER BY nn.distance
         """
         async with pool.acquire() as conn:
-            rows = await conn.fetch(sql, match_threshold, effective_limit)
+            async with conn.transaction():
+                # The index returns at most ef_search rows
+                await conn.execute(
+                    f"SELECT {schema}.apply_hnsw_settings(NULL, NULL, $1)", candidates
+                )
+                rows = await conn.fetch(
+                    sql,
+                    self._vector_param(query_embedding),
+                    effective_limit,
+                    match_threshold,
+                    candidates,
+                    source_type,
+                )
             return [dict(row) for row in rows]
 
     async def create_error_code(self, error_code: ErrorCodeModel) -> str:
@@ -1156,6 +1233,75 @@ class PostgreSQLAdapter(DatabaseAdapter):
             self.logger.info(f"Created error code {error_code_id}")
             return str(error_code_id)
 
+    # SQL element types for the unnest() arrays of create_error_codes_bulk
+    _ERROR_CODE_COLUMN_TYPES = {
+        "id": "uuid",
+        "chunk_id": "uuid",
+        "error_code": "text",
+        "error_description": "text",
+        "solution_customer_text": "text",
+        "solution_agent_text": "text",
+        "solution_technician_text": "text",
+        "page_number": "integer",
+        "confidence_score": "float8",
+        "extraction_method": "text",
+        "requires_parts": "boolean",
+        "estimated_fix_time_minutes": "integer",
+        "severity_level": "text",
+        "parent_code": "text",
+        "is_category": "boolean",
+        "created_at": "timestamptz",
+    }
+
+    async def create_error_codes_bulk(self, document_id: str, error_codes: list[ErrorCodeModel]) -> list[str]:
+        """Insert all error codes of one document with a single statement.
+
+        Codes the document already has (same ``error_code``) are skipped, so
+        re-running metadata extraction does not duplicate rows. A transaction-level
+        advisory lock on the document serialises concurrent runs. Returns the ids
+        of the inserted rows.
+        """
+        if not error_codes:
+            return []
+
+        rows: dict[str, dict[str, Any]] = {}
+        for model in error_codes:
+            rows.setdefault(model.error_code, model.model_dump(mode="python"))
+        # Columns that are NULL for every row are left to their database defaults
+        columns = [
+            column
+            for column in self._ERROR_CODE_COLUMN_TYPES
+            if any(row.get(column) is not None for row in rows.values())
+        ]
+        arrays = [[row.get(column) for row in rows.values()] for column in columns]
+        unnest_args = ", ".join(
+            f"${idx + 2}::{self._ERROR_CODE_COLUMN_TYPES[column]}[]" for idx, column in enumerate(columns)
+        )
+        sql = f"""
+            INSERT INTO {self._intelligence_schema}.error_codes (document_id, {', '.join(columns)})
+            SELECT $1::uuid, {', '.join(f'r.{column}' for column in columns)}
+            FROM unnest({unnest_args}) AS r({', '.join(columns)})
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {self._intelligence_schema}.error_codes e
+                WHERE e.document_id = $1::uuid AND e.error_code = r.error_code
+            )
+            RETURNING id
+        """
+
+        pool = self._ensure_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", f"error_codes:{document_id}")
+                inserted = await conn.fetch(sql, str(document_id), *arrays)
+        self.logger.info(
+            "Inserted %d of %d error codes for document %s (%d already present)",
+            len(inserted),
+            len(rows),
+            document_id,
+            len(rows) - len(inserted),
+        )
+        return [str(row["id"]) for row in inserted]
+
     async def get_error_codes_by_document(self, document_id: str) -> list[dict[str, Any]]:
         """Return all error codes for a document."""
         pool = self._ensure_pool()
@@ -1656,7 +1802,15 @@ class PostgreSQLAdapter(DatabaseAdapter):
             await conn.execute(sql, *param_values)
 
     async def match_multimodal(
-        self, query_embedding: list[float], match_threshold: float = 0.5, match_count: int = 10
+        self,
+        query_embedding: list[float],
+        match_threshold: float = 0.5,
+        match_count: int = 10,
+        document_id: str | None = None,
+        manufacturer_id: str | None = None,
+        product_id: str | None = None,
+        ef_search: int | None = None,
+        iterative_scan: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Wrapper for match_multimodal RPC function
@@ -1665,20 +1819,33 @@ class PostgreSQLAdapter(DatabaseAdapter):
             query_embedding: Query embedding vector
             match_threshold: Similarity threshold
             match_count: Maximum number of results
+            document_id: Only match content of this document
+            manufacturer_id: Only match content of this manufacturer's documents
+            product_id: Only match content of documents linked to this product
+            ef_search: hnsw.ef_search for this query (default: server setting)
+            iterative_scan: hnsw.iterative_scan for this query ('relaxed_order',
+                'strict_order' or 'off'); keeps filtered queries from running
+                out of index candidates
 
         Returns:
             List of multimodal search results
         """
         try:
             pool = self._ensure_pool()
-            vector_literal = self._vector_literal(query_embedding)
+            vector_param = self._vector_param(query_embedding)
 
             async with pool.acquire() as conn:
                 results = await conn.fetch(
-                    f"SELECT * FROM {self._intelligence_schema}.match_multimodal($1::vector, $2, $3)",
-                    vector_literal,
+                    f"SELECT * FROM {self._intelligence_schema}.match_multimodal("
+                    "$1::vector, $2, $3, $4::uuid, $5::uuid, $6::uuid, $7, $8)",
+                    vector_param,
                     match_threshold,
                     match_count,
+                    document_id,
+                    manufacturer_id,
+                    product_id,
+                    ef_search,
+                    iterative_scan,
                 )
 
                 return [dict(result) for result in results]
@@ -1687,6 +1854,60 @@ class PostgreSQLAdapter(DatabaseAdapter):
             self.logger.error(f"Failed to execute match_multimodal: {e}")
             return []
 
+    async def hybrid_search_chunks(
+        self,
+        query_text: str,
+        query_embedding: list[float] | None,
+        match_count: int = 10,
+        exact_token: str | None = None,
+        candidate_count: int = 50,
+        rrf_k: int = 60,
+        ef_search: int | None = None,
+        iterative_scan: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Wrapper for hybrid_search_chunks RPC function
+
+        Full-text, vector and exact-token candidates are ranked and fused
+        (reciprocal rank fusion) server-side in a single round trip.
+
+        Args:
+            query_text: Natural-language query for the full-text list
+            query_embedding: Query embedding vector (None skips the vector list)
+            match_count: Maximum number of fused results
+            exact_token: Identifier (error code, part number) matched verbatim
+            candidate_count: Candidates taken from each ranked list
+            rrf_k: Reciprocal rank fusion constant
+            ef_search: hnsw.ef_search for the vector list (at least candidate_count)
+            iterative_scan: hnsw.iterative_scan for the vector list
+
+        Returns:
+            List of chunk results ordered by fused score
+        """
+        try:
+            pool = self._ensure_pool()
+            vector_param = self._vector_param(query_embedding) if query_embedding else None
+
+            async with pool.acquire() as conn:
+                results = await conn.fetch(
+                    f"SELECT * FROM {self._intelligence_schema}.hybrid_search_chunks("
+                    "$1, $2::vector, $3, $4, $5, $6, $7, $8)",
+                    query_text,
+                    vector_param,
+                    match_count,
+                    exact_token,
+                    candidate_count,
+                    rrf_k,
+                    ef_search,
+                    iterative_scan,
+                )
+
+                return [dict(result) for result in results]
+
+        except Exception as e:
+            self.logger.error(f"Failed to execute hybrid_search_chunks: {e}")
+            return []
+
     async def match_images_by_context(
         self, query_embedding: list[float], match_threshold: float = 0.5, match_count: int = 5
     ) -> list[dict[str, Any]]:
@@ -1703,12 +1924,12 @@ class PostgreSQLAdapter(DatabaseAdapter):
         """
         try:
             pool = self._ensure_pool()
-            vector_literal = self._vector_literal(query_embedding)
+            vector_param = self._vector_param(query_embedding)
 
             async with pool.acquire() as conn:
                 results = await conn.fetch(
                     f"SELECT * FROM {self._intelligence_schema}.match_images_by_context($1::vector, $2, $3)",
-                    vector_literal,
+                    vector_param,
                     match_threshold,
                     match_count,
                 )
@@ -7,8 +7,10 @@ Configuration (env vars):
   RERANKING_TOP_N    default: 5      — results returned after reranking
   RERANKING_CANDIDATES default: 20  — how many candidates to fetch before reranking
 """
+import asyncio
 import logging
 import os
+import threading
 from typing import Optional
 
 logger = logging.getLogger("krai.reranking")
@@ -21,6 +23,7 @@ class RerankingService:
     Usage:
         svc = RerankingService()
         top_texts = svc.rerank(query, candidate_texts, top_n=5)
+        top_texts = await svc.arerank(query, candidate_texts, top_n=5)  # from async code
 
     Callers extract text from result objects before calling rerank(), then
     re-attach metadata by index after (index-based reconstruction pattern).
@@ -32,9 +35,18 @@ class RerankingService:
         self.default_top_n = int(os.getenv("RERANKING_TOP_N", "5"))
         self.candidates = int(os.getenv("RERANKING_CANDIDATES", "20"))
         self._model: Optional[object] = None
+        # The CrossEncoder is loaded on the first rerank() call, not at construction,
+        # so building the service (e.g. during API startup) stays cheap.
+        self._model_loaded = False
+        self._model_lock = threading.Lock()
 
-        if self.enabled:
-            self._load_model()
+    def _ensure_model(self) -> None:
+        if self._model_loaded or not self.enabled:
+            return
+        with self._model_lock:
+            if not self._model_loaded:
+                self._load_model()
+                self._model_loaded = True
 
     def _load_model(self) -> None:
         try:
@@ -60,6 +72,8 @@ class RerankingService:
         """
         n = top_n if top_n is not None else self.default_top_n
 
+        if texts:
+            self._ensure_model()
         if not self.enabled or self._model is None or not texts:
             return texts[:n]
 
@@ -71,3 +85,11 @@ class RerankingService:
         except Exception as e:
             logger.warning("RerankingService.rerank failed, returning unranked: %s", e)
             return texts[:n]
+
+    async def arerank(self, query: str, texts: list[str], top_n: int | None = None) -> list[str]:
+        """Async ``rerank()`` for request handlers.
+
+        The first call loads the CrossEncoder and every call runs ``predict()``; both
+        block for a while, so they run in a worker thread instead of on the event loop.
+        """
+        return await asyncio.to_thread(self.rerank, query, texts, top_n)
@@ -0,0 +1,127 @@
+"""Read access to the trigger-maintained statistics counters.
+
+Migration 031 keeps ``krai_system.stat_counters`` up to date from statement
+triggers on documents, products, manufacturers, the processing queue and media
+tables. Dimensions are ``<table>`` (key ``''``) for row totals and
+``<table>.<column>`` for per-value counts, e.g. ``documents.processing_status``.
+
+When the migration has not been applied yet, :meth:`StatsService.read` returns
+``None`` and callers fall back to live ``COUNT(*)`` queries.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger("krai.stats")
+
+FetchFn = Callable[[str, Sequence[Any]], Awaitable[List[Any]]]
+
+STAT_COUNTERS_QUERY = """
+    SELECT dimension, key, count, updated_at
+    FROM krai_system.stat_counters
+    WHERE dimension = ANY($1::text[])
+"""
+
+UNDEFINED_TABLE_SQLSTATE = "42P01"
+
+# How long to skip the counters table after finding it missing
+MISSING_TABLE_RETRY_SECONDS = 300.0
+
+
+@dataclass
+class StatsSnapshot:
+    """Counter values for the requested dimensions plus their freshness."""
+
+    totals: Dict[str, int] = field(default_factory=dict)
+    groups: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    updated_at: Optional[datetime] = None
+
+    def total(self, table: str) -> int:
+        return self.totals.get(table, 0)
+
+    def group(self, table: str, column: str, *, include_unknown: bool = True) -> Dict[str, int]:
+        counts = self.groups.get(f"{table}.{column}", {})
+        if include_unknown:
+            return dict(counts)
+        return {key: value for key, value in counts.items() if key != "unknown"}
+
+
+def build_snapshot(rows: Iterable[Any]) -> StatsSnapshot:
+    """Fold ``stat_counters`` rows into a :class:`StatsSnapshot`.
+
+    Zero counters (values that no longer occur) are dropped so the grouped
+    dicts match what a live ``GROUP BY`` would return.
+    """
+    snapshot = StatsSnapshot()
+    for row in rows:
+        dimension = row["dimension"]
+        count = int(row["count"] or 0)
+        updated_at = row["updated_at"]
+        if updated_at is not None and (snapshot.updated_at is None or updated_at > snapshot.updated_at):
+            snapshot.updated_at = updated_at
+        if "." not in dimension:
+            snapshot.totals[dimension] = count
+        elif count > 0:
+            snapshot.groups.setdefault(dimension, {})[row["key"]] = count
+    return snapshot
+
+
+def _is_missing_table(exc: Exception) -> bool:
+    if getattr(exc, "sqlstate", None) == UNDEFINED_TABLE_SQLSTATE:
+        return True
+    return "stat_counters" in str(exc) and "does not exist" in str(exc)
+
+
+class StatsService:
+    """Reads counters through either an asyncpg pool or a ``DatabaseAdapter``."""
+
+    _counters_missing_until: float = 0.0
+
+    def __init__(self, fetch: FetchFn) -> None:
+        self._fetch = fetch
+
+    @classmethod
+    def from_pool(cls, pool: Any) -> "StatsService":
+        async def _fetch(query: str, params: Sequence[Any]) -> List[Any]:
+            async with pool.acquire() as conn:
+                return await conn.fetch(query, *params)
+
+        return cls(_fetch)
+
+    @classmethod
+    def from_adapter(cls, adapter: Any) -> "StatsService":
+        async def _fetch(query: str, params: Sequence[Any]) -> List[Any]:
+            return await adapter.execute_query(query, list(params)) or []
+
+        return cls(_fetch)
+
+    async def read(self, dimensions: Sequence[str]) -> Optional[StatsSnapshot]:
+        """Return counters for ``dimensions`` or ``None`` if they are unavailable."""
+        if time.monotonic() < StatsService._counters_missing_until:
+            return None
+        try:
+            rows = await self._fetch(STAT_COUNTERS_QUERY, [list(dimensions)])
+        except Exception as exc:
+            if not _is_missing_table(exc):
+                raise
+            logger.warning(
+                "krai_system.stat_counters missing (apply migration 031); using live COUNT(*) queries"
+            )
+            StatsService._counters_missing_until = time.monotonic() + MISSING_TABLE_RETRY_SECONDS
+            return None
+
+        snapshot = build_snapshot(rows or [])
+        # Counters are backfilled by the migration; an empty result means it never ran
+        if not snapshot.totals:
+            return None
+        return snapshot
+
+
+def table_dimensions(table: str, columns: Iterable[str] = ()) -> List[str]:
+    """Dimension names for a table total and its grouped columns."""
+    return [table, *(f"{table}.{column}" for column in columns)]
@@ -4,6 +4,12 @@ Structured Logger for JSON-based Error Logging
 Provides JSON-formatted logging with file rotation for pipeline error tracking.
 Supports correlation IDs, error IDs, and rich contextual metadata.
 
+Records are handed to a bounded queue (QueueHandler) and written by a
+QueueListener thread, so callers never wait on disk I/O. When the queue is
+full, records are dropped and counted in ``dropped_records`` instead of
+blocking the pipeline. The listener is stopped (and the queue drained) by
+``close()`` and at interpreter exit.
+
 Usage:
     logger = StructuredLogger("pipeline", "logs/pipeline.log")
     await logger.log_error(
@@ -14,16 +20,43 @@ Usage:
     )
 """
 
+import atexit
 import json
 import logging
-import asyncio
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 import traceback
 
 
+# Active listener per logger name, so re-creating a logger stops the old thread
+_LISTENERS: Dict[str, QueueListener] = {}
+
+
+@atexit.register
+def _stop_listeners():
+    """Drain and stop all listener threads at interpreter exit."""
+    while _LISTENERS:
+        _, listener = _LISTENERS.popitem()
+        listener.stop()
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records on a full queue instead of raising."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 class StructuredLogger:
     """
     JSON-based structured logger with file rotation.
@@ -31,7 +64,7 @@ class StructuredLogger:
     Features:
     - JSON-formatted log entries for easy parsing
     - Automatic file rotation (100MB max, 10 backup files)
-    - Async writes to avoid blocking the pipeline
+    - Non-blocking writes through a bounded queue and a listener thread
     - Correlation ID and error ID tracking
     - Rich contextual metadata support
     
@@ -40,6 +73,7 @@ class StructuredLogger:
         log_file_path (str): Path to the log file
         max_bytes (int): Maximum file size before rotation (default: 100MB)
         backup_count (int): Number of backup files to keep (default: 10)
+        queue_size (int): Maximum records waiting for the writer thread (default: 10000)
     """
     
     def __init__(
@@ -47,7 +81,8 @@ class StructuredLogger:
         logger_name: str,
         log_file_path: str,
         max_bytes: int = 100 * 1024 * 1024,  # 100MB
-        backup_count: int = 10
+        backup_count: int = 10,
+        queue_size: int = 10000
     ):
         """
         Initialize the structured logger.
@@ -57,11 +92,13 @@ class StructuredLogger:
             log_file_path: Path where log file should be created
             max_bytes: Maximum file size before rotation (default: 100MB)
             backup_count: Number of backup files to keep (default: 10)
+            queue_size: Maximum records waiting for the writer thread (default: 10000)
         """
         self.logger_name = logger_name
         self.log_file_path = log_file_path
         self.max_bytes = max_bytes
         self.backup_count = backup_count
+        self.queue_size = queue_size
         
         # Ensure log directory exists
         log_dir = Path(log_file_path).parent
@@ -75,18 +112,41 @@ class StructuredLogger:
         # Remove existing handlers to avoid duplicates
         self._logger.handlers.clear()
         
-        # Add rotating file handler
-        handler = RotatingFileHandler(
+        # Rotating file handler, driven by the listener thread
+        self._file_handler = RotatingFileHandler(
             log_file_path,
             maxBytes=max_bytes,
             backupCount=backup_count,
             encoding='utf-8'
         )
-        handler.setLevel(logging.DEBUG)
+        self._file_handler.setLevel(logging.DEBUG)
         
         # Use plain formatter - we'll format as JSON ourselves
-        handler.setFormatter(logging.Formatter('%(message)s'))
-        self._logger.addHandler(handler)
+        self._file_handler.setFormatter(logging.Formatter('%(message)s'))
+        
+        self._queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self._logger.addHandler(self._queue_handler)
+        
+        previous = _LISTENERS.pop(self._logger.name, None)
+        if previous is not None:
+            previous.stop()
+            for handler in previous.handlers:
+                handler.close()
+        self._listener = QueueListener(self._queue_handler.queue, self._file_handler)
+        self._listener.start()
+        _LISTENERS[self._logger.name] = self._listener
+    
+    @property
+    def dropped_records(self) -> int:
+        """Records dropped because the queue was full."""
+        return self._queue_handler.dropped
+    
+    def close(self):
+        """Stop the listener thread after writing all queued records."""
+        if _LISTENERS.get(self._logger.name) is self._listener:
+            del _LISTENERS[self._logger.name]
+            self._listener.stop()
+        self._file_handler.close()
     
     def _format_json(
         self,
@@ -158,18 +218,14 @@ class StructuredLogger:
     
     async def _async_write(self, log_entry: str, level: int):
         """
-        Asynchronously write log entry to file.
+        Queue log entry for the writer thread.
         
         Args:
             log_entry: Formatted JSON log entry
             level: Logging level constant
         """
-        # Run the blocking log operation in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self._logger.log(level, log_entry)
-        )
+        # Only enqueues; the QueueListener thread does the file I/O
+        self._logger.log(level, log_entry)
     
     async def log_error(
         self,
@@ -149,6 +149,90 @@ class TransactionManager:
             execution_time_ms=execution_ms,
         )
 
+    async def execute_set_based_batch(
+        self,
+        operation: Callable[[Optional[Any]], Awaitable[List[BatchOperationResult]]],
+        *,
+        rollback_on_error: bool = True,
+        total_items: Optional[int] = None,
+        progress_callback: Optional[
+            Callable[[BatchOperationResult, int, int, int, int], Awaitable[None]]
+        ] = None,
+    ) -> BatchOperationResponse:
+        """Execute a single set-based callable that handles every item at once.
+
+        The callable receives the transactional connection and returns one
+        ``BatchOperationResult`` per item in input order. Results are then accounted
+        exactly like :meth:`execute_batch_with_transaction`: progress callbacks fire per
+        item and the first failed result rolls the whole transaction back when
+        ``rollback_on_error`` is set, so callers and ``/rollback`` see the same shape
+        regardless of execution mode.
+        """
+
+        start_time = time.perf_counter()
+        results: List[BatchOperationResult] = []
+        failed = 0
+        successful = 0
+        processed = 0
+        total_target = total_items or 0
+
+        try:
+            async with self.begin_transaction() as connection:
+                try:
+                    item_results = await operation(connection)
+                except Exception as exc:
+                    self._logger.error("Set-based batch operation raised an exception", exc_info=True)
+                    failure_result = BatchOperationResult(
+                        id=None,
+                        status=BatchOperationResultStatus.FAILED,
+                        error=str(exc),
+                    )
+                    failed += 1
+                    processed += 1
+                    results.append(failure_result)
+                    if progress_callback:
+                        await progress_callback(failure_result, processed, total_target, successful, failed)
+                    raise
+
+                for result in item_results:
+                    results.append(result)
+                    processed += 1
+                    if result.status == BatchOperationResultStatus.FAILED:
+                        failed += 1
+                    else:
+                        successful += 1
+                    if progress_callback:
+                        await progress_callback(result, processed, total_target, successful, failed)
+                    if (
+                        result.status == BatchOperationResultStatus.FAILED
+                        and rollback_on_error
+                        and self.has_transaction_support()
+                    ):
+                        raise RuntimeError(
+                            f"Transactional operation failed: {result.error or 'unknown error'}",
+                        )
+        except Exception:
+            self._logger.error("Set-based batch execution aborted", exc_info=True)
+            execution_ms = int((time.perf_counter() - start_time) * 1000)
+            return BatchOperationResponse(
+                success=False,
+                total=total_target if total_target else processed,
+                successful=successful,
+                failed=failed,
+                results=results,
+                execution_time_ms=execution_ms,
+            )
+
+        execution_ms = int((time.perf_counter() - start_time) * 1000)
+        return BatchOperationResponse(
+            success=failed == 0,
+            total=total_target if total_target else processed,
+            successful=successful,
+            failed=failed,
+            results=results,
+            execution_time_ms=execution_ms,
+        )
+
     async def create_rollback_point(
         self,
         *,
@@ -0,0 +1,62 @@
+"""Shared fakes for backend unit tests that stub the database adapter and AI service."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+# AuthConfig writes freshly generated JWT keys to the tracked .env.auth in development
+os.environ.setdefault("ENVIRONMENT", "test")
+
+
+class FakeAdapter:
+    """Database adapter whose execute_query records each call and returns fixed rows."""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.queries = []
+
+    async def execute_query(self, query, params=None):
+        self.queries.append((query, params))
+        return self.rows
+
+
+class FakeEmbeddingAI:
+    """AI service returning a constant 768-dim query embedding."""
+
+    async def generate_embeddings(self, text):
+        return [0.1] * 768
+
+
+class FakeSearchDatabase:
+    """Records the keyword arguments of the search RPC wrappers."""
+
+    def __init__(self, multimodal_rows=None, hybrid_rows=None):
+        self.multimodal_rows = multimodal_rows or []
+        self.hybrid_rows = hybrid_rows or []
+        self.calls = []
+
+    async def match_multimodal(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.multimodal_rows
+
+    async def hybrid_search_chunks(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.hybrid_rows
+
+
+@pytest.fixture
+def fake_adapter():
+    """Factory: ``fake_adapter(rows)`` -> FakeAdapter."""
+    return FakeAdapter
+
+
+@pytest.fixture
+def fake_ai():
+    return FakeEmbeddingAI()
+
+
+@pytest.fixture
+def fake_search_database():
+    return FakeSearchDatabase()
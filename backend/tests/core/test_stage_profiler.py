@@ -0,0 +1,135 @@
+"""
+Tests for on-demand sampling profiles of BaseProcessor.safe_process().
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.core.base_processor import BaseProcessor
+from backend.core.stage_profiler import ProfileRequest, profile_request_for, profiling
+from backend.core.types import ProcessingContext, ProcessingResult, ProcessingStatus
+
+
+def busy_parse(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def busy_worker(seconds):
+    return busy_parse(seconds)
+
+
+async def wait_for_ollama():
+    await asyncio.sleep(0.15)
+
+
+class SlowProcessor(BaseProcessor):
+    async def process(self, context: ProcessingContext) -> ProcessingResult:
+        busy_parse(0.15)
+        await wait_for_ollama()
+        await asyncio.to_thread(busy_worker, 0.15)
+        return ProcessingResult(
+            success=True,
+            processor=self.name,
+            status=ProcessingStatus.COMPLETED,
+            data={},
+            metadata={},
+            processing_time=0.0,
+        )
+
+
+@pytest.fixture
+def context():
+    return ProcessingContext(
+        document_id="doc-slow-1",
+        file_path="/tmp/test.pdf",
+        document_type="application/pdf",
+    )
+
+
+@pytest.fixture
+def processor():
+    proc = SlowProcessor("slow_processor", {})
+    with patch.object(proc, "_check_completion_marker", return_value=None), \
+            patch.object(proc, "_set_completion_marker", new_callable=AsyncMock), \
+            patch.object(proc, "_get_retry_orchestrator", return_value=None), \
+            patch.object(proc, "_get_error_logger", return_value=None), \
+            patch(
+                "backend.core.base_processor.RetryPolicyManager.get_policy",
+                new_callable=AsyncMock,
+                return_value=MagicMock(max_retries=0),
+            ):
+        yield proc
+
+
+def test_request_matching(monkeypatch):
+    monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+    assert profile_request_for("doc-1", "image_processor") is None
+
+    monkeypatch.setenv("PIPELINE_PROFILE", "image_processing, embedding")
+    monkeypatch.setenv("PIPELINE_PROFILE_DOCUMENTS", "DOC-1")
+    assert profile_request_for("doc-1", "image_processor", "image_processing") is not None
+    assert profile_request_for("doc-2", "image_processor", "image_processing") is None
+    assert profile_request_for("doc-1", "text_processor", "text_extraction") is None
+
+    # An explicit request (API / CLI) takes precedence over the environment
+    with profiling("all"):
+        assert profile_request_for("doc-2", "text_processor") is not None
+    assert ProfileRequest.parse("off") is None
+
+
+def test_env_request_is_parsed_once_per_value(monkeypatch):
+    monkeypatch.setenv("PIPELINE_PROFILE", "embedding")
+    monkeypatch.delenv("PIPELINE_PROFILE_DOCUMENTS", raising=False)
+
+    first = ProfileRequest.from_env()
+    assert ProfileRequest.from_env() is first
+
+    monkeypatch.setenv("PIPELINE_PROFILE", "image_processing")
+    assert ProfileRequest.from_env().stages == frozenset({"image_processing"})
+
+
+async def test_unrequested_stage_is_not_profiled(monkeypatch, processor, context, tmp_path):
+    monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+    monkeypatch.setenv("PIPELINE_PROFILE_DIR", str(tmp_path))
+
+    result = await processor.safe_process(context)
+
+    assert result.success
+    assert "profile" not in result.metadata
+    assert not any(tmp_path.iterdir())
+
+
+async def test_profile_artifacts_cover_cpu_awaits_and_worker_threads(monkeypatch, processor, context, tmp_path):
+    monkeypatch.setenv("PIPELINE_PROFILE_DIR", str(tmp_path))
+
+    with profiling("slow_processor", interval_ms=5):
+        result = await processor.safe_process(context)
+
+    profile = result.metadata["profile"]
+    assert profile["samples"] > 20
+    assert profile["collapsed"].startswith(str(tmp_path / "doc-slow-1"))
+
+    collapsed = open(profile["collapsed"], encoding="utf-8").read().splitlines()
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in collapsed}
+
+    def weight(*names):
+        return sum(count for stack, count in stacks.items() if all(name in stack for name in names))
+
+    # The stage task is rooted at safe_process, whether running or suspended
+    assert all(stack.startswith("safe_process") or stack.startswith("thread:") for stack in stacks)
+    assert weight("process (", "busy_parse") > 5
+    assert weight("wait_for_ollama", "<awaiting>") > 5
+    assert weight("thread:", "busy_worker") > 5
+
+    speedscope = json.loads(open(profile["speedscope"], encoding="utf-8").read())
+    sampled = speedscope["profiles"][0]
+    assert sampled["type"] == "sampled" and len(sampled["samples"]) == len(sampled["weights"]) == len(stacks)
+    assert {frame["name"] for frame in speedscope["shared"]["frames"]} >= {"busy_parse", "busy_worker", "<awaiting>"}
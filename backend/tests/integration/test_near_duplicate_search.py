@@ -0,0 +1,107 @@
+"""
+Database-backed checks that chunk search resolves near-duplicate references.
+
+A reference chunk (duplicate_of set, no embedding) must be returned by a
+search scoped to its own document although only the canonical chunk in a
+sibling manual is in the HNSW index; unscoped searches return the canonical
+chunk once. Skipped until migration 041 is applied.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+
+pytestmark = [pytest.mark.integration, pytest.mark.database]
+
+EMBEDDING = [0.0] * 767 + [1.0]
+VECTOR = "[" + ",".join(str(value) for value in EMBEDDING) + "]"
+TEXT = "WARNING: Disconnect the power cord before removing the fuser unit."
+
+
+async def _migration_applied(db, name: str) -> bool:
+    try:
+        rows = await db.execute_query(
+            "SELECT 1 FROM krai_system.migrations WHERE migration_name = $1",
+            [name],
+        )
+        return bool(rows)
+    except Exception:
+        return False
+
+
+@pytest.fixture
+async def duplicate_pair(test_database):
+    """Two manuals sharing one passage: embedded canonical in A, reference in B."""
+    if not await _migration_applied(test_database, "041_scoped_near_duplicate_expansion"):
+        pytest.skip("migration 041_scoped_near_duplicate_expansion not applied")
+
+    doc_a, doc_b = str(uuid.uuid4()), str(uuid.uuid4())
+    canonical_id, reference_id = str(uuid.uuid4()), str(uuid.uuid4())
+    for doc_id in (doc_a, doc_b):
+        await test_database.execute_query(
+            "INSERT INTO krai_core.documents (id, filename) VALUES ($1::uuid, $2)",
+            [doc_id, f"test_near_duplicate_{doc_id}.pdf"],
+        )
+    await test_database.execute_query(
+        """
+        INSERT INTO krai_intelligence.chunks
+            (id, document_id, text_chunk, chunk_index, page_start, page_end, fingerprint, embedding)
+        VALUES ($1::uuid, $2::uuid, $3, 0, 4, 4, $4, $5::vector)
+        """,
+        [canonical_id, doc_a, TEXT, f"test-{canonical_id}", VECTOR],
+    )
+    await test_database.execute_query(
+        """
+        INSERT INTO krai_intelligence.chunks
+            (id, document_id, text_chunk, chunk_index, page_start, page_end, fingerprint, duplicate_of)
+        VALUES ($1::uuid, $2::uuid, $3, 0, 7, 7, $4, $5::uuid)
+        """,
+        [reference_id, doc_b, TEXT, f"test-{reference_id}", canonical_id],
+    )
+
+    yield {"doc_a": doc_a, "doc_b": doc_b, "canonical": canonical_id, "reference": reference_id}
+
+    await test_database.execute_query(
+        "DELETE FROM krai_intelligence.chunks WHERE id = ANY($1::uuid[])",
+        [[reference_id, canonical_id]],
+    )
+    await test_database.execute_query(
+        "DELETE FROM krai_core.documents WHERE id = ANY($1::uuid[])",
+        [[doc_a, doc_b]],
+    )
+
+
+class TestNearDuplicateSearch:
+    async def test_document_scoped_match_chunks_returns_reference(self, test_database, duplicate_pair):
+        rows = await test_database.execute_query(
+            "SELECT * FROM krai_intelligence.match_chunks($1::vector, 0.5, 5, $2::uuid)",
+            [VECTOR, duplicate_pair["doc_b"]],
+        )
+
+        assert [str(row["id"]) for row in rows] == [duplicate_pair["reference"]]
+        assert rows[0]["page_number"] == 7
+        assert rows[0]["similarity"] == pytest.approx(1.0)
+
+    async def test_unscoped_searches_return_canonical_once(self, test_database, duplicate_pair):
+        rows = await test_database.match_multimodal(query_embedding=EMBEDDING, match_count=50)
+        ids = [str(row["source_id"]) for row in rows]
+        assert ids.count(duplicate_pair["canonical"]) == 1
+        assert duplicate_pair["reference"] not in ids
+
+        hybrid = await test_database.hybrid_search_chunks(
+            query_text="disconnect power cord fuser unit",
+            query_embedding=EMBEDDING,
+            match_count=50,
+        )
+        hybrid_ids = [str(row["id"]) for row in hybrid]
+        assert hybrid_ids.count(duplicate_pair["canonical"]) == 1
+        assert duplicate_pair["reference"] not in hybrid_ids
+
+    async def test_scoped_multimodal_search_finds_reference(self, test_database, duplicate_pair):
+        scoped = await test_database.match_multimodal(
+            query_embedding=EMBEDDING, match_count=5, document_id=duplicate_pair["doc_b"]
+        )
+        assert [str(row["source_id"]) for row in scoped] == [duplicate_pair["reference"]]
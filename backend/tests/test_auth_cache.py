@@ -0,0 +1,172 @@
+"""Tests for cached principal/blacklist lookups and batched API key last-used writes."""
+
+from __future__ import annotations
+
+import sys
+import types
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.middleware.auth_middleware import AuthMiddleware  # noqa: E402
+from models.user import UserUpdate  # noqa: E402
+from services import api_key_service  # noqa: E402
+from services.api_key_service import APIKeyService  # noqa: E402
+from services.auth_service import AuthService  # noqa: E402
+from config.auth_config import CLAIM_EMAIL, CLAIM_JTI, CLAIM_ROLE, CLAIM_USER_ID  # noqa: E402
+
+USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+class _CountingAdapter:
+    """DatabaseAdapter stand-in that counts the statements it receives."""
+
+    def __init__(self, role="viewer"):
+        self.calls = []
+        self.role = role
+
+    def _user(self, user_id):
+        now = datetime.now(timezone.utc)
+        return {
+            "id": user_id, "email": "viewer@example.com", "username": "viewer",
+            "first_name": None, "last_name": None, "role": self.role if user_id == USER_ID else "admin", "status": "active",
+            "is_active": True, "is_verified": True, "last_login": None, "login_count": 1,
+            "failed_login_attempts": 0, "created_at": now, "updated_at": now,
+            "locked_until": None, "permissions": None,
+        }
+
+    async def fetch_one(self, query, params=None):
+        self.calls.append(query)
+        if "token_blacklist" in query:
+            return None
+        return self._user((params or {}).get("user_id", USER_ID))
+
+    async def execute_query(self, query, params=None):
+        self.calls.append(query)
+        return types.SimpleNamespace(rowcount=1)
+
+
+@pytest.fixture
+def adapter():
+    return _CountingAdapter()
+
+
+@pytest.fixture
+def middleware(adapter, monkeypatch):
+    service = AuthService(adapter)
+    mw = AuthMiddleware.__new__(AuthMiddleware)
+    mw.auth_service = service
+
+    async def _credentials(request):
+        return types.SimpleNamespace(credentials="token")
+
+    async def _claims(token, allow_expired=False):
+        return {CLAIM_USER_ID: USER_ID, CLAIM_EMAIL: "viewer@example.com", CLAIM_ROLE: "viewer", CLAIM_JTI: "jti-1"}
+
+    monkeypatch.setattr(mw, "_get_credentials", _credentials)
+    monkeypatch.setattr(mw, "_validate_token", _claims)
+    return mw
+
+
+def _request():
+    return types.SimpleNamespace(state=types.SimpleNamespace())
+
+
+async def test_warm_requests_do_not_touch_the_database(middleware, adapter):
+    request = _request()
+    await middleware(request, ["documents:read", "products:read"])
+    assert len(adapter.calls) == 2  # one blacklist check, one principal
+
+    for _ in range(5):
+        await middleware(_request(), ["documents:read"])
+    assert len(adapter.calls) == 2
+    assert "documents:read" in request.state.user["permissions"]
+
+
+async def test_logout_and_role_change_invalidate_the_cache(middleware, adapter):
+    from fastapi import HTTPException
+
+    service = middleware.auth_service
+    await middleware(_request(), ["documents:read"])
+
+    # Role change made through the service is visible on the next request
+    adapter.role = "editor"
+    await service.update_user(USER_ID, UserUpdate(role="editor", current_password=""), current_user_id="admin-id")
+    adapter.calls.clear()
+    request = _request()
+    await middleware(request, ["documents:write"])
+    assert adapter.calls == []
+    assert "documents:write" in request.state.user["permissions"]
+
+    # Logout blacklists the token without another lookup
+    await service.add_to_blacklist("jti-1", USER_ID, "access", datetime.now(timezone.utc) + timedelta(hours=1))
+    adapter.calls.clear()
+    with pytest.raises(HTTPException) as exc:
+        await middleware(_request())
+    assert exc.value.status_code == 401
+    assert adapter.calls == []
+
+
+class _Connection:
+    def __init__(self, record, calls):
+        self.record = record
+        self.calls = calls
+
+    async def fetchrow(self, query, *values):
+        self.calls.append(("fetchrow", query, values))
+        return self.record
+
+    async def execute(self, query, *values):
+        self.calls.append(("execute", query, values))
+        return "UPDATE 1"
+
+
+class _CountingPool:
+    def __init__(self, record):
+        self.record = record
+        self.calls = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield _Connection(self.record, self.calls)
+
+
+@pytest.fixture
+def key_pool(monkeypatch):
+    monkeypatch.setattr(api_key_service, "_key_cache", None)
+    monkeypatch.setattr(api_key_service, "_pending_last_used", {})
+    monkeypatch.setattr(api_key_service, "_last_flush", api_key_service.time.monotonic())
+    record = {
+        "id": "11111111-1111-1111-1111-111111111111",
+        "user_id": USER_ID,
+        "permissions": [],
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=1),
+        "revoked": False,
+    }
+    return _CountingPool(record)
+
+
+async def test_api_key_validation_is_cached_and_last_used_writes_are_batched(key_pool):
+    service = APIKeyService(key_pool)
+
+    for _ in range(10):
+        assert await service.validate_api_key("krai_live_secret") is not None
+    assert [call[0] for call in key_pool.calls] == ["fetchrow"]
+
+    assert await service.flush_last_used() == 1
+    kind, query, values = key_pool.calls[-1]
+    assert kind == "execute" and "unnest" in query
+    assert values[0] == [key_pool.record["id"]]
+    assert await service.flush_last_used() == 0
+
+    # Revocation drops the cached record; the next lookup sees the revoked row
+    await service.revoke_api_key(key_pool.record["id"])
+    key_pool.record = dict(key_pool.record, revoked=True)
+    assert await service.validate_api_key("krai_live_secret") is None
+    assert [call[0] for call in key_pool.calls].count("fetchrow") == 2
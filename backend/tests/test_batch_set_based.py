@@ -0,0 +1,238 @@
+"""Tests for set-based execution of batch delete/update/status-change operations."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def _load_batch_module():
+    """Load api/routes/batch.py with lightweight auth/database dependency stubs."""
+    for name, path_fragment in [
+        ("api", "api"),
+        ("api.routes", "api/routes"),
+        ("api.dependencies", "api/dependencies"),
+        ("api.middleware", "api/middleware"),
+    ]:
+        pkg = types.ModuleType(name)
+        pkg.__path__ = [str(ROOT / path_fragment)]
+        sys.modules.setdefault(name, pkg)
+
+    if "api.middleware.auth_middleware" not in sys.modules:
+        auth_mod = types.ModuleType("api.middleware.auth_middleware")
+        auth_mod.require_permission = lambda _perm: (lambda: {"id": "test"})
+        sys.modules["api.middleware.auth_middleware"] = auth_mod
+
+    if "api.dependencies.database" not in sys.modules:
+        db_mod = types.ModuleType("api.dependencies.database")
+        db_mod.get_database_pool = lambda: None
+        sys.modules["api.dependencies.database"] = db_mod
+
+    spec = importlib.util.spec_from_file_location("krai_batch_routes", ROOT / "api" / "routes" / "batch.py")
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+batch = _load_batch_module()
+
+from services.transaction_manager import TransactionManager  # noqa: E402
+from models.batch import BatchOperationResultStatus  # noqa: E402
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def start(self):
+        self._conn.events.append("begin")
+
+    async def commit(self):
+        self._conn.events.append("commit")
+
+    async def rollback(self):
+        self._conn.events.append("rollback")
+
+
+class FakeConnection:
+    """Records every statement; serves rows from an in-memory table."""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: dict(row) for row in rows}
+        self.events: list[str] = []
+        self.statements: list[tuple[str, tuple]] = []
+        self.copied: list[tuple] = []
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def fetch(self, query, *args):
+        self.statements.append((query, args))
+        ids = args[0]
+        matched = [self.rows[i] for i in ids if i in self.rows]
+        if query.startswith("DELETE"):
+            for row in matched:
+                self.rows.pop(row["id"])
+        return [dict(row) for row in matched]
+
+    async def execute(self, query, *args):
+        self.statements.append((query, args))
+        return "UPDATE"
+
+    async def executemany(self, query, rows):
+        self.statements.append((query, tuple(rows)))
+
+    async def copy_records_to_table(self, table, *, schema_name, columns, records):
+        self.statements.append((f"COPY {schema_name}.{table}", tuple(columns)))
+        self.copied.extend(records)
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def acquire(self):
+        return self.conn
+
+    async def release(self, _conn):
+        return None
+
+
+def _manager(rows):
+    conn = FakeConnection(rows)
+    return TransactionManager(FakePool(conn)), conn
+
+
+ROWS = [{"id": f"id-{i}", "status": "draft", "title": f"T{i}"} for i in range(5)]
+
+
+async def test_delete_uses_constant_statements_regardless_of_size():
+    manager, conn = _manager(ROWS)
+    progress = []
+
+    async def _progress(result, processed, total, successful, failed):
+        progress.append((result.id, processed, total))
+
+    response = await batch._execute_sync_delete(
+        pool=None,
+        transaction_manager=manager,
+        resource_type="documents",
+        ids=[row["id"] for row in ROWS],
+        user_id="user-1",
+        progress_callback=_progress,
+    )
+
+    assert response.success is True and response.successful == 5
+    assert [query.split()[0] for query, _ in conn.statements] == ["DELETE", "COPY"]
+    assert "id = ANY($1)" in conn.statements[0][0]
+    assert conn.events == ["begin", "commit"]
+    assert len(conn.copied) == 5 and conn.copied[0][2] == "DELETE"
+    # rollback payload keeps the shape /rollback relies on
+    first = response.results[0]
+    assert first.rollback_data == {
+        "operation": "delete",
+        "table": "krai_core.documents",
+        "record_id": "id-0",
+        "old_values": ROWS[0],
+    }
+    assert progress[-1] == ("id-4", 5, 5)
+
+
+async def test_missing_id_rolls_back_like_per_item_mode():
+    manager, conn = _manager(ROWS)
+
+    response = await batch._execute_sync_delete(
+        pool=None,
+        transaction_manager=manager,
+        resource_type="documents",
+        ids=["id-0", "missing", "id-1"],
+        user_id="user-1",
+    )
+
+    assert response.success is False
+    assert [r.status for r in response.results] == [
+        BatchOperationResultStatus.SUCCESS,
+        BatchOperationResultStatus.FAILED,
+    ]
+    assert response.results[1].error == "Not found"
+    assert conn.events == ["begin", "rollback"]
+    assert conn.copied == []
+
+
+async def test_update_groups_identical_changes_into_one_statement():
+    manager, conn = _manager(ROWS)
+    updates = [{"id": row["id"], "update_data": {"status": "active"}} for row in ROWS[:3]]
+    updates.append({"id": "id-3", "update_data": {"title": "A"}})
+    updates.append({"id": "id-4", "update_data": {"title": "B"}})
+
+    response = await batch._execute_sync_update(
+        pool=None,
+        transaction_manager=manager,
+        resource_type="products",
+        updates=updates,
+        user_id="user-1",
+    )
+
+    assert response.success is True and response.successful == 5
+    kinds = [query.split()[0] for query, _ in conn.statements]
+    assert kinds == ["SELECT", "UPDATE", "UPDATE", "COPY"]
+    bulk_update, bulk_args = conn.statements[1]
+    assert "status = $2" in bulk_update and "ANY($1)" in bulk_update
+    assert bulk_args == (["id-0", "id-1", "id-2"], "active")
+    # differing one-off values go through one pipelined executemany
+    assert conn.statements[2][1] == (("id-3", "A"), ("id-4", "B"))
+    assert response.results[3].rollback_data["old_values"]["title"] == "T3"
+    assert response.results[3].rollback_data["new_values"] == {"title": "A"}
+
+
+async def test_status_change_records_reason_in_audit_rows():
+    manager, conn = _manager(ROWS)
+
+    response = await batch._execute_sync_status_change(
+        pool=None,
+        transaction_manager=manager,
+        resource_type="documents",
+        ids=["id-0", "id-1"],
+        new_status="archived",
+        user_id="user-1",
+        reason="superseded",
+    )
+
+    assert response.success is True
+    assert [query.split()[0] for query, _ in conn.statements] == ["SELECT", "UPDATE", "COPY"]
+    notes_index = batch.AUDIT_LOG_COLUMNS.index("notes")
+    assert {record[2] for record in conn.copied} == {"STATUS_CHANGE"}
+    assert {record[notes_index] for record in conn.copied} == {"superseded"}
+
+
+async def test_per_item_mode_still_available(monkeypatch):
+    monkeypatch.setattr(batch, "SET_BASED_EXECUTION", False)
+    manager, conn = _manager(ROWS)
+
+    async def _fetchrow(query, *args):
+        conn.statements.append((query, args))
+        return conn.rows.get(args[0])
+
+    conn.fetchrow = _fetchrow
+
+    response = await batch._execute_sync_delete(
+        pool=None,
+        transaction_manager=manager,
+        resource_type="documents",
+        ids=["id-0", "id-1"],
+        user_id="user-1",
+    )
+
+    assert response.success is True
+    # fetch + delete + audit insert per id
+    assert len(conn.statements) == 6
@@ -0,0 +1,131 @@
+"""Tests for media context embeddings: event-loop safety and the streaming text path."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from uuid import uuid4
+
+import pytest
+
+from backend.core.base_processor import ProcessingContext
+from backend.processors import embedding_processor as embedding_module
+from backend.processors.embedding_processor import EmbeddingProcessor
+from backend.services.ollama_scheduler import OllamaScheduler
+
+IMAGE_ID = "00000000-0000-0000-0000-0000000000aa"
+
+
+class _OfflineEmbeddingProcessor(EmbeddingProcessor):
+    """Skips the Ollama availability probe; embeddings come from ``_generate_embedding`` stubs."""
+
+    def _check_ollama(self) -> bool:  # type: ignore[override]
+        return True
+
+
+class _FakeDatabase:
+    """Chunk persistence for the text stage and query handling for the embedding stage."""
+
+    def __init__(self):
+        self.chunks = {}
+        self.embedded = set()
+        self.unified = []
+
+    async def create_intelligence_chunk(self, model):
+        self.chunks[str(model.id)] = model
+        return model.id
+
+    async def execute_query(self, query, params=None):
+        if query.startswith("UPDATE krai_intelligence.chunks"):
+            self.embedded.add(params[0])
+            return []
+        if query.startswith("INSERT INTO krai_intelligence.unified_embeddings"):
+            self.unified.append((params[0], params[1]))
+            return []
+        if "FROM krai_intelligence.chunks" in query and "embedding IS NULL" in query:
+            return [
+                {"chunk_id": chunk_id, "text": model.text_chunk, "chunk_index": model.chunk_index}
+                for chunk_id, model in self.chunks.items()
+                if chunk_id not in self.embedded
+            ]
+        if "FROM krai_content.images" in query:
+            return [{"id": IMAGE_ID, "context_caption": "Figure 3: fuser unit", "page_header": "Fuser"}]
+        return []
+
+
+@pytest.fixture
+def make_processor(monkeypatch, tmp_path):
+    monkeypatch.setenv("KRAI_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("ENABLE_CONTEXT_EMBEDDINGS", "true")
+    monkeypatch.setenv("EMBEDDING_REUSE_BY_FINGERPRINT", "false")
+
+    def _make(database):
+        processor = _OfflineEmbeddingProcessor(database_adapter=database)
+        processor.near_duplicate_index = None
+        processor.stage_tracker = None
+        return processor
+
+    return _make
+
+
+async def test_context_embeddings_do_not_block_aslot_holders(monkeypatch, make_processor):
+    scheduler = OllamaScheduler(max_concurrency=1, slot_timeout=2)
+    monkeypatch.setattr(embedding_module, "get_ollama_scheduler", lambda: scheduler)
+    processor = make_processor(_FakeDatabase())
+
+    def generate(text):
+        # Same slot path as the real request
+        with embedding_module.get_ollama_scheduler().slot(processor.model_name):
+            return [0.1] * 768
+
+    processor._generate_embedding = generate
+    holding = asyncio.Event()
+
+    async def hold_slot():
+        async with scheduler.aslot("llava"):
+            holding.set()
+            await asyncio.sleep(0.05)
+
+    holder = asyncio.create_task(hold_slot())
+    await holding.wait()
+
+    created = await asyncio.wait_for(
+        processor._generate_context_embeddings(uuid4(), logging.getLogger("test.context_embeddings")), 5
+    )
+    await holder
+
+    assert created == 1
+
+
+async def test_streaming_text_mode_still_writes_context_embeddings(make_processor, tmp_path):
+    fitz = pytest.importorskip("fitz")
+    from backend.processors.text_processor_optimized import OptimizedTextProcessor
+
+    pdf_path = tmp_path / "manual.pdf"
+    doc = fitz.open()
+    for page in range(1, 7):
+        doc.new_page().insert_textbox(
+            fitz.Rect(36, 36, 560, 800),
+            f"Page {page}: remove the fuser unit and check the heating roller for wear. " * 8,
+            fontsize=8,
+        )
+    doc.save(pdf_path)
+    doc.close()
+
+    database = _FakeDatabase()
+    embedder = make_processor(database)
+    embedder._generate_embedding = lambda text: [0.1] * 768
+    text_stage = OptimizedTextProcessor(database_service=database)
+    text_stage.enable_streaming(window_pages=2, embedding_processor=embedder)
+    context = ProcessingContext(file_path=str(pdf_path), document_id=str(uuid4()), file_hash="h", document_type="")
+
+    text_result = await text_stage.process(context)
+    assert text_result.success
+    assert database.chunks and set(database.chunks) == database.embedded
+    assert all(source_type == "text" for _, source_type in database.unified)
+
+    result = await embedder.process(context)
+
+    assert result["success"] and result["embeddings_created"] == 0
+    assert result["context_embeddings_created"] == 1
+    assert (IMAGE_ID, "context") in database.unified
@@ -0,0 +1,263 @@
+"""Tests for the shared asyncpg pool: settings, codecs, acquire metrics and adapter reuse."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import db_pool  # noqa: E402
+
+
+class TestPoolSettings:
+    def test_defaults(self, monkeypatch):
+        for name in ("DB_POOL_MIN_SIZE", "DB_POOL_MAX_SIZE", "DB_STATEMENT_CACHE_SIZE"):
+            monkeypatch.delenv(name, raising=False)
+
+        settings = db_pool.PoolSettings.from_env()
+
+        assert (settings.min_size, settings.max_size) == (2, 10)
+        assert settings.statement_cache_size == 256
+
+    def test_env_overrides_and_clamps_min_to_max(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_MIN_SIZE", "50")
+        monkeypatch.setenv("DB_POOL_MAX_SIZE", "20")
+        monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "0")
+
+        settings = db_pool.PoolSettings.from_env()
+
+        assert (settings.min_size, settings.max_size) == (20, 20)
+        assert settings.statement_cache_size == 0
+
+    def test_invalid_value_falls_back_to_default(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_MAX_SIZE", "lots")
+
+        assert db_pool.PoolSettings.from_env().max_size == 10
+
+    def test_url_prefers_postgres_url(self, monkeypatch):
+        monkeypatch.setenv("POSTGRES_URL", "postgresql://local/krai")
+        monkeypatch.setenv("DATABASE_CONNECTION_URL", "postgresql://container/krai")
+
+        assert db_pool.resolve_database_url() == "postgresql://local/krai"
+
+        monkeypatch.delenv("POSTGRES_URL")
+        assert db_pool.resolve_database_url() == "postgresql://container/krai"
+
+
+class TestCodecs:
+    def test_vector_binary_layout(self):
+        encoded = db_pool.encode_vector([1.0, -0.5])
+
+        assert encoded == struct.pack(">HHff", 2, 0, 1.0, -0.5)
+        assert db_pool.decode_vector(encoded) == [1.0, -0.5]
+
+    def test_vector_accepts_legacy_text_literal(self):
+        assert db_pool.encode_vector("[0.25,0.5]") == db_pool.encode_vector([0.25, 0.5])
+
+    def test_halfvec_binary_layout(self):
+        encoded = db_pool.encode_halfvec([1.0, -0.5])
+
+        assert encoded == struct.pack(">HHee", 2, 0, 1.0, -0.5)
+        assert len(encoded) == 4 + 2 * 2
+        assert db_pool.decode_halfvec(encoded) == [1.0, -0.5]
+
+    def test_embedding_storage_type_from_env(self, monkeypatch):
+        monkeypatch.delenv("EMBEDDING_STORAGE", raising=False)
+        assert db_pool.embedding_storage_type() == "vector"
+
+        monkeypatch.setenv("EMBEDDING_STORAGE", "HalfVec")
+        assert db_pool.embedding_storage_type() == "halfvec"
+
+        monkeypatch.setenv("EMBEDDING_STORAGE", "float8")
+        assert db_pool.embedding_storage_type() == "vector"
+
+    def test_jsonb_round_trip(self):
+        payload = {"a": [1, 2], "b": None}
+
+        encoded = db_pool.encode_jsonb(payload)
+
+        assert encoded[:1] == b"\x01"
+        assert db_pool.decode_jsonb(encoded) == payload
+
+    def test_jsonb_passes_through_pre_serialized_strings(self):
+        assert db_pool.encode_jsonb(json.dumps({"k": "v"})) == b'\x01{"k": "v"}'
+
+    async def test_init_hook_skips_vector_without_extension(self):
+        class FakeConnection:
+            def __init__(self, vector_schema):
+                self.vector_schema = vector_schema
+                self.codecs = []
+
+            async def set_type_codec(self, name, **kwargs):
+                self.codecs.append((name, kwargs["schema"], kwargs["format"]))
+
+            async def fetchval(self, _query, _type_name):
+                return self.vector_schema
+
+        with_vector = FakeConnection("public")
+        without_vector = FakeConnection(None)
+
+        await db_pool.init_connection(with_vector)
+        await db_pool.init_connection(without_vector)
+
+        assert ("vector", "public", "binary") in with_vector.codecs
+        assert ("halfvec", "public", "binary") in with_vector.codecs
+        assert ("jsonb", "pg_catalog", "binary") in with_vector.codecs
+        assert [name for name, _, _ in without_vector.codecs] == ["jsonb", "json"]
+
+
+class TestAcquireMetrics:
+    def test_snapshot_tracks_average_and_max(self):
+        metrics = db_pool.PoolAcquireMetrics("test")
+
+        metrics.record(0.010)
+        metrics.record(0.030)
+        metrics.record(0.500, success=False)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["acquire_count"] == 2
+        assert snapshot["acquire_failures"] == 1
+        assert snapshot["max_wait_ms"] == 500.0
+        assert snapshot["avg_wait_ms"] == pytest.approx(180.0)
+
+    async def test_acquire_wrapper_records_wait_for_context_and_await(self):
+        class _SlowAcquire:
+            def __init__(self):
+                self.released = False
+
+            async def _connection(self):
+                await asyncio.sleep(0.01)
+                return "conn"
+
+            async def __aenter__(self):
+                return await self._connection()
+
+            async def __aexit__(self, *exc_info):
+                self.released = True
+
+            def __await__(self):
+                return self._connection().__await__()
+
+        metrics = db_pool.PoolAcquireMetrics("test")
+        context = _SlowAcquire()
+
+        async with db_pool._MeteredAcquire(context, metrics) as connection:
+            assert connection == "conn"
+            assert metrics.waiting == 0
+        assert context.released
+        assert await db_pool._MeteredAcquire(_SlowAcquire(), metrics) == "conn"
+
+        snapshot = metrics.snapshot()
+        assert snapshot["acquire_count"] == 2
+        assert snapshot["max_wait_ms"] >= 9.0
+
+    def test_metered_pool_does_not_override_private_acquire(self):
+        assert "acquire" in vars(db_pool.MeteredPool)
+        assert "_acquire" not in vars(db_pool.MeteredPool)
+
+    def test_stats_empty_before_pool_exists(self, monkeypatch):
+        monkeypatch.setattr(db_pool, "_pool", None)
+
+        assert db_pool.get_pool_stats() == {}
+
+
+class TestAdapterPoolSharing:
+    @pytest.fixture
+    def adapter_cls(self):
+        pytest.importorskip("backend.core.data_models")
+        from services.postgresql_adapter import PostgreSQLAdapter
+
+        return PostgreSQLAdapter
+
+    async def test_adapter_reuses_shared_pool_and_leaves_it_open(self, monkeypatch, adapter_cls):
+        class FakePool:
+            closed = False
+
+            async def close(self):
+                self.closed = True
+
+        shared = FakePool()
+
+        async def _get_pool():
+            return shared
+
+        monkeypatch.setattr(db_pool, "resolve_database_url", lambda: "postgresql://db/krai")
+        monkeypatch.setattr(db_pool, "get_pool", _get_pool)
+
+        adapter = adapter_cls("postgresql://db/krai")
+        await adapter.initialize()
+
+        assert adapter.pg_pool is shared
+        await adapter.disconnect()
+        assert shared.closed is False and adapter.pg_pool is None
+
+    def test_factory_resolves_the_pool_url(self, monkeypatch, adapter_cls):
+        from services.database_factory import create_database_adapter
+
+        monkeypatch.setenv("POSTGRES_URL", "postgresql://local/krai")
+        monkeypatch.setenv("DATABASE_CONNECTION_URL", "postgresql://container/krai")
+
+        adapter = create_database_adapter("postgresql")
+
+        assert adapter.postgres_url == db_pool.resolve_database_url() == "postgresql://local/krai"
+
+    async def test_adapter_with_other_dsn_owns_its_pool(self, monkeypatch, adapter_cls):
+        created = []
+
+        class FakePool:
+            closed = False
+
+            async def close(self):
+                self.closed = True
+
+        async def _create_pool(dsn=None, settings=None, pool_name="shared"):
+            created.append((dsn, pool_name))
+            return FakePool()
+
+        monkeypatch.setattr(db_pool, "resolve_database_url", lambda: "postgresql://db/krai")
+        monkeypatch.setattr(db_pool, "create_pool", _create_pool)
+
+        adapter = adapter_cls("postgresql://other/krai")
+        await adapter.initialize()
+        pool = adapter.pg_pool
+        await adapter.disconnect()
+
+        assert created == [("postgresql://other/krai", "adapter")]
+        assert pool.closed is True
+
+    async def test_writers_cast_to_configured_storage_type(self, monkeypatch, adapter_cls):
+        queries = []
+
+        class FakeConnection:
+            async def fetchval(self, sql, *params):
+                queries.append(sql)
+                return "e-1"
+
+        class FakePool:
+            def acquire(self):
+                connection = FakeConnection()
+
+                class _Acquire:
+                    async def __aenter__(self):
+                        return connection
+
+                    async def __aexit__(self, *exc):
+                        return False
+
+                return _Acquire()
+
+        monkeypatch.setenv("EMBEDDING_STORAGE", "halfvec")
+        adapter = adapter_cls("postgresql://db/krai")
+        adapter.pg_pool = FakePool()
+
+        await adapter.create_unified_embedding("s-1", "text", [0.1, 0.2], "model")
+
+        assert "$3::halfvec" in queries[0]
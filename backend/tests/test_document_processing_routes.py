@@ -480,6 +480,41 @@ async def test_process_thumbnail_returns_url():
     assert body["data"]["file_size"] == 48000
 
 
+@pytest.mark.asyncio
+async def test_process_thumbnail_retries_storage_after_failed_build():
+    from api.startup import LazyService
+
+    app, mock_conn = _make_test_app()
+    mock_conn.fetchrow = AsyncMock(
+        return_value={"id": "doc-123", "storage_path": "", "document_type": "service_manual"}
+    )
+    attempts = []
+
+    def build_storage():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("object storage offline")
+        return MagicMock()
+
+    app.state.storage_service = LazyService("storage_service", build_storage)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.post(
+            "/api/v1/documents/doc-123/process/thumbnail",
+            json={},
+            headers={"Authorization": "Bearer test-token"},
+        )
+        second = await client.post(
+            "/api/v1/documents/doc-123/process/thumbnail",
+            json={},
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+    assert first.status_code == 503
+    # storage is built on the retry; the empty storage_path is rejected next
+    assert second.status_code == 400
+    assert len(attempts) == 2
+
+
 def test_upload_endpoint_accepts_language_form_param():
     """The /upload endpoint must accept optional multipart context fields."""
     app_path = ROOT / "api" / "app.py"
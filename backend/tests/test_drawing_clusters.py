@@ -0,0 +1,68 @@
+"""Tests for grouping vector drawing operations into figure clusters."""
+
+from __future__ import annotations
+
+import random
+
+from backend.utils.drawing_clusters import cluster_drawings
+
+PAGE = (0.0, 0.0, 600.0, 800.0)
+
+
+def _exploded_view(x0, y0, count=400, size=120.0, seed=0):
+    """Many short strokes inside one figure area, like an exploded-view drawing."""
+    rng = random.Random(seed)
+    rects = []
+    for _ in range(count):
+        x = x0 + rng.uniform(0, size - 10)
+        y = y0 + rng.uniform(0, size - 10)
+        rects.append((x, y, x + rng.uniform(2, 10), y + rng.uniform(0, 10)))
+    return rects
+
+
+def test_thousands_of_strokes_collapse_into_figures():
+    rects = _exploded_view(50, 60, seed=1) + _exploded_view(350, 500, seed=2)
+
+    clusters = cluster_drawings(rects, page_rect=PAGE)
+
+    assert len(clusters) == 2
+    top, bottom = clusters
+    assert top.y0 < bottom.y0
+    assert len(top.members) + len(bottom.members) == len(rects)
+    assert 50 <= top.x0 and top.x1 <= 170
+
+
+def test_gap_controls_merging():
+    rects = [(0, 0, 40, 40), (50, 0, 90, 40)]
+
+    assert len(cluster_drawings(rects, gap=12, min_size=10)) == 1
+    assert len(cluster_drawings(rects, gap=5, min_size=10)) == 2
+
+
+def test_page_frame_and_small_marks_are_ignored():
+    rects = [
+        (5, 5, 595, 795),  # page border would otherwise merge everything
+        (100, 100, 300, 101),  # underline
+        (100, 400, 200, 500),
+    ]
+
+    clusters = cluster_drawings(rects, page_rect=PAGE, min_size=32)
+
+    assert [c.members for c in clusters] == [[2]]
+
+
+def test_max_clusters_keeps_largest():
+    rects = [(i * 100.0, 0.0, i * 100.0 + 40 + i, 40.0 + i) for i in range(6)]
+
+    clusters = cluster_drawings(rects, gap=1, min_size=10, max_clusters=2)
+
+    assert sorted(c.members[0] for c in clusters) == [4, 5]
+
+
+def test_overlapping_cluster_boxes_are_merged():
+    # an L-shaped figure whose bbox encloses a separate small part
+    rects = [(0, 0, 200, 10), (0, 0, 10, 200), (100, 100, 140, 140)]
+
+    clusters = cluster_drawings(rects, gap=2, min_size=10)
+
+    assert len(clusters) == 1 and clusters[0].rect == (0, 0, 200, 200)
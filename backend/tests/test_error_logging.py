@@ -13,6 +13,7 @@ import pytest
 import json
 import asyncio
 import tempfile
+from logging.handlers import QueueHandler
 from pathlib import Path
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch, call
@@ -96,9 +97,9 @@ def mock_structured_logger():
 
 
 @pytest.fixture
-def error_logger(mock_db_adapter, mock_structured_logger):
-    """Create an ErrorLogger instance with mocks."""
-    logger = ErrorLogger(mock_db_adapter)
+def error_logger(mock_db_adapter, mock_structured_logger, temp_log_file):
+    """Create an ErrorLogger instance with mocks (unbuffered: one INSERT per error)."""
+    logger = ErrorLogger(mock_db_adapter, log_file_path=temp_log_file, batch_size=1)
     logger.structured_logger = mock_structured_logger
     return logger
 
@@ -220,10 +221,12 @@ class TestStructuredLogger:
         assert logger.max_bytes == 100 * 1024 * 1024
         assert logger.backup_count == 10
         assert len(logger._logger.handlers) == 1
+        assert isinstance(logger._logger.handlers[0], QueueHandler)
         
-        handler = logger._logger.handlers[0]
+        handler = logger._file_handler
         assert handler.maxBytes == 100 * 1024 * 1024
         assert handler.backupCount == 10
+        logger.close()
     
     @pytest.mark.asyncio
     async def test_log_file_creation(self, temp_log_file):
@@ -365,9 +368,11 @@ class TestErrorLogger:
         params = call_args[0][1]
         
         assert "INSERT INTO krai_system.pipeline_errors" in query
-        assert params[0] == error_id  # error_id
-        assert params[1] == "doc_123"  # document_id
-        assert params[4] == "transient"  # error_category
+        assert "unnest(" in query
+        # One array parameter per column
+        assert params[0] == [error_id]  # error_id
+        assert params[1] == ["doc_123"]  # document_id
+        assert params[4] == ["transient"]  # error_category
     
     @pytest.mark.asyncio
     async def test_log_error_generates_unique_error_id(self, error_logger):
@@ -426,7 +431,7 @@ class TestErrorLogger:
         # Get the context parameter (8th parameter, index 7)
         call_args = mock_db_adapter.execute_query.call_args
         params = call_args[0][1]
-        context_json = params[7]
+        context_json = params[7][0]
         
         # Should be valid JSON
         context_data = json.loads(context_json)
@@ -489,7 +494,7 @@ class TestErrorLogger:
         call_args = mock_db_adapter.execute_query.call_args
         params = call_args[0][1]
         
-        assert params[12] == correlation_id
+        assert params[12] == [correlation_id]
     
     @pytest.mark.asyncio
     async def test_update_error_status(
@@ -605,9 +610,9 @@ class TestErrorLogger:
         params = call_args[0][1]
         
         # is_transient should be True (12th parameter, index 11)
-        assert params[11] is True
+        assert params[11] == [True]
         # error_category should be "transient" (5th parameter, index 4)
-        assert params[4] == "transient"
+        assert params[4] == ["transient"]
     
     @pytest.mark.asyncio
     async def test_log_error_with_permanent_classification(
@@ -638,9 +643,9 @@ class TestErrorLogger:
         params = call_args[0][1]
         
         # is_transient should be False
-        assert params[11] is False
+        assert params[11] == [False]
         # error_category should be "permanent"
-        assert params[4] == "permanent"
+        assert params[4] == ["permanent"]
 
     @pytest.mark.asyncio
     async def test_stage_name_normalized_from_correlation_id(
@@ -664,7 +669,7 @@ class TestErrorLogger:
         call_args = mock_db_adapter.execute_query.call_args
         params = call_args[0][1]
         # stage_name is 3rd column (index 2) in INSERT
-        assert params[2] == "embedding"
+        assert params[2] == ["embedding"]
     
     @pytest.mark.asyncio
     async def test_concurrent_error_logging(
@@ -769,6 +774,7 @@ class TestErrorLoggingIntegration:
             max_retries=3,
             correlation_id="req_456.embedding.retry_1"
         )
+        await error_logger.flush()
         
         # Give async writes time to complete
         await asyncio.sleep(0.2)
@@ -820,6 +826,7 @@ class TestErrorLoggingIntegration:
             max_retries=3,
             correlation_id="req_456.embedding.retry_0"
         )
+        await error_logger.flush()
         
         await asyncio.sleep(0.1)
         
@@ -859,16 +866,220 @@ class TestErrorLoggingIntegration:
             max_retries=3,
             correlation_id=correlation_id
         )
+        await error_logger.flush()
         
         await asyncio.sleep(0.1)
         
         # Verify correlation_id in database call
         call_args = mock_db.execute_query.call_args
         params = call_args[0][1]
-        assert params[12] == correlation_id
+        assert params[12] == [correlation_id]
         
         # Verify correlation_id in JSON log
         with open(temp_log_file, 'r') as f:
             log_line = f.readline()
             log_data = json.loads(log_line)
             assert log_data["correlation_id"] == correlation_id
+
+
+# ============================================================================
+# TestErrorLoggerBuffering - Batched Inserts and Overflow
+# ============================================================================
+
+class TestErrorLoggerBuffering:
+    """Test suite for buffered multi-row inserts, overflow counters and shutdown flush."""
+    
+    @pytest.fixture(autouse=True)
+    def _log_file(self, temp_log_file):
+        self.log_file = temp_log_file
+    
+    def _logger(self, mock_db_adapter, mock_structured_logger, **kwargs):
+        logger = ErrorLogger(mock_db_adapter, log_file_path=self.log_file, **kwargs)
+        logger.structured_logger = mock_structured_logger
+        return logger
+    
+    async def _log(self, logger, context, classification, count):
+        return [
+            await logger.log_error(
+                context=context,
+                error=ValueError(f"Error {i}"),
+                classification=classification,
+                retry_count=0,
+                max_retries=3,
+                correlation_id=f"req_456.stage_embedding.retry_{i}"
+            )
+            for i in range(count)
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_as_one_insert(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that batch_size errors become a single unnest() INSERT."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=5, flush_interval=60)
+        
+        error_ids = await self._log(logger, sample_processing_context, sample_error_classification, 5)
+        
+        mock_db_adapter.execute_query.assert_called_once()
+        query, params = mock_db_adapter.execute_query.call_args[0]
+        assert "$13::text[]" in query and "$14" not in query
+        assert len(params) == 13
+        assert params[0] == error_ids
+        assert params[2] == ["embedding"] * 5
+        # JSON log entries are written per error
+        assert mock_structured_logger.log_error.call_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_large_batch_uses_one_parameter_per_column(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that 3000 rows (39000 values) still bind only 13 parameters."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=3000, flush_interval=60)
+        
+        await self._log(logger, sample_processing_context, sample_error_classification, 3000)
+        
+        mock_db_adapter.execute_query.assert_called_once()
+        params = mock_db_adapter.execute_query.call_args[0][1]
+        assert len(params) == 13
+        assert all(len(column) == 3000 for column in params)
+    
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_flushed_after_interval(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that a partial batch is written by the periodic flush."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=100, flush_interval=0.05)
+        
+        await self._log(logger, sample_processing_context, sample_error_classification, 3)
+        mock_db_adapter.execute_query.assert_not_called()
+        
+        await asyncio.sleep(0.2)
+        
+        mock_db_adapter.execute_query.assert_called_once()
+        assert len(mock_db_adapter.execute_query.call_args[0][1][0]) == 3
+        assert logger.get_buffer_stats()["pending_rows"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_overflow_drops_rows_and_counts_them(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that rows beyond max_pending are dropped but still logged to JSON."""
+        logger = self._logger(
+            mock_db_adapter, mock_structured_logger, batch_size=100, flush_interval=60, max_pending=2
+        )
+        
+        await self._log(logger, sample_processing_context, sample_error_classification, 5)
+        
+        assert logger.get_buffer_stats()["pending_rows"] == 2
+        assert logger.dropped_rows == 3
+        assert mock_structured_logger.log_error.call_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_failed_insert_is_counted(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that a failed batch INSERT is counted and logged once."""
+        mock_db_adapter.execute_query.side_effect = Exception("Database connection failed")
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=3, flush_interval=60)
+        
+        await self._log(logger, sample_processing_context, sample_error_classification, 3)
+        
+        assert logger.failed_rows == 3
+        db_error_call = mock_structured_logger.log_error.call_args_list[-2]
+        assert db_error_call[1]["error_category"] == "database_error"
+        assert len(db_error_call[1]["context"]["error_ids"]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_rows(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that close() writes rows still waiting for the interval."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=100, flush_interval=60)
+        mock_structured_logger.close = MagicMock()
+        
+        await self._log(logger, sample_processing_context, sample_error_classification, 2)
+        await logger.close()
+        
+        mock_db_adapter.execute_query.assert_called_once()
+        mock_structured_logger.close.assert_called_once()
+        assert logger.get_buffer_stats()["pending_rows"] == 0
+    
+    def test_asyncio_run_teardown_flushes_pending_rows(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that a CLI run ending without close() still writes buffered rows."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=100, flush_interval=60)
+        
+        # Returns before the flush interval; asyncio.run() cancels the flush task
+        asyncio.run(self._log(logger, sample_processing_context, sample_error_classification, 2))
+        
+        mock_db_adapter.execute_query.assert_called_once()
+        assert len(mock_db_adapter.execute_query.call_args[0][1][0]) == 2
+        assert logger.get_buffer_stats()["pending_rows"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_status_update_flushes_buffered_row_first(
+        self,
+        mock_db_adapter,
+        mock_structured_logger,
+        sample_processing_context,
+        sample_error_classification
+    ):
+        """Test that a status update never runs before the row's INSERT."""
+        logger = self._logger(mock_db_adapter, mock_structured_logger, batch_size=100, flush_interval=60)
+        
+        error_id, = await self._log(logger, sample_processing_context, sample_error_classification, 1)
+        await logger.update_error_status(error_id=error_id, status="retrying")
+        
+        queries = [call_args[0][0] for call_args in mock_db_adapter.execute_query.call_args_list]
+        assert "INSERT INTO krai_system.pipeline_errors" in queries[0]
+        assert "UPDATE krai_system.pipeline_errors" in queries[1]
+    
+    @pytest.mark.asyncio
+    async def test_structured_logger_drops_records_when_queue_is_full(self, temp_log_file):
+        """Test that a full log queue drops records instead of blocking."""
+        logger = StructuredLogger(
+            logger_name="overflow_test",
+            log_file_path=temp_log_file,
+            queue_size=1
+        )
+        # Stop the writer so the queue fills up
+        logger._listener.stop()
+        
+        for i in range(5):
+            await logger.log_info(message=f"Message {i}", context={})
+        
+        assert logger.dropped_records == 4
+        logger._listener.start()
+        logger.close()
+        
+        with open(temp_log_file, 'r') as f:
+            assert json.loads(f.readline())["message"] == "Message 0"
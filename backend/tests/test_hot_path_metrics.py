@@ -0,0 +1,147 @@
+"""Tests for database, Ollama and object storage latency instrumentation."""
+
+from __future__ import annotations
+
+import types
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from backend.pipeline.metrics import PipelineMetrics, statement_fingerprint
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    monkeypatch.setenv("ENABLE_PROMETHEUS_METRICS", "1")
+    monkeypatch.delenv("PROMETHEUS_EXPORTER_PORT", raising=False)
+    return PipelineMetrics()
+
+
+def _sample(m, name, **labels):
+    return m.registry.get_sample_value(name, labels) or 0.0
+
+
+def test_statement_fingerprint_ignores_literals_and_list_lengths():
+    a = statement_fingerprint("SELECT * FROM krai_core.documents WHERE id = $1 AND status IN ($2, $3, $4)")
+    b = statement_fingerprint("select *\n  from krai_core.documents -- by id\n where id = 'x' and status in (1, 2)")
+    other = statement_fingerprint("SELECT * FROM krai_core.documents WHERE file_hash = $1")
+
+    assert a == b
+    assert a[0] == "select" and a[1].startswith("select krai_core.documents#")
+    assert other != a
+
+
+def test_disabled_metrics_hand_out_a_shared_null_timer(monkeypatch):
+    monkeypatch.setenv("ENABLE_PROMETHEUS_METRICS", "0")
+    disabled = PipelineMetrics()
+
+    assert disabled.query_timer("select 1") is disabled.model_call_timer("llava")
+    with disabled.query_timer("select 1") as timer:
+        timer.acquired()
+        timer.rows = 3
+    disabled.record_storage_call("images", "PutObject", 0.1, size=10)
+
+
+class _FakeConnection:
+    async def fetch(self, query, *values):
+        return [{"id": 1}, {"id": 2}]
+
+    async def fetchrow(self, query, *values):
+        return None
+
+    async def execute(self, query, *values):
+        return "UPDATE 3"
+
+
+class _FakePool:
+    @asynccontextmanager
+    async def acquire(self):
+        yield _FakeConnection()
+
+
+async def test_adapter_reports_latency_pool_wait_and_rows(monkeypatch, fresh_metrics):
+    from backend.services import postgresql_adapter
+    from backend.services.postgresql_adapter import PostgreSQLAdapter
+
+    monkeypatch.setattr(postgresql_adapter, "metrics", fresh_metrics)
+    adapter = PostgreSQLAdapter("postgresql://user:pw@localhost/db")
+    adapter.pg_pool = _FakePool()
+
+    await adapter.execute_query("SELECT id FROM krai_core.documents WHERE status = $1", ["done"])
+    await adapter.fetch_all("SELECT id FROM krai_core.documents WHERE status = $1", ["failed"])
+    await adapter.fetch_one("SELECT id FROM krai_core.documents WHERE id = $1", ["x"])
+    result = await adapter.execute_query("UPDATE krai_core.documents SET status = 'done' WHERE id = $1", ["x"])
+
+    assert result.rowcount == 3
+    _, select_label = statement_fingerprint("SELECT id FROM krai_core.documents WHERE status = $1")
+    _, update_label = statement_fingerprint("UPDATE krai_core.documents SET status = 'done' WHERE id = $1")
+    select = {"operation": "select", "statement": select_label}
+    assert _sample(fresh_metrics, "krai_db_query_duration_seconds_count", **select) == 2
+    assert _sample(fresh_metrics, "krai_db_rows_returned_sum", **select) == 4
+    assert _sample(fresh_metrics, "krai_db_rows_returned_sum", operation="update", statement=update_label) == 3
+    assert _sample(fresh_metrics, "krai_db_pool_acquire_seconds_count") == 4
+
+
+def _response(status_code, sent, received):
+    return types.SimpleNamespace(
+        url="http://ollama:11434/api/generate",
+        status_code=status_code,
+        content=b"x" * received,
+        request=types.SimpleNamespace(body=b"y" * sent),
+    )
+
+
+def test_scheduler_slots_record_model_calls(monkeypatch, fresh_metrics):
+    from backend.services import ollama_scheduler
+    from backend.services.ollama_scheduler import OllamaScheduler
+
+    monkeypatch.setattr(ollama_scheduler, "metrics", fresh_metrics)
+    scheduler = OllamaScheduler(max_concurrency=1)
+
+    with scheduler.slot("llava") as call:
+        call.observe(_response(200, sent=100, received=40))
+    with scheduler.slot("llava") as call:
+        call.observe(_response(500, sent=10, received=5))
+    with pytest.raises(ConnectionError):
+        with scheduler.slot("llava"):
+            raise ConnectionError("refused")
+
+    assert _sample(fresh_metrics, "krai_ollama_request_duration_seconds_count", model="llava", endpoint="/api/generate") == 2
+    assert _sample(fresh_metrics, "krai_ollama_bytes_total", model="llava", direction="sent") == 110
+    assert _sample(fresh_metrics, "krai_ollama_bytes_total", model="llava", direction="received") == 45
+    assert _sample(fresh_metrics, "krai_ollama_errors_total", model="llava", error="status_500") == 1
+    assert _sample(fresh_metrics, "krai_ollama_errors_total", model="llava", error="ConnectionError") == 1
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_s3_calls_are_reported_per_bucket(monkeypatch, fresh_metrics):
+    boto3 = pytest.importorskip("boto3")
+    from botocore.stub import Stubber
+
+    from backend.services import object_storage_service
+    from backend.services.object_storage_service import instrument_client
+
+    monkeypatch.setattr(object_storage_service, "metrics", fresh_metrics)
+    client = boto3.client(
+        "s3", region_name="us-east-1", aws_access_key_id="k", aws_secret_access_key="s"
+    )
+    instrument_client(client)
+
+    with Stubber(client) as stub:
+        stub.add_response("put_object", {}, {"Bucket": "images", "Key": "a.png", "Body": b"12345"})
+        stub.add_response("get_object", {"ContentLength": 7}, {"Bucket": "images", "Key": "a.png"})
+        stub.add_client_error("head_object", "404", http_status_code=404)
+        client.put_object(Bucket="images", Key="a.png", Body=b"12345")
+        client.get_object(Bucket="images", Key="a.png")
+        with pytest.raises(client.exceptions.ClientError):
+            client.head_object(Bucket="images", Key="b.png")
+
+    assert _sample(fresh_metrics, "krai_object_storage_duration_seconds_count", bucket="images", operation="PutObject") == 1
+    assert _sample(fresh_metrics, "krai_object_storage_bytes_total", bucket="images", operation="PutObject") == 5
+    assert _sample(fresh_metrics, "krai_object_storage_bytes_total", bucket="images", operation="GetObject") == 7
+    assert (
+        _sample(fresh_metrics, "krai_object_storage_errors_total", bucket="images", operation="HeadObject", error="status_404")
+        == 1
+    )
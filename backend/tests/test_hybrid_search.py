@@ -0,0 +1,120 @@
+"""Tests for hybrid lexical + vector search and exact identifier routing."""
+
+from __future__ import annotations
+
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from api.routes import openai_compat  # noqa: E402
+from api.routes import search as search_routes  # noqa: E402
+from core.data_models import HybridSearchRequest  # noqa: E402
+from services.multimodal_search_service import (  # noqa: E402
+    MultimodalSearchService,
+    extract_exact_token,
+    reciprocal_rank_fusion,
+)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement_between_lists():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert [item for item, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+    assert reciprocal_rank_fusion([["a", "b"]], limit=1) == [("a", 1 / 61)]
+
+
+def test_extract_exact_token_finds_codes_and_part_numbers():
+    assert extract_exact_token("Was bedeutet 13.A2.FF auf dem E877?") == "13.A2.FF"
+    assert extract_exact_token("fuser error C-2801") == "C-2801"
+    assert extract_exact_token("price of RM1-1234-000") == "RM1-1234-000"
+    assert extract_exact_token("paper jams since 2024") is None
+
+
+async def test_search_hybrid_passes_detected_identifier_in_one_call(fake_search_database, fake_ai):
+    database = fake_search_database
+    database.hybrid_rows = [
+        {
+            "id": "c1", "document_id": "d1", "content": "Error C-2801: fuser thermistor open",
+            "page_start": 12, "page_end": 12, "similarity": 0.71,
+            "fts_rank": 1, "vector_rank": None, "exact_rank": 1, "score": 2 / 61,
+        }
+    ]
+    service = MultimodalSearchService(database, fake_ai)
+
+    response = await service.search_hybrid("what does C-2801 mean", limit=5)
+
+    assert len(database.calls) == 1
+    call = database.calls[0]
+    assert call["exact_token"] == "C-2801"
+    assert call["match_count"] == 5 and call["query_embedding"] is not None
+    result = response["results"][0]
+    assert result["source_type"] == "text" and result["page_number"] == 12
+    assert result["ranks"] == {"fts": 1, "vector": None, "exact": 1}
+    assert response["exact_token"] == "C-2801"
+
+
+async def test_hybrid_search_route_is_gated_by_flag(monkeypatch, fake_search_database, fake_ai):
+    service = MultimodalSearchService(fake_search_database, fake_ai)
+    request = HybridSearchRequest(query="fuser error C-2801", limit=3)
+
+    monkeypatch.delenv("ENABLE_HYBRID_SEARCH", raising=False)
+    with pytest.raises(HTTPException) as disabled:
+        await search_routes.hybrid_search(request, search_service=service, current_user={})
+    assert disabled.value.status_code == 404 and fake_search_database.calls == []
+
+    monkeypatch.setenv("ENABLE_HYBRID_SEARCH", "true")
+    response = await search_routes.hybrid_search(request, search_service=service, current_user={})
+
+    assert response["exact_token"] == "C-2801" and response["total_count"] == 0
+    assert fake_search_database.calls[0]["match_count"] == 3
+
+
+class _PartsConnection:
+    def __init__(self, rows_for):
+        self.rows_for = rows_for
+        self.queries = []
+
+    async def fetch(self, query, *params):
+        self.queries.append((query, params))
+        return self.rows_for(query)
+
+
+class _Pool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _part_row():
+    return {
+        "part_number": "RM1-1234-000", "part_name": "Fuser assembly", "price_usd": None,
+        "manufacturer_name": "HP", "description": None, "model_number": None,
+        "model_name": None, "series_name": None,
+    }
+
+
+async def test_parts_lookup_probes_part_number_exactly_before_substring_scan():
+    conn = _PartsConnection(lambda query: [_part_row()])
+
+    result = await openai_compat._parts_lookup(_Pool(conn), "spare part RM1-1234-000")
+
+    assert "RM1-1234-000" in result
+    assert len(conn.queries) == 1
+    query, params = conn.queries[0]
+    assert "upper(pc.part_number) = $1" in query and params[0] == "RM1-1234-000"
+
+    # No exact hit: fall back to the substring scan
+    conn = _PartsConnection(lambda query: [] if "upper(pc.part_number)" in query else [_part_row()])
+    await openai_compat._parts_lookup(_Pool(conn), "spare part rm1-1234")
+    assert [params[0] for _, params in conn.queries] == ["RM1-1234", "%rm1-1234%"]
@@ -18,7 +18,13 @@ from typing import Dict, Any, Optional
 from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
 
-from backend.core.idempotency import IdempotencyChecker, compute_context_hash
+from backend.core.idempotency import (
+    IdempotencyChecker,
+    compute_context_hash,
+    compute_content_fingerprint,
+    compute_page_fingerprints,
+    diff_fingerprints,
+)
 from backend.core.types import ProcessingContext, ProcessingResult, ProcessingStatus
 from backend.core.base_processor import BaseProcessor
 from backend.services.database_adapter import DatabaseAdapter
@@ -939,3 +945,61 @@ class TestAsyncOperations:
             assert "INSERT INTO krai_system.stage_completion_markers" in query
             assert "ON CONFLICT" in query
             assert "DO UPDATE SET" in query
+
+
+# ============================================================================
+# J. Content Fingerprint Tests
+# ============================================================================
+
+class TestContentFingerprints:
+    """Test suite for page/chunk fingerprints and version diffs."""
+    
+    def test_fingerprint_ignores_case_and_whitespace(self):
+        """Test that re-extracted text with layout noise keeps its fingerprint."""
+        fingerprint = compute_content_fingerprint("Replace the  Fuser\nUnit")
+        
+        assert fingerprint == compute_content_fingerprint("replace the fuser unit ")
+        assert fingerprint != compute_content_fingerprint("replace the fuser roller")
+        assert len(fingerprint) == 32
+    
+    def test_diff_treats_shifted_pages_as_unchanged(self):
+        """Test that inserting a page does not mark the following pages as changed."""
+        previous = compute_page_fingerprints({1: "cover", 2: "fuser", 3: "tray"})
+        current = compute_page_fingerprints({1: "cover", 2: "new safety page", 3: "fuser", 4: "tray v2"})
+        
+        diff = diff_fingerprints(previous, current)
+        
+        assert diff.unchanged == [1, 3]
+        assert diff.changed == [2]
+        assert diff.added == [4]
+        assert diff.removed == []
+        assert diff.summary()["reuse_ratio"] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_diff_against_previous_version(self, idempotency_checker, mock_db_adapter):
+        """Test that fingerprints are stored and compared with the previous version."""
+        previous = compute_page_fingerprints({1: "cover", 2: "fuser"})
+        mock_db_adapter.execute_query.side_effect = [
+            [{"id": "doc-old"}],
+            None,
+            [{"page_number": page, "fingerprint": fp} for page, fp in previous.items()],
+        ]
+        current = compute_page_fingerprints({1: "cover", 2: "fuser (revised)"})
+        
+        summary = await idempotency_checker.diff_against_previous_version("doc-new", current)
+        
+        assert summary["previous_document_id"] == "doc-old"
+        assert (summary["unchanged"], summary["changed"]) == (1, 1)
+        insert_query, insert_params = mock_db_adapter.execute_query.call_args_list[1].args
+        assert "page_fingerprints" in insert_query
+        assert insert_params == ["doc-new", [1, 2], [current[1], current[2]]]
+    
+    @pytest.mark.asyncio
+    async def test_no_previous_version(self, idempotency_checker, mock_db_adapter):
+        """Test that a first version only records its fingerprints."""
+        mock_db_adapter.execute_query.side_effect = [[], None]
+        
+        summary = await idempotency_checker.diff_against_previous_version("doc-new", {1: "a" * 32})
+        
+        assert summary is None
+        assert mock_db_adapter.execute_query.call_count == 2
@@ -0,0 +1,145 @@
+"""Tests for informativeness ranking of images before the vision budget is spent."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+
+import pytest
+from PIL import Image, ImageDraw
+
+from backend.processors.image_ranking import hamming_distance, image_signals, rank_for_vision, score_image
+
+
+def _diagram(path, seed=0, size=(400, 400)):
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        offset = (i * 29 + seed * 53) % (size[0] - 60)
+        draw.rectangle([offset, (i * 31) % (size[1] - 60), offset + 50, (i * 31) % (size[1] - 60) + 40], outline="black")
+        draw.line([0, offset, size[0], (offset * 3 + seed * 17) % size[1]], fill="black", width=2)
+    img.save(path)
+    return str(path)
+
+
+def _blank(path, size=(400, 400)):
+    Image.new("RGB", size, (250, 250, 250)).save(path)
+    return str(path)
+
+
+def _image(path, **extra):
+    with Image.open(path) as img:
+        width, height = img.size
+    info = {"path": path, "filename": str(path).rsplit("/", 1)[-1], "width": width, "height": height}
+    info.update(image_signals(path))
+    info.update(extra)
+    return info
+
+
+def test_signals_separate_line_drawings_from_flat_fills(tmp_path):
+    diagram = image_signals(_diagram(tmp_path / "d.png"))
+    blank = image_signals(_blank(tmp_path / "b.png"))
+
+    assert diagram["edge_density"] > blank["edge_density"]
+    assert diagram["entropy"] > blank["entropy"]
+    assert image_signals(str(tmp_path / "missing.png")) == {}
+
+
+def test_error_code_context_raises_the_score(tmp_path):
+    path = _diagram(tmp_path / "d.png")
+    plain = score_image(_image(path))[0]
+    with_code = score_image(_image(path, ocr_text="see 13.20.01 for the jam sensor"))[0]
+    nearby_code = score_image(_image(path, surrounding_paragraphs=["Error 13.20.01: paper jam"]))[0]
+
+    assert with_code > nearby_code > plain
+
+
+def test_ranking_prefers_informative_images_and_drops_duplicates(tmp_path):
+    images = [
+        _image(_blank(tmp_path / "blank.png")),
+        _image(_diagram(tmp_path / "a.png", seed=1)),
+        _image(_diagram(tmp_path / "a_copy.png", seed=1)),
+        _image(_diagram(tmp_path / "b.png", seed=2), related_error_codes=["13.20.01"]),
+    ]
+
+    selected, skipped = rank_for_vision(images, budget=2)
+
+    assert [img["filename"] for img in selected] == ["b.png", "a.png"]
+    assert [img["filename"] for img in skipped["duplicate"]] == ["a_copy.png"]
+    assert skipped["duplicate"][0]["vision_duplicate_of"] == "a.png"
+    assert [img["filename"] for img in skipped["budget"]] == ["blank.png"]
+
+
+def test_duplicate_hashes_are_close(tmp_path):
+    path = _diagram(tmp_path / "a.png", seed=3)
+    with Image.open(path) as img:
+        img.resize((300, 300)).save(tmp_path / "a_small.jpg", quality=70)
+    first = image_signals(path)
+    resized = image_signals(str(tmp_path / "a_small.jpg"))
+    other = image_signals(_diagram(tmp_path / "b.png", seed=9))
+
+    assert hamming_distance(first["dhash"], resized["dhash"]) <= 6
+    assert hamming_distance(first["dhash"], other["dhash"]) > 6
+
+
+@pytest.fixture
+def vision_processor(monkeypatch):
+    from backend.processors import image_processor as module
+    from backend.processors.image_processor import ImageProcessor
+
+    class _NoCache:
+        def get(self, *args):
+            return None
+
+    proc = ImageProcessor.__new__(ImageProcessor)
+    proc.logger = logging.getLogger("test.image_processor")
+    proc.logger.success = proc.logger.info
+    proc.vision_available = True
+    proc.vision_budget = 3
+    proc.vision_parallel_requests = 2
+    proc.max_images_per_document = 80
+    proc.max_image_mb = 12.0
+    proc.global_vision_limit = 500
+    proc.global_vision_window = 3600.0
+    proc._vision_usage = deque()
+    proc._vision_breaker_until = None
+    proc._vision_state_lock = threading.Lock()
+    proc.result_cache = _NoCache()
+    proc._get_vision_model_name = lambda: "llava"
+    monkeypatch.setattr(module, "make_key", lambda *args: "key")
+    return proc
+
+
+def test_vision_budget_is_spent_on_top_ranked_images_in_parallel(tmp_path, vision_processor):
+    images = [_image(_blank(tmp_path / f"blank{i}.png")) for i in range(3)]
+    images += [_image(_diagram(tmp_path / f"d{i}.png", seed=i)) for i in range(4)]
+    images.append(_image(_diagram(tmp_path / "d0_copy.png", seed=0)))
+    for img in (images[3], images[-1]):
+        img["ocr_text"] = "fuser error 13.20.01"
+
+    active, peak, described = [0], [0], []
+    lock = threading.Lock()
+
+    def fake_describe(img, model_name, ollama_url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+            described.append(img["filename"])
+        vision_processor._apply_vision_description(img, f"diagram {img['filename']}")
+        return True
+
+    vision_processor._describe_image = fake_describe
+
+    vision_processor._run_vision_ai(images)
+
+    assert len(described) == 3 and "d0.png" in described and "d0_copy.png" not in described
+    assert not any(name.startswith("blank") for name in described)
+    assert peak[0] == 2
+    by_name = {img["filename"]: img for img in images}
+    assert by_name["d0_copy.png"]["ai_description"] == by_name["d0.png"]["ai_description"] != ""
+    assert not any(by_name[f"blank{i}.png"].get("ai_description") for i in range(3))
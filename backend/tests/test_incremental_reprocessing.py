@@ -0,0 +1,95 @@
+"""Tests for reusing stored chunk embeddings by content fingerprint and near-duplicate reference."""
+
+from __future__ import annotations
+
+import logging
+
+from backend.core.idempotency import compute_content_fingerprint
+from backend.processors.embedding_processor import EmbeddingProcessor
+
+
+def _processor(adapter):
+    # Skip __init__: it probes Ollama and creates state files
+    processor = EmbeddingProcessor.__new__(EmbeddingProcessor)
+    processor.database_adapter = adapter
+    processor.model_name = "nomic-embed-text:latest"
+    processor.reuse_by_fingerprint = True
+    processor.near_duplicate_index = None
+    processor.generated = []
+    processor.stored = {}
+
+    def _generate_embedding(text):
+        processor.generated.append(text)
+        return [0.5] * 4
+
+    async def _store_embedding(chunk_id, document_id, embedding, chunk_data):
+        processor.stored[chunk_id] = embedding
+        return True
+
+    processor._generate_embedding = _generate_embedding
+    processor._store_embedding = _store_embedding
+    return processor
+
+
+def _chunk(chunk_id, text):
+    return {"chunk_id": chunk_id, "text": text, "fingerprint": compute_content_fingerprint(text)}
+
+
+async def test_unchanged_chunks_reuse_stored_embeddings(fake_adapter):
+    unchanged = _chunk("c1", "Replace the fuser unit.")
+    revised = _chunk("c2", "Replace the fuser unit (new torque: 5 Nm).")
+    adapter = fake_adapter([
+        {"fingerprint": unchanged["fingerprint"], "text_chunk": unchanged["text"], "embedding": [0.1] * 4},
+    ])
+    processor = _processor(adapter)
+
+    result = await processor._embed_batch([unchanged, revised], "doc-new")
+
+    assert result["success_count"] == 2 and result["reused_count"] == 1
+    assert processor.generated == [revised["text"]]
+    assert processor.stored == {"c1": [0.1] * 4, "c2": [0.5] * 4}
+    query, params = adapter.queries[0]
+    assert "unified_embeddings" in query and params[2] == "nomic-embed-text:latest"
+
+
+async def test_lookup_failure_falls_back_to_generating():
+    class _BrokenAdapter:
+        async def execute_query(self, query, params=None):
+            raise RuntimeError("relation does not exist")
+
+    processor = _processor(_BrokenAdapter())
+    processor.logger = logging.getLogger("test_incremental_reprocessing")
+
+    result = await processor._embed_batch([_chunk("c1", "Paper jam in tray 2.")], "doc-new")
+
+    assert result["success_count"] == 1 and result["reused_count"] == 0
+    assert processor.generated == ["Paper jam in tray 2."]
+
+
+async def test_near_duplicates_are_stored_as_references(fake_adapter):
+    class _Index:
+        def __init__(self):
+            self.references, self.registered = [], []
+
+        async def find_canonical(self, chunks):
+            return {"c1": {"canonical_id": "c-old", "similarity": 0.95}}
+
+        async def store_reference(self, chunk_id, canonical_id, similarity):
+            self.references.append((chunk_id, canonical_id))
+            return True
+
+        async def register(self, chunk_id, text):
+            self.registered.append(chunk_id)
+            return True
+
+    processor = _processor(fake_adapter([]))
+    processor.near_duplicate_index = _Index()
+
+    result = await processor._embed_batch(
+        [_chunk("c1", "Safety notice for M608."), _chunk("c2", "New procedure.")], "doc-new"
+    )
+
+    assert result["success_count"] == 2 and result["referenced_count"] == 1
+    assert processor.generated == ["New procedure."]
+    assert processor.near_duplicate_index.references == [("c1", "c-old")]
+    assert processor.near_duplicate_index.registered == ["c2"]
@@ -0,0 +1,208 @@
+"""Tests for concurrent crawled-page extraction against a local static HTTP server."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.manufacturer_crawler import ManufacturerCrawler, _HostLimiter  # noqa: E402
+
+
+class _FixtureServer:
+    """Serves static pages and records how many requests were in flight per host."""
+
+    def __init__(self, latency: float = 0.05):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.starts = {}
+        fixture = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                host = self.headers.get("Host", "").split(":")[0]
+                with fixture.lock:
+                    fixture.active[host] = fixture.active.get(host, 0) + 1
+                    fixture.peak[host] = max(fixture.peak.get(host, 0), fixture.active[host])
+                    fixture.starts.setdefault(host, []).append(time.monotonic())
+                time.sleep(latency)
+                body = f"<html><body>{self.path}</body></html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fixture.lock:
+                    fixture.active[host] -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, host: str, path: str) -> str:
+        return f"http://{host}:{self.port}{path}"
+
+
+@pytest.fixture
+def fixture_server():
+    server = _FixtureServer()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+class _FakeDatabase:
+    def __init__(self, pages, processed_before=()):
+        self.pages = pages
+        self.processed_before = list(processed_before)
+        self.updates = []
+
+    async def execute_query(self, query, params=None):
+        if "UPDATE krai_system.crawled_pages" in query:
+            self.updates.append((params[0], list(params[2])))
+            return []
+        if "SELECT DISTINCT url_hash, content_hash" in query:
+            return [row for row in self.processed_before if row["url_hash"] in params[0]]
+        return self.pages
+
+
+class _FetchingExtractionService:
+    """Stands in for StructuredExtractionService: fetches the page from the fixture server."""
+
+    def __init__(self, urls, fail=()):
+        self.urls = urls
+        self.fail = set(fail)
+        self.extracted = []
+        # Bypass any proxy configured in the environment
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    async def extract_from_crawled_page(self, page_id):
+        self.extracted.append(page_id)
+        await asyncio.to_thread(lambda: self._opener.open(self.urls[page_id], timeout=5).read())
+        return {"success": page_id not in self.fail}
+
+
+def _crawler(database, extraction, **config):
+    crawler = ManufacturerCrawler(None, database, structured_extraction_service=extraction)
+    crawler._config.update(config)
+    return crawler
+
+
+def _pages(server, count_per_host, hosts=("127.0.0.1", "localhost")):
+    pages = []
+    for host in hosts:
+        for index in range(count_per_host):
+            pages.append({
+                "id": f"{host}-{index}",
+                "url": server.url(host, f"/product/{index}"),
+                "url_hash": f"{host}-url-{index}",
+                "content_hash": f"hash-{index}",
+                "page_type": "product_page",
+            })
+    return pages
+
+
+async def test_extraction_runs_concurrently_within_per_host_limit(fixture_server):
+    pages = _pages(fixture_server, 6)
+    database = _FakeDatabase(pages)
+    extraction = _FetchingExtractionService({page["id"]: page["url"] for page in pages})
+    crawler = _crawler(database, extraction, max_concurrency=4, per_host_concurrency=2, per_host_delay=0.0)
+
+    result = await crawler.process_crawled_pages("job-1")
+
+    assert result == {"processed": 12, "failed": 0, "skipped": 0, "extractions": 12}
+    assert fixture_server.peak == {"127.0.0.1": 2, "localhost": 2}
+    assert sorted(page_id for _, ids in database.updates for page_id in ids) == sorted(p["id"] for p in pages)
+
+
+async def test_per_host_delay_spaces_request_starts(fixture_server):
+    pages = _pages(fixture_server, 3, hosts=("127.0.0.1",))
+    database = _FakeDatabase(pages)
+    extraction = _FetchingExtractionService({page["id"]: page["url"] for page in pages})
+    crawler = _crawler(database, extraction, max_concurrency=4, per_host_concurrency=3, per_host_delay=0.1)
+
+    await crawler.process_crawled_pages("job-1")
+
+    starts = fixture_server.starts["127.0.0.1"]
+    assert len(starts) == 3
+    assert all(later - earlier >= 0.09 for earlier, later in zip(starts, starts[1:]))
+
+
+async def test_host_gap_is_applied_after_the_global_slot():
+    hosts = _HostLimiter(concurrency=2, delay=0.05)
+    global_slots = asyncio.Semaphore(2)
+    await global_slots.acquire()
+    await global_slots.acquire()
+    starts = []
+
+    async def request():
+        async with hosts.slot("http://example.test/page", global_slots):
+            starts.append(time.monotonic())
+
+    # Both requests queue for a global slot longer than the host gap
+    tasks = [asyncio.create_task(request()) for _ in range(2)]
+    await asyncio.sleep(0.15)
+    global_slots.release()
+    global_slots.release()
+    await asyncio.gather(*tasks)
+
+    assert starts[1] - starts[0] >= 0.045
+
+
+async def test_host_delay_does_not_hold_a_global_slot():
+    hosts = _HostLimiter(concurrency=2, delay=0.3)
+    global_slots = asyncio.Semaphore(1)
+    starts = {}
+
+    async def request(name, url):
+        async with hosts.slot(url, global_slots):
+            starts[name] = time.monotonic()
+
+    began = time.monotonic()
+    await request("a1", "http://a.test/1")
+    # a2 waits out the host delay for a.test; b1 must not queue behind it
+    waiting = asyncio.create_task(request("a2", "http://a.test/2"))
+    await asyncio.sleep(0.01)
+    await request("b1", "http://b.test/1")
+    await waiting
+
+    assert starts["b1"] - began < 0.15
+    assert starts["a2"] - starts["a1"] >= 0.29
+
+
+async def test_unchanged_pages_are_skipped_and_updates_are_batched(fixture_server):
+    pages = _pages(fixture_server, 4, hosts=("127.0.0.1",))
+    database = _FakeDatabase(
+        pages,
+        processed_before=[
+            {"url_hash": pages[0]["url_hash"], "content_hash": pages[0]["content_hash"]},
+            {"url_hash": pages[1]["url_hash"], "content_hash": "older-hash"},
+        ],
+    )
+    extraction = _FetchingExtractionService({page["id"]: page["url"] for page in pages}, fail={pages[3]["id"]})
+    crawler = _crawler(database, extraction, per_host_delay=0.0, persist_batch_size=100)
+
+    result = await crawler.process_crawled_pages("job-2")
+
+    assert result == {"processed": 3, "failed": 1, "skipped": 1, "extractions": 2}
+    assert pages[0]["id"] not in extraction.extracted
+    assert sorted(extraction.extracted) == sorted(page["id"] for page in pages[1:])
+    # One UPDATE per status for the whole job
+    assert sorted(status for status, _ in database.updates) == ["failed", "processed"]
+    processed = next(ids for status, ids in database.updates if status == "processed")
+    assert sorted(processed) == sorted(page["id"] for page in pages[:3])
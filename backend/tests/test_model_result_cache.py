@@ -0,0 +1,109 @@
+"""Tests for the content-addressed model result cache."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from backend.services import model_result_cache
+from backend.services.model_result_cache import ModelResultCache, make_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    instance = ModelResultCache(path=tmp_path / "results.sqlite3")
+    yield instance
+    instance.close()
+
+
+def test_key_depends_on_model_prompt_and_content():
+    base = make_key("vision", "llava:7b", "Describe", b"\x89PNG")
+
+    assert base == make_key("vision", "llava:7b", "Describe", b"\x89PNG")
+    assert base != make_key("vision", "llava:13b", "Describe", b"\x89PNG")
+    assert base != make_key("vision", "llava:7b", "Describe briefly", b"\x89PNG")
+    assert base != make_key("vision", "llava:7b", "Describe", b"\x89PNG2")
+    assert base != make_key("vision", "llava:7b", "Describe", b"\x89PNG", prompt_version="2")
+
+
+def test_repeated_call_is_served_from_cache(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"description": "exploded view of fuser unit"}
+
+    first = cache.get_or_compute("vision", "llava", "prompt", compute, content=b"img")
+    second = cache.get_or_compute("vision", "llava", "prompt", compute, content=b"img")
+
+    assert first == second and len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_empty_results_are_not_cached(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ""
+
+    cache.get_or_compute("llm", "qwen", "prompt", compute)
+    cache.get_or_compute("llm", "qwen", "prompt", compute)
+
+    assert len(calls) == 2
+
+
+async def test_async_variant(cache):
+    async def compute():
+        return "answer"
+
+    assert await cache.aget_or_compute("llm", "qwen", "p", compute) == "answer"
+    assert cache.get(make_key("llm", "qwen", "p")) == "answer"
+
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    first = ModelResultCache(path=path)
+    first.set("k", {"v": 1})
+    first.close()
+
+    second = ModelResultCache(path=path)
+    assert second.get("k") == {"v": 1}
+    second.close()
+
+
+def test_ttl_expiry(cache, monkeypatch):
+    cache.ttl_seconds = 60
+    cache.set("k", "v")
+    real_time = time.time
+    monkeypatch.setattr(model_result_cache.time, "time", lambda: real_time() + 120)
+
+    assert cache.get("k") is None
+
+
+def test_size_eviction_drops_least_recently_used(cache, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(model_result_cache.time, "time", lambda: float(next(clock)))
+    cache.ttl_seconds = 0
+    cache.max_bytes = 250
+
+    for name in ("a", "b", "c"):
+        cache.set(name, "x" * 90)
+    cache.get("a")  # a becomes most recently used
+
+    assert cache.evict() >= 1
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 90
+
+
+def test_disabled_cache_always_computes(tmp_path):
+    disabled = ModelResultCache(path=tmp_path / "off.sqlite3", enabled=False)
+    calls = []
+
+    for _ in range(2):
+        disabled.get_or_compute("llm", "m", "p", lambda: calls.append(1) or "r")
+
+    assert len(calls) == 2
+    assert not (tmp_path / "off.sqlite3").exists()
@@ -0,0 +1,42 @@
+"""Tests for per-query HNSW settings and scope filters in multimodal search."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.multimodal_search_service import MultimodalSearchService  # noqa: E402
+
+
+async def test_filtered_search_passes_scope_and_enables_iterative_scan(monkeypatch, fake_search_database, fake_ai):
+    monkeypatch.delenv("HNSW_EF_SEARCH", raising=False)
+    monkeypatch.delenv("HNSW_ITERATIVE_SCAN", raising=False)
+    database = fake_search_database
+    service = MultimodalSearchService(database, fake_ai)
+
+    await service.search_multimodal("fuser error", manufacturer_id="m-1", limit=5)
+    await service.search_multimodal("fuser error", limit=5, ef_search=200)
+
+    filtered, unfiltered = database.calls
+    assert filtered["manufacturer_id"] == "m-1" and filtered["match_count"] == 5
+    assert filtered["iterative_scan"] == "relaxed_order"
+    assert filtered["ef_search"] is None
+    assert unfiltered["iterative_scan"] is None and unfiltered["ef_search"] == 200
+
+
+async def test_environment_defaults_apply_unless_overridden(monkeypatch, fake_search_database, fake_ai):
+    monkeypatch.setenv("HNSW_EF_SEARCH", "80")
+    monkeypatch.setenv("HNSW_ITERATIVE_SCAN", "strict_order")
+    database = fake_search_database
+    service = MultimodalSearchService(database, fake_ai)
+
+    await service.search_multimodal("fuser error", document_id="d-1")
+    await service.search_multimodal("fuser error", iterative_scan="off")
+
+    assert database.calls[0]["ef_search"] == 80
+    assert database.calls[0]["iterative_scan"] == "strict_order"
+    assert database.calls[1]["iterative_scan"] == "off"
@@ -0,0 +1,55 @@
+"""Tests for MinHash/LSH near-duplicate chunk detection."""
+
+from __future__ import annotations
+
+from backend.processors.near_duplicate_index import NearDuplicateIndex
+from backend.utils.minhash import MinHasher, estimate_jaccard, shingles
+
+PROCEDURE = (
+    "To replace the fuser unit, switch off the printer and disconnect the power cord. "
+    "Wait at least thirty minutes until the fuser has cooled down. Open the rear door, "
+    "release the two blue levers on both sides of the fuser and pull the unit straight out. "
+    "Insert the new fuser until both levers click into place, close the rear door and reset "
+    "the fuser counter in the service menu of the {model}."
+)
+JAM = (
+    "Paper jam in tray two: pull the tray out completely, remove any crumpled sheets, check the "
+    "pickup roller and the separation pad for wear and paper dust, then push the tray back in "
+    "until it locks and confirm the paper size on the control panel."
+)
+
+
+def test_signature_estimates_jaccard_similarity():
+    hasher = MinHasher()
+    original = PROCEDURE.format(model="M607")
+    sibling = PROCEDURE.format(model="M608")
+    actual = len(shingles(original) & shingles(sibling)) / len(shingles(original) | shingles(sibling))
+
+    estimate = estimate_jaccard(hasher.signature(original), hasher.signature(sibling))
+
+    assert abs(estimate - actual) < 0.1
+    assert estimate_jaccard(hasher.signature(original), hasher.signature(JAM)) < 0.1
+    assert set(hasher.band_hashes(hasher.signature(original))) & set(
+        hasher.band_hashes(hasher.signature(sibling))
+    )
+
+
+async def test_find_canonical_matches_sibling_manual_chunk(monkeypatch, fake_adapter):
+    monkeypatch.delenv("NEAR_DUPLICATE_CHUNKS_ENABLED", raising=False)
+    index = NearDuplicateIndex(None, threshold=0.8)
+    indexed = index.signature(PROCEDURE.format(model="M607"))
+    index.database_adapter = fake_adapter([
+        {"chunk_id": "canonical", "signature": [int(v) for v in indexed], "bands": index.hasher.band_hashes(indexed)},
+    ])
+
+    matches = await index.find_canonical([
+        {"chunk_id": "c-sibling", "text": PROCEDURE.format(model="M608")},
+        {"chunk_id": "c-jam", "text": JAM},
+        {"chunk_id": "c-short", "text": "Safety notice."},
+    ])
+
+    assert list(matches) == ["c-sibling"]
+    assert matches["c-sibling"]["canonical_id"] == "canonical"
+    assert matches["c-sibling"]["similarity"] >= 0.8
+    _, params = index.database_adapter.queries[0]
+    assert params[1] == ["c-sibling", "c-jam"]
@@ -0,0 +1,192 @@
+"""Tests for the model-affinity Ollama request scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from backend.services.ollama_scheduler import CURRENT_PRIORITY, OllamaScheduler, Priority
+
+
+def _wait_for_depth(scheduler, depth, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.stats()["queue_depth"] < depth:
+        if time.monotonic() > deadline:
+            raise AssertionError(f"queue never reached depth {depth}: {scheduler.stats()}")
+        time.sleep(0.005)
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    """Records the model of every /api/generate call and counts model loads."""
+
+    calls: list = []
+    loaded = None
+    loads = 0
+    lock = threading.Lock()
+
+    def do_POST(self):  # noqa: N802 - http.server API
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.calls.append(body["model"])
+            if cls.loaded != body["model"]:
+                cls.loaded = body["model"]
+                cls.loads += 1
+        time.sleep(0.002)
+        payload = json.dumps({"model": body["model"], "response": "ok", "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_ollama():
+    handler = type("Handler", (_FakeOllama,), {"calls": [], "loaded": None, "loads": 0, "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_interleaved_requests_are_grouped_by_model(fake_ollama):
+    url, server_state = fake_ollama
+    scheduler = OllamaScheduler(max_concurrency=2, max_batch=32)
+
+    def call(model):
+        with scheduler.slot(model):
+            requests.post(f"{url}/api/generate", json={"model": model, "prompt": "p"}, timeout=5).raise_for_status()
+
+    models = ["llava", "qwen", "embed"] * 6
+    with scheduler.slot("llava"):
+        threads = [threading.Thread(target=call, args=(m,)) for m in models]
+        for t in threads:
+            t.start()
+        # llava is loaded, so its requests run alongside the held slot; the rest queue
+        _wait_for_depth(scheduler, 12)
+    for t in threads:
+        t.join(5)
+
+    assert server_state.calls == ["llava"] * 6 + ["qwen"] * 6 + ["embed"] * 6
+    assert server_state.loads == 3
+    stats = scheduler.stats()
+    assert stats["swaps"] == 2 and stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+
+async def test_interactive_requests_jump_the_batch_queue():
+    scheduler = OllamaScheduler(max_concurrency=1)
+    order = []
+
+    async def call(model, priority=None):
+        async with scheduler.aslot(model, priority):
+            order.append(model)
+
+    async with scheduler.aslot("llava"):
+        tasks = [asyncio.create_task(call("llava")), asyncio.create_task(call("llava"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("chat", Priority.INTERACTIVE)))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["interactive_waiting"] == 1
+    await asyncio.gather(*tasks)
+
+    assert order == ["chat", "llava", "llava"]
+
+
+async def test_priority_defaults_to_context():
+    scheduler = OllamaScheduler(max_concurrency=1)
+    order = []
+
+    async def call(model):
+        async with scheduler.aslot(model):
+            order.append(model)
+
+    async def interactive_call(model):
+        CURRENT_PRIORITY.set(Priority.INTERACTIVE)
+        await call(model)
+
+    async with scheduler.aslot("llava"):
+        tasks = [asyncio.create_task(call("llava")), asyncio.create_task(interactive_call("chat"))]
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order == ["chat", "llava"]
+
+
+def test_max_batch_yields_to_waiting_model():
+    scheduler = OllamaScheduler(max_concurrency=1, max_batch=2)
+    order = []
+    lock = threading.Lock()
+
+    def call(model):
+        with scheduler.slot(model):
+            with lock:
+                order.append(model)
+
+    threads = []
+    with scheduler.slot("a"):
+        for model in ["a", "a", "a", "b"]:
+            threads.append(threading.Thread(target=call, args=(model,)))
+            threads[-1].start()
+            _wait_for_depth(scheduler, len(threads))
+    for t in threads:
+        t.join(5)
+
+    # the held slot plus one queued "a" use up the batch, then "b" gets its turn
+    assert order == ["a", "b", "a", "a"]
+    assert scheduler.swaps == 2
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    scheduler = OllamaScheduler(max_concurrency=1)
+
+    async with scheduler.aslot("a"):
+        with pytest.raises(asyncio.TimeoutError):
+            async with scheduler.aslot("b", timeout=0.01):
+                pass
+        assert scheduler.stats()["queue_depth"] == 0
+
+    async with scheduler.aslot("b"):
+        assert scheduler.stats()["active_model"] == "b"
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_sync_timeout_raises():
+    scheduler = OllamaScheduler(max_concurrency=1)
+
+    with scheduler.slot("a"):
+        with pytest.raises(TimeoutError):
+            with scheduler.slot("b", timeout=0.01):
+                pass
+
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+def test_sync_slot_uses_default_timeout(monkeypatch):
+    monkeypatch.setenv("OLLAMA_SLOT_TIMEOUT", "0.01")
+    scheduler = OllamaScheduler.from_env()
+
+    with scheduler.slot("a"):
+        with pytest.raises(TimeoutError):
+            with scheduler.slot("b"):
+                pass
+
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+def test_disabled_scheduler_admits_everything():
+    scheduler = OllamaScheduler(max_concurrency=1, enabled=False)
+
+    with scheduler.slot("a"), scheduler.slot("b"):
+        assert scheduler.stats()["in_flight"] == 0
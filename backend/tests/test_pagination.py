@@ -0,0 +1,274 @@
+"""Tests for keyset pagination helpers used by the list endpoints."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+
+
+def _load_pagination_module():
+    """Load api/pagination.py without importing the full api package."""
+    path = Path(__file__).resolve().parents[1] / "api" / "pagination.py"
+    spec = importlib.util.spec_from_file_location("krai_api_pagination", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+pagination = _load_pagination_module()
+
+
+class RecordingFetch:
+    """Fake query callable that records SQL and serves canned responses in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls: list[tuple[str, list]] = []
+
+    async def __call__(self, query, params):
+        self.calls.append((" ".join(query.split()), list(params)))
+        return self.responses.pop(0) if self.responses else []
+
+
+def _rows(count, start=0):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": f"id-{i:03d}", "created_at": base.replace(minute=i % 60), "filename": f"f{i}.pdf"}
+        for i in range(start, start + count)
+    ]
+
+
+class TestCursorEncoding:
+    def test_round_trip_preserves_types(self):
+        ts = datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)
+        row_id = UUID("8dc1d2a5-8ef3-4dc1-90f9-1d4b7c6c1234")
+
+        cursor = pagination.encode_cursor("created_at", ts, row_id)
+
+        assert pagination.decode_cursor(cursor, "created_at") == (ts, row_id)
+
+    def test_cursor_is_url_safe(self):
+        cursor = pagination.encode_cursor("filename", "a/b+c?", "id-1")
+
+        assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+
+    def test_rejects_cursor_for_other_sort_field(self):
+        cursor = pagination.encode_cursor("created_at", None, "id-1")
+
+        with pytest.raises(HTTPException) as exc:
+            pagination.decode_cursor(cursor, "filename")
+        assert exc.value.status_code == 400
+
+    def test_rejects_garbage(self):
+        with pytest.raises(HTTPException) as exc:
+            pagination.decode_cursor("not-a-cursor!!", "created_at")
+        assert exc.value.status_code == 400
+
+
+class TestKeysetClause:
+    def test_descending_uses_row_comparison(self):
+        clause, params = pagination.build_keyset_clause("created_at", "desc", "v", "id-1", 2)
+
+        assert clause == '("created_at", id) < ($3, $4)'
+        assert params == ["v", "id-1"]
+
+    def test_ascending_uses_row_comparison_only(self):
+        clause, _ = pagination.build_keyset_clause("created_at", "asc", "v", "id-1", 0)
+
+        assert clause == '("created_at", id) > ($1, $2)'
+        assert pagination.build_keyset_tail_clause("created_at", "asc", "v") == '"created_at" IS NULL'
+
+    def test_null_sort_value_stays_in_null_phase(self):
+        clause, params = pagination.build_keyset_clause("updated_at", "desc", None, "id-9", 0)
+
+        assert clause == '"updated_at" IS NULL AND id < $1'
+        assert params == ["id-9"]
+        assert pagination.build_keyset_tail_clause("updated_at", "desc", None) == '"updated_at" IS NOT NULL'
+
+    def test_last_phase_has_no_tail(self):
+        assert pagination.build_keyset_tail_clause("updated_at", "asc", None) is None
+        assert pagination.build_keyset_tail_clause("updated_at", "desc", "v") is None
+        assert pagination.build_keyset_tail_clause("id", "asc", "id-1") is None
+
+    def test_invalid_sort_field_rejected(self):
+        with pytest.raises(HTTPException):
+            pagination.build_order_clause("created_at; DROP TABLE x", "desc")
+
+
+class TestFetchKeysetPage:
+    async def test_offset_mode_keeps_window_count_and_emits_cursor(self):
+        rows = [dict(r, total_count=25) for r in _rows(11)]
+        fetch = RecordingFetch(rows)
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_core.documents",
+            where_clauses=["processing_status = $1"],
+            params=["completed"],
+            sort_by="created_at",
+            sort_order="desc",
+            page=2,
+            page_size=10,
+        )
+
+        query, params = fetch.calls[0]
+        assert "COUNT(*) OVER()" in query
+        assert "LIMIT 11 OFFSET 10" in query
+        assert 'ORDER BY "created_at" DESC, id DESC' in query
+        assert params == ["completed"]
+        assert len(page.rows) == 10 and "total_count" not in page.rows[0]
+        assert page.total == 25 and page.total_estimated is False
+        assert pagination.decode_cursor(page.next_cursor, "created_at")[1] == "id-009"
+
+    async def test_cursor_mode_skips_offset_and_window_count(self):
+        cursor = pagination.encode_cursor("created_at", datetime(2026, 1, 1, tzinfo=timezone.utc), "id-009")
+        fetch = RecordingFetch(_rows(3), [{"count": 13}])
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_core.documents",
+            where_clauses=["processing_status = $1"],
+            params=["completed"],
+            sort_by="created_at",
+            sort_order="desc",
+            page=1,
+            page_size=10,
+            cursor=cursor,
+        )
+
+        query, params = fetch.calls[0]
+        assert "OFFSET" not in query and "OVER()" not in query
+        assert '("created_at", id) < ($2, $3)' in query
+        assert params[0] == "completed" and params[2] == "id-009"
+        # exact totals in cursor mode use a separate count without the keyset predicate
+        assert fetch.calls[1] == (
+            "SELECT COUNT(*) AS count FROM krai_core.documents WHERE processing_status = $1",
+            ["completed"],
+        )
+        assert page.total == 13
+        assert page.next_cursor is None
+
+    async def test_total_mode_none_issues_single_query(self):
+        fetch = RecordingFetch(_rows(5))
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_content.images",
+            where_clauses=[],
+            params=[],
+            sort_by="created_at",
+            sort_order="asc",
+            page=1,
+            page_size=10,
+            total_mode="none",
+        )
+
+        assert len(fetch.calls) == 1
+        assert page.total is None
+
+    async def test_estimated_total_reads_reltuples_when_unfiltered(self):
+        fetch = RecordingFetch(_rows(2), [{"estimate": 10_000_000}])
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_intelligence.error_codes",
+            where_clauses=[],
+            params=[],
+            sort_by="created_at",
+            sort_order="desc",
+            page=1,
+            page_size=10,
+            total_mode="estimated",
+        )
+
+        assert "pg_class" in fetch.calls[1][0]
+        assert page.total == 10_000_000 and page.total_estimated is True
+
+    async def test_estimated_total_uses_explain_when_filtered(self):
+        plan = json.dumps([{"Plan": {"Node Type": "Index Scan", "Plan Rows": 4321}}])
+        fetch = RecordingFetch(_rows(2), [{"QUERY PLAN": plan}])
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_intelligence.error_codes",
+            where_clauses=["document_id = $1"],
+            params=["doc-1"],
+            sort_by="created_at",
+            sort_order="desc",
+            page=1,
+            page_size=10,
+            total_mode="estimated",
+        )
+
+        assert fetch.calls[1] == (
+            "EXPLAIN (FORMAT JSON) SELECT 1 FROM krai_intelligence.error_codes WHERE document_id = $1",
+            ["doc-1"],
+        )
+        assert page.total == 4321
+
+    async def test_exhausted_non_null_range_continues_into_trailing_nulls(self):
+        non_null = _rows(3)
+        nulls = [{"id": f"id-n{i}", "created_at": None, "filename": "n.pdf"} for i in range(5)]
+        fetch = RecordingFetch(non_null, nulls)
+        cursor = pagination.encode_cursor("created_at", _rows(1)[0]["created_at"], "id-000")
+
+        page = await pagination.fetch_keyset_page(
+            fetch,
+            table="krai_core.documents",
+            where_clauses=["processing_status = $1"],
+            params=["completed"],
+            sort_by="created_at",
+            sort_order="asc",
+            page=1,
+            page_size=5,
+            cursor=cursor,
+            total_mode="none",
+        )
+
+        assert '("created_at", id) > ($2, $3)' in fetch.calls[0][0]
+        tail_query, tail_params = fetch.calls[1]
+        assert 'WHERE processing_status = $1 AND "created_at" IS NULL' in tail_query
+        assert "LIMIT 3" in tail_query
+        assert tail_params == ["completed"]
+        assert [row["id"] for row in page.rows] == ["id-000", "id-001", "id-002", "id-n0", "id-n1"]
+        assert pagination.decode_cursor(page.next_cursor, "created_at") == (None, "id-n1")
+
+    async def test_walking_cursors_visits_every_row_once(self):
+        dataset = sorted(_rows(23), key=lambda r: (r["created_at"], r["id"]), reverse=True)
+
+        async def fetch(query, params):
+            remaining = dataset
+            if params:
+                value, row_id = params[-2], params[-1]
+                remaining = [r for r in dataset if (r["created_at"], r["id"]) < (value, row_id)]
+            return remaining[:11]
+
+        seen, cursor = [], None
+        while True:
+            page = await pagination.fetch_keyset_page(
+                fetch,
+                table="krai_core.documents",
+                where_clauses=[],
+                params=[],
+                sort_by="created_at",
+                sort_order="desc",
+                page=1,
+                page_size=10,
+                cursor=cursor,
+                total_mode="none",
+            )
+            seen.extend(row["id"] for row in page.rows)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == [r["id"] for r in dataset]
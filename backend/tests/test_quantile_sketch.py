@@ -0,0 +1,126 @@
+"""Tests for DDSketch accuracy and mergeability and the sketch-backed PerformanceCollector buffers."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+
+import numpy as np
+import pytest
+
+from backend.services.performance_service import PerformanceCollector
+from backend.utils.quantile_sketch import DDSketch
+
+QUANTILES = (0.5, 0.95, 0.99, 0.999)
+
+
+def _exact(values, q):
+    # Order statistic at rank floor(q * (n - 1)), the value the sketch guarantee refers to
+    return float(np.quantile(values, q, method="lower"))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.random.default_rng(1).lognormal(mean=0.0, sigma=1.5, size=50_000),
+        np.random.default_rng(2).exponential(scale=0.2, size=50_000),
+        np.random.default_rng(3).uniform(0.001, 30.0, size=50_000),
+    ],
+    ids=["lognormal", "exponential", "uniform"],
+)
+def test_quantiles_are_within_relative_accuracy_of_exact_values(values):
+    sketch = DDSketch(relative_accuracy=0.01)
+    sketch.update(values.tolist())
+
+    for q in QUANTILES:
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    assert sketch.count == len(values)
+    assert math.isclose(sketch.avg, float(values.mean()), rel_tol=1e-9)
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+
+def test_memory_is_bounded_by_value_range_not_sample_count():
+    rng = np.random.default_rng(4)
+    sketch = DDSketch(relative_accuracy=0.01)
+    sketch.update(rng.lognormal(0.0, 1.0, size=10_000).tolist())
+    bins_after_10k = sketch.num_bins
+    sketch.update(rng.lognormal(0.0, 1.0, size=90_000).tolist())
+
+    # 10x the samples only adds the few buckets reached by new extremes
+    assert sketch.num_bins < bins_after_10k * 1.5
+
+    capped = DDSketch(relative_accuracy=0.01, max_bins=64)
+    capped.update(rng.uniform(1e-6, 1e4, size=20_000).tolist())
+    assert capped.num_bins == 64
+    # Collapsing only touches the lowest buckets, the tail stays accurate
+    assert abs(capped.quantile(0.99) - 0.99 * 1e4) <= 0.02 * 1e4
+
+
+def test_merged_worker_sketches_equal_a_single_sketch():
+    values = np.random.default_rng(5).lognormal(-2.0, 1.0, size=30_000)
+    single = DDSketch()
+    single.update(values.tolist())
+
+    merged = DDSketch()
+    for part in np.array_split(values, 3):
+        worker = DDSketch()
+        worker.update(part.tolist())
+        merged.merge(DDSketch.from_dict(json.loads(json.dumps(worker.to_dict()))))
+
+    for q in QUANTILES:
+        assert merged.quantile(q) == single.quantile(q)
+    assert merged.count == single.count and merged.max == single.max
+
+
+def test_merge_rejects_different_accuracy_and_sketch_rejects_negative_values():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+    with pytest.raises(ValueError):
+        DDSketch().add(-1.0)
+    assert DDSketch().quantile(0.5) is None
+
+
+def _collector():
+    return PerformanceCollector(None, logging.getLogger("test_quantile_sketch"))
+
+
+async def test_collector_percentiles_match_exact_aggregation_within_accuracy():
+    durations = np.random.default_rng(6).lognormal(0.0, 0.8, size=5_000).tolist()
+    collector = _collector()
+    for duration in durations:
+        await collector.collect_db_query_metrics("get_chunks", duration)
+
+    sketched = (await collector.flush_db_buffer())["get_chunks"]
+    exact = await collector.aggregate_metrics("db__get_chunks", durations)
+
+    assert sketched["avg_seconds"] == exact["avg_seconds"]
+    for key in ("p50_seconds", "p95_seconds", "p99_seconds"):
+        # exact uses interpolated quantiles; 1% sketch error plus rounding to ms
+        assert abs(sketched[key] - exact[key]) <= 0.011 * exact[key] + 0.001
+    assert collector._db_buffer == {}
+
+
+async def test_collector_snapshots_merge_across_workers():
+    class _Result:
+        def __init__(self, processing_time, success):
+            self.processing_time = processing_time
+            self.success = success
+            self.error = None
+            self.metadata = {}
+
+    workers = [_collector(), _collector()]
+    for index in range(200):
+        await workers[index % 2].collect_stage_metrics("embedding", _Result(0.01 * (index + 1), index % 10 != 0))
+        await workers[index % 2].collect_api_response_metrics("ollama_embed", 0.005 * (index + 1))
+
+    main = _collector()
+    for worker in workers:
+        main.merge_snapshot(json.loads(json.dumps(worker.snapshot())))
+
+    stage = (await main.flush_metrics_buffer())["embedding"]
+    assert stage["success_count"] == 180 and stage["failure_count"] == 20
+    assert stage["avg_seconds"] == 1.005
+    assert abs(stage["p95_seconds"] - 1.9) <= 0.02
+    assert (await main.flush_api_buffer())["ollama_embed"]["p50_seconds"] == pytest.approx(0.5, rel=0.01)
@@ -0,0 +1,173 @@
+"""Tests for lazy service construction and startup profiling helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def _load_startup_module():
+    """Load api/startup.py without importing the api package."""
+    spec = importlib.util.spec_from_file_location("krai_api_startup", ROOT / "api" / "startup.py")
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+startup = _load_startup_module()
+
+
+class TestLazyService:
+    async def test_builds_once_under_concurrent_access(self):
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return object()
+
+        holder = startup.LazyService("svc", factory)
+        assert holder.initialized is False and holder.peek() is None
+
+        results = await asyncio.gather(*(holder.get() for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert holder.initialized is True
+
+    async def test_failed_construction_is_retried(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("storage offline")
+            return "ready"
+
+        holder = startup.LazyService("storage", factory)
+
+        with pytest.raises(RuntimeError):
+            await holder.get()
+        assert await holder.get() == "ready"
+
+    async def test_resolve_service_passes_plain_values_through(self):
+        plain = object()
+        state = SimpleNamespace(pipeline=plain, agent=startup.LazyService("agent", lambda: "agent"))
+
+        assert await startup.resolve_service(state, "pipeline") is plain
+        assert await startup.resolve_service(state, "agent") == "agent"
+        assert await startup.resolve_service(state, "missing") is None
+
+    async def test_records_lazy_init_time_when_profiling(self):
+        profiler = startup.StartupProfiler(enabled=True)
+        holder = startup.LazyService("reranker", lambda: 1, profiler=profiler)
+
+        await holder.get()
+
+        assert [(t.name, t.kind) for t in profiler.timings] == [("reranker", "lazy")]
+
+
+class TestStartupProfiler:
+    def test_disabled_profiler_records_nothing(self):
+        profiler = startup.StartupProfiler(enabled=False)
+
+        with profiler.phase("db_pool"):
+            pass
+
+        assert profiler.timings == []
+
+    def test_failed_phase_is_reported_with_error(self):
+        profiler = startup.StartupProfiler(enabled=True)
+
+        with pytest.raises(ValueError):
+            with profiler.phase("auth_service"):
+                raise ValueError("bad secret")
+
+        report = profiler.format_report()
+        assert "auth_service" in report and "ValueError: bad secret" in report
+
+    def test_flag_and_env_enable_profiling(self, monkeypatch):
+        monkeypatch.delenv("KRAI_PROFILE_STARTUP", raising=False)
+        assert startup.profiling_requested(["app.py", "--profile-startup"]) is True
+        assert startup.profiling_requested(["app.py"]) is False
+
+        monkeypatch.setenv("KRAI_PROFILE_STARTUP", "true")
+        assert startup.profiling_requested(["app.py"]) is True
+
+
+def test_parse_importtime_groups_by_component():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        900 |     torch._C",
+            "import time:       200 |       1500 |   torch",
+            "import time:        50 |        300 |     api.routes.search",
+            "import time:        10 |       2500 | api.app",
+            "some unrelated stderr line",
+        ]
+    )
+
+    timings = startup.parse_importtime(output)
+
+    assert [(t.name, round(t.seconds * 1_000_000)) for t in timings] == [
+        ("api.app", 2500),
+        ("torch", 1500),
+        ("api.routes.search", 300),
+    ]
+
+
+def test_reranking_model_is_not_loaded_at_construction(monkeypatch):
+    monkeypatch.setenv("ENABLE_RERANKING", "true")
+    from services.reranking_service import RerankingService
+
+    loads = []
+    monkeypatch.setattr(RerankingService, "_load_model", lambda self: loads.append(1))
+
+    svc = RerankingService()
+    assert loads == []
+
+    svc.rerank("q", ["a", "b"], top_n=1)
+    svc.rerank("q", ["a", "b"], top_n=1)
+    assert loads == [1]
+
+
+async def test_async_rerank_loads_the_model_off_the_event_loop(monkeypatch):
+    monkeypatch.setenv("ENABLE_RERANKING", "true")
+    from services.reranking_service import RerankingService
+
+    loader_threads = []
+
+    def slow_load(self):
+        loader_threads.append(threading.current_thread())
+        time.sleep(0.3)
+
+    monkeypatch.setattr(RerankingService, "_load_model", slow_load)
+    svc = RerankingService()
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    result = await svc.arerank("q", ["a", "b"], top_n=1)
+    ticker.cancel()
+
+    assert result == ["a"]
+    assert loader_threads and loader_threads[0] is not threading.main_thread()
+    assert ticks > 5
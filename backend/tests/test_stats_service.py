@@ -0,0 +1,109 @@
+"""Tests for reading the trigger-maintained statistics counters."""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import stats_service  # noqa: E402
+from services.stats_service import StatsService, build_snapshot, table_dimensions  # noqa: E402
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def _row(dimension, key, count, updated_at=NOW):
+    return {"dimension": dimension, "key": key, "count": count, "updated_at": updated_at}
+
+
+@pytest.fixture(autouse=True)
+def _reset_missing_flag(monkeypatch):
+    monkeypatch.setattr(StatsService, "_counters_missing_until", 0.0)
+
+
+def test_build_snapshot_splits_totals_and_groups():
+    snapshot = build_snapshot(
+        [
+            _row("documents", "", 7),
+            _row("documents.processing_status", "completed", 5, NOW - timedelta(hours=1)),
+            _row("documents.processing_status", "failed", 2),
+            _row("documents.processing_status", "pending", 0),
+            _row("documents.document_type", "unknown", 7),
+        ]
+    )
+
+    assert snapshot.total("documents") == 7
+    assert snapshot.total("products") == 0
+    # zero counters (values that no longer occur) are dropped
+    assert snapshot.group("documents", "processing_status") == {"completed": 5, "failed": 2}
+    assert snapshot.group("documents", "document_type", include_unknown=False) == {}
+    assert snapshot.updated_at == NOW
+
+
+async def test_read_passes_dimensions_and_returns_snapshot():
+    calls = []
+
+    async def fetch(query, params):
+        calls.append(params)
+        return [_row("products", "", 3), _row("products.product_type", "printer", 3)]
+
+    dimensions = table_dimensions("products", ("product_type",))
+    snapshot = await StatsService(fetch).read(dimensions)
+
+    assert calls == [[["products", "products.product_type"]]]
+    assert snapshot.group("products", "product_type") == {"printer": 3}
+
+
+async def test_missing_table_falls_back_and_is_not_retried_immediately():
+    class UndefinedTable(Exception):
+        sqlstate = "42P01"
+
+    calls = []
+
+    async def fetch(query, params):
+        calls.append(query)
+        raise UndefinedTable('relation "krai_system.stat_counters" does not exist')
+
+    service = StatsService(fetch)
+
+    assert await service.read(["documents"]) is None
+    assert await service.read(["documents"]) is None
+    assert len(calls) == 1
+
+
+async def test_other_errors_propagate():
+    async def fetch(query, params):
+        raise RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError):
+        await StatsService(fetch).read(["documents"])
+
+
+async def test_empty_counters_mean_not_backfilled():
+    async def fetch(query, params):
+        return []
+
+    assert await StatsService(fetch).read(["documents"]) is None
+
+
+async def test_from_adapter_uses_execute_query():
+    class Adapter:
+        def __init__(self):
+            self.params = None
+
+        async def execute_query(self, query, params=None):
+            self.params = params
+            return [_row("manufacturers", "", 4)]
+
+    adapter = Adapter()
+    snapshot = await StatsService.from_adapter(adapter).read(["manufacturers"])
+
+    assert adapter.params == [["manufacturers"]]
+    assert snapshot.total("manufacturers") == 4
+    assert stats_service.STAT_COUNTERS_QUERY.strip().startswith("SELECT")
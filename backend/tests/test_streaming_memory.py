@@ -0,0 +1,165 @@
+"""Tests for the memory budget and windowed image extraction used by the streaming stages."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from backend.utils import memory_budget
+from backend.utils.memory_budget import MemoryBudget
+
+
+class TestMemoryBudget:
+    def test_tracks_peak_without_ceiling(self, monkeypatch):
+        readings = iter([100.0, 180.0, 120.0, 120.0])
+        monkeypatch.setattr(memory_budget, "current_rss_mb", lambda: next(readings))
+
+        budget = MemoryBudget()
+        assert budget.over_ceiling() is False
+        assert budget.over_ceiling() is False
+
+        report = budget.report()
+        assert report["peak_rss_mb"] == 180.0
+        assert report["start_rss_mb"] == 100.0
+        assert report["memory_ceiling_mb"] is None
+        assert report["backpressure_events"] == 0
+
+    def test_ceiling_counts_backpressure_events(self, monkeypatch):
+        readings = iter([100.0, 350.0, 150.0])
+        monkeypatch.setattr(memory_budget, "current_rss_mb", lambda: next(readings))
+
+        budget = MemoryBudget(ceiling_mb=200)
+
+        assert budget.over_ceiling() is True
+        assert budget.over_ceiling() is False
+        assert budget.backpressure_events == 1
+
+    def test_ceiling_applies_to_growth_since_window_start(self, monkeypatch):
+        # RSS stays high after the spike (freed memory is not returned to the OS)
+        readings = iter([100.0, 350.0, 350.0, 400.0, 600.0, 600.0])
+        monkeypatch.setattr(memory_budget, "current_rss_mb", lambda: next(readings))
+
+        budget = MemoryBudget(ceiling_mb=200)
+        assert budget.over_ceiling() is True
+
+        budget.start_window()
+        assert budget.over_ceiling() is False
+        assert budget.over_ceiling() is True
+        assert budget.report()["peak_rss_mb"] == 600.0
+
+    def test_window_shrinks_under_backpressure_and_grows_back(self):
+        budget = MemoryBudget()
+
+        assert budget.next_window_pages(8, 8, over_ceiling=True) == 4
+        assert budget.next_window_pages(1, 8, over_ceiling=True) == 1
+        assert budget.next_window_pages(1, 8, over_ceiling=False) == 2
+        assert budget.next_window_pages(4, 8, over_ceiling=False) == 8
+        assert budget.next_window_pages(8, 8, over_ceiling=False) == 8
+        assert budget.next_window_pages(0, 0, over_ceiling=True) == 0
+
+    def test_ceiling_requires_psutil(self, monkeypatch):
+        monkeypatch.setattr(memory_budget, "psutil", None)
+
+        with pytest.raises(ImportError, match="psutil"):
+            MemoryBudget(ceiling_mb=200)
+        assert MemoryBudget().ceiling_mb is None
+
+    def test_invalid_env_disables_ceiling(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_MEMORY_CEILING_MB", "lots")
+
+        assert MemoryBudget.from_env().ceiling_mb is None
+
+    def test_reads_real_rss(self):
+        assert memory_budget.current_rss_mb() > 0
+
+
+class _FakeBudget:
+    """Reports RSS above the ceiling on the listed page indices (0-based)."""
+
+    def __init__(self, over_on=()):
+        self.over_on = set(over_on)
+        self.calls = 0
+        self.peak_mb = 0.0
+        self.ceiling_mb = 1.0
+
+    def over_ceiling(self):
+        over = self.calls in self.over_on
+        self.calls += 1
+        return over
+
+    next_window_pages = MemoryBudget.next_window_pages
+
+    def start_window(self):
+        return 0.0
+
+    def relieve(self):
+        return 0.0
+
+
+@pytest.fixture
+def processor():
+    from backend.processors.image_processor import ImageProcessor
+
+    proc = ImageProcessor.__new__(ImageProcessor)
+    proc.logger = __import__("logging").getLogger("test.image_processor")
+
+    def _pages(pdf_path, output_dir):
+        for page in range(1, 8):
+            yield page, [{"page_number": page, "filename": f"p{page}.jpg"}]
+
+    proc._iter_page_images = _pages
+    return proc
+
+
+def _pages_per_window(windows):
+    return [[img["page_number"] for img in window] for window in windows]
+
+
+def test_windows_follow_page_count(processor):
+    processor.stream_window_pages = 3
+
+    windows = list(processor._iter_image_windows(None, None, _FakeBudget()))
+
+    assert _pages_per_window(windows) == [[1, 2, 3], [4, 5, 6], [7]]
+
+
+def test_zero_window_buffers_whole_document(processor):
+    processor.stream_window_pages = 0
+
+    windows = list(processor._iter_image_windows(None, None, _FakeBudget()))
+
+    assert _pages_per_window(windows) == [[1, 2, 3, 4, 5, 6, 7]]
+
+
+def test_backpressure_flushes_early_and_shrinks_window(processor):
+    processor.stream_window_pages = 4
+
+    windows = list(processor._iter_image_windows(None, None, _FakeBudget(over_on={1})))
+
+    # over the ceiling after page 2 -> flush, window shrinks to 2 pages, then grows back to 4
+    assert _pages_per_window(windows) == [[1, 2], [3, 4], [5, 6, 7]]
+
+
+def test_spilled_windows_round_trip_and_records_stay_small(tmp_path):
+    from backend.processors.image_processor import IMAGE_RECORD_KEYS, ImageProcessor
+
+    image = {
+        "filename": "page_0001_img_000.jpg",
+        "path": "/tmp/page_0001_img_000.jpg",
+        "page_number": 1,
+        "ocr_text": "fuser error 13.20.01 " * 50,
+        "surrounding_paragraphs": ["Remove the fuser unit."],
+        "bbox": (0.0, 0.0, 10.0, 10.0),
+        "vision_score": 0.7,
+    }
+    spill_path = tmp_path / "windows.jsonl"
+    spill_path.write_text(json.dumps([image]) + "\n" + json.dumps([image, image]) + "\n")
+
+    windows = list(ImageProcessor._iter_spilled_windows(spill_path))
+    record = ImageProcessor._image_record(image)
+
+    assert [len(window) for window in windows] == [1, 2]
+    assert windows[0][0]["ocr_text"] == image["ocr_text"]
+    assert set(record) <= set(IMAGE_RECORD_KEYS)
+    assert "ocr_text" not in record and record["vision_score"] == 0.7
@@ -0,0 +1,140 @@
+"""Tests for the streaming page mode of the text stage (text -> chunk -> persist -> embed per window)."""
+
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from backend.core.base_processor import ProcessingContext
+from backend.processors.chunker import SmartChunker
+from backend.processors.text_extractor import TextExtractor
+from backend.processors.text_processor_optimized import OptimizedTextProcessor
+
+PARAGRAPH = (
+    "Remove the fuser unit and check the heating roller for wear. "
+    "Replace the pressure roller if the surface is damaged or the bearings are noisy."
+)
+
+
+def _page_text(page: int) -> str:
+    lines = []
+    if page % 7 == 1:
+        lines.append(f"Chapter {page // 7 + 1}: Maintenance")
+    if page % 3 == 0:
+        lines.append(f"{page // 3}.{page % 5} Fuser adjustments")
+    if page % 4 == 2:
+        lines.append(f"Error Code 13.{page:02d}.01")
+    lines.extend(f"{PARAGRAPH} Step {page}.{n}" for n in range(page % 6 + 2))
+    return "\n\n".join(lines)
+
+
+@pytest.fixture
+def manual_pdf(tmp_path):
+    path = tmp_path / "manual.pdf"
+    doc = fitz.open()
+    for page in range(1, 31):
+        pdf_page = doc.new_page()
+        if page % 10 == 0:
+            continue  # blank page, skipped by the extractor
+        pdf_page.insert_textbox(fitz.Rect(36, 36, 560, 800), _page_text(page), fontsize=8)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _normalized(chunks):
+    """Chunks with uuids replaced by chunk positions so two runs compare equal."""
+    position = {str(chunk.chunk_id): i for i, chunk in enumerate(chunks)}
+    result = []
+    for chunk in chunks:
+        metadata = dict(chunk.metadata)
+        for key in ("previous_chunk_id", "next_chunk_id"):
+            if key in metadata:
+                metadata[key] = position[metadata[key]]
+        result.append(
+            (chunk.text, chunk.chunk_index, chunk.page_start, chunk.page_end, chunk.chunk_type, chunk.fingerprint, metadata)
+        )
+    return result
+
+
+def test_iter_pages_matches_extract_text(manual_pdf):
+    extractor = TextExtractor()
+
+    page_texts, _metadata, _structured = extractor.extract_text(manual_pdf, uuid4())
+
+    assert list(extractor.iter_pages(manual_pdf)) == sorted(page_texts.items())
+
+
+@pytest.mark.parametrize("hierarchical", [False, True])
+def test_streamed_chunks_match_whole_document(manual_pdf, hierarchical):
+    extractor = TextExtractor()
+    chunker = SmartChunker(chunk_size=300, overlap_size=50, enable_hierarchical_chunking=hierarchical)
+    doc_id = uuid4()
+
+    page_texts, _metadata, _structured = extractor.extract_text(manual_pdf, doc_id)
+    expected = chunker.chunk_document(page_texts, doc_id)
+
+    structure = chunker.detect_structure_streaming(extractor.iter_pages(manual_pdf)) if hierarchical else None
+    streamed = list(chunker.iter_chunks(extractor.iter_pages(manual_pdf), doc_id, structure))
+
+    if hierarchical:
+        assert structure == chunker.detect_document_structure(page_texts)
+        assert structure["sections"] and structure["error_code_sections"]
+    assert _normalized(streamed) == _normalized(expected)
+
+
+class _FakeDatabase:
+    def __init__(self):
+        self.chunks = {}
+
+    async def create_intelligence_chunk(self, model):
+        self.chunks[model.id] = model
+        return model.id
+
+
+class _FakeEmbedder:
+    def __init__(self, database):
+        self.database = database
+        self.windows = []
+
+    def is_configured(self):
+        return True
+
+    async def embed_chunks(self, chunks, document_id):
+        # Every chunk is persisted before it is embedded
+        assert all(chunk["chunk_id"] in self.database.chunks for chunk in chunks)
+        self.windows.append([chunk["page_start"] for chunk in chunks])
+        return {"success_count": len(chunks), "failed_chunks": []}
+
+
+async def test_processor_persists_and_embeds_per_window(manual_pdf):
+    database = _FakeDatabase()
+    embedder = _FakeEmbedder(database)
+    processor = OptimizedTextProcessor(database_service=database)
+    processor.enable_streaming(window_pages=5, embedding_processor=embedder)
+    context = ProcessingContext(file_path=str(manual_pdf), document_id=str(uuid4()), file_hash="h", document_type="")
+
+    result = await processor.process(context)
+
+    assert result.success
+    data = result.data
+    assert data["pages_processed"] == 27
+    assert data["chunks_created"] == data["chunks_saved"] == data["chunks_embedded"] == len(database.chunks)
+    assert data["streaming_windows"] == len(embedder.windows) > 1
+    assert not getattr(context, "chunks", None) and not getattr(context, "page_texts", None)
+
+    # Windows stay within a few pages and cover the chunks in order
+    for pages in embedder.windows:
+        assert max(pages) - min(pages) <= 6
+    assert [page for window in embedder.windows for page in window] == sorted(
+        chunk.page_start for chunk in database.chunks.values()
+    )
+
+    # Links survive window boundaries
+    saved = sorted(database.chunks.values(), key=lambda chunk: chunk.chunk_index)
+    for previous, current in zip(saved, saved[1:]):
+        assert previous.metadata["next_chunk_id"] == current.id
+        assert current.metadata["previous_chunk_id"] == previous.id
@@ -0,0 +1,150 @@
+"""Tests for event-driven, diff-based WebSocket monitoring broadcasts."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.websockets import WebSocketState  # noqa: E402
+
+from api.websocket import MonitoringBroadcaster, WebSocketManager, diff_state  # noqa: E402
+from backend.core.event_bus import EventBus, MonitoringEvent  # noqa: E402
+from models.monitoring import HardwareStatus, PipelineMetrics, QueueMetrics  # noqa: E402
+
+
+class _FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, payload):
+        await self.gate.wait()
+        self.sent.append(payload)
+
+
+class _FakeMetricsService:
+    def __init__(self):
+        self.calls = 0
+        self.completed = 10
+
+    def invalidate_cache(self, key=None):
+        pass
+
+    async def get_pipeline_metrics(self):
+        self.calls += 1
+        return PipelineMetrics(
+            total_documents=20, documents_pending=10 - (self.completed - 10), documents_processing=0,
+            documents_completed=self.completed, documents_failed=0, success_rate=100.0,
+            avg_processing_time_seconds=1.0, current_throughput_docs_per_hour=1.0,
+        )
+
+    async def get_queue_metrics(self):
+        self.calls += 1
+        return QueueMetrics(
+            total_items=0, pending_count=0, processing_count=0, completed_count=0,
+            failed_count=0, avg_wait_time_seconds=0.0, by_task_type={},
+        )
+
+    async def get_hardware_metrics(self):
+        self.calls += 1
+        return HardwareStatus(cpu_percent=1.0, ram_percent=1.0, ram_available_gb=1.0, gpu_available=False)
+
+
+@pytest.fixture
+def setup():
+    bus = EventBus()
+    manager = WebSocketManager()
+    broadcaster = MonitoringBroadcaster(
+        manager, bus=bus, coalesce_seconds=0.05, refresh_seconds=60, hardware_seconds=60
+    )
+    return bus, manager, broadcaster, _FakeMetricsService()
+
+
+def _types(ws):
+    return [payload["type"] for payload in ws.sent]
+
+
+def test_diff_state_reports_only_changes():
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "gone": 3}
+    new = {"a": 1, "b": {"x": 1, "y": 5}, "c": 4}
+    assert diff_state(old, new) == {"b": {"y": 5}, "c": 4, "gone": None}
+    assert diff_state(new, new) == {}
+
+
+async def test_no_polling_or_subscription_without_clients(setup):
+    bus, manager, broadcaster, metrics = setup
+    task = asyncio.create_task(broadcaster.run(metrics))
+    await asyncio.sleep(0.1)
+
+    assert metrics.calls == 0
+    assert not bus.has_subscribers
+    task.cancel()
+
+
+async def test_bursts_are_coalesced_and_metrics_sent_as_deltas(setup):
+    bus, manager, broadcaster, metrics = setup
+    task = asyncio.create_task(broadcaster.run(metrics))
+    ws = _FakeWebSocket()
+    await manager.connect(ws, "user-1", ["monitoring:read"])
+    await asyncio.sleep(0.1)
+    assert bus.has_subscribers
+    ws.sent.clear()
+    calls_before = metrics.calls
+
+    # One stage transitions several times within the window; another completes once
+    for status in ("running", "running", "completed"):
+        bus.publish(MonitoringEvent("stage_processing", {"status": status}, key="stage:doc-1:embedding"))
+    bus.publish(MonitoringEvent("stage_completed", {"status": "completed"}, key="stage:doc-2:embedding"))
+    metrics.completed = 12
+    await asyncio.sleep(0.2)
+
+    assert _types(ws) == ["stage_processing", "stage_completed", "pipeline_update"]
+    assert ws.sent[0]["data"] == {"status": "completed"}
+    pipeline = ws.sent[-1]
+    assert pipeline["delta"] is True
+    assert pipeline["data"] == {"documents_completed": 12, "documents_pending": 8}
+    # Pipeline and queue were re-read once for the whole burst; the queue did not change
+    assert metrics.calls - calls_before == 2
+
+    manager.disconnect(ws)
+    await asyncio.sleep(0.05)
+    assert not bus.has_subscribers
+    task.cancel()
+
+
+async def test_slow_client_is_resynced_without_stalling_others(setup):
+    bus, manager, broadcaster, metrics = setup
+    await broadcaster.initial_snapshot(metrics)
+    fast, slow = _FakeWebSocket(), _FakeWebSocket(blocked=True)
+    await manager.connect(fast, "fast", ["monitoring:read"])
+    await manager.connect(slow, "slow", ["monitoring:read"])
+    manager.clients[slow]._queue_size = 3
+
+    for i in range(10):
+        manager.deliver({"type": "alert_triggered", "data": {"n": i}})
+    await asyncio.sleep(0.05)
+
+    assert len(fast.sent) == 10
+    assert manager.clients[slow].dropped > 0
+
+    slow.gate.set()
+    await asyncio.sleep(0.05)
+    # The backlog was replaced by one snapshot followed by the newest events
+    assert _types(slow)[0] == "snapshot" and len(slow.sent) < 10
+    assert set(slow.sent[0]["data"]) == {"pipeline", "queue", "hardware"}
+    assert slow.sent[-1]["data"] == {"n": 9}
+    manager.disconnect(fast)
+    manager.disconnect(slow)
@@ -0,0 +1,183 @@
+"""
+Drawing Clusters - group vector drawing operations into figures
+
+``page.get_drawings()`` returns one entry per path/line operation. Exploded
+views in parts manuals produce thousands of them per page, so exporting one
+SVG per operation yields thousands of fragments. This module merges drawing
+bounding boxes that overlap or lie within ``gap`` points of each other into
+figure-level clusters (single-linkage via union-find), using a uniform grid as
+spatial index so only nearby boxes are compared.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Rect = Tuple[float, float, float, float]
+
+
+@dataclass
+class DrawingCluster:
+    """Union bounding box of a group of drawing operations."""
+
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    members: List[int] = field(default_factory=list)
+
+    @property
+    def width(self) -> float:
+        return self.x1 - self.x0
+
+    @property
+    def height(self) -> float:
+        return self.y1 - self.y0
+
+    @property
+    def area(self) -> float:
+        return self.width * self.height
+
+    @property
+    def rect(self) -> Rect:
+        return (self.x0, self.y0, self.x1, self.y1)
+
+
+def _near(a: Rect, b: Rect, gap: float) -> bool:
+    return (
+        a[0] - gap <= b[2]
+        and b[0] - gap <= a[2]
+        and a[1] - gap <= b[3]
+        and b[1] - gap <= a[3]
+    )
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _grid_cells(rect: Rect, cell: float, gap: float) -> Iterable[Tuple[int, int]]:
+    cx0 = int((rect[0] - gap) // cell)
+    cy0 = int((rect[1] - gap) // cell)
+    cx1 = int((rect[2] + gap) // cell)
+    cy1 = int((rect[3] + gap) // cell)
+    for cx in range(cx0, cx1 + 1):
+        for cy in range(cy0, cy1 + 1):
+            yield cx, cy
+
+
+def _link_nearby(rects: Sequence[Rect], gap: float, cell: float) -> _UnionFind:
+    """Union every pair of rects within ``gap`` of each other."""
+    uf = _UnionFind(len(rects))
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, rect in enumerate(rects):
+        seen = set()
+        for key in _grid_cells(rect, cell, gap):
+            bucket = grid.setdefault(key, [])
+            for j in bucket:
+                if j in seen:
+                    continue
+                seen.add(j)
+                if _near(rect, rects[j], gap):
+                    uf.union(i, j)
+            bucket.append(i)
+    return uf
+
+
+def _merge_overlapping(clusters: List[DrawingCluster], gap: float) -> List[DrawingCluster]:
+    """Merge clusters whose union boxes overlap (one figure's box can swallow another's)."""
+    changed = True
+    while changed and len(clusters) > 1:
+        changed = False
+        uf = _link_nearby([c.rect for c in clusters], gap, cell=max(gap * 8, 64.0))
+        groups: Dict[int, DrawingCluster] = {}
+        for i, cluster in enumerate(clusters):
+            root = uf.find(i)
+            target = groups.get(root)
+            if target is None:
+                groups[root] = DrawingCluster(cluster.x0, cluster.y0, cluster.x1, cluster.y1, list(cluster.members))
+                continue
+            changed = True
+            target.x0 = min(target.x0, cluster.x0)
+            target.y0 = min(target.y0, cluster.y0)
+            target.x1 = max(target.x1, cluster.x1)
+            target.y1 = max(target.y1, cluster.y1)
+            target.members.extend(cluster.members)
+        clusters = list(groups.values())
+    return clusters
+
+
+def cluster_drawings(
+    rects: Sequence[Rect],
+    page_rect: Optional[Rect] = None,
+    gap: float = 12.0,
+    min_size: float = 32.0,
+    max_clusters: int = 20,
+    frame_coverage: float = 0.9,
+) -> List[DrawingCluster]:
+    """
+    Group drawing bounding boxes into figure-level clusters.
+
+    Args:
+        rects: ``(x0, y0, x1, y1)`` per drawing operation
+        page_rect: Page bounds; drawings covering ``frame_coverage`` of the page
+            (borders, background fills) are ignored so they don't merge everything
+        gap: Boxes closer than this (points) join the same cluster
+        min_size: Clusters narrower or lower than this (points) are dropped
+        max_clusters: Keep at most this many clusters, largest area first
+        frame_coverage: Fraction of the page area above which a drawing is a frame
+
+    Returns:
+        Clusters in reading order (top-to-bottom, left-to-right)
+    """
+    page_area = None
+    if page_rect is not None:
+        page_area = max((page_rect[2] - page_rect[0]) * (page_rect[3] - page_rect[1]), 0.0)
+
+    indices: List[int] = []
+    kept: List[Rect] = []
+    for i, (x0, y0, x1, y1) in enumerate(rects):
+        if x1 < x0 or y1 < y0:
+            continue
+        if page_area and (x1 - x0) * (y1 - y0) >= frame_coverage * page_area:
+            continue
+        indices.append(i)
+        kept.append((x0, y0, x1, y1))
+
+    if not kept:
+        return []
+
+    uf = _link_nearby(kept, gap, cell=max(gap * 4, 32.0))
+    groups: Dict[int, DrawingCluster] = {}
+    for local, rect in enumerate(kept):
+        root = uf.find(local)
+        cluster = groups.get(root)
+        if cluster is None:
+            groups[root] = DrawingCluster(*rect, members=[indices[local]])
+            continue
+        cluster.x0 = min(cluster.x0, rect[0])
+        cluster.y0 = min(cluster.y0, rect[1])
+        cluster.x1 = max(cluster.x1, rect[2])
+        cluster.y1 = max(cluster.y1, rect[3])
+        cluster.members.append(indices[local])
+
+    clusters = _merge_overlapping(list(groups.values()), gap=0.0)
+    clusters = [c for c in clusters if c.width >= min_size and c.height >= min_size]
+    if max_clusters and len(clusters) > max_clusters:
+        clusters = sorted(clusters, key=lambda c: c.area, reverse=True)[:max_clusters]
+
+    clusters.sort(key=lambda c: (round(c.y0), c.x0))
+    for cluster in clusters:
+        cluster.members.sort()
+    return clusters
@@ -0,0 +1,126 @@
+"""
+Memory Budget - RSS tracking and backpressure for streaming stages
+
+SVG, text and image stages process documents in page windows and release each
+window's payloads once they are uploaded/queued. ``MemoryBudget`` tracks the
+process RSS (peak is reported in stage metadata) and tells the stage when the
+current window has grown the RSS by more than the configured ceiling, so it
+can flush the window early and shrink the next one instead of accumulating
+the whole document.
+
+Growth is measured from the RSS at the start of each window: the allocator
+rarely returns freed memory to the OS, so an absolute RSS ceiling stays
+exceeded after the first spike and would pin the window at one page. Windows
+that stay within the budget grow back towards the configured size.
+
+Backpressure needs psutil for the current RSS; without it only the lifetime
+peak (``ru_maxrss``) is available, which is fine for reporting but never goes
+down, so a ceiling cannot be enforced.
+"""
+
+import gc
+import logging
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is in requirements.txt
+    psutil = None
+
+logger = logging.getLogger("krai.memory_budget")
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 if it cannot be read)."""
+    if psutil is not None:
+        try:
+            return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+        except Exception:
+            pass
+    try:
+        import resource
+
+        # ru_maxrss is the peak, in KB on Linux; only used for reporting
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return 0.0
+
+
+class MemoryBudget:
+    """
+    Tracks peak RSS for one stage run and signals when a window outgrows its budget.
+
+    Args:
+        ceiling_mb: RSS growth allowed per window in MB; ``None``/0 disables
+            backpressure (peak RSS is still tracked)
+
+    Raises:
+        ImportError: A ceiling is set but psutil is not installed
+    """
+
+    def __init__(self, ceiling_mb: Optional[float] = None):
+        self.ceiling_mb = ceiling_mb if ceiling_mb and ceiling_mb > 0 else None
+        if self.ceiling_mb is not None and psutil is None:
+            raise ImportError(
+                "psutil is required for STREAMING_MEMORY_CEILING_MB "
+                "(without it only the lifetime peak RSS can be read)"
+            )
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self.window_start_mb = self.start_mb
+        self.backpressure_events = 0
+
+    @classmethod
+    def from_env(cls, var: str = "STREAMING_MEMORY_CEILING_MB") -> "MemoryBudget":
+        try:
+            ceiling = float(os.getenv(var, "0") or 0)
+        except ValueError:
+            logger.warning("Invalid %s=%r, memory ceiling disabled", var, os.getenv(var))
+            ceiling = 0.0
+        return cls(ceiling)
+
+    def sample(self) -> float:
+        """Read the current RSS and update the peak."""
+        rss = current_rss_mb()
+        if rss > self.peak_mb:
+            self.peak_mb = rss
+        return rss
+
+    def start_window(self) -> float:
+        """Measure growth from the current RSS on; call when a new window starts."""
+        self.window_start_mb = self.sample()
+        return self.window_start_mb
+
+    def over_ceiling(self) -> bool:
+        """True when the current window grew the RSS beyond the ceiling (counts as a backpressure event)."""
+        rss = self.sample()
+        if self.ceiling_mb is None or rss - self.window_start_mb <= self.ceiling_mb:
+            return False
+        self.backpressure_events += 1
+        return True
+
+    def next_window_pages(self, window_pages: int, configured_pages: int, over_ceiling: bool) -> int:
+        """
+        Size of the next window: halved after backpressure, otherwise doubled
+        back up to ``configured_pages``. 0 (whole document) is left unchanged.
+        """
+        if not window_pages:
+            return window_pages
+        if over_ceiling:
+            return max(1, window_pages // 2)
+        return min(configured_pages, window_pages * 2)
+
+    def relieve(self) -> float:
+        """Collect garbage after a window was released and start the next window; returns the RSS."""
+        gc.collect()
+        return self.start_window()
+
+    def report(self) -> Dict[str, Any]:
+        self.sample()
+        return {
+            "peak_rss_mb": round(self.peak_mb, 1),
+            "start_rss_mb": round(self.start_mb, 1),
+            "memory_ceiling_mb": self.ceiling_mb,
+            "backpressure_events": self.backpressure_events,
+        }
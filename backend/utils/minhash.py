@@ -0,0 +1,86 @@
+"""
+MinHash / LSH - near-duplicate detection for chunk text
+
+Sibling service manuals repeat safety notices, error-code tables and whole
+procedures with small edits (model names, page references), so their chunk
+fingerprints differ while the content is effectively the same. A MinHash
+signature over word shingles estimates the Jaccard similarity of two chunks;
+splitting the signature into bands and hashing each band (locality-sensitive
+hashing) lets an index find candidates by exact band-hash lookups instead of
+comparing every pair.
+
+With ``bands`` bands of ``rows`` rows, two texts with Jaccard similarity s
+share at least one band with probability 1 - (1 - s^rows)^bands; the default
+16 x 8 puts the 50% point near s = 0.7, and candidates are then checked
+against the actual ``threshold`` with the full signature.
+"""
+
+import hashlib
+import re
+from typing import List, Optional, Set
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Word ``size``-grams of the lower-cased text (one shingle for shorter texts)."""
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+class MinHasher:
+    """
+    MinHash signatures with ``num_perm`` universal hash permutations.
+
+    Signatures from hashers with the same ``num_perm`` and ``seed`` are
+    comparable, so both must stay fixed once signatures are persisted.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a < 2^31 and x < 2^32 keep a * x + b below 2^64
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature (uint32 per permutation), or None for text without words."""
+        values = shingles(text, self.shingle_size)
+        if not values:
+            return None
+        hashes = np.fromiter((_hash32(value) for value in values), dtype=np.uint64, count=len(values))
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_hashes(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit hash per band (the band index is part of the hash)."""
+        result = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(band.to_bytes(2, "big") + rows.tobytes(), digest_size=8).digest()
+            result.append(int.from_bytes(digest, "big", signed=True))
+        return result
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Share of equal signature positions, an unbiased estimate of the Jaccard similarity."""
+    if len(a) != len(b) or not len(a):
+        return 0.0
+    return float(np.count_nonzero(np.asarray(a) == np.asarray(b))) / len(a)
@@ -0,0 +1,141 @@
+"""
+DDSketch - mergeable streaming quantiles with relative-error guarantees
+
+Durations are counted in logarithmically sized buckets: with
+gamma = (1 + a) / (1 - a), a value x lands in bucket ceil(log_gamma(x)) and
+every value in a bucket is within a relative error ``a`` of the bucket's
+representative 2 * gamma^i / (gamma + 1). The q-quantile returned for n
+values is therefore within ``a`` (relative) of the exact order statistic at
+rank floor(q * (n - 1)), whatever the distribution.
+
+Recording is a dict increment. With a = 1% the buckets between 1 microsecond
+and 1 day need about 1,300 bins; beyond ``max_bins`` the lowest buckets are
+collapsed, which only affects the accuracy of the smallest values. Sketches
+with the same relative accuracy merge exactly by adding bucket counts, so
+per-worker snapshots combine into the same result a single sketch would give.
+
+Reference: Masson, Rim, Lee - "DDSketch: A Fast and Fully-Mergeable Quantile
+Sketch with Relative-Error Guarantees" (VLDB 2019).
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+
+class DDSketch:
+    """Quantile sketch for non-negative values (durations, sizes)."""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048, min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def num_bins(self) -> int:
+        return len(self._bins)
+
+    def add(self, value: float) -> None:
+        """Record one value; negative values are rejected."""
+        if value < 0:
+            raise ValueError(f"DDSketch only accepts non-negative values, got {value}")
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        if key in self._bins:
+            self._bins[key] += 1
+        else:
+            self._bins[key] = 1
+            if len(self._bins) > self.max_bins:
+                self._collapse_lowest()
+
+    def update(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def _collapse_lowest(self) -> None:
+        count = self._bins.pop(min(self._bins))
+        self._bins[min(self._bins)] += count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"q must be in [0, 1], got {q}")
+        if not self.count:
+            return None
+        rank = math.floor(q * (self.count - 1))
+        # Exact extremes are tracked, so the first and last rank need no bucket
+        if rank == 0:
+            return self.min
+        if rank == self.count - 1:
+            return self.max
+        if rank < self.zero_count:
+            return self.min
+        seen = self.zero_count
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if seen > rank:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's values to this one (same relative accuracy required)."""
+        if not math.isclose(self._gamma, other._gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        while len(self._bins) > self.max_bins:
+            self._collapse_lowest()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot, e.g. to ship from a worker process."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "min_value": self.min_value,
+            "bins": {str(key): count for key, count in self._bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], data.get("max_bins", 2048), data.get("min_value", 1e-9))
+        sketch._bins = {int(key): int(count) for key, count in data.get("bins", {}).items()}
+        sketch.zero_count = int(data.get("zero_count", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.sum = float(data.get("sum", 0.0))
+        if sketch.count:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        return sketch
@@ -0,0 +1,64 @@
+-- ======================================================================
+-- Migration 030: Composite indexes for keyset (cursor) pagination
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: List endpoints page with
+--                WHERE (sort_key, id) < ($n, $m) ORDER BY sort_key, id LIMIT k
+--              which needs a (sort_key, id) btree to run at constant cost
+--              regardless of page depth. Covers the default created_at sort
+--              plus the most common filtered listings.
+-- ======================================================================
+
+-- ======================================================================
+-- DOCUMENTS
+-- ======================================================================
+
+CREATE INDEX IF NOT EXISTS idx_documents_created_at_id
+    ON krai_core.documents(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_documents_updated_at_id
+    ON krai_core.documents(updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_documents_status_created_at_id
+    ON krai_core.documents(processing_status, created_at, id);
+
+-- ======================================================================
+-- PRODUCTS
+-- ======================================================================
+
+CREATE INDEX IF NOT EXISTS idx_products_created_at_id
+    ON krai_core.products(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_products_manufacturer_created_at_id
+    ON krai_core.products(manufacturer_id, created_at, id);
+
+-- ======================================================================
+-- ERROR CODES
+-- ======================================================================
+
+CREATE INDEX IF NOT EXISTS idx_error_codes_created_at_id
+    ON krai_intelligence.error_codes(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_error_codes_document_created_at_id
+    ON krai_intelligence.error_codes(document_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_error_codes_manufacturer_created_at_id
+    ON krai_intelligence.error_codes(manufacturer_id, created_at, id);
+
+-- ======================================================================
+-- IMAGES
+-- ======================================================================
+
+CREATE INDEX IF NOT EXISTS idx_images_created_at_id
+    ON krai_content.images(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_images_document_created_at_id
+    ON krai_content.images(document_id, created_at, id);
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('030_keyset_pagination_indexes', 'Composite (sort_key, id) indexes for keyset pagination')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,227 @@
+-- ======================================================================
+-- Migration 031: Trigger-maintained statistics counters
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: The dashboard and /stats endpoints used to run COUNT(*) /
+--              GROUP BY scans over documents, products, queue and media on
+--              every request. krai_system.stat_counters keeps one row per
+--              (dimension, key) that statement-level triggers update with
+--              the net delta of each INSERT / UPDATE / DELETE, so reads are
+--              a single index lookup. Dimensions are '<table>' (key '')
+--              for the row total and '<table>.<column>' per grouped value.
+--
+--              krai_system.refresh_stat_counters() rebuilds the counters
+--              from the source tables (initial backfill, after TRUNCATE or
+--              bulk loads with triggers disabled).
+-- ======================================================================
+
+CREATE TABLE IF NOT EXISTS krai_system.stat_counters (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (dimension, key)
+);
+
+COMMENT ON TABLE krai_system.stat_counters IS
+    'Row counts per table and grouped column, maintained by krai_system.maintain_stat_counters()';
+
+-- Which tables are counted and by which columns
+CREATE TABLE IF NOT EXISTS krai_system.stat_counter_sources (
+    source_table REGCLASS PRIMARY KEY,
+    dimension TEXT NOT NULL UNIQUE,
+    group_columns TEXT[] NOT NULL DEFAULT '{}'
+);
+
+INSERT INTO krai_system.stat_counter_sources (source_table, dimension, group_columns)
+VALUES
+    ('krai_core.documents', 'documents', ARRAY['processing_status', 'document_type', 'manufacturer']),
+    ('krai_core.products', 'products', ARRAY['product_type', 'manufacturer_id']),
+    ('krai_core.manufacturers', 'manufacturers', '{}'),
+    ('krai_system.processing_queue', 'processing_queue', ARRAY['status']),
+    ('krai_content.images', 'images', '{}'),
+    ('krai_content.videos', 'videos', '{}')
+ON CONFLICT (source_table) DO UPDATE
+SET dimension = EXCLUDED.dimension,
+    group_columns = EXCLUDED.group_columns;
+
+-- ======================================================================
+-- TRIGGER FUNCTION
+-- ======================================================================
+-- TG_ARGV[0] is the dimension, TG_ARGV[1..] the grouped columns. Deltas
+-- from the transition tables are summed per key first, so an UPDATE that
+-- does not touch a grouped column writes nothing, and a bulk statement
+-- touches each counter row once. Rows are upserted in key order to keep
+-- lock ordering stable between concurrent writers.
+
+CREATE OR REPLACE FUNCTION krai_system.maintain_stat_counters()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_dimension TEXT := TG_ARGV[0];
+    v_sources TEXT[] := ARRAY[]::TEXT[];
+    v_selects TEXT[] := ARRAY[]::TEXT[];
+    v_source TEXT;
+    v_sign INTEGER;
+    i INTEGER;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_sources := v_sources || 'new_rows'::TEXT;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        v_sources := v_sources || 'old_rows'::TEXT;
+    END IF;
+
+    FOREACH v_source IN ARRAY v_sources LOOP
+        v_sign := CASE WHEN v_source = 'new_rows' THEN 1 ELSE -1 END;
+        v_selects := v_selects || format(
+            'SELECT %L::text AS dimension, ''''::text AS key, %s::bigint AS delta FROM %I',
+            v_dimension, v_sign, v_source
+        );
+        FOR i IN 1 .. TG_NARGS - 1 LOOP
+            v_selects := v_selects || format(
+                'SELECT %L::text, COALESCE(%I::text, ''unknown''), %s::bigint FROM %I',
+                v_dimension || '.' || TG_ARGV[i], TG_ARGV[i], v_sign, v_source
+            );
+        END LOOP;
+    END LOOP;
+
+    EXECUTE format(
+        'INSERT INTO krai_system.stat_counters AS c (dimension, key, count, updated_at)
+         SELECT dimension, key, SUM(delta), NOW()
+         FROM (%s) deltas
+         GROUP BY dimension, key
+         HAVING SUM(delta) <> 0
+         ORDER BY dimension, key
+         ON CONFLICT (dimension, key) DO UPDATE
+         SET count = c.count + EXCLUDED.count,
+             updated_at = EXCLUDED.updated_at',
+        array_to_string(v_selects, ' UNION ALL ')
+    );
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION krai_system.refresh_stat_counters(p_dimension TEXT DEFAULT NULL)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_src RECORD;
+    v_column TEXT;
+BEGIN
+    FOR v_src IN
+        SELECT source_table, dimension, group_columns
+        FROM krai_system.stat_counter_sources
+        WHERE p_dimension IS NULL OR dimension = p_dimension
+    LOOP
+        -- Block concurrent writers so the rebuilt counts are exact
+        EXECUTE format('LOCK TABLE %s IN SHARE MODE', v_src.source_table);
+
+        DELETE FROM krai_system.stat_counters
+        WHERE dimension = v_src.dimension
+           OR dimension LIKE v_src.dimension || '.%';
+
+        EXECUTE format(
+            'INSERT INTO krai_system.stat_counters (dimension, key, count, updated_at)
+             SELECT %L, '''', COUNT(*), NOW() FROM %s',
+            v_src.dimension, v_src.source_table
+        );
+
+        FOREACH v_column IN ARRAY v_src.group_columns LOOP
+            EXECUTE format(
+                'INSERT INTO krai_system.stat_counters (dimension, key, count, updated_at)
+                 SELECT %L, COALESCE(%I::text, ''unknown''), COUNT(*), NOW()
+                 FROM %s GROUP BY 2',
+                v_src.dimension || '.' || v_column, v_column, v_src.source_table
+            );
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION krai_system.reset_stat_counters_on_truncate()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE krai_system.stat_counters
+    SET count = 0, updated_at = NOW()
+    WHERE dimension = TG_ARGV[0]
+       OR dimension LIKE TG_ARGV[0] || '.%';
+    RETURN NULL;
+END;
+$$;
+
+-- ======================================================================
+-- TRIGGERS (transition tables need one trigger per event)
+-- ======================================================================
+
+DO $$
+DECLARE
+    v_src RECORD;
+    v_args TEXT;
+    v_name TEXT;
+BEGIN
+    FOR v_src IN SELECT source_table, dimension, group_columns FROM krai_system.stat_counter_sources LOOP
+        v_args := array_to_string(
+            ARRAY(SELECT quote_literal(a) FROM unnest(v_src.dimension || v_src.group_columns) AS a),
+            ', '
+        );
+        v_name := 'trg_stat_counters_' || v_src.dimension;
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', v_name || '_ins', v_src.source_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', v_name || '_upd', v_src.source_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', v_name || '_del', v_src.source_table);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %s', v_name || '_trunc', v_src.source_table);
+
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON %s REFERENCING NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION krai_system.maintain_stat_counters(%s)',
+            v_name || '_ins', v_src.source_table, v_args
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER UPDATE ON %s REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION krai_system.maintain_stat_counters(%s)',
+            v_name || '_upd', v_src.source_table, v_args
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON %s REFERENCING OLD TABLE AS old_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION krai_system.maintain_stat_counters(%s)',
+            v_name || '_del', v_src.source_table, v_args
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON %s
+             FOR EACH STATEMENT EXECUTE FUNCTION krai_system.reset_stat_counters_on_truncate(%L)',
+            v_name || '_trunc', v_src.source_table, v_src.dimension
+        );
+    END LOOP;
+END;
+$$;
+
+-- Initial backfill
+SELECT krai_system.refresh_stat_counters();
+
+-- ======================================================================
+-- TIME-DEPENDENT STATS
+-- ======================================================================
+-- "processed in the last 24h" and "discontinued" depend on NOW() and
+-- cannot be kept as counters; these indexes turn them into range scans.
+
+CREATE INDEX IF NOT EXISTS idx_documents_completed_updated_at
+    ON krai_core.documents(updated_at)
+    WHERE processing_status = 'completed';
+
+CREATE INDEX IF NOT EXISTS idx_products_end_of_life_date
+    ON krai_core.products(end_of_life_date)
+    WHERE end_of_life_date IS NOT NULL;
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('031_stat_counters', 'Trigger-maintained stat counters for dashboard and /stats endpoints')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,76 @@
+-- ======================================================================
+-- Migration 032: Unique keys for set-based link and video upserts
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: LinkExtractionProcessorAI saves a document's links with one
+--              INSERT ... SELECT FROM unnest(...) ON CONFLICT (document_id, url)
+--              statement instead of a SELECT + UPDATE/INSERT per link. The
+--              conflict target needs a unique index; duplicate rows left by
+--              earlier concurrent runs are merged first (videos are re-pointed
+--              to the surviving link, which is the oldest one).
+--              Video upserts use the existing partial unique indexes on
+--              youtube_id / video_url; they are (re)created here for databases
+--              that were not built from the seed schema.
+-- ======================================================================
+
+-- ======================================================================
+-- LINKS: merge duplicates, then enforce (document_id, url)
+-- ======================================================================
+
+WITH duplicates AS (
+    SELECT id, keep_id
+    FROM (
+        SELECT
+            id,
+            first_value(id) OVER (
+                PARTITION BY document_id, url
+                ORDER BY created_at NULLS LAST, id
+            ) AS keep_id
+        FROM krai_content.links
+    ) ranked
+    WHERE id <> keep_id
+)
+UPDATE krai_content.videos v
+SET link_id = d.keep_id
+FROM duplicates d
+WHERE v.link_id = d.id;
+
+WITH duplicates AS (
+    SELECT id
+    FROM (
+        SELECT
+            id,
+            first_value(id) OVER (
+                PARTITION BY document_id, url
+                ORDER BY created_at NULLS LAST, id
+            ) AS keep_id
+        FROM krai_content.links
+    ) ranked
+    WHERE id <> keep_id
+)
+DELETE FROM krai_content.links l
+USING duplicates d
+WHERE l.id = d.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_links_document_url_unique
+    ON krai_content.links(document_id, url);
+
+-- ======================================================================
+-- VIDEOS: conflict targets for YouTube ids and plain URLs
+-- ======================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_videos_youtube_id_unique
+    ON krai_content.videos(youtube_id)
+    WHERE youtube_id IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_videos_url_unique
+    ON krai_content.videos(video_url)
+    WHERE video_url IS NOT NULL AND youtube_id IS NULL;
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('032_link_video_upsert_keys', 'Unique (document_id, url) on links for set-based link/video upserts')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,128 @@
+-- ======================================================================
+-- Migration 033: Hybrid lexical + vector chunk search
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: Semantic search alone misses exact identifiers (error codes,
+--              part numbers) because embeddings blur "C-2801" and "C-2810"
+--              into the same neighbourhood. hybrid_search_chunks() runs the
+--              full-text, vector and (optional) exact-token candidate
+--              queries against the existing chunk indexes in one statement
+--              and fuses their ranks with reciprocal rank fusion:
+--
+--                score = sum(1 / (rrf_k + rank_in_list))
+--
+--                fts      idx_chunks_text_fts   (GIN to_tsvector('english'))
+--                semantic chunks_embedding_hnsw_idx (HNSW cosine)
+--                exact    idx_chunks_text_trgm  (GIN trigram, ILIKE)
+--
+--              Expression indexes on upper(error_code) / upper(part_number)
+--              let the agent fast paths probe exact identifiers with a btree
+--              lookup before falling back to trigram substring matching.
+-- ======================================================================
+
+CREATE OR REPLACE FUNCTION krai_intelligence.hybrid_search_chunks(
+    query_text text,
+    query_embedding vector(768),
+    match_count int DEFAULT 10,
+    exact_token text DEFAULT NULL,
+    candidate_count int DEFAULT 50,
+    rrf_k int DEFAULT 60
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    page_start int,
+    page_end int,
+    similarity float,
+    fts_rank int,
+    vector_rank int,
+    exact_rank int,
+    score float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH fts AS (
+        -- Expression must match idx_chunks_text_fts for the GIN index to apply
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY ts_rank_cd(to_tsvector('english'::regconfig, c.text_chunk), q.query) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c,
+             websearch_to_tsquery('english'::regconfig, query_text) q(query)
+        WHERE query_text IS NOT NULL
+          AND to_tsvector('english'::regconfig, c.text_chunk) @@ q.query
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    semantic AS (
+        SELECT ranked.id, row_number() OVER (ORDER BY ranked.distance, ranked.id)::int AS rank
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE query_embedding IS NOT NULL
+              AND c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) ranked
+    ),
+    exact AS (
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY word_similarity(exact_token, c.text_chunk) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c
+        WHERE exact_token IS NOT NULL
+          AND c.text_chunk ILIKE '%' || exact_token || '%'
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    fused AS (
+        SELECT COALESCE(f.id, s.id, e.id) AS id,
+               f.rank AS fts_rank,
+               s.rank AS vector_rank,
+               e.rank AS exact_rank,
+               COALESCE(1.0 / (rrf_k + f.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + s.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + e.rank), 0) AS score
+        FROM fts f
+        FULL OUTER JOIN semantic s ON s.id = f.id
+        FULL OUTER JOIN exact e ON e.id = COALESCE(f.id, s.id)
+    )
+    SELECT c.id,
+           c.document_id,
+           c.text_chunk,
+           c.page_start,
+           c.page_end,
+           CASE
+               WHEN query_embedding IS NULL OR c.embedding IS NULL THEN NULL
+               ELSE 1 - (c.embedding <=> query_embedding)
+           END::float AS similarity,
+           fu.fts_rank,
+           fu.vector_rank,
+           fu.exact_rank,
+           fu.score::float
+    FROM fused fu
+    JOIN krai_intelligence.chunks c ON c.id = fu.id
+    ORDER BY fu.score DESC, c.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION krai_intelligence.hybrid_search_chunks(text, vector, int, text, int, int) IS
+    'Full-text + vector (+ exact token) chunk search fused with reciprocal rank fusion';
+
+-- Exact identifier probes used by the agent fast paths
+CREATE INDEX IF NOT EXISTS idx_error_codes_code_upper
+    ON krai_intelligence.error_codes (upper(error_code));
+
+CREATE INDEX IF NOT EXISTS idx_parts_catalog_part_number_upper
+    ON krai_parts.parts_catalog (upper(part_number));
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('033_hybrid_chunk_search', 'hybrid_search_chunks() with RRF over FTS/vector/trigram plus exact identifier indexes')
+ON CONFLICT (migration_name) DO NOTHING;
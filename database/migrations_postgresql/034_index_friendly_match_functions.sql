@@ -0,0 +1,319 @@
+-- ======================================================================
+-- Migration 034: Index-friendly vector match functions
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: match_chunks / match_multimodal filtered on
+--                1 - (embedding <=> q) > match_threshold
+--              in the WHERE clause, so the planner could not use the HNSW
+--              indexes as an ORDER BY ... LIMIT scan and computed the
+--              distance for every row (UNION ALL of five full scans for
+--              match_multimodal). The functions now take the nearest
+--              match_count rows per table straight from the index and apply
+--              the threshold afterwards; the result is identical because
+--              the rows above the threshold are a prefix of the distance
+--              order.
+--
+--              Document / manufacturer / product filters are evaluated
+--              during the index scan. Selective filters can leave fewer
+--              than match_count rows in the ef_search candidate list, so
+--              callers may pass per query:
+--                ef_search       hnsw.ef_search (raised to at least the
+--                                number of rows requested)
+--                iterative_scan  hnsw.iterative_scan ('relaxed_order' /
+--                                'strict_order' / 'off', pgvector >= 0.8)
+--              Both are applied with set_config(..., is_local => true) and
+--              only last for the calling statement's transaction.
+-- ======================================================================
+
+-- ----------------------------------------------------------------------
+-- Per-query HNSW settings
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.apply_hnsw_settings(
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL,
+    min_ef_search int DEFAULT NULL
+) RETURNS void AS $$
+DECLARE
+    effective_ef int;
+BEGIN
+    effective_ef := GREATEST(
+        COALESCE(ef_search, NULLIF(current_setting('hnsw.ef_search', true), '')::int, 40),
+        COALESCE(min_ef_search, 0)
+    );
+    PERFORM set_config('hnsw.ef_search', LEAST(effective_ef, 1000)::text, true);
+
+    IF iterative_scan IS NOT NULL THEN
+        BEGIN
+            PERFORM set_config('hnsw.iterative_scan', iterative_scan, true);
+        EXCEPTION WHEN invalid_name OR invalid_parameter_value OR undefined_object THEN
+            -- pgvector < 0.8 has no iterative index scans
+            RAISE DEBUG 'hnsw.iterative_scan not supported, ignoring %', iterative_scan;
+        END;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- NULL filters match everything. Called per candidate row: the EXISTS sublinks
+-- keep it from being inlined (superseded by document_scope() in 038)
+CREATE OR REPLACE FUNCTION krai_intelligence.document_in_scope(
+    doc_id uuid,
+    filter_document_id uuid,
+    filter_manufacturer_id uuid,
+    filter_product_id uuid
+) RETURNS boolean AS $$
+    SELECT (filter_document_id IS NULL OR doc_id = filter_document_id)
+       AND (filter_manufacturer_id IS NULL OR EXISTS (
+               SELECT 1 FROM krai_core.documents d
+               WHERE d.id = doc_id AND d.manufacturer_id = filter_manufacturer_id))
+       AND (filter_product_id IS NULL OR EXISTS (
+               SELECT 1 FROM krai_core.document_products dp
+               WHERE dp.document_id = doc_id AND dp.product_id = filter_product_id))
+$$ LANGUAGE sql STABLE;
+
+-- ----------------------------------------------------------------------
+-- match_chunks
+-- ----------------------------------------------------------------------
+DROP FUNCTION IF EXISTS krai_intelligence.match_chunks(vector, double precision, integer);
+
+CREATE OR REPLACE FUNCTION krai_intelligence.match_chunks(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    chunk_text text,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+
+    RETURN QUERY
+    SELECT nn.id, nn.document_id, nn.text_chunk, nn.page_start, (1 - nn.distance)::float
+    FROM (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start,
+               c.embedding <=> query_embedding AS distance
+        FROM krai_intelligence.chunks c
+        WHERE c.embedding IS NOT NULL
+          AND krai_intelligence.document_in_scope(
+                c.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+        ORDER BY c.embedding <=> query_embedding
+        LIMIT match_count
+    ) nn
+    WHERE 1 - nn.distance > match_threshold
+    ORDER BY nn.distance;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------
+-- match_multimodal: nearest match_count per modality, then merge
+-- ----------------------------------------------------------------------
+DROP FUNCTION IF EXISTS krai_intelligence.match_multimodal(vector, double precision, integer);
+
+CREATE OR REPLACE FUNCTION krai_intelligence.match_multimodal(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    source_id uuid,
+    source_type text,
+    content text,
+    document_id uuid,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+
+    RETURN QUERY
+    WITH candidates AS (
+        (
+            SELECT c.id AS source_id, 'chunk'::text AS source_type, c.text_chunk AS content,
+                   c.document_id, c.page_start AS page_number,
+                   c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE c.embedding IS NOT NULL
+              AND krai_intelligence.document_in_scope(
+                    c.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT i.id, 'image'::text, COALESCE(i.ai_description, i.figure_context, ''),
+                   i.document_id, i.page_number,
+                   i.context_embedding <=> query_embedding
+            FROM krai_content.images i
+            WHERE i.context_embedding IS NOT NULL
+              AND krai_intelligence.document_in_scope(
+                    i.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+            ORDER BY i.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT v.id, 'video'::text, COALESCE(v.description, v.title, ''),
+                   v.document_id, v.page_number,
+                   v.context_embedding <=> query_embedding
+            FROM krai_content.videos v
+            WHERE v.context_embedding IS NOT NULL
+              AND krai_intelligence.document_in_scope(
+                    v.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+            ORDER BY v.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT l.id, 'link'::text, COALESCE(l.description, l.url, ''),
+                   l.document_id, l.page_number,
+                   l.context_embedding <=> query_embedding
+            FROM krai_content.links l
+            WHERE l.context_embedding IS NOT NULL
+              AND krai_intelligence.document_in_scope(
+                    l.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+            ORDER BY l.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT t.id, 'table'::text, COALESCE(t.table_markdown, ''),
+                   t.document_id, t.page_number,
+                   t.table_embedding <=> query_embedding
+            FROM krai_intelligence.structured_tables t
+            WHERE t.table_embedding IS NOT NULL
+              AND krai_intelligence.document_in_scope(
+                    t.document_id, filter_document_id, filter_manufacturer_id, filter_product_id)
+            ORDER BY t.table_embedding <=> query_embedding
+            LIMIT match_count
+        )
+    )
+    SELECT cd.source_id, cd.source_type, cd.content, cd.document_id, cd.page_number,
+           (1 - cd.distance)::float
+    FROM candidates cd
+    WHERE 1 - cd.distance > match_threshold
+    ORDER BY cd.distance
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------
+-- hybrid_search_chunks (033): same per-query settings for its vector list
+-- ----------------------------------------------------------------------
+DROP FUNCTION IF EXISTS krai_intelligence.hybrid_search_chunks(text, vector, integer, text, integer, integer);
+
+CREATE OR REPLACE FUNCTION krai_intelligence.hybrid_search_chunks(
+    query_text text,
+    query_embedding vector(768),
+    match_count int DEFAULT 10,
+    exact_token text DEFAULT NULL,
+    candidate_count int DEFAULT 50,
+    rrf_k int DEFAULT 60,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    page_start int,
+    page_end int,
+    similarity float,
+    fts_rank int,
+    vector_rank int,
+    exact_rank int,
+    score float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, candidate_count);
+
+    RETURN QUERY
+    WITH fts AS (
+        -- Expression must match idx_chunks_text_fts for the GIN index to apply
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY ts_rank_cd(to_tsvector('english'::regconfig, c.text_chunk), q.query) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c,
+             websearch_to_tsquery('english'::regconfig, query_text) q(query)
+        WHERE query_text IS NOT NULL
+          AND to_tsvector('english'::regconfig, c.text_chunk) @@ q.query
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    semantic AS (
+        SELECT ranked.id, row_number() OVER (ORDER BY ranked.distance, ranked.id)::int AS rank
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE query_embedding IS NOT NULL
+              AND c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) ranked
+    ),
+    exact AS (
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY word_similarity(exact_token, c.text_chunk) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c
+        WHERE exact_token IS NOT NULL
+          AND c.text_chunk ILIKE '%' || exact_token || '%'
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    fused AS (
+        SELECT COALESCE(f.id, s.id, e.id) AS id,
+               f.rank AS fts_rank,
+               s.rank AS vector_rank,
+               e.rank AS exact_rank,
+               COALESCE(1.0 / (rrf_k + f.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + s.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + e.rank), 0) AS score
+        FROM fts f
+        FULL OUTER JOIN semantic s ON s.id = f.id
+        FULL OUTER JOIN exact e ON e.id = COALESCE(f.id, s.id)
+    )
+    SELECT c.id,
+           c.document_id,
+           c.text_chunk,
+           c.page_start,
+           c.page_end,
+           CASE
+               WHEN query_embedding IS NULL OR c.embedding IS NULL THEN NULL
+               ELSE 1 - (c.embedding <=> query_embedding)
+           END::float AS similarity,
+           fu.fts_rank,
+           fu.vector_rank,
+           fu.exact_rank,
+           fu.score::float
+    FROM fused fu
+    JOIN krai_intelligence.chunks c ON c.id = fu.id
+    ORDER BY fu.score DESC, c.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION krai_intelligence.hybrid_search_chunks(text, vector, int, text, int, int, int, text) IS
+    'Full-text + vector (+ exact token) chunk search fused with reciprocal rank fusion';
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('034_index_friendly_match_functions', 'HNSW ORDER BY/LIMIT match functions with scope filters and per-query ef_search / iterative_scan')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,125 @@
+-- ======================================================================
+-- Migration 035: Half-precision and binary-quantized embedding storage
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: Storage tier for the 768-dimensional embeddings
+--              (pgvector >= 0.7):
+--
+--              1. krai_intelligence.convert_embedding_storage('halfvec')
+--                 switches every embedding column to halfvec(768) and
+--                 rebuilds its HNSW index with halfvec_cosine_ops; this
+--                 halves heap and index size (3 KB -> 1.5 KB per vector).
+--                 convert_embedding_storage('vector') converts back. The
+--                 conversion rewrites each table under an ACCESS EXCLUSIVE
+--                 lock, so it is NOT run by this migration:
+--
+--                   SELECT * FROM krai_intelligence.convert_embedding_storage('halfvec');
+--
+--                 Then set EMBEDDING_STORAGE=halfvec so writers bind
+--                 halfvec parameters. Existing queries keep passing
+--                 ::vector; pgvector casts vector to halfvec implicitly,
+--                 so the match functions use the halfvec indexes as is.
+--
+--              2. An HNSW index over binary_quantize(embedding) on
+--                 unified_embeddings (96 bytes per vector) for a coarse
+--                 Hamming-distance first pass. Candidates are re-ranked by
+--                 cosine distance on the stored embedding; see
+--                 PostgreSQLAdapter.search_embeddings(rescore_factor=...).
+-- ======================================================================
+
+-- ----------------------------------------------------------------------
+-- Binary-quantized coarse index
+-- ----------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_unified_embeddings_embedding_bq_hnsw
+    ON krai_intelligence.unified_embeddings
+    USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops);
+
+-- ----------------------------------------------------------------------
+-- Column type conversion (vector <-> halfvec)
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.convert_embedding_storage(
+    target text DEFAULT 'halfvec'
+) RETURNS TABLE (
+    table_name text,
+    column_name text,
+    previous_type text,
+    converted boolean
+) AS $$
+#variable_conflict use_column
+DECLARE
+    entry record;
+    current_type text;
+    opclass text;
+BEGIN
+    IF target NOT IN ('vector', 'halfvec') THEN
+        RAISE EXCEPTION 'Unsupported embedding storage type: % (expected vector or halfvec)', target;
+    END IF;
+    opclass := target || '_cosine_ops';
+
+    FOR entry IN
+        SELECT * FROM (VALUES
+            ('krai_intelligence', 'chunks', 'embedding', 'chunks_embedding_hnsw_idx'),
+            ('krai_intelligence', 'unified_embeddings', 'embedding', 'idx_unified_embeddings_embedding_hnsw'),
+            ('krai_intelligence', 'structured_tables', 'table_embedding', 'idx_structured_tables_table_embedding_hnsw'),
+            ('krai_intelligence', 'structured_tables', 'context_embedding', 'idx_structured_tables_context_embedding_hnsw'),
+            ('krai_content', 'images', 'context_embedding', 'idx_images_context_embedding_hnsw'),
+            ('krai_content', 'videos', 'context_embedding', 'idx_videos_context_embedding_hnsw'),
+            ('krai_content', 'links', 'context_embedding', 'idx_links_context_embedding_hnsw')
+        ) AS registry(schema_name, table_name, column_name, index_name)
+    LOOP
+        SELECT t.typname INTO current_type
+        FROM pg_attribute a
+        JOIN pg_class cl ON cl.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = cl.relnamespace
+        JOIN pg_type t ON t.oid = a.atttypid
+        WHERE n.nspname = entry.schema_name
+          AND cl.relname = entry.table_name
+          AND a.attname = entry.column_name
+          AND NOT a.attisdropped;
+
+        IF current_type IS NULL THEN
+            CONTINUE;
+        END IF;
+
+        table_name := entry.schema_name || '.' || entry.table_name;
+        column_name := entry.column_name;
+        previous_type := current_type;
+        converted := current_type <> target;
+
+        IF converted THEN
+            EXECUTE format('DROP INDEX IF EXISTS %I.%I', entry.schema_name, entry.index_name);
+            IF entry.table_name = 'unified_embeddings' THEN
+                -- Expression index depends on the column type as well
+                EXECUTE format('DROP INDEX IF EXISTS %I.idx_unified_embeddings_embedding_bq_hnsw',
+                               entry.schema_name);
+            END IF;
+
+            EXECUTE format('ALTER TABLE %I.%I ALTER COLUMN %I TYPE %s(768) USING %I::%s(768)',
+                           entry.schema_name, entry.table_name, entry.column_name,
+                           target, entry.column_name, target);
+
+            EXECUTE format('CREATE INDEX %I ON %I.%I USING hnsw (%I %s)',
+                           entry.index_name, entry.schema_name, entry.table_name,
+                           entry.column_name, opclass);
+            IF entry.table_name = 'unified_embeddings' THEN
+                EXECUTE format('CREATE INDEX idx_unified_embeddings_embedding_bq_hnsw ON %I.%I '
+                               'USING hnsw ((binary_quantize(%I)::bit(768)) bit_hamming_ops)',
+                               entry.schema_name, entry.table_name, entry.column_name);
+            END IF;
+        END IF;
+
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION krai_intelligence.convert_embedding_storage(text) IS
+    'Convert all embedding columns and their HNSW indexes to vector(768) or halfvec(768); rewrites the tables';
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('035_quantized_embeddings', 'Binary-quantized HNSW index on unified_embeddings and vector/halfvec storage conversion function')
+ON CONFLICT (migration_name) DO NOTHING;
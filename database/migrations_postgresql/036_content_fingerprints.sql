@@ -0,0 +1,43 @@
+-- ======================================================================
+-- Migration 036: Content fingerprints for incremental reprocessing
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: Re-processing a revised manual regenerated every embedding
+--              even when only a few pages changed.
+--
+--              page_fingerprints records a content fingerprint per page
+--              (same format as chunks.fingerprint: SHA-256 of the
+--              whitespace/case-normalized text, 32 hex chars). The text
+--              stage diffs a new document against the latest earlier
+--              document with the same filename.
+--
+--              The embedding stage looks up stored embeddings by chunk
+--              fingerprint + text before calling the embedding model; the
+--              partial index below serves that lookup.
+-- ======================================================================
+
+CREATE TABLE IF NOT EXISTS krai_intelligence.page_fingerprints (
+    document_id uuid NOT NULL REFERENCES krai_core.documents(id) ON DELETE CASCADE,
+    page_number integer NOT NULL,
+    fingerprint character varying(64) NOT NULL,
+    created_at timestamp with time zone DEFAULT now(),
+    PRIMARY KEY (document_id, page_number)
+);
+
+COMMENT ON TABLE krai_intelligence.page_fingerprints IS
+    'Per-page content fingerprints used to diff document versions';
+
+CREATE INDEX IF NOT EXISTS idx_chunks_fingerprint_embedded
+    ON krai_intelligence.chunks (fingerprint)
+    WHERE embedding IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_documents_filename_created_at
+    ON krai_core.documents (filename, created_at DESC);
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('036_content_fingerprints', 'Page fingerprint table and chunk fingerprint index for incremental reprocessing')
+ON CONFLICT (migration_name) DO NOTHING;
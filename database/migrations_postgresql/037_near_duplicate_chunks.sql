@@ -0,0 +1,153 @@
+-- ======================================================================
+-- Migration 037: Cross-document near-duplicate chunks (MinHash/LSH)
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: Sibling manuals repeat safety notices, error-code tables
+--              and procedures with small edits. The embedding stage keeps
+--              a MinHash signature (128 x uint32) and 16 LSH band hashes
+--              per embedded chunk in chunk_minhash; a new chunk whose
+--              estimated Jaccard similarity to an indexed chunk reaches
+--              NEAR_DUPLICATE_THRESHOLD is stored with duplicate_of set and
+--              no embedding of its own (see
+--              backend/processors/near_duplicate_index.py).
+--
+--              References therefore never enter the HNSW index and cannot
+--              appear twice in vector results; hybrid_search_chunks also
+--              skips them in its full-text and exact-token lists. Deleting
+--              the canonical chunk clears duplicate_of, and the embedding
+--              stage embeds such chunks again on its next run.
+-- ======================================================================
+
+ALTER TABLE krai_intelligence.chunks
+    ADD COLUMN IF NOT EXISTS duplicate_of uuid
+    REFERENCES krai_intelligence.chunks(id) ON DELETE SET NULL;
+
+COMMENT ON COLUMN krai_intelligence.chunks.duplicate_of IS
+    'Embedded chunk this chunk is a near-duplicate of (no own embedding)';
+
+CREATE INDEX IF NOT EXISTS idx_chunks_duplicate_of
+    ON krai_intelligence.chunks (duplicate_of)
+    WHERE duplicate_of IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS krai_intelligence.chunk_minhash (
+    chunk_id uuid PRIMARY KEY REFERENCES krai_intelligence.chunks(id) ON DELETE CASCADE,
+    signature bigint[] NOT NULL,
+    bands bigint[] NOT NULL,
+    created_at timestamp with time zone DEFAULT now()
+);
+
+COMMENT ON TABLE krai_intelligence.chunk_minhash IS
+    'MinHash signatures and LSH band hashes of embedded chunks for near-duplicate lookup';
+
+-- Candidate lookup: bands && $1
+CREATE INDEX IF NOT EXISTS idx_chunk_minhash_bands
+    ON krai_intelligence.chunk_minhash USING gin (bands);
+
+-- ----------------------------------------------------------------------
+-- hybrid_search_chunks: skip near-duplicate references
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.hybrid_search_chunks(
+    query_text text,
+    query_embedding vector(768),
+    match_count int DEFAULT 10,
+    exact_token text DEFAULT NULL,
+    candidate_count int DEFAULT 50,
+    rrf_k int DEFAULT 60,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    page_start int,
+    page_end int,
+    similarity float,
+    fts_rank int,
+    vector_rank int,
+    exact_rank int,
+    score float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, candidate_count);
+
+    RETURN QUERY
+    WITH fts AS (
+        -- Expression must match idx_chunks_text_fts for the GIN index to apply
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY ts_rank_cd(to_tsvector('english'::regconfig, c.text_chunk), q.query) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c,
+             websearch_to_tsquery('english'::regconfig, query_text) q(query)
+        WHERE query_text IS NOT NULL
+          AND to_tsvector('english'::regconfig, c.text_chunk) @@ q.query
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    semantic AS (
+        SELECT ranked.id, row_number() OVER (ORDER BY ranked.distance, ranked.id)::int AS rank
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE query_embedding IS NOT NULL
+              AND c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) ranked
+    ),
+    exact AS (
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY word_similarity(exact_token, c.text_chunk) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c
+        WHERE exact_token IS NOT NULL
+          AND c.text_chunk ILIKE '%' || exact_token || '%'
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    fused AS (
+        SELECT COALESCE(f.id, s.id, e.id) AS id,
+               f.rank AS fts_rank,
+               s.rank AS vector_rank,
+               e.rank AS exact_rank,
+               COALESCE(1.0 / (rrf_k + f.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + s.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + e.rank), 0) AS score
+        FROM fts f
+        FULL OUTER JOIN semantic s ON s.id = f.id
+        FULL OUTER JOIN exact e ON e.id = COALESCE(f.id, s.id)
+    )
+    SELECT c.id,
+           c.document_id,
+           c.text_chunk,
+           c.page_start,
+           c.page_end,
+           CASE
+               WHEN query_embedding IS NULL OR c.embedding IS NULL THEN NULL
+               ELSE 1 - (c.embedding <=> query_embedding)
+           END::float AS similarity,
+           fu.fts_rank,
+           fu.vector_rank,
+           fu.exact_rank,
+           fu.score::float
+    FROM fused fu
+    JOIN krai_intelligence.chunks c ON c.id = fu.id
+    ORDER BY fu.score DESC, c.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION krai_intelligence.hybrid_search_chunks(text, vector, int, text, int, int, int, text) IS
+    'Full-text + vector (+ exact token) chunk search fused with reciprocal rank fusion';
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('037_near_duplicate_chunks', 'MinHash/LSH index for cross-document near-duplicate chunks and chunks.duplicate_of references')
+ON CONFLICT (migration_name) DO NOTHING;
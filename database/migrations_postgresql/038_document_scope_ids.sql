@@ -0,0 +1,189 @@
+-- ======================================================================
+-- Migration 038: Resolve match-function scope filters once per query
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: 034 filtered every HNSW candidate through
+--              document_in_scope(), whose EXISTS sublinks on documents /
+--              document_products keep the SQL function from being inlined:
+--              a manufacturer or product filter cost one function call and
+--              up to two index probes per candidate row, and iterative
+--              scans visit many more candidates than they return.
+--
+--              document_scope() now resolves the document / manufacturer /
+--              product filters to the set of matching document ids once per
+--              call (NULL when no filter is given). The match functions keep
+--              it in a variable and test
+--                scope_ids IS NULL OR document_id = ANY(scope_ids)
+--              during the index scan, which is a plain array lookup.
+--              An empty set (filter matches no document) returns no rows.
+-- ======================================================================
+
+CREATE OR REPLACE FUNCTION krai_intelligence.document_scope(
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL
+) RETURNS uuid[] AS $$
+    SELECT CASE
+        WHEN filter_document_id IS NULL
+             AND filter_manufacturer_id IS NULL
+             AND filter_product_id IS NULL THEN NULL
+        ELSE COALESCE((
+            SELECT array_agg(d.id)
+            FROM krai_core.documents d
+            WHERE (filter_document_id IS NULL OR d.id = filter_document_id)
+              AND (filter_manufacturer_id IS NULL OR d.manufacturer_id = filter_manufacturer_id)
+              AND (filter_product_id IS NULL OR EXISTS (
+                      SELECT 1 FROM krai_core.document_products dp
+                      WHERE dp.document_id = d.id AND dp.product_id = filter_product_id))
+        ), '{}'::uuid[])
+    END
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION krai_intelligence.document_scope(uuid, uuid, uuid) IS
+    'Document ids matching the match-function scope filters (NULL = unscoped)';
+
+-- ----------------------------------------------------------------------
+-- match_chunks
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.match_chunks(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    chunk_text text,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+DECLARE
+    scope_ids uuid[];
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+    scope_ids := krai_intelligence.document_scope(filter_document_id, filter_manufacturer_id, filter_product_id);
+
+    RETURN QUERY
+    SELECT nn.id, nn.document_id, nn.text_chunk, nn.page_start, (1 - nn.distance)::float
+    FROM (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start,
+               c.embedding <=> query_embedding AS distance
+        FROM krai_intelligence.chunks c
+        WHERE c.embedding IS NOT NULL
+          AND (scope_ids IS NULL OR c.document_id = ANY(scope_ids))
+        ORDER BY c.embedding <=> query_embedding
+        LIMIT match_count
+    ) nn
+    WHERE 1 - nn.distance > match_threshold
+    ORDER BY nn.distance;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------
+-- match_multimodal
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.match_multimodal(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    source_id uuid,
+    source_type text,
+    content text,
+    document_id uuid,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+DECLARE
+    scope_ids uuid[];
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+    scope_ids := krai_intelligence.document_scope(filter_document_id, filter_manufacturer_id, filter_product_id);
+
+    RETURN QUERY
+    WITH candidates AS (
+        (
+            SELECT c.id AS source_id, 'chunk'::text AS source_type, c.text_chunk AS content,
+                   c.document_id, c.page_start AS page_number,
+                   c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE c.embedding IS NOT NULL
+              AND (scope_ids IS NULL OR c.document_id = ANY(scope_ids))
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT i.id, 'image'::text, COALESCE(i.ai_description, i.figure_context, ''),
+                   i.document_id, i.page_number,
+                   i.context_embedding <=> query_embedding
+            FROM krai_content.images i
+            WHERE i.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR i.document_id = ANY(scope_ids))
+            ORDER BY i.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT v.id, 'video'::text, COALESCE(v.description, v.title, ''),
+                   v.document_id, v.page_number,
+                   v.context_embedding <=> query_embedding
+            FROM krai_content.videos v
+            WHERE v.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR v.document_id = ANY(scope_ids))
+            ORDER BY v.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT l.id, 'link'::text, COALESCE(l.description, l.url, ''),
+                   l.document_id, l.page_number,
+                   l.context_embedding <=> query_embedding
+            FROM krai_content.links l
+            WHERE l.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR l.document_id = ANY(scope_ids))
+            ORDER BY l.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT t.id, 'table'::text, COALESCE(t.table_markdown, ''),
+                   t.document_id, t.page_number,
+                   t.table_embedding <=> query_embedding
+            FROM krai_intelligence.structured_tables t
+            WHERE t.table_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR t.document_id = ANY(scope_ids))
+            ORDER BY t.table_embedding <=> query_embedding
+            LIMIT match_count
+        )
+    )
+    SELECT cd.source_id, cd.source_type, cd.content, cd.document_id, cd.page_number,
+           (1 - cd.distance)::float
+    FROM candidates cd
+    WHERE 1 - cd.distance > match_threshold
+    ORDER BY cd.distance
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- No longer referenced by the match functions
+DROP FUNCTION IF EXISTS krai_intelligence.document_in_scope(uuid, uuid, uuid, uuid);
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('038_document_scope_ids', 'Resolve match-function scope filters to a document-id set once per query instead of per candidate')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,303 @@
+-- ======================================================================
+-- Migration 039: Resolve near-duplicate references in chunk search
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: A near-duplicate chunk (037) has no embedding of its own and
+--              was skipped by the lexical lists, so it could never be
+--              returned: a search scoped to its document (or manufacturer /
+--              product) missed the passage whenever the canonical copy sat
+--              in another manual, and unscoped results only named the
+--              manual that happened to be embedded first.
+--
+--              The chunk searches now match canonical chunks as before and
+--              then expand each hit to the references pointing at it
+--              (idx_chunks_duplicate_of). References inherit the canonical's
+--              distance / fusion score and are listed right after it. With
+--              a scope, the index scan also accepts a canonical outside the
+--              scope when one of its references is inside it, and the scope
+--              is applied to the expanded rows.
+-- ======================================================================
+
+-- ----------------------------------------------------------------------
+-- match_chunks
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.match_chunks(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    chunk_text text,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+DECLARE
+    scope_ids uuid[];
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+    scope_ids := krai_intelligence.document_scope(filter_document_id, filter_manufacturer_id, filter_product_id);
+
+    RETURN QUERY
+    WITH nn AS (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start,
+               c.embedding <=> query_embedding AS distance
+        FROM krai_intelligence.chunks c
+        WHERE c.embedding IS NOT NULL
+          AND (scope_ids IS NULL
+               OR c.document_id = ANY(scope_ids)
+               OR EXISTS (
+                   SELECT 1 FROM krai_intelligence.chunks r
+                   WHERE r.duplicate_of = c.id AND r.document_id = ANY(scope_ids)))
+        ORDER BY c.embedding <=> query_embedding
+        LIMIT match_count
+    )
+    SELECT hit.id, hit.document_id, hit.text_chunk, hit.page_start, (1 - nn.distance)::float
+    FROM nn
+    CROSS JOIN LATERAL (
+        SELECT nn.id, nn.document_id, nn.text_chunk, nn.page_start, 0 AS copy_order
+        UNION ALL
+        SELECT r.id, r.document_id, r.text_chunk, r.page_start, 1
+        FROM krai_intelligence.chunks r
+        WHERE r.duplicate_of = nn.id
+    ) hit
+    WHERE 1 - nn.distance > match_threshold
+      AND (scope_ids IS NULL OR hit.document_id = ANY(scope_ids))
+    ORDER BY nn.distance, nn.id, hit.copy_order, hit.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------
+-- match_multimodal: chunk branch expanded the same way
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.match_multimodal(
+    query_embedding vector(768),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 10,
+    filter_document_id uuid DEFAULT NULL,
+    filter_manufacturer_id uuid DEFAULT NULL,
+    filter_product_id uuid DEFAULT NULL,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    source_id uuid,
+    source_type text,
+    content text,
+    document_id uuid,
+    page_number int,
+    similarity float
+) AS $$
+#variable_conflict use_column
+DECLARE
+    scope_ids uuid[];
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, match_count);
+    scope_ids := krai_intelligence.document_scope(filter_document_id, filter_manufacturer_id, filter_product_id);
+
+    RETURN QUERY
+    WITH chunk_nn AS (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start,
+               c.embedding <=> query_embedding AS distance
+        FROM krai_intelligence.chunks c
+        WHERE c.embedding IS NOT NULL
+          AND (scope_ids IS NULL
+               OR c.document_id = ANY(scope_ids)
+               OR EXISTS (
+                   SELECT 1 FROM krai_intelligence.chunks r
+                   WHERE r.duplicate_of = c.id AND r.document_id = ANY(scope_ids)))
+        ORDER BY c.embedding <=> query_embedding
+        LIMIT match_count
+    ),
+    candidates AS (
+        (
+            SELECT hit.id AS source_id, 'chunk'::text AS source_type, hit.text_chunk AS content,
+                   hit.document_id, hit.page_start AS page_number, nn.distance
+            FROM chunk_nn nn
+            CROSS JOIN LATERAL (
+                SELECT nn.id, nn.document_id, nn.text_chunk, nn.page_start
+                UNION ALL
+                SELECT r.id, r.document_id, r.text_chunk, r.page_start
+                FROM krai_intelligence.chunks r
+                WHERE r.duplicate_of = nn.id
+            ) hit
+            WHERE scope_ids IS NULL OR hit.document_id = ANY(scope_ids)
+        )
+        UNION ALL
+        (
+            SELECT i.id, 'image'::text, COALESCE(i.ai_description, i.figure_context, ''),
+                   i.document_id, i.page_number,
+                   i.context_embedding <=> query_embedding
+            FROM krai_content.images i
+            WHERE i.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR i.document_id = ANY(scope_ids))
+            ORDER BY i.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT v.id, 'video'::text, COALESCE(v.description, v.title, ''),
+                   v.document_id, v.page_number,
+                   v.context_embedding <=> query_embedding
+            FROM krai_content.videos v
+            WHERE v.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR v.document_id = ANY(scope_ids))
+            ORDER BY v.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT l.id, 'link'::text, COALESCE(l.description, l.url, ''),
+                   l.document_id, l.page_number,
+                   l.context_embedding <=> query_embedding
+            FROM krai_content.links l
+            WHERE l.context_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR l.document_id = ANY(scope_ids))
+            ORDER BY l.context_embedding <=> query_embedding
+            LIMIT match_count
+        )
+        UNION ALL
+        (
+            SELECT t.id, 'table'::text, COALESCE(t.table_markdown, ''),
+                   t.document_id, t.page_number,
+                   t.table_embedding <=> query_embedding
+            FROM krai_intelligence.structured_tables t
+            WHERE t.table_embedding IS NOT NULL
+              AND (scope_ids IS NULL OR t.document_id = ANY(scope_ids))
+            ORDER BY t.table_embedding <=> query_embedding
+            LIMIT match_count
+        )
+    )
+    SELECT cd.source_id, cd.source_type, cd.content, cd.document_id, cd.page_number,
+           (1 - cd.distance)::float
+    FROM candidates cd
+    WHERE 1 - cd.distance > match_threshold
+    ORDER BY cd.distance
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------
+-- hybrid_search_chunks: fuse canonical chunks, then list their references
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.hybrid_search_chunks(
+    query_text text,
+    query_embedding vector(768),
+    match_count int DEFAULT 10,
+    exact_token text DEFAULT NULL,
+    candidate_count int DEFAULT 50,
+    rrf_k int DEFAULT 60,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    page_start int,
+    page_end int,
+    similarity float,
+    fts_rank int,
+    vector_rank int,
+    exact_rank int,
+    score float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, candidate_count);
+
+    RETURN QUERY
+    WITH fts AS (
+        -- Expression must match idx_chunks_text_fts for the GIN index to apply
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY ts_rank_cd(to_tsvector('english'::regconfig, c.text_chunk), q.query) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c,
+             websearch_to_tsquery('english'::regconfig, query_text) q(query)
+        WHERE query_text IS NOT NULL
+          AND to_tsvector('english'::regconfig, c.text_chunk) @@ q.query
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    semantic AS (
+        SELECT ranked.id, row_number() OVER (ORDER BY ranked.distance, ranked.id)::int AS rank
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE query_embedding IS NOT NULL
+              AND c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) ranked
+    ),
+    exact AS (
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY word_similarity(exact_token, c.text_chunk) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c
+        WHERE exact_token IS NOT NULL
+          AND c.text_chunk ILIKE '%' || exact_token || '%'
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    fused AS (
+        SELECT COALESCE(f.id, s.id, e.id) AS id,
+               f.rank AS fts_rank,
+               s.rank AS vector_rank,
+               e.rank AS exact_rank,
+               COALESCE(1.0 / (rrf_k + f.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + s.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + e.rank), 0) AS score
+        FROM fts f
+        FULL OUTER JOIN semantic s ON s.id = f.id
+        FULL OUTER JOIN exact e ON e.id = COALESCE(f.id, s.id)
+    ),
+    top AS (
+        SELECT fu.*
+        FROM fused fu
+        ORDER BY fu.score DESC, fu.id
+        LIMIT match_count
+    )
+    SELECT hit.id,
+           hit.document_id,
+           hit.text_chunk,
+           hit.page_start,
+           hit.page_end,
+           CASE
+               WHEN query_embedding IS NULL OR c.embedding IS NULL THEN NULL
+               ELSE 1 - (c.embedding <=> query_embedding)
+           END::float AS similarity,
+           fu.fts_rank,
+           fu.vector_rank,
+           fu.exact_rank,
+           fu.score::float
+    FROM top fu
+    JOIN krai_intelligence.chunks c ON c.id = fu.id
+    CROSS JOIN LATERAL (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start, c.page_end, 0 AS copy_order
+        UNION ALL
+        SELECT r.id, r.document_id, r.text_chunk, r.page_start, r.page_end, 1
+        FROM krai_intelligence.chunks r
+        WHERE r.duplicate_of = c.id
+    ) hit
+    ORDER BY fu.score DESC, fu.id, hit.copy_order, hit.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('039_resolve_near_duplicate_references', 'Expand chunk search hits to their near-duplicate references and apply scope filters to the references')
+ON CONFLICT (migration_name) DO NOTHING;
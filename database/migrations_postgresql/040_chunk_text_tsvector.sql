@@ -0,0 +1,152 @@
+-- ======================================================================
+-- Migration 040: Stored tsvector for chunk full-text search
+-- ======================================================================
+-- Created: 2026-10-18
+-- Description: The fts list of hybrid_search_chunks (033/034/037/039)
+--              matched through the expression index idx_chunks_text_fts but
+--              then computed ts_rank_cd(to_tsvector(text_chunk), ...) for
+--              every matching row before the LIMIT, i.e. re-parsed the full
+--              text of each match; for common terms that is most of the
+--              table on every query.
+--
+--              chunks.text_tsv stores to_tsvector('english', text_chunk) as a
+--              generated column (kept in sync by PostgreSQL on insert and
+--              update) with its own GIN index, and the fts list matches and
+--              ranks that column. Ranking a stored tsvector only reads the
+--              lexeme positions. Adding the column rewrites the chunks table
+--              once; the old expression index is dropped afterwards.
+-- ======================================================================
+
+ALTER TABLE krai_intelligence.chunks
+    ADD COLUMN IF NOT EXISTS text_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english'::regconfig, text_chunk)) STORED;
+
+COMMENT ON COLUMN krai_intelligence.chunks.text_tsv IS
+    'to_tsvector(''english'', text_chunk), used by hybrid_search_chunks';
+
+CREATE INDEX IF NOT EXISTS idx_chunks_text_tsv
+    ON krai_intelligence.chunks USING gin (text_tsv);
+
+DROP INDEX IF EXISTS krai_intelligence.idx_chunks_text_fts;
+
+-- ----------------------------------------------------------------------
+-- hybrid_search_chunks: fts list on the stored tsvector
+-- ----------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION krai_intelligence.hybrid_search_chunks(
+    query_text text,
+    query_embedding vector(768),
+    match_count int DEFAULT 10,
+    exact_token text DEFAULT NULL,
+    candidate_count int DEFAULT 50,
+    rrf_k int DEFAULT 60,
+    ef_search int DEFAULT NULL,
+    iterative_scan text DEFAULT NULL
+) RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    page_start int,
+    page_end int,
+    similarity float,
+    fts_rank int,
+    vector_rank int,
+    exact_rank int,
+    score float
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM krai_intelligence.apply_hnsw_settings(ef_search, iterative_scan, candidate_count);
+
+    RETURN QUERY
+    WITH fts AS (
+        -- Ranks the stored tsvector; nothing is re-parsed per matching row
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY ts_rank_cd(c.text_tsv, q.query) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c,
+             websearch_to_tsquery('english'::regconfig, query_text) q(query)
+        WHERE query_text IS NOT NULL
+          AND c.text_tsv @@ q.query
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    semantic AS (
+        SELECT ranked.id, row_number() OVER (ORDER BY ranked.distance, ranked.id)::int AS rank
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM krai_intelligence.chunks c
+            WHERE query_embedding IS NOT NULL
+              AND c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT candidate_count
+        ) ranked
+    ),
+    exact AS (
+        SELECT c.id,
+               row_number() OVER (
+                   ORDER BY word_similarity(exact_token, c.text_chunk) DESC, c.id
+               )::int AS rank
+        FROM krai_intelligence.chunks c
+        WHERE exact_token IS NOT NULL
+          AND c.text_chunk ILIKE '%' || exact_token || '%'
+          AND c.duplicate_of IS NULL
+        ORDER BY rank
+        LIMIT candidate_count
+    ),
+    fused AS (
+        SELECT COALESCE(f.id, s.id, e.id) AS id,
+               f.rank AS fts_rank,
+               s.rank AS vector_rank,
+               e.rank AS exact_rank,
+               COALESCE(1.0 / (rrf_k + f.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + s.rank), 0)
+                 + COALESCE(1.0 / (rrf_k + e.rank), 0) AS score
+        FROM fts f
+        FULL OUTER JOIN semantic s ON s.id = f.id
+        FULL OUTER JOIN exact e ON e.id = COALESCE(f.id, s.id)
+    ),
+    top AS (
+        SELECT fu.*
+        FROM fused fu
+        ORDER BY fu.score DESC, fu.id
+        LIMIT match_count
+    )
+    SELECT hit.id,
+           hit.document_id,
+           hit.text_chunk,
+           hit.page_start,
+           hit.page_end,
+           CASE
+               WHEN query_embedding IS NULL OR c.embedding IS NULL THEN NULL
+               ELSE 1 - (c.embedding <=> query_embedding)
+           END::float AS similarity,
+           fu.fts_rank,
+           fu.vector_rank,
+           fu.exact_rank,
+           fu.score::float
+    FROM top fu
+    JOIN krai_intelligence.chunks c ON c.id = fu.id
+    CROSS JOIN LATERAL (
+        SELECT c.id, c.document_id, c.text_chunk, c.page_start, c.page_end, 0 AS copy_order
+        UNION ALL
+        SELECT r.id, r.document_id, r.text_chunk, r.page_start, r.page_end, 1
+        FROM krai_intelligence.chunks r
+        WHERE r.duplicate_of = c.id
+    ) hit
+    ORDER BY fu.score DESC, fu.id, hit.copy_order, hit.id
+    LIMIT match_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION krai_intelligence.hybrid_search_chunks(text, vector, int, text, int, int, int, text) IS
+    'Full-text + vector (+ exact token) chunk search fused with reciprocal rank fusion';
+
+-- ======================================================================
+-- LOGGING
+-- ======================================================================
+
+INSERT INTO krai_system.migrations (migration_name, description)
+VALUES ('040_chunk_text_tsvector', 'Stored tsvector column and GIN index for hybrid_search_chunks full-text ranking')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,254 @@
+"""
+Offline relevance and latency benchmark for hybrid (lexical + vector) search
+
+Builds a synthetic service-manual corpus, then compares lexical-only,
+vector-only and hybrid retrieval (reciprocal rank fusion, exactly as
+krai_intelligence.hybrid_search_chunks() fuses) on two query sets:
+
+  - code queries:    "what does error C-2801 mean" -> chunks documenting C-2801
+  - concept queries: paraphrases that share no words with the chunk text
+
+The synthetic embeddings mimic a real embedding model's weakness: they know
+the topic of a chunk but not the exact identifier in it, so neighbouring
+codes (C-2801 / C-2810) are indistinguishable. No database or model is
+needed; lexical ranking uses BM25 as a stand-in for ts_rank_cd. Latencies
+are for these in-process stand-ins and only meaningful relative to each other.
+
+Usage:
+    python scripts/benchmark_hybrid_search.py
+    python scripts/benchmark_hybrid_search.py --chunks 20000 --queries 300 --k 10
+    python scripts/benchmark_hybrid_search.py --json results.json
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "backend"))
+
+from services.multimodal_search_service import (  # noqa: E402
+    RRF_K,
+    extract_exact_token,
+    reciprocal_rank_fusion,
+)
+
+# topic -> (manual vocabulary, user paraphrase vocabulary, code prefix)
+TOPICS = {
+    "fuser": (["fuser", "heating", "roller", "thermistor", "temperature"], ["toner", "smears", "hot", "melting"], "C-28"),
+    "tray": (["tray", "pickup", "feed", "separation", "pad"], ["paper", "drawer", "grabs", "sheets"], "13.A"),
+    "scanner": (["scanner", "carriage", "lamp", "optics", "ccd"], ["copies", "dark", "streaks", "glass"], "SC5"),
+    "network": (["network", "ethernet", "dhcp", "address", "interface"], ["offline", "cannot", "connect", "wifi"], "E-7"),
+    "drum": (["drum", "photoconductor", "charge", "transfer", "belt"], ["faded", "blank", "ghosting", "spots"], "C-44"),
+    "duplex": (["duplex", "reversing", "unit", "solenoid", "path"], ["double", "sided", "flip", "backside"], "13.B"),
+}
+FILLER = ["check", "replace", "the", "unit", "procedure", "step", "service", "manual", "remove", "install", "verify"]
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def build_corpus(n_chunks: int, rng: random.Random) -> Tuple[List[str], List[str], List[str]]:
+    """Return chunk texts with their topic and documented error code."""
+    texts, topics, codes = [], [], []
+    names = list(TOPICS)
+    for _ in range(n_chunks):
+        topic = rng.choice(names)
+        vocab, _, prefix = TOPICS[topic]
+        code = f"{prefix}{rng.randint(0, 99):02d}"
+        words = rng.sample(vocab, 3) + rng.sample(FILLER, 5)
+        rng.shuffle(words)
+        texts.append(f"Error {code}: " + " ".join(words))
+        topics.append(topic)
+        codes.append(code)
+    return texts, topics, codes
+
+
+class SyntheticEmbedder:
+    """Topic-aware, identifier-blind embeddings."""
+
+    def __init__(self, dim: int, rng: random.Random):
+        seed = rng.randint(0, 2**31)
+        gen = np.random.default_rng(seed)
+        self.dim = dim
+        self.centroids = {topic: gen.normal(size=dim) for topic in TOPICS}
+        self.gen = gen
+
+    def embed(self, topic: str, noise: float = 0.6) -> np.ndarray:
+        vector = self.centroids[topic] + self.gen.normal(scale=noise, size=self.dim)
+        return vector / np.linalg.norm(vector)
+
+
+class LexicalIndex:
+    """BM25 over an inverted index (stand-in for the tsvector GIN index)."""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths = []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_id, tf))
+        self.avg_length = sum(self.lengths) / max(len(self.lengths), 1)
+        self.n = len(texts)
+        self.k1, self.b = k1, b
+
+    def search(self, query: str, limit: int) -> List[int]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (self.n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = 1 - self.b + self.b * self.lengths[doc_id] / self.avg_length
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))[:limit]
+
+
+def vector_search(matrix: np.ndarray, query: np.ndarray, limit: int) -> List[int]:
+    scores = matrix @ query
+    top = np.argpartition(-scores, min(limit, len(scores) - 1))[:limit]
+    return sorted(top.tolist(), key=lambda doc_id: (-scores[doc_id], doc_id))
+
+
+def exact_search(texts: Sequence[str], token: str, limit: int) -> List[int]:
+    needle = token.lower()
+    return [doc_id for doc_id, text in enumerate(texts) if needle in text.lower()][:limit]
+
+
+def build_queries(texts, topics, codes, n_queries: int, rng: random.Random):
+    """Half code lookups, half identifier-free paraphrases."""
+    by_code = defaultdict(set)
+    by_topic = defaultdict(set)
+    for doc_id, (topic, code) in enumerate(zip(topics, codes)):
+        by_code[code].add(doc_id)
+        by_topic[topic].add(doc_id)
+    queries = []
+    for i in range(n_queries):
+        doc_id = rng.randrange(len(texts))
+        topic = topics[doc_id]
+        if i % 2 == 0:
+            code = codes[doc_id]
+            text = f"what does error {code} mean on the {TOPICS[topic][0][0]}"
+            queries.append({"kind": "code", "text": text, "topic": topic, "relevant": by_code[code]})
+        else:
+            text = "my printer " + " ".join(rng.sample(TOPICS[topic][1], 3))
+            queries.append({"kind": "concept", "text": text, "topic": topic, "relevant": by_topic[topic]})
+    return queries
+
+
+def evaluate(
+    queries: List[dict],
+    search: Callable[[dict], List[int]],
+    k: int,
+) -> Dict[str, Dict[str, float]]:
+    """Recall@k, MRR and latency percentiles per query kind."""
+    per_kind: Dict[str, Dict[str, list]] = defaultdict(lambda: defaultdict(list))
+    for query in queries:
+        start = time.perf_counter()
+        ranked = search(query)[:k]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        relevant = query["relevant"]
+        hits = sum(1 for doc_id in ranked if doc_id in relevant)
+        first = next((rank for rank, doc_id in enumerate(ranked, 1) if doc_id in relevant), None)
+        stats = per_kind[query["kind"]]
+        stats["recall"].append(hits / min(len(relevant), k))
+        stats["mrr"].append(1 / first if first else 0.0)
+        stats["latency"].append(elapsed_ms)
+
+    report = {}
+    for kind, stats in sorted(per_kind.items()):
+        latency = sorted(stats["latency"])
+        report[kind] = {
+            f"recall@{k}": round(statistics.mean(stats["recall"]), 3),
+            "mrr": round(statistics.mean(stats["mrr"]), 3),
+            "p50_ms": round(latency[len(latency) // 2], 3),
+            "p95_ms": round(latency[min(len(latency) - 1, int(len(latency) * 0.95))], 3),
+        }
+    return report
+
+
+def run_benchmark(
+    n_chunks: int = 5000,
+    n_queries: int = 200,
+    k: int = 10,
+    candidates: int = 50,
+    seed: int = 42,
+    dim: int = 64,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    rng = random.Random(seed)
+    texts, topics, codes = build_corpus(n_chunks, rng)
+    embedder = SyntheticEmbedder(dim, rng)
+    matrix = np.vstack([embedder.embed(topic) for topic in topics])
+    lexical = LexicalIndex(texts)
+    queries = build_queries(texts, topics, codes, n_queries, rng)
+    for query in queries:
+        query["embedding"] = embedder.embed(query["topic"], noise=0.3)
+
+    def lexical_only(query):
+        return lexical.search(query["text"], candidates)
+
+    def vector_only(query):
+        return vector_search(matrix, query["embedding"], candidates)
+
+    def hybrid(query):
+        rankings = [lexical_only(query), vector_only(query)]
+        token = extract_exact_token(query["text"])
+        if token:
+            rankings.append(exact_search(texts, token, candidates))
+        return [doc_id for doc_id, _ in reciprocal_rank_fusion(rankings, k=RRF_K, limit=k)]
+
+    return {
+        "lexical": evaluate(queries, lexical_only, k),
+        "vector": evaluate(queries, vector_only, k),
+        "hybrid": evaluate(queries, hybrid, k),
+    }
+
+
+def print_report(report: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    kinds = sorted({kind for methods in report.values() for kind in methods})
+    for kind in kinds:
+        print(f"\n{kind} queries")
+        header = None
+        for method, per_kind in report.items():
+            row = per_kind[kind]
+            if header is None:
+                header = list(row)
+                print(f"  {'method':<10}" + "".join(f"{name:>12}" for name in header))
+            print(f"  {method:<10}" + "".join(f"{row[name]:>12}" for name in header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline hybrid search benchmark")
+    parser.add_argument("--chunks", type=int, default=5000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Cutoff for recall / MRR")
+    parser.add_argument("--candidates", type=int, default=50, help="Candidates per ranked list")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.chunks, args.queries, args.k, args.candidates, args.seed)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Offline recall-versus-size benchmark for embedding storage formats
+
+Compares the storage tiers of migration 035 on synthetic clustered
+embeddings (768 dimensions by default):
+
+  vector            float32, 3072 bytes per vector (ground truth)
+  halfvec           float16, 1536 bytes per vector
+  binary            binary_quantize() sign bits, 96 bytes, Hamming distance
+  binary+rescore    binary first pass for k * factor candidates, re-ranked by
+                    cosine distance on the stored (float32 or float16) vector,
+                    as PostgreSQLAdapter.search_embeddings(rescore_factor=...)
+
+Reports bytes per vector, total size, recall@k against the exact float32
+search and per-query latency. Sizes are raw vector payloads; HNSW graph
+overhead comes on top and is the same for every tier. No database needed.
+
+Usage:
+    python scripts/benchmark_quantized_embeddings.py
+    python scripts/benchmark_quantized_embeddings.py --vectors 200000 --queries 200 --k 10
+    python scripts/benchmark_quantized_embeddings.py --factors 4 16 32 --json results.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def generate(n_vectors: int, n_queries: int, dim: int, clusters: int, seed: int):
+    """Unit vectors around random topic centroids, queries from the same topics."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(count: int, noise: float) -> np.ndarray:
+        labels = rng.integers(0, clusters, size=count)
+        vectors = centroids[labels] + rng.normal(scale=noise, size=(count, dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(n_vectors, 1.0), sample(n_queries, 1.0)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return len(set(found.tolist()) & set(truth.tolist())) / len(truth)
+
+
+def evaluate(
+    queries: np.ndarray,
+    truth: List[np.ndarray],
+    search: Callable[[np.ndarray], np.ndarray],
+) -> Dict[str, float]:
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall(found, expected))
+    latencies.sort()
+    return {
+        "recall": round(statistics.mean(recalls), 4),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+    }
+
+
+def run_benchmark(
+    n_vectors: int = 100_000,
+    n_queries: int = 100,
+    dim: int = 768,
+    k: int = 10,
+    factors: Optional[List[int]] = None,
+    clusters: int = 64,
+    seed: int = 7,
+) -> Dict[str, Dict[str, float]]:
+    factors = factors or [2, 4, 8, 16]
+    full, queries = generate(n_vectors, n_queries, dim, clusters, seed)
+    half = full.astype(np.float16)
+    # Values a halfvec column holds, widened once for the matrix product
+    half_values = half.astype(np.float32)
+    # binary_quantize(): bit set for every positive component
+    bits = np.packbits(full > 0, axis=1)
+    popcount = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+    truth = [top_k(full @ query, k) for query in queries]
+
+    def hamming_candidates(query: np.ndarray, count: int) -> np.ndarray:
+        query_bits = np.packbits(query > 0)
+        distances = popcount[np.bitwise_xor(bits, query_bits)].sum(axis=1)
+        return top_k(-distances.astype(np.float32), count)
+
+    def rescored(stored: np.ndarray, factor: int) -> Callable[[np.ndarray], np.ndarray]:
+        def search(query: np.ndarray) -> np.ndarray:
+            candidates = hamming_candidates(query, k * factor)
+            scores = stored[candidates] @ query
+            return candidates[top_k(scores, k)]
+        return search
+
+    def row(bytes_per_vector: int, metrics: Dict[str, float]) -> Dict[str, float]:
+        return {
+            "bytes/vector": bytes_per_vector,
+            "total_mb": round(bytes_per_vector * n_vectors / 1024 ** 2, 1),
+            f"recall@{k}": metrics["recall"],
+            "p50_ms": metrics["p50_ms"],
+            "p95_ms": metrics["p95_ms"],
+        }
+
+    report = {
+        "vector": row(full.itemsize * dim, evaluate(queries, truth, lambda q: top_k(full @ q, k))),
+        "halfvec": row(
+            half.itemsize * dim,
+            evaluate(queries, truth, lambda q: top_k(half_values @ q, k)),
+        ),
+        "binary": row(bits.shape[1], evaluate(queries, truth, lambda q: hamming_candidates(q, k))),
+    }
+    for factor in factors:
+        # The rescore reads the stored vector, so the index is extra on top of it
+        report[f"binary+rescore x{factor} (halfvec)"] = row(
+            bits.shape[1] + half.itemsize * dim, evaluate(queries, truth, rescored(half_values, factor))
+        )
+    return report
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    header = list(next(iter(report.values())))
+    width = max(len(name) for name in report) + 2
+    print(f"{'tier':<{width}}" + "".join(f"{name:>14}" for name in header))
+    for name, row in report.items():
+        print(f"{name:<{width}}" + "".join(f"{row[column]:>14}" for column in header))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Recall vs. size of vector / halfvec / binary embeddings")
+    parser.add_argument("--vectors", type=int, default=100_000, help="Stored vectors")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", type=int, nargs="+", default=[2, 4, 8, 16], help="Rescore factors")
+    parser.add_argument("--clusters", type=int, default=64, help="Synthetic topic clusters")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.vectors, args.queries, args.dim, args.k, args.factors, args.clusters, args.seed)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
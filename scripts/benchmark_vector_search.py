@@ -0,0 +1,231 @@
+"""
+EXPLAIN / latency benchmark for the vector match function query shapes
+
+Generates a table of random vectors (1M x 768 by default) in a scratch
+schema, builds an HNSW index like the production ones, and compares:
+
+  threshold_first   the pre-034 match_multimodal shape: similarity threshold
+                    in WHERE, ORDER BY the computed similarity
+  index_first       the 034 shape: ORDER BY embedding <=> q LIMIT k from the
+                    index, threshold applied to those k rows
+  filtered          index_first plus a selective document filter, with
+                    hnsw.iterative_scan off and relaxed_order
+
+For every shape the EXPLAIN (ANALYZE, BUFFERS) plan is printed along with
+p50/p95 latency, rows returned and recall@k against an exact scan.
+
+Requires a PostgreSQL server with pgvector (>= 0.8 for iterative scans).
+Uses POSTGRES_URL (or DATABASE_CONNECTION_URL / DATABASE_URL).
+
+Usage:
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --rows 100000 --runs 20
+    python scripts/benchmark_vector_search.py --reuse --keep --output plans.md
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.processors.env_loader import load_all_env_files  # noqa: E402
+load_all_env_files(PROJECT_ROOT)
+
+try:
+    import asyncpg
+except ImportError:
+    print("asyncpg required: pip install asyncpg")
+    sys.exit(1)
+
+
+SCHEMA = "krai_bench"
+TABLE = f"{SCHEMA}.vectors"
+
+QUERIES = {
+    "threshold_first": """
+        SELECT id FROM (
+            SELECT id, 1 - (embedding <=> $1::vector) AS similarity
+            FROM {table}
+            WHERE 1 - (embedding <=> $1::vector) > $2
+        ) m
+        ORDER BY similarity DESC
+        LIMIT $3
+    """,
+    "index_first": """
+        SELECT id FROM (
+            SELECT id, embedding <=> $1::vector AS distance
+            FROM {table}
+            ORDER BY embedding <=> $1::vector
+            LIMIT $3
+        ) nn
+        WHERE 1 - nn.distance > $2
+        ORDER BY nn.distance
+    """,
+    "filtered": """
+        SELECT id FROM (
+            SELECT id, embedding <=> $1::vector AS distance
+            FROM {table}
+            WHERE document_id = $4
+            ORDER BY embedding <=> $1::vector
+            LIMIT $3
+        ) nn
+        WHERE 1 - nn.distance > $2
+        ORDER BY nn.distance
+    """,
+}
+
+
+def random_vector(dim: int, rng: random.Random) -> str:
+    return "[" + ",".join(f"{rng.uniform(-1, 1):.5f}" for _ in range(dim)) + "]"
+
+
+async def generate(conn, rows: int, dim: int, documents: int, m: int, ef_construction: int) -> None:
+    print(f"Generating {rows:,} x {dim} vectors in {TABLE} ...")
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(
+        f"CREATE TABLE {TABLE} (id bigserial PRIMARY KEY, document_id int NOT NULL, embedding vector({dim}))"
+    )
+    batch = 50_000
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        size = min(batch, rows - offset)
+        # The correlated g reference forces one random vector per row
+        await conn.execute(
+            f"""
+            INSERT INTO {TABLE} (document_id, embedding)
+            SELECT g % $2,
+                   (SELECT array_agg(random() * 2 - 1 + g * 0) FROM generate_series(1, $3))::vector
+            FROM generate_series($1::bigint, $1::bigint + $4 - 1) g
+            """,
+            offset, documents, dim, size,
+        )
+        print(f"  {offset + size:,} rows ({time.perf_counter() - start:.0f}s)")
+
+    print(f"Building HNSW index (m={m}, ef_construction={ef_construction}) ...")
+    start = time.perf_counter()
+    await conn.execute("SET maintenance_work_mem = '2GB'")
+    await conn.execute(
+        f"CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = {m}, ef_construction = {ef_construction})"
+    )
+    await conn.execute(f"CREATE INDEX ON {TABLE} (document_id)")
+    await conn.execute(f"ANALYZE {TABLE}")
+    print(f"  done in {time.perf_counter() - start:.0f}s")
+
+
+async def run_query(conn, sql: str, params: list, settings: Dict[str, str], explain: bool = False):
+    async with conn.transaction():
+        for name, value in settings.items():
+            await conn.execute("SELECT set_config($1, $2, true)", name, value)
+        if explain:
+            rows = await conn.fetch("EXPLAIN (ANALYZE, BUFFERS) " + sql, *params)
+            return "\n".join(row[0] for row in rows)
+        return [row["id"] for row in await conn.fetch(sql, *params)]
+
+
+async def benchmark(args) -> str:
+    postgres_url = (
+        os.getenv("POSTGRES_URL")
+        or os.getenv("DATABASE_CONNECTION_URL")
+        or os.getenv("DATABASE_URL")
+    )
+    if not postgres_url:
+        print("POSTGRES_URL (or DATABASE_CONNECTION_URL / DATABASE_URL) not set.")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    conn = await asyncpg.connect(postgres_url)
+    report: List[str] = [f"# Vector search benchmark ({args.rows:,} x {args.dim})\n"]
+    try:
+        if not args.reuse:
+            await generate(conn, args.rows, args.dim, args.documents, args.m, args.ef_construction)
+
+        query_vectors = [random_vector(args.dim, rng) for _ in range(args.runs)]
+        document_ids = [rng.randrange(args.documents) for _ in range(args.runs)]
+        cases = [
+            ("threshold_first", {}),
+            ("index_first", {"hnsw.ef_search": str(args.ef_search)}),
+            ("filtered", {"hnsw.ef_search": str(args.ef_search), "hnsw.iterative_scan": "off"}),
+            ("filtered", {"hnsw.ef_search": str(args.ef_search), "hnsw.iterative_scan": "relaxed_order"}),
+        ]
+        exact_settings = {"enable_indexscan": "off"}
+
+        for name, settings in cases:
+            sql = QUERIES[name].format(table=TABLE)
+            label = name + "".join(f" {key}={value}" for key, value in settings.items())
+            print(f"\n== {label}")
+
+            latencies, returned, recalls = [], [], []
+            for vector, document_id in zip(query_vectors, document_ids):
+                params = [vector, args.threshold, args.k]
+                if name == "filtered":
+                    params.append(document_id)
+                start = time.perf_counter()
+                ids = await run_query(conn, sql, params, settings)
+                latencies.append((time.perf_counter() - start) * 1000)
+                returned.append(len(ids))
+                if args.recall:
+                    exact = await run_query(conn, sql, params, exact_settings)
+                    if exact:
+                        recalls.append(len(set(ids) & set(exact)) / len(exact))
+
+            params = [query_vectors[0], args.threshold, args.k]
+            if name == "filtered":
+                params.append(document_ids[0])
+            plan = await run_query(conn, sql, params, settings, explain=True)
+
+            latencies.sort()
+            summary = (
+                f"p50 {latencies[len(latencies) // 2]:.2f} ms, "
+                f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.2f} ms, "
+                f"rows/query {statistics.mean(returned):.1f}"
+            )
+            if recalls:
+                summary += f", recall@{args.k} {statistics.mean(recalls):.3f}"
+            print(summary)
+            print(plan)
+            report += [f"## {label}\n", summary + "\n", "```", plan, "```\n"]
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+    return "\n".join(report)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="EXPLAIN benchmark for vector match query shapes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--documents", type=int, default=2000, help="Distinct document_id values")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--ef-search", type=int, default=40)
+    parser.add_argument("--threshold", type=float, default=-1.0, help="Similarity threshold (-1 keeps every row)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-recall", dest="recall", action="store_false", help="Skip exact-scan recall")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an existing krai_bench.vectors table")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema afterwards")
+    parser.add_argument("--output", type=Path, help="Write plans and timings as Markdown")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(benchmark(args))
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,9 @@ import json
 backend_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_path))
 
+# Mocked model responses must not land in (or be served from) the on-disk result cache
+os.environ.setdefault("MODEL_CACHE_ENABLED", "false")
+
 from backend.services.database_adapter import DatabaseAdapter
 from backend.processors.stage_tracker import StageTracker
 from backend.core.base_processor import ProcessingContext, ProcessingResult
@@ -401,3 +401,78 @@ class TestDatabasePersistenceHelpers:
             link_id_map={},
             adapter=processor.logger,
         )
+
+
+class _RecordingDatabase:
+    """execute_query stand-in that records statements and echoes upserted URLs."""
+
+    def __init__(self, fail_bulk: bool = False) -> None:
+        self.calls: List[tuple] = []
+        self.fail_bulk = fail_bulk
+
+    async def execute_query(self, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        self.calls.append((query, params))
+        if "krai_content.links" not in query:
+            return []
+        urls = params[1]
+        if self.fail_bulk and len(urls) > 1:
+            raise RuntimeError("null value in column page_number")
+        if any(url.endswith("/broken") for url in urls):
+            raise RuntimeError("null value in column page_number")
+        return [{"url": url, "id": f"id-{url.rsplit('/', 1)[-1]}"} for url in urls]
+
+
+class TestSetBasedUpserts:
+    LINKS = [
+        {"url": "http://example.com/a", "page_number": 1, "related_error_codes": ["E100"]},
+        {"url": "http://example.com/b", "page_number": 2},
+        {"url": "http://example.com/a", "page_number": 3, "description": "again"},
+    ]
+
+    async def test_links_are_upserted_in_one_statement(self) -> None:
+        database = _RecordingDatabase()
+        processor = LinkExtractionProcessorAI(database_service=database)
+        links = [dict(link) for link in self.LINKS]
+
+        mapping = await processor._save_links_to_db(links, "doc-1", processor.logger)  # type: ignore[attr-defined]
+
+        assert mapping == {"http://example.com/a": "id-a", "http://example.com/b": "id-b"}
+        assert len(database.calls) == 1
+        query, params = database.calls[0]
+        assert "ON CONFLICT (document_id, url) DO UPDATE" in query
+        assert params[0] == "doc-1"
+        # duplicate URL collapsed, last occurrence wins
+        assert params[1] == ["http://example.com/a", "http://example.com/b"]
+        assert params[5] == [3, 2]
+        assert [link["id"] for link in links] == ["id-a", "id-b", "id-a"]
+
+    async def test_failed_batch_falls_back_to_single_rows(self) -> None:
+        database = _RecordingDatabase(fail_bulk=True)
+        processor = LinkExtractionProcessorAI(database_service=database)
+        links = [dict(link) for link in self.LINKS] + [{"url": "http://example.com/broken"}]
+
+        mapping = await processor._save_links_to_db(links, "doc-1", processor.logger)  # type: ignore[attr-defined]
+
+        assert mapping == {"http://example.com/a": "id-a", "http://example.com/b": "id-b"}
+        assert len(database.calls) == 4
+
+    async def test_videos_are_grouped_by_conflict_key(self) -> None:
+        database = _RecordingDatabase()
+        processor = LinkExtractionProcessorAI(database_service=database)
+        videos = [
+            {"url": "http://youtu.be/x", "youtube_id": "x", "title": "One"},
+            {"url": "http://youtu.be/x", "youtube_id": "x", "title": "One (dup)"},
+            {"url": "http://vimeo.com/1", "title": "Two"},
+            {"url": "http://unknown/3", "title": "No link"},
+        ]
+        link_id_map = {"http://youtu.be/x": "l1", "http://vimeo.com/1": "l2"}
+
+        await processor._save_videos_to_db(videos, link_id_map, processor.logger)  # type: ignore[attr-defined]
+
+        assert len(database.calls) == 2
+        youtube_query, youtube_params = database.calls[0]
+        assert "ON CONFLICT (youtube_id) WHERE youtube_id IS NOT NULL" in youtube_query
+        assert youtube_params[5] == ["One (dup)"]
+        url_query, url_params = database.calls[1]
+        assert "ON CONFLICT (video_url) WHERE video_url IS NOT NULL AND youtube_id IS NULL" in url_query
+        assert url_params[0] == ["l2"]
@@ -537,3 +537,116 @@ class TestMetadataProcessorAIQuality:
         
         # All types should be present
         assert len(set(version_types)) == 5
+
+
+class _RecordingExtractor:
+    """Stands in for ErrorCodeExtractor: records scanned text, finds 'E###' codes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract_from_text(self, text, page_number, manufacturer_name=None):
+        import re
+        from types import SimpleNamespace
+
+        self.calls.append((page_number, text))
+        return [
+            SimpleNamespace(
+                error_code=code,
+                error_description=f"Description for {code}",
+                page_number=page_number,
+                confidence=0.9,
+                extraction_method="hp_pattern",
+                severity_level="medium",
+            )
+            for code in dict.fromkeys(re.findall(r"E\d{3}", text))
+        ]
+
+
+class _BulkDatabase:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.bulk_calls = []
+
+    async def get_chunks_by_document(self, document_id):
+        return self.chunks
+
+    async def create_error_codes_bulk(self, document_id, models):
+        self.bulk_calls.append((document_id, models))
+        return [model.id for model in models]
+
+
+@pytest.mark.metadata
+@pytest.mark.error_codes
+class TestOverlapAwareErrorCodeScan:
+    """Each page is scanned once; chunk overlap is not scanned twice."""
+
+    OVERLAP = "E200 Fuser temperature too low. Check the thermistor."
+
+    @pytest.fixture
+    def chunks(self):
+        return [
+            {"id": "c1", "chunk_index": 0, "page_start": 1, "page_end": 1,
+             "text_chunk": "Intro. E100 Paper jam in tray 1. " + self.OVERLAP},
+            {"id": "c2", "chunk_index": 1, "page_start": 1, "page_end": 1,
+             "text_chunk": self.OVERLAP + "\n\nE300 Scanner lamp failure."},
+            {"id": "c3", "chunk_index": 2, "page_start": 2, "page_end": 2,
+             "text_chunk": "E400 Toner low on page two."},
+        ]
+
+    def test_overlap_length_matches_repeated_tail(self):
+        from backend.processors.metadata_processor_ai import chunk_overlap_length
+
+        previous = "Some earlier text. " + self.OVERLAP
+        assert chunk_overlap_length(previous, self.OVERLAP + "\n\nNew paragraph") == len(self.OVERLAP)
+        assert chunk_overlap_length(previous, "Unrelated text that does not repeat anything") == 0
+
+    def test_stitched_pages_drop_overlap(self, chunks):
+        from backend.processors.metadata_processor_ai import stitch_chunk_pages
+
+        pages = stitch_chunk_pages(chunks)
+
+        assert sorted(pages) == [1, 2]
+        assert pages[1].count("E200") == 1
+        assert "E300" in pages[1]
+
+    @pytest.mark.asyncio
+    async def test_scans_each_page_once_and_links_chunks(self, chunks):
+        database = _BulkDatabase(chunks)
+        processor = MetadataProcessorAI(database_service=database)
+        processor.error_code_extractor = _RecordingExtractor()
+
+        codes = await processor._extract_error_codes_from_chunks("doc-1", "HP", MagicMock())
+
+        assert [page for page, _ in processor.error_code_extractor.calls] == [1, 2]
+        assert {c.error_code: c.chunk_id for c in codes} == {
+            "E100": "c1", "E200": "c1", "E300": "c2", "E400": "c3",
+        }
+
+    @pytest.mark.asyncio
+    async def test_page_texts_are_preferred_over_chunks(self, chunks):
+        database = _BulkDatabase(chunks)
+        processor = MetadataProcessorAI(database_service=database)
+        processor.error_code_extractor = _RecordingExtractor()
+
+        codes = await processor._extract_error_codes_from_chunks(
+            "doc-1", "HP", MagicMock(), page_texts={2: "E400 Toner low on page two."}
+        )
+
+        assert processor.error_code_extractor.calls == [(2, "E400 Toner low on page two.")]
+        assert codes[0].chunk_id == "c3"
+
+    @pytest.mark.asyncio
+    async def test_codes_are_saved_in_one_bulk_call(self, chunks):
+        database = _BulkDatabase(chunks)
+        processor = MetadataProcessorAI(database_service=database)
+        processor.error_code_extractor = _RecordingExtractor()
+        codes = await processor._extract_error_codes_from_chunks("doc-1", "HP", MagicMock())
+
+        saved = await processor._save_error_codes(codes, "doc-1", "HP", MagicMock())
+
+        assert saved == 4
+        assert len(database.bulk_calls) == 1
+        document_id, models = database.bulk_calls[0]
+        assert document_id == "doc-1"
+        assert [m.chunk_id for m in models] == ["c1", "c1", "c2", "c3"]